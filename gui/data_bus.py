@@ -0,0 +1,110 @@
+"""
+Moduł zawierający szynę zdarzeń "dane się zmieniły" dla zakładek GUI.
+
+Zamiast od razu aktualizować wszystkie zakładki, szyna zaznacza je jako
+nieaktualne. Widoczna zakładka odświeża się od razu, pozostałe - gdy użytkownik
+na nie przejdzie albo po kolei w tle, gdy aplikacja nic innego nie robi.
+"""
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+class DataBus(QObject):
+    """Szyna zdarzeń zmiany danych z leniwym odświeżaniem zakładek."""
+
+    data_changed = pyqtSignal(object)
+
+    def __init__(self, tab_widget, task_runner=None, parent=None, background_interval_ms=300):
+        """
+        Inicjalizacja szyny.
+
+        Args:
+            tab_widget (QTabWidget): Zakładki - odświeżamy tę, która staje się widoczna.
+            task_runner (TaskRunner, optional): Gdy liczy coś w tle, odświeżanie w tle czeka.
+            parent (QObject, optional): Obiekt nadrzędny. Domyślnie None.
+            background_interval_ms (int, optional): Odstęp między odświeżeniami w tle.
+        """
+        super(DataBus, self).__init__(parent)
+        self.tab_widget = tab_widget
+        self.task_runner = task_runner
+
+        self._data = None
+        self._subscribers = []
+        self._dirty = []
+
+        # niski priorytet - jedna zakładka na tyknięcie, tylko gdy nic innego nie trwa
+        self._background_timer = QTimer(self)
+        self._background_timer.setInterval(background_interval_ms)
+        self._background_timer.timeout.connect(self._refresh_next_in_background)
+
+        tab_widget.currentChanged.connect(self._on_tab_changed)
+
+    def subscribe(self, tab):
+        """
+        Rejestruje zakładkę z metodą update_data(data).
+
+        Args:
+            tab (QWidget): Zakładka.
+        """
+        if tab not in self._subscribers:
+            self._subscribers.append(tab)
+            if self._data is not None:
+                self._mark_dirty(tab)
+
+    def publish(self, data):
+        """
+        Ogłasza nowe dane - widoczna zakładka odświeża się od razu, reszta później.
+
+        Args:
+            data (pandas.DataFrame): Nowe dane.
+        """
+        self._data = data
+        for tab in self._subscribers:
+            self._mark_dirty(tab)
+
+        self.data_changed.emit(data)
+
+        self.refresh(self.tab_widget.currentWidget())
+        self._background_timer.start()
+
+    def is_dirty(self, tab):
+        """Czy zakładka czeka na odświeżenie."""
+        return tab in self._dirty
+
+    def refresh(self, tab):
+        """
+        Odświeża zakładkę, jeśli jest nieaktualna.
+
+        Args:
+            tab (QWidget): Zakładka.
+        """
+        if tab not in self._dirty:
+            return
+
+        self._dirty.remove(tab)
+        try:
+            tab.update_data(self._data)
+        except Exception as error:
+            print(f"blad przy odswiezaniu zakladki {type(tab).__name__}: {error}")
+
+    def refresh_all(self):
+        """Odświeża od razu wszystkie nieaktualne zakładki."""
+        for tab in list(self._dirty):
+            self.refresh(tab)
+
+    def _mark_dirty(self, tab):
+        if tab not in self._dirty:
+            self._dirty.append(tab)
+
+    def _on_tab_changed(self, index):
+        self.refresh(self.tab_widget.widget(index))
+
+    def _refresh_next_in_background(self):
+        if not self._dirty:
+            self._background_timer.stop()
+            return
+
+        # nie przeszkadzamy zadaniom uruchomionym przez użytkownika
+        if self.task_runner is not None and self.task_runner.is_running():
+            return
+
+        self.refresh(self._dirty[0])
@@ -0,0 +1,200 @@
+"""
+Moduł zawierający model tabeli Qt oparty bezpośrednio na ramce pandas.
+
+Zamiast tworzyć QTableWidgetItem dla każdej komórki, widok (QTableView) pyta model
+tylko o komórki, które są aktualnie widoczne. Wartości formatowane są blokami
+wierszy (wektorowo, na tablicach NumPy) i trzymane w małym buforze, więc pamięć
+nie rośnie z rozmiarem danych, a przewijanie nawet milionów wierszy jest płynne.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from PyQt5.QtGui import QColor
+
+
+class DataFrameModel(QAbstractTableModel):
+    """Model tabeli tylko do odczytu dla ramki pandas."""
+
+    # ile wierszy formatujemy naraz i ile takich bloków pamiętamy
+    BLOCK_SIZE = 128
+    MAX_CACHED_BLOCKS = 512
+
+    HIGHLIGHT_COLOR = QColor(255, 255, 0, 100)  # Żółte tło
+
+    def __init__(self, data=None, parent=None, max_text_length=50):
+        """
+        Inicjalizacja modelu.
+
+        Args:
+            data (pandas.DataFrame, optional): Dane do wyświetlenia. Domyślnie None.
+            parent (QObject, optional): Obiekt nadrzędny. Domyślnie None.
+            max_text_length (int, optional): Maksymalna długość tekstu w komórce. Domyślnie 50.
+        """
+        super(DataFrameModel, self).__init__(parent)
+        self.max_text_length = max_text_length
+
+        self._data = None
+        self._columns = []
+        self._arrays = {}
+        self._blocks = OrderedDict()
+        self._highlight = {}
+        self._numeric = []
+
+        self.set_data(data)
+
+    def set_data(self, data, highlight=None):
+        """
+        Podmienia wyświetlane dane.
+
+        Args:
+            data (pandas.DataFrame): Nowe dane (None = pusta tabela).
+            highlight (pandas.DataFrame, optional): Maska True/False tego samego kształtu
+                (np. z compute_change_mask) - zaznaczone komórki dostają kolorowe tło.
+        """
+        self.beginResetModel()
+        self._data = data
+        self._columns = list(data.columns) if data is not None else []
+        self._arrays = {}
+        self._blocks.clear()
+        self._numeric = [
+            pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+            for dtype in data.dtypes
+        ] if data is not None else []
+
+        # pamiętamy tylko kolumny, w których coś jest zaznaczone
+        self._highlight = {}
+        if data is not None and highlight is not None:
+            for position, column in enumerate(self._columns):
+                if column in highlight.columns:
+                    values = highlight[column].to_numpy(dtype=bool)
+                    if values.any():
+                        self._highlight[position] = values
+
+        self.endResetModel()
+
+    def get_data(self):
+        """Zwraca wyświetlaną ramkę danych."""
+        return self._data
+
+    def rowCount(self, parent=QModelIndex()):
+        """Liczba wierszy - cała ramka, bez limitu."""
+        if parent.isValid() or self._data is None:
+            return 0
+        return len(self._data)
+
+    def columnCount(self, parent=QModelIndex()):
+        """Liczba kolumn."""
+        if parent.isValid():
+            return 0
+        return len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Zwraca sformatowaną wartość komórki (tylko dla widocznych komórek)."""
+        if not index.isValid() or self._data is None:
+            return QVariant()
+
+        if role == Qt.DisplayRole:
+            row = index.row()
+            block = self._get_block(index.column(), row // self.BLOCK_SIZE)
+            return block[row % self.BLOCK_SIZE]
+
+        if role == Qt.BackgroundRole:
+            marked = self._highlight.get(index.column())
+            if marked is not None and marked[index.row()]:
+                return self.HIGHLIGHT_COLOR
+            return QVariant()
+
+        if role == Qt.TextAlignmentRole and self._is_numeric(index.column()):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """Nagłówki - nazwy kolumn i etykiety indeksu."""
+        if role != Qt.DisplayRole or self._data is None:
+            return QVariant()
+
+        if orientation == Qt.Horizontal:
+            if 0 <= section < len(self._columns):
+                return str(self._columns[section])
+            return QVariant()
+
+        if 0 <= section < len(self._data):
+            return str(self._data.index[section])
+        return QVariant()
+
+    def _column_array(self, column):
+        """Tablica NumPy kolumny - widok na dane ramki, bez kopiowania gdy się da."""
+        array = self._arrays.get(column)
+        if array is None:
+            array = self._data.iloc[:, column].to_numpy()
+            self._arrays[column] = array
+        return array
+
+    def _is_numeric(self, column):
+        """Czy kolumna jest liczbowa (do wyrównania do prawej)."""
+        return self._numeric[column]
+
+    def _get_block(self, column, block_number):
+        """
+        Zwraca listę sformatowanych tekstów dla bloku wierszy jednej kolumny.
+
+        Args:
+            column (int): Numer kolumny.
+            block_number (int): Numer bloku wierszy.
+
+        Returns:
+            list: Teksty do wyświetlenia.
+        """
+        key = (column, block_number)
+        block = self._blocks.get(key)
+
+        if block is not None:
+            self._blocks.move_to_end(key)
+            return block
+
+        start = block_number * self.BLOCK_SIZE
+        values = self._column_array(column)[start:start + self.BLOCK_SIZE]
+        block = self._format_values(values)
+
+        self._blocks[key] = block
+        if len(self._blocks) > self.MAX_CACHED_BLOCKS:
+            self._blocks.popitem(last=False)
+
+        return block
+
+    def _format_values(self, values):
+        """
+        Formatuje wektorowo fragment kolumny.
+
+        Args:
+            values (numpy.ndarray): Wartości do sformatowania.
+
+        Returns:
+            list: Teksty do wyświetlenia.
+        """
+        if values.dtype.kind == 'f':
+            texts = np.char.mod('%.4f', values).astype(object)
+            texts[np.isnan(values)] = "NaN"
+            return texts.tolist()
+
+        if values.dtype.kind in 'iub':
+            return values.astype(str).tolist()
+
+        texts = []
+        for value in values:
+            if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NA:
+                text = "NaN"
+            elif isinstance(value, float):
+                text = f"{value:.4f}"
+            else:
+                text = str(value)
+
+            # Ograniczenie długości tekstu
+            if len(text) > self.max_text_length:
+                text = text[:self.max_text_length - 3] + "..."
+            texts.append(text)
+
+        return texts
@@ -0,0 +1,73 @@
+"""
+Moduł zawierający zastępcę zakładki budowanej przy pierwszym otwarciu.
+
+Zakładki z wykresami i uczeniem maszynowym ciągną za sobą matplotlib, seaborn
+i sklearn. LazyTab trzyma tylko funkcję budującą - prawdziwa zakładka (razem
+z jej importami) powstaje dopiero, gdy użytkownik pierwszy raz ją otworzy.
+"""
+import time
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+
+
+class LazyTab(QWidget):
+    """Zastępca zakładki - buduje prawdziwą zakładkę przy pierwszym pokazaniu."""
+
+    def __init__(self, factory, name="", parent=None):
+        """
+        Inicjalizacja zastępcy.
+
+        Args:
+            factory (callable): Funkcja bez argumentów zwracająca gotową zakładkę.
+            name (str, optional): Nazwa do komunikatów o czasie budowy.
+            parent (QWidget, optional): Widget nadrzędny. Domyślnie None.
+        """
+        super(LazyTab, self).__init__(parent)
+        self._factory = factory
+        self._name = name
+        self._pending_data = None
+        self.widget = None
+
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    def is_built(self):
+        """Czy prawdziwa zakładka już istnieje."""
+        return self.widget is not None
+
+    def ensure_built(self):
+        """
+        Buduje prawdziwą zakładkę, jeśli jeszcze nie istnieje.
+
+        Returns:
+            QWidget: Prawdziwa zakładka.
+        """
+        if self.widget is None:
+            start = time.perf_counter()
+            self.widget = self._factory()
+            self._layout.addWidget(self.widget)
+            print(f"zbudowano zakladke {self._name} w {time.perf_counter() - start:.2f} s")
+
+            # dane, które przyszły zanim zakładka powstała
+            if self._pending_data is not None:
+                self.widget.update_data(self._pending_data)
+                self._pending_data = None
+
+        return self.widget
+
+    def update_data(self, data):
+        """
+        Przekazuje dane do zakładki - niezbudowana zakładka tylko je zapamiętuje.
+
+        Args:
+            data (pandas.DataFrame): Nowe dane.
+        """
+        if self.widget is None:
+            self._pending_data = data
+        else:
+            self.widget.update_data(data)
+
+    def showEvent(self, event):
+        """Pierwsze pokazanie zakładki - budujemy ją."""
+        self.ensure_built()
+        super(LazyTab, self).showEvent(event)
@@ -0,0 +1,319 @@
+"""
+Moduł zawierający wykres "na żywo" dla danych dopisywanych w trakcie pracy.
+
+Zamiast przerysowywać całą figurę przy każdym nowym wierszu, LivePlot trzyma
+gotowe tło (osie, siatka, opisy i już narysowane punkty) i dorysowuje na nim
+tylko nowe odcinki, a potem przenosi na ekran sam obszar osi (blitting).
+Pełne przerysowanie następuje tylko wtedy, gdy nowe punkty wychodzą poza
+zakres osi - zakres rośnie wtedy z zapasem, więc zdarza się to rzadko.
+
+Wszystkie wykresy na żywo korzystają z jednego zegara klatek o częstotliwości
+odświeżania ekranu. Zegar działa tylko wtedy, gdy któryś wykres ma nowe dane,
+więc kilka paneli bez nowych wierszy nie zużywa procesora.
+"""
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.lines import Line2D
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QGuiApplication
+
+from utils.downsampling import POINTS_PER_PIXEL, MARKER_LIMIT, min_max_downsample
+
+
+# zapas zakresu osi przy rozszerzaniu - im większy, tym rzadziej pełne przerysowanie
+LIMIT_HEADROOM = 0.25
+
+# gdy nie da się odczytać częstotliwości ekranu
+DEFAULT_REFRESH_RATE = 60
+
+
+class _FrameClock(QObject):
+    """Wspólny zegar klatek dla wszystkich wykresów na żywo."""
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Zwraca (i w razie potrzeby tworzy) jedyny zegar."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        super(_FrameClock, self).__init__()
+        self._pending = []
+
+        screen = QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+        if not refresh_rate or refresh_rate <= 0:
+            refresh_rate = DEFAULT_REFRESH_RATE
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(int(1000 / refresh_rate), 1))
+        self._timer.timeout.connect(self._tick)
+
+    def request_frame(self, plot):
+        """Zgłasza wykres do narysowania w najbliższej klatce."""
+        if plot not in self._pending:
+            self._pending.append(plot)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def cancel(self, plot):
+        """Usuwa wykres z kolejki (np. po zatrzymaniu)."""
+        if plot in self._pending:
+            self._pending.remove(plot)
+
+    def _tick(self):
+        pending, self._pending = self._pending, []
+        for plot in pending:
+            try:
+                plot.render_frame()
+            except Exception as error:
+                print(f"blad przy rysowaniu klatki wykresu na zywo: {error}")
+
+        # nic nowego - zegar stoi do następnego append()
+        if not self._pending:
+            self._timer.stop()
+
+
+class _LiveLine(Line2D):
+    """Linia, która przy pełnym rysowaniu bierze punkty prosto z bufora LivePlot."""
+
+    def __init__(self, live_plot, *args, **kwargs):
+        super(_LiveLine, self).__init__([], [], *args, **kwargs)
+        self._live_plot = live_plot
+
+    def draw(self, renderer):
+        # widoczny fragment bufora zmniejszony do szerokości osi w pikselach
+        x, y = self._live_plot.visible_points()
+        self.set_data(x, y)
+        if self._live_plot.connect_points:
+            self.set_marker('o' if len(x) <= MARKER_LIMIT else 'None')
+        super(_LiveLine, self).draw(renderer)
+        self._live_plot.mark_drawn()
+
+
+class LivePlot(QObject):
+    """Wykres liniowy albo punktowy dorysowujący nowe dane przez blitting."""
+
+    def __init__(self, canvas, ax, connect_points=True, color='C0', window=None, parent=None):
+        """
+        Inicjalizacja wykresu na żywo.
+
+        Args:
+            canvas (FigureCanvas): Płótno z osiami.
+            ax (matplotlib.axes.Axes): Osie z opisami - tło wykresu.
+            connect_points (bool, optional): True = linia, False = same punkty.
+            color (str, optional): Kolor linii/punktów.
+            window (float, optional): Szerokość okna osi x (w jednostkach osi,
+                dla dat - w dniach). None = pokazujemy wszystkie dane.
+            parent (QObject, optional): Obiekt nadrzędny. Domyślnie None.
+        """
+        super(LivePlot, self).__init__(parent)
+        self.canvas = canvas
+        self.ax = ax
+        self.connect_points = connect_points
+        self.window = window
+
+        # bufor z zapasem - dopisywanie bez kopiowania wszystkiego przy każdym wierszu
+        self._x = np.empty(1024)
+        self._y = np.empty(1024)
+        self._count = 0
+        self._drawn_count = 0
+        self._dates = None
+
+        # najmniejsze/największe x i y w danych - z nich liczymy zakres osi
+        self._data_range = np.array([np.inf, -np.inf, np.inf, -np.inf])
+        self._limits_set = False
+
+        self._background = None
+        self._running = True
+
+        style = {'color': color, 'linewidth': 1}
+        if not connect_points:
+            style.update(linestyle='None', marker='o', markersize=3)
+
+        # punkty, które są już w tle
+        self._line = _LiveLine(self, **style)
+        ax.add_line(self._line)
+
+        # nowe punkty - rysowane tylko w klatce, potem trafiają do tła
+        self._segment = Line2D([], [], animated=True, **style)
+        ax.add_line(self._segment)
+
+        # ostatni punkt i jego wartość - jedyne elementy, które się ruszają
+        self._last_marker = Line2D([], [], marker='o', color='red', linestyle='None', animated=True)
+        ax.add_line(self._last_marker)
+        self._last_label = ax.text(0.01, 0.98, '', transform=ax.transAxes, va='top',
+                                   animated=True, bbox={'facecolor': 'white', 'alpha': 0.8})
+
+        self._draw_connection = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def append(self, x, y):
+        """
+        Dopisuje nowe punkty - rysowanie nastąpi w najbliższej klatce.
+
+        Args:
+            x (array-like): Wartości osi x (liczby albo daty), dla linii rosnąco.
+            y (array-like): Wartości osi y.
+        """
+        x = np.asarray(x)
+        y = np.asarray(y, dtype=np.float64)
+        if len(x) == 0:
+            return
+
+        if self._dates is None:
+            self._dates = np.issubdtype(x.dtype, np.datetime64)
+            if self._dates:
+                self.ax.xaxis_date()
+        x = mdates.date2num(x) if self._dates else x.astype(np.float64)
+
+        needed = self._count + len(x)
+        if needed > len(self._x):
+            capacity = max(needed, 2 * len(self._x))
+            self._x = np.resize(self._x, capacity)
+            self._y = np.resize(self._y, capacity)
+
+        self._x[self._count:needed] = x
+        self._y[self._count:needed] = y
+        self._count = needed
+
+        finite_y = y[np.isfinite(y)]
+        low_y, high_y = (finite_y.min(), finite_y.max()) if len(finite_y) else (np.inf, -np.inf)
+        self._data_range = np.array([
+            min(self._data_range[0], x.min()), max(self._data_range[1], x.max()),
+            min(self._data_range[2], low_y), max(self._data_range[3], high_y),
+        ])
+
+        if self._running:
+            _FrameClock.instance().request_frame(self)
+
+    def stop(self):
+        """Zatrzymuje wykres - dane zostają, ale nie jest już przerysowywany."""
+        self._running = False
+        _FrameClock.instance().cancel(self)
+        self.canvas.mpl_disconnect(self._draw_connection)
+
+    def point_count(self):
+        """Liczba punktów w buforze."""
+        return self._count
+
+    def visible_points(self):
+        """
+        Punkty z widocznego zakresu osi x, zmniejszone do szerokości osi.
+
+        Returns:
+            tuple: (x, y) do narysowania.
+        """
+        x = self._x[:self._count]
+        y = self._y[:self._count]
+        if not self.connect_points:
+            # punkty nie muszą być posortowane po x - rysujemy wszystkie
+            return x, y
+
+        left, right = self.ax.get_xlim()
+        start = max(np.searchsorted(x, left, side='left') - 1, 0)
+        end = min(np.searchsorted(x, right, side='right') + 1, self._count)
+        x, y = x[start:end], y[start:end]
+
+        budget = max(int(self.ax.bbox.width), 100) * POINTS_PER_PIXEL
+        if len(x) > budget:
+            valid = ~np.isnan(y)
+            x, y = x[valid], y[valid]
+            indices = min_max_downsample(x, y, budget // 2)
+            x, y = x[indices], y[indices]
+
+        return x, y
+
+    def mark_drawn(self):
+        """Pełne rysowanie objęło cały bufor (wywoływane przez linię)."""
+        self._drawn_count = self._count
+
+    def render_frame(self):
+        """Dorysowuje nowe punkty (wywoływane przez zegar klatek)."""
+        # ukryte płótno - dorysujemy przy najbliższym pełnym rysowaniu
+        if not self._running or not self.canvas.isVisible():
+            return
+        if self.ax not in self.canvas.figure.axes:
+            self.stop()
+            return
+
+        limits_changed = self._extend_limits()
+        if self._drawn_count == self._count and not limits_changed:
+            return
+
+        if self._background is None or limits_changed:
+            # pełne przerysowanie - _on_draw zapisze nowe tło
+            self.canvas.draw()
+            return
+
+        start = max(self._drawn_count - 1, 0)
+        self._segment.set_data(self._x[start:self._count], self._y[start:self._count])
+
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self._segment)
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._drawn_count = self._count
+
+        self._draw_last_point()
+        self.canvas.blit(self.ax.bbox)
+
+    def _on_draw(self, event):
+        """Po pełnym rysowaniu zapamiętujemy tło i dorysowujemy ruchome elementy."""
+        if self.ax not in self.canvas.figure.axes:
+            # osie zostały usunięte z figury (np. reset_axes) bez stop()
+            self.stop()
+            return
+
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_last_point()
+
+    def _draw_last_point(self):
+        if self._count == 0:
+            return
+
+        last_x, last_y = self._x[self._count - 1], self._y[self._count - 1]
+        self._last_marker.set_data([last_x], [last_y])
+        self.ax.draw_artist(self._last_marker)
+
+        when = mdates.num2date(last_x).strftime('%Y-%m-%d %H:%M') if self._dates else f"{last_x:g}"
+        self._last_label.set_text(f"ostatni: {last_y:.2f} ({when})  punktów: {self._count}")
+        self.ax.draw_artist(self._last_label)
+
+    def _extend_limits(self):
+        """
+        Rozszerza zakres osi, gdy dane z niego wychodzą.
+
+        Returns:
+            bool: True, jeśli zakres się zmienił (potrzebne pełne przerysowanie).
+        """
+        if self._count == 0:
+            return False
+
+        low_x, high_x, low_y, high_y = self._data_range
+        left, right = self.ax.get_xlim()
+        bottom, top = self.ax.get_ylim()
+
+        changed = False
+        # w oknie przesuwamy się tylko w prawo - starsze dane mogą wyjść poza oś
+        outside_x = high_x > right or (self.window is None and low_x < left)
+        if not self._limits_set or outside_x:
+            if self.window is not None:
+                left = high_x - self.window * (1 - LIMIT_HEADROOM)
+                right = left + self.window
+            else:
+                span = max(high_x - low_x, 1e-9)
+                # linia zaczyna się od pierwszego punktu, punkty mają margines z obu stron
+                left = low_x if self.connect_points else low_x - span * LIMIT_HEADROOM / 2
+                right = high_x + span * LIMIT_HEADROOM
+            self.ax.set_xlim(left, right)
+            changed = True
+
+        if np.isfinite(low_y) and (not self._limits_set or low_y < bottom or high_y > top):
+            margin = max(high_y - low_y, 1e-9) * LIMIT_HEADROOM / 2
+            self.ax.set_ylim(low_y - margin, high_y + margin)
+            changed = True
+
+        self._limits_set = True
+        return changed
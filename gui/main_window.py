@@ -3,32 +3,44 @@ Moduł zawierający klasę głównego okna aplikacji.
 ZAKTUALIZOWANY - używa prostych funkcji z utils zamiast klas.
 """
 import os
+import importlib
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QPushButton, QTabWidget, QFileDialog,
                              QMessageBox, QDialog, QComboBox, QAction, QStatusBar,
                              QToolBar)
 from PyQt5.QtCore import Qt
 
-# importujemy nasze proste funkcje z utils
-from utils.data_loader import load_csv_data, save_data_to_csv, check_basic_info
-from utils.data_processor import calculate_basic_statistics, calculate_correlation
-from utils.visualization import setup_plot_style
+from gui.task_runner import TaskRunner, TaskProgressWidget, run_task
+from gui.data_bus import DataBus
+from gui.lazy_tab import LazyTab
 
-# importujemy taby GUI
-from gui.tabs.data_previews import DataPreviewTab
-from gui.tabs.stats_tab import StatsTab
-from gui.tabs.correlation_tab import CorrelationTab
-from gui.tabs.visualization_tab import VisualizationTab
-from gui.tabs.data_processing_tab import DataProcessingTab
-from gui.tabs.classification_tab import ClassificationTab
+# taby GUI i funkcje z utils (pandas, matplotlib, sklearn) importujemy dopiero
+# przy pierwszym użyciu - okno pokazuje się od razu
+# (atrybut okna, moduł, klasa, tytuł, czy rysuje wykresy)
+TABS = [
+    ('data_preview_tab', 'gui.tabs.data_previews', 'DataPreviewTab', "Podgląd danych", False),
+    ('stats_tab', 'gui.tabs.stats_tab', 'StatsTab', "Analiza statystyczna", False),
+    ('correlation_tab', 'gui.tabs.correlation_tab', 'CorrelationTab', "Korelacje", True),
+    ('visualization_tab', 'gui.tabs.visualization_tab', 'VisualizationTab', "Wizualizacja", True),
+    ('data_processing_tab', 'gui.tabs.data_processing_tab', 'DataProcessingTab', "Przetwarzanie danych", False),
+    ('classification_tab', 'gui.tabs.classification_tab', 'ClassificationTab', "Klasyfikacja i grupowanie", True),
+]
 
 
 class MainWindow(QMainWindow):
     """Główne okno aplikacji - teraz prostsze i bardziej zrozumiałe!"""
 
-    def __init__(self):
-        """Inicjalizacja głównego okna aplikacji."""
+    def __init__(self, lazy_tabs=True):
+        """
+        Inicjalizacja głównego okna aplikacji.
+
+        Args:
+            lazy_tabs (bool, optional): Budować zakładki przy pierwszym otwarciu
+                (False = wszystkie od razu, jak dawniej). Domyślnie True.
+        """
         super(MainWindow, self).__init__()
+        self.lazy_tabs = lazy_tabs
+        self.plot_style_ready = False
 
         # Tytuł i rozmiar okna
         self.setWindowTitle("Analiza danych o jakości powietrza - Wersja 2.0")
@@ -39,9 +51,7 @@ class MainWindow(QMainWindow):
         self.original_data = None  # oryginalne dane (do resetowania)
         self.current_file_path = None  # sciezka do aktualnego pliku
 
-        # ustawiamy ladny styl wykresow od razu
-        setup_plot_style()
-        print("ustawiono ladny styl wykresow")
+        # ladny styl wykresow ustawiamy przy pierwszej zakladce z wykresami
 
         # Tworzenie interfejsu użytkownika
         self.init_ui()
@@ -65,6 +75,14 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("Gotowy - wczytaj dane zeby zaczac analize")
 
+        # Zadania w tle - pasek postępu z przyciskiem anulowania w pasku stanu
+        self.task_runner = TaskRunner(self)
+        self.task_progress_widget = TaskProgressWidget(self.task_runner)
+        self.statusBar.addPermanentWidget(self.task_progress_widget)
+        self.task_runner.task_rejected.connect(
+            lambda description: self.statusBar.showMessage(f"Poczekaj - zadanie '{description}' jeszcze trwa")
+        )
+
         # Przyciski do wczytywania danych
         load_data_group = QWidget()
         load_data_layout = QHBoxLayout(load_data_group)
@@ -81,24 +99,50 @@ class MainWindow(QMainWindow):
         # Zakładki dla różnych funkcjonalności
         self.tabs = QTabWidget()
 
-        # POPRAWIONE konstruktory tabs - tylko status_bar
-        self.data_preview_tab = DataPreviewTab()
-        self.stats_tab = StatsTab(self.statusBar)
-        self.correlation_tab = CorrelationTab(self.statusBar)
-        self.visualization_tab = VisualizationTab(self.statusBar)
-        self.data_processing_tab = DataProcessingTab(self.statusBar)
-        self.classification_tab = ClassificationTab(self.statusBar)
-
-        # Dodawanie zakładek
-        self.tabs.addTab(self.data_preview_tab, "Podgląd danych")
-        self.tabs.addTab(self.stats_tab, "Analiza statystyczna")
-        self.tabs.addTab(self.correlation_tab, "Korelacje")
-        self.tabs.addTab(self.visualization_tab, "Wizualizacja")
-        self.tabs.addTab(self.data_processing_tab, "Przetwarzanie danych")
-        self.tabs.addTab(self.classification_tab, "Klasyfikacja i grupowanie")
+        # Zakładki - zastępcy budują prawdziwe zakładki przy pierwszym otwarciu
+        for attribute, module_name, class_name, title, uses_plots in TABS:
+            setattr(self, attribute, None)
+            tab = LazyTab(self._tab_factory(attribute, module_name, class_name, uses_plots), title)
+            self.tabs.addTab(tab, title)
+            if not self.lazy_tabs:
+                tab.ensure_built()
 
         main_layout.addWidget(self.tabs)
 
+        # Nowe dane ogłaszamy przez szynę - zakładki odświeżają się dopiero gdy są widoczne
+        self.data_bus = DataBus(self.tabs, self.task_runner, self)
+        for index in range(self.tabs.count()):
+            self.data_bus.subscribe(self.tabs.widget(index))
+
+    def _tab_factory(self, attribute, module_name, class_name, uses_plots):
+        """
+        Zwraca funkcję budującą zakładkę (import modułu dopiero w środku).
+
+        Args:
+            attribute (str): Atrybut okna, pod którym zapisać zakładkę.
+            module_name (str): Moduł z klasą zakładki.
+            class_name (str): Nazwa klasy zakładki.
+            uses_plots (bool): Czy zakładka rysuje wykresy (potrzebny styl).
+
+        Returns:
+            callable: Funkcja bez argumentów zwracająca zakładkę.
+        """
+        def build():
+            if uses_plots and not self.plot_style_ready:
+                from utils.visualization import setup_plot_style
+                setup_plot_style()
+                self.plot_style_ready = True
+
+            tab_class = getattr(importlib.import_module(module_name), class_name)
+
+            # wszystkie taby dostają status_bar i wspólny wykonawca zadań
+            tab = tab_class(self.statusBar, self.task_runner)
+
+            setattr(self, attribute, tab)
+            return tab
+
+        return build
+
     def create_toolbar(self):
         """Tworzenie paska narzędzi."""
         toolbar = QToolBar("Pasek narzędzi")
@@ -179,34 +223,55 @@ class MainWindow(QMainWindow):
             if separator is None:
                 return  # anulowano wybor separatora
 
-            # wczytujemy dane prostą funkcją!
+            # wczytujemy dane prostą funkcją - w tle, okno dalej działa
             print(f"wczytuje dane z pliku: {file_path}")
-            self.current_data = load_csv_data(file_path, separator=separator)
+            run_task(
+                self.task_runner, self, f"Wczytywanie {os.path.basename(file_path)}",
+                _load_data_task, file_path, separator,
+                on_finished=lambda result: self._on_data_loaded(result, file_path),
+                on_error=lambda message: QMessageBox.critical(
+                    self, "Błąd krytyczny", f"Wystąpił błąd: {message}"
+                ),
+                on_cancelled=lambda: self.statusBar.showMessage("Anulowano wczytywanie danych")
+            )
 
-            if self.current_data is not None:
-                # zapisujemy oryginalne dane do resetowania
-                self.original_data = self.current_data.copy()
-                self.current_file_path = file_path
+        except Exception as error:
+            print(f"blad przy wczytywaniu: {error}")
+            QMessageBox.critical(self, "Błąd krytyczny", f"Wystąpił błąd: {str(error)}")
 
-                # pokazujemy podstawowe info
-                info = check_basic_info(self.current_data)
+    def _on_data_loaded(self, result, file_path):
+        """
+        Odbiera wczytane dane z zadania w tle (wywoływane w wątku GUI).
 
-                # aktualizujemy status
-                self.statusBar.showMessage(
-                    f"Wczytano {info['row_count']} wierszy, {info['column_count']} kolumn z {os.path.basename(file_path)}"
-                )
+        Args:
+            result (tuple): (dane, kopia oryginalnych danych) albo (None, None).
+            file_path (str): Ścieżka do wczytanego pliku.
+        """
+        data, original_data = result
 
-                # aktualizujemy wszystkie taby
-                self.update_all_tabs()
+        if data is None:
+            QMessageBox.warning(self, "Błąd", "Nie udało się wczytać danych z pliku.")
+            return
 
-                print("dane wczytane pomyslnie!")
+        self.current_data = data
 
-            else:
-                QMessageBox.warning(self, "Błąd", "Nie udało się wczytać danych z pliku.")
+        # zapisujemy oryginalne dane do resetowania
+        self.original_data = original_data
+        self.current_file_path = file_path
 
-        except Exception as error:
-            print(f"blad przy wczytywaniu: {error}")
-            QMessageBox.critical(self, "Błąd krytyczny", f"Wystąpił błąd: {str(error)}")
+        # pokazujemy podstawowe info
+        from utils.data_loader import check_basic_info
+        info = check_basic_info(self.current_data)
+
+        # aktualizujemy status
+        self.statusBar.showMessage(
+            f"Wczytano {info['row_count']} wierszy, {info['column_count']} kolumn z {os.path.basename(file_path)}"
+        )
+
+        # aktualizujemy wszystkie taby
+        self.update_all_tabs()
+
+        print("dane wczytane pomyslnie!")
 
     def ask_for_separator(self):
         """
@@ -262,6 +327,7 @@ class MainWindow(QMainWindow):
             return
 
         # zapisujemy prostą funkcją!
+        from utils.data_loader import save_data_to_csv
         success = save_data_to_csv(self.current_data, file_path, separator)
 
         if success:
@@ -288,24 +354,17 @@ class MainWindow(QMainWindow):
 
     def update_all_tabs(self):
         """
-        Aktualizuje wszystkie zakładki po wczytaniu/zmianie danych
+        Ogłasza nowe dane wszystkim zakładkom po wczytaniu/zmianie danych.
+        Widoczna zakładka odświeża się od razu, pozostałe gdy zostaną otwarte
+        albo w tle (patrz DataBus).
         """
         try:
             if self.current_data is None:
                 print("Brak danych do aktualizacji tabs")
                 return
 
-            print("Aktualizuję wszystkie zakładki...")
-
-            # aktualizujemy każdą zakładkę - POPRAWIONA METODA
-            self.data_preview_tab.update_data(self.current_data)
-            self.stats_tab.update_data(self.current_data)
-            self.correlation_tab.update_data(self.current_data)
-            self.visualization_tab.update_data(self.current_data)
-            self.data_processing_tab.update_data(self.current_data)
-            self.classification_tab.update_data(self.current_data)
-
-            print("wszystkie taby zaktualizowane!")
+            print("Ogłaszam nowe dane zakładkom...")
+            self.data_bus.publish(self.current_data)
 
         except Exception as error:
             print(f"blad przy aktualizacji tabow: {error}")
@@ -325,6 +384,12 @@ class MainWindow(QMainWindow):
         # można powiadomić inne taby o zmianie
         # ale to zrobimy później jak będzie potrzeba
 
+    def closeEvent(self, event):
+        """Przy zamykaniu okna anulujemy zadania w tle i czekamy na ich koniec."""
+        self.task_runner.cancel()
+        self.task_runner.wait()
+        super(MainWindow, self).closeEvent(event)
+
     def show_about_dialog(self):
         """Wyświetlanie okna dialogowego 'O programie'."""
         QMessageBox.about(
@@ -346,4 +411,25 @@ class MainWindow(QMainWindow):
             "- Grupowanie danych\n"
             "- Reguły asocjacyjne\n\n"
             "Wersja 2.0 - Podejście funkcyjne"
-        )
\ No newline at end of file
+        )
+
+
+def _load_data_task(context, file_path, separator):
+    """
+    Zadanie w tle - wczytanie pliku z raportowaniem postępu.
+
+    Returns:
+        tuple: (dane, kopia do resetowania) albo (None, None).
+    """
+    from utils.data_loader import load_csv_data
+
+    data = load_csv_data(
+        file_path, separator=separator,
+        progress_callback=lambda percent: context.report_progress(percent, "wczytywanie")
+    )
+    context.check_cancelled()
+
+    if data is None:
+        return None, None
+
+    return data, data.copy()
@@ -1,7 +1,7 @@
 """
 Moduł zawierający klasę do osadzania wykresów Matplotlib w interfejsie PyQt5.
 """
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from PyQt5.QtWidgets import QSizePolicy
@@ -14,16 +14,31 @@ class MatplotlibCanvas(FigureCanvas):
         """
         Inicjalizacja płótna Matplotlib.
 
+        Figura tworzona jest bez pyplot - nie trafia do globalnego rejestru
+        figur i jest używana ponownie przy każdym rysowaniu.
+
         Args:
             parent (QWidget, optional): Widget nadrzędny. Domyślnie None.
             width (int, optional): Szerokość w calach. Domyślnie 5.
             height (int, optional): Wysokość w calach. Domyślnie 4.
             dpi (int, optional): Rozdzielczość. Domyślnie 100.
         """
-        self.fig, self.ax = plt.subplots(figsize=(width, height), dpi=dpi)
+        self.fig = Figure(figsize=(width, height), dpi=dpi)
+        self.ax = self.fig.add_subplot(111)
         super(MatplotlibCanvas, self).__init__(self.fig)
         self.setParent(parent)
 
         # Ustawienie rozmiaru płótna
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.updateGeometry()
\ No newline at end of file
+        self.updateGeometry()
+
+    def reset_axes(self):
+        """
+        Czyści figurę i tworzy na niej nowe, puste osie.
+
+        Returns:
+            matplotlib.axes.Axes: Osie do rysowania (także w self.ax).
+        """
+        self.fig.clear()
+        self.ax = self.fig.add_subplot(111)
+        return self.ax
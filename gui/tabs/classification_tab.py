@@ -7,27 +7,61 @@ import pandas as pd
 from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QGroupBox, QLabel,
                              QComboBox, QPushButton, QListWidget, QAbstractItemView,
                              QSpinBox, QDoubleSpinBox, QSplitter, QTableWidget,
-                             QTableWidgetItem, QTabWidget, QTextEdit, QMessageBox)
+                             QTableWidgetItem, QTabWidget, QTextEdit, QMessageBox,
+                             QTableView, QCheckBox, QFileDialog, QInputDialog)
 from PyQt5.QtCore import Qt
 
+from ..dataframe_model import DataFrameModel
 from ..matplotlib_canvas import MatplotlibCanvas, NavigationToolbar
+from ..task_runner import run_task
+from utils.classification import CLASSIFIERS, INCREMENTAL_CLASSIFIERS, CV_MODES
+from utils.clustering import (CLUSTERING_METHODS, K_METHODS, AUTO_K_VALUES, fit_clustering,
+                              stratified_sample, sweep_clusters)
+
+
+# sposób oceny klasyfikatora -> tryb; sąsiednie godziny są prawie identyczne,
+# więc domyślnie testujemy na danych późniejszych niż treningowe
+EVALUATION_MODES = {
+    "Podział czasowy (bez mieszania)": 'time_split',
+    "Podział losowy": 'random_split',
+    "Walidacja krzyżowa (k-fold)": 'kfold',
+    "Walidacja krzyżowa (szereg czasowy)": 'timeseries',
+    "Walk-forward (okno rosnące)": 'walk_forward',
+    "Walk-forward (okno przesuwne)": 'sliding',
+}
+
+CROSS_VALIDATION_MODES = ('kfold', 'timeseries')
+WALK_FORWARD_MODES = ('walk_forward', 'sliding')
+
+# strojenie parametrów przy walidacji krzyżowej
+SEARCH_MODES = {
+    "Bez strojenia": 'none',
+    "Siatka parametrów": 'grid',
+    "Losowe parametry": 'random',
+}
 
 
 class ClassificationTab(QWidget):
     """Zakładka klasyfikacji i grupowania."""
 
-    def __init__(self, status_bar):
+    def __init__(self, status_bar, task_runner=None):
         """
         Inicjalizacja zakładki klasyfikacji i grupowania.
 
         Args:
             status_bar (QStatusBar): Pasek stanu głównego okna.
+            task_runner (TaskRunner, optional): Wykonawca zadań w tle (None = liczenie od razu).
         """
         super(ClassificationTab, self).__init__()
 
         self.status_bar = status_bar
+        self.task_runner = task_runner
         self.current_data = None
 
+        # ostatnio wytrenowane modele - do zapisania w rejestrze
+        self.last_classifier = None
+        self.last_clustering = None
+
         # Inicjalizacja interfejsu
         self.init_ui()
 
@@ -61,7 +95,8 @@ class ClassificationTab(QWidget):
 
         # Wybór klasyfikatora
         self.classifier_combo = QComboBox()
-        self.classifier_combo.addItems(["Decision Tree", "Random Forest", "SVM", "KNN"])
+        self.classifier_combo.addItems(CLASSIFIERS)
+        self.classifier_combo.currentTextChanged.connect(self._on_classifier_changed)
 
         classifier_layout = QHBoxLayout()
         classifier_layout.addWidget(QLabel("Klasyfikator:"))
@@ -82,11 +117,80 @@ class ClassificationTab(QWidget):
 
         classification_layout.addLayout(test_size_layout)
 
+        # Walidacja krzyżowa i strojenie parametrów
+        self.evaluation_combo = QComboBox()
+        self.evaluation_combo.addItems(list(EVALUATION_MODES))
+        self.evaluation_combo.currentTextChanged.connect(self._on_evaluation_changed)
+
+        evaluation_layout = QHBoxLayout()
+        evaluation_layout.addWidget(QLabel("Ocena:"))
+        evaluation_layout.addWidget(self.evaluation_combo)
+        classification_layout.addLayout(evaluation_layout)
+
+        self.search_combo = QComboBox()
+        self.search_combo.addItems(list(SEARCH_MODES))
+        self.search_combo.currentTextChanged.connect(self._on_evaluation_changed)
+
+        self.folds_spin = QSpinBox()
+        self.folds_spin.setRange(2, 520)
+        self.folds_spin.setValue(5)
+
+        self.n_iter_spin = QSpinBox()
+        self.n_iter_spin.setRange(2, 500)
+        self.n_iter_spin.setValue(20)
+
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(QLabel("Strojenie:"))
+        search_layout.addWidget(self.search_combo)
+        search_layout.addWidget(QLabel("Foldy:"))
+        search_layout.addWidget(self.folds_spin)
+        search_layout.addWidget(QLabel("Losowań:"))
+        search_layout.addWidget(self.n_iter_spin)
+        classification_layout.addLayout(search_layout)
+
+        # Okno przesuwne walk-forward - ile bloków testowych wstecz uczymy.
+        # Ostatni fold uczy się na n_folds blokach, więc okno musi być krótsze,
+        # inaczej nic nie przesuwa i wynik jest taki sam jak przy oknie rosnącym
+        self.window_spin = QSpinBox()
+        self.window_spin.setRange(1, self.folds_spin.value() - 1)
+        self.window_spin.setValue(3)
+        self.folds_spin.valueChanged.connect(lambda folds: self.window_spin.setMaximum(folds - 1))
+
+        window_layout = QHBoxLayout()
+        window_layout.addWidget(QLabel("Okno uczenia (bloki):"))
+        window_layout.addWidget(self.window_spin)
+        classification_layout.addLayout(window_layout)
+
+        self._on_evaluation_changed()
+
+        # Uczenie kawałkami z pliku - tylko klasyfikatory z partial_fit
+        self.out_of_core_checkbox = QCheckBox("Ucz z pliku kawałkami (większy niż pamięć)")
+        self.out_of_core_checkbox.setToolTip(
+            "Cechy i etykietę wybierz na wczytanej próbce - plik do uczenia musi mieć te same kolumny."
+        )
+
+        self.epochs_spin = QSpinBox()
+        self.epochs_spin.setRange(1, 50)
+        self.epochs_spin.setValue(3)
+
+        out_of_core_layout = QHBoxLayout()
+        out_of_core_layout.addWidget(self.out_of_core_checkbox)
+        out_of_core_layout.addWidget(QLabel("Epoki:"))
+        out_of_core_layout.addWidget(self.epochs_spin)
+        classification_layout.addLayout(out_of_core_layout)
+
+        self._on_classifier_changed(self.classifier_combo.currentText())
+
         # Przycisk do klasyfikacji
         classify_button = QPushButton("Klasyfikuj")
         classify_button.clicked.connect(self.classify_data)
         classification_layout.addWidget(classify_button)
 
+        self.save_classifier_button = QPushButton("Zapisz model")
+        self.save_classifier_button.setEnabled(False)
+        self.save_classifier_button.clicked.connect(lambda: self.save_model(self.last_classifier))
+        classification_layout.addWidget(self.save_classifier_button)
+
         classification_group.setLayout(classification_layout)
         control_layout.addWidget(classification_group)
 
@@ -108,14 +212,24 @@ class ClassificationTab(QWidget):
         self.n_clusters_spin.setRange(2, 10)
         self.n_clusters_spin.setValue(3)
 
+        # automatyczne k - sprawdzamy cały zakres pola równolegle i bierzemy najlepsze
+        self.auto_k_checkbox = QCheckBox("Automatycznie")
+        self.auto_k_checkbox.setToolTip(
+            f"Sprawdza k = {AUTO_K_VALUES[0]}..{AUTO_K_VALUES[-1]} w osobnych procesach "
+            "i wybiera k z najwyższym silhouette")
+        self.auto_k_checkbox.toggled.connect(
+            lambda: self._on_clustering_method_changed(self.clustering_method_combo.currentText()))
+
         clusters_layout.addWidget(QLabel("Liczba klastrów:"))
         clusters_layout.addWidget(self.n_clusters_spin)
+        clusters_layout.addWidget(self.auto_k_checkbox)
 
         clustering_layout.addLayout(clusters_layout)
 
         # Metoda grupowania
         self.clustering_method_combo = QComboBox()
-        self.clustering_method_combo.addItems(["K-means", "Hierarchical", "DBSCAN"])
+        self.clustering_method_combo.addItems(CLUSTERING_METHODS)
+        self.clustering_method_combo.currentTextChanged.connect(self._on_clustering_method_changed)
 
         method_layout = QHBoxLayout()
         method_layout.addWidget(QLabel("Metoda:"))
@@ -123,11 +237,36 @@ class ClassificationTab(QWidget):
 
         clustering_layout.addLayout(method_layout)
 
+        # Parametry gęstościowe (DBSCAN, HDBSCAN) - na danych po standaryzacji
+        density_layout = QHBoxLayout()
+
+        self.eps_spin = QDoubleSpinBox()
+        self.eps_spin.setRange(0.01, 10.0)
+        self.eps_spin.setSingleStep(0.05)
+        self.eps_spin.setValue(0.5)
+
+        self.min_samples_spin = QSpinBox()
+        self.min_samples_spin.setRange(2, 1000)
+        self.min_samples_spin.setValue(5)
+
+        density_layout.addWidget(QLabel("Promień (eps):"))
+        density_layout.addWidget(self.eps_spin)
+        density_layout.addWidget(QLabel("Min. sąsiadów:"))
+        density_layout.addWidget(self.min_samples_spin)
+
+        clustering_layout.addLayout(density_layout)
+        self._on_clustering_method_changed(self.clustering_method_combo.currentText())
+
         # Przycisk do grupowania
         cluster_button = QPushButton("Grupuj")
         cluster_button.clicked.connect(self.cluster_data)
         clustering_layout.addWidget(cluster_button)
 
+        self.save_clustering_button = QPushButton("Zapisz model")
+        self.save_clustering_button.setEnabled(False)
+        self.save_clustering_button.clicked.connect(lambda: self.save_model(self.last_clustering))
+        clustering_layout.addWidget(self.save_clustering_button)
+
         clustering_group.setLayout(clustering_layout)
         control_layout.addWidget(clustering_group)
 
@@ -143,6 +282,7 @@ class ClassificationTab(QWidget):
 
         # Panel z wynikami
         results_panel = QTabWidget()
+        self.results_panel = results_panel
 
         # Zakładka wyników klasyfikacji
         self.classification_results_tab = QWidget()
@@ -153,6 +293,16 @@ class ClassificationTab(QWidget):
 
         classification_results_layout.addWidget(self.classification_results_text)
 
+        # Zakładka wyników walidacji krzyżowej - jeden wiersz na zestaw parametrów
+        self.cv_results_tab = QWidget()
+        cv_results_layout = QVBoxLayout(self.cv_results_tab)
+
+        self.cv_results_model = DataFrameModel()
+        self.cv_results_table = QTableView()
+        self.cv_results_table.setModel(self.cv_results_model)
+
+        cv_results_layout.addWidget(self.cv_results_table)
+
         # Zakładka wyników grupowania
         self.clustering_results_tab = QWidget()
         clustering_results_layout = QVBoxLayout(self.clustering_results_tab)
@@ -163,9 +313,23 @@ class ClassificationTab(QWidget):
         clustering_results_layout.addWidget(self.clustering_toolbar)
         clustering_results_layout.addWidget(self.clustering_canvas)
 
+        # Zakładka wyboru liczby klastrów (krzywe dla kolejnych k)
+        self.k_results_tab = QWidget()
+        k_results_layout = QVBoxLayout(self.k_results_tab)
+
+        self.k_canvas = MatplotlibCanvas(self, width=8, height=4)
+        self.k_results_model = DataFrameModel()
+        self.k_results_table = QTableView()
+        self.k_results_table.setModel(self.k_results_model)
+
+        k_results_layout.addWidget(self.k_canvas, 2)
+        k_results_layout.addWidget(self.k_results_table, 1)
+
         # Dodanie zakładek do panelu wyników
         results_panel.addTab(self.classification_results_tab, "Klasyfikacja")
+        results_panel.addTab(self.cv_results_tab, "Walidacja")
         results_panel.addTab(self.clustering_results_tab, "Grupowanie")
+        results_panel.addTab(self.k_results_tab, "Wybór k")
 
         # Splitter do dzielenia paneli
         splitter = QSplitter(Qt.Horizontal)
@@ -239,81 +403,316 @@ class ClassificationTab(QWidget):
             )
             return
 
-        try:
-            # Proste sprawdzenie danych
-            from sklearn.model_selection import train_test_split
-            from sklearn.tree import DecisionTreeClassifier
-            from sklearn.ensemble import RandomForestClassifier
-            from sklearn.svm import SVC
-            from sklearn.neighbors import KNeighborsClassifier
-            from sklearn.metrics import accuracy_score, classification_report
-
-            # Przygotowanie danych
-            X = self.current_data[features].dropna()
-            y = self.current_data.loc[X.index, target].dropna()
-
-            # Sprawdzenie czy mamy dane
-            if len(X) == 0 or len(y) == 0:
-                QMessageBox.warning(self, "Błąd", "Brak danych po usunięciu braków.")
-                return
-
-            # Podział na zbiór treningowy i testowy
-            test_size = self.test_size_spin.value()
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=42
-            )
+        classifier_type_text = self.classifier_combo.currentText()
+        test_size = self.test_size_spin.value()
 
-            # Wybór klasyfikatora
-            classifier_type_text = self.classifier_combo.currentText()
-
-            if classifier_type_text == "Decision Tree":
-                classifier = DecisionTreeClassifier(random_state=42)
-            elif classifier_type_text == "Random Forest":
-                classifier = RandomForestClassifier(random_state=42, n_estimators=100)
-            elif classifier_type_text == "SVM":
-                classifier = SVC(random_state=42)
-            elif classifier_type_text == "KNN":
-                classifier = KNeighborsClassifier()
-            else:
-                QMessageBox.warning(self, "Błąd", "Nieznany typ klasyfikatora.")
-                return
-
-            # Trenowanie i predykcja
-            classifier.fit(X_train, y_train)
-            y_pred = classifier.predict(X_test)
-
-            # Obliczenie wyników
-            accuracy = accuracy_score(y_test, y_pred)
-            report = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
-
-            # Aktualizacja wyników
-            self.classification_results_text.clear()
-            self.classification_results_text.append(f"Klasyfikator: {classifier_type_text}")
-            self.classification_results_text.append(f"Cechy: {', '.join(features)}")
-            self.classification_results_text.append(f"Etykieta: {target}")
-            self.classification_results_text.append(f"Rozmiar zbioru testowego: {test_size}")
-            self.classification_results_text.append(f"Rozmiar danych: {len(X)} próbek")
-            self.classification_results_text.append(f"\nDokładność: {accuracy:.4f}")
-
-            self.classification_results_text.append("\nRaport klasyfikacji:")
-            for label, metrics in report.items():
-                if isinstance(metrics, dict):
-                    self.classification_results_text.append(f"\nKlasa: {label}")
-                    for metric, value in metrics.items():
-                        if isinstance(value, (int, float)):
-                            self.classification_results_text.append(f"  {metric}: {value:.4f}")
-
-            self.status_bar.showMessage(f"Dokonano klasyfikacji: {classifier_type_text}, dokładność: {accuracy:.4f}")
-
-        except ImportError:
-            QMessageBox.warning(
-                self, "Błąd", "Brak biblioteki scikit-learn. Zainstaluj: pip install scikit-learn"
-            )
-        except Exception as error:
-            print(f"Błąd przy klasyfikacji: {error}")
-            QMessageBox.critical(
-                self, "Błąd", f"Wystąpił błąd: {str(error)}"
-            )
+        if self.out_of_core_checkbox.isEnabled() and self.out_of_core_checkbox.isChecked():
+            self.train_out_of_core(features, target, classifier_type_text, test_size)
+            return
+
+        mode = EVALUATION_MODES[self.evaluation_combo.currentText()]
+        if mode in CROSS_VALIDATION_MODES:
+            self.cross_validate(features, target, classifier_type_text, mode)
+            return
+        if mode in WALK_FORWARD_MODES:
+            self.walk_forward(features, target, classifier_type_text, mode)
+            return
+
+        shuffle = mode == 'random_split'
+
+        # Trenowanie w tle - wyniki wypisujemy po powrocie
+        run_task(
+            self.task_runner, self, f"Klasyfikacja: {classifier_type_text}",
+            _classification_task, self.current_data, features, target, classifier_type_text, test_size,
+            shuffle,
+            on_finished=lambda result: self._show_classification(
+                result, classifier_type_text, features, target, test_size, shuffle
+            ),
+            on_error=self._show_error
+        )
+
+    def cross_validate(self, features, target, classifier_type_text, cv):
+        """
+        Walidacja krzyżowa (z opcjonalnym strojeniem parametrów) w tle.
+
+        Args:
+            features (list): Cechy.
+            target (str): Etykieta.
+            classifier_type_text (str): Nazwa klasyfikatora.
+            cv (str): Tryb walidacji ('kfold' albo 'timeseries').
+        """
+        search = SEARCH_MODES[self.search_combo.currentText()]
+        n_splits = self.folds_spin.value()
+        n_iter = self.n_iter_spin.value()
+
+        run_task(
+            self.task_runner, self, f"Walidacja krzyżowa: {classifier_type_text}",
+            _cross_validation_task, self.current_data, features, target, classifier_type_text,
+            cv, search, n_splits, n_iter,
+            on_finished=lambda result: self._show_cross_validation(
+                result, classifier_type_text, features, target, cv, n_splits
+            ),
+            on_error=self._show_error
+        )
+
+    def _show_cross_validation(self, result, classifier_type_text, features, target, cv, n_splits):
+        """
+        Wyświetlenie tabeli wyników walidacji krzyżowej (wywoływane w wątku GUI).
+
+        Args:
+            result (dict): Wynik _cross_validation_task.
+            classifier_type_text (str): Nazwa klasyfikatora.
+            features (list): Cechy.
+            target (str): Etykieta.
+            cv (str): Tryb walidacji.
+            n_splits (int): Liczba foldów.
+        """
+        if "error" in result:
+            QMessageBox.warning(self, "Błąd", result["error"])
+            return
+
+        table = result["results"]
+        best = table.iloc[0]
+        self.cv_results_model.set_data(table.reset_index(drop=True))
+        self.cv_results_table.resizeColumnsToContents()
+
+        self.classification_results_text.clear()
+        self.classification_results_text.append(f"Klasyfikator: {classifier_type_text}")
+        self.classification_results_text.append(f"Cechy: {', '.join(features)}")
+        self.classification_results_text.append(f"Etykieta: {target}")
+        self.classification_results_text.append(f"Walidacja: {CV_MODES[cv]}, {n_splits} foldów")
+        self.classification_results_text.append(f"Rozmiar danych: {result['samples']} próbek")
+        self.classification_results_text.append(
+            f"Sprawdzone zestawy parametrów: {len(table)}, odrzucone wcześniej: {result['pruned']}")
+        self.classification_results_text.append(f"Czas: {result['seconds']:.1f} s")
+        self.classification_results_text.append(f"\nNajlepsze parametry: {best['parametry']}")
+        self.classification_results_text.append(
+            f"Dokładność: {best['sredni wynik']:.4f} ± {best['odch. std']:.4f}")
+
+        self.results_panel.setCurrentWidget(self.cv_results_tab)
+        self.status_bar.showMessage(
+            f"Walidacja krzyżowa: {classifier_type_text}, najlepsza dokładność: {best['sredni wynik']:.4f}")
+
+    def walk_forward(self, features, target, classifier_type_text, mode):
+        """
+        Ocena walk-forward (okno rosnące albo przesuwne) w tle.
+
+        Args:
+            features (list): Cechy.
+            target (str): Etykieta.
+            classifier_type_text (str): Nazwa klasyfikatora.
+            mode (str): 'walk_forward' albo 'sliding'.
+        """
+        n_folds = self.folds_spin.value()
+        window_blocks = self.window_spin.value() if mode == 'sliding' else None
+
+        run_task(
+            self.task_runner, self, f"Walk-forward: {classifier_type_text}",
+            _walk_forward_task, self.current_data, features, target, classifier_type_text,
+            n_folds, window_blocks,
+            on_finished=lambda result: self._show_walk_forward(
+                result, classifier_type_text, features, target, n_folds, window_blocks
+            ),
+            on_error=self._show_error
+        )
+
+    def _show_walk_forward(self, result, classifier_type_text, features, target, n_folds, window_blocks):
+        """
+        Wyświetlenie wyników walk-forward (wywoływane w wątku GUI).
+
+        Args:
+            result (dict): Wynik _walk_forward_task.
+            classifier_type_text (str): Nazwa klasyfikatora.
+            features (list): Cechy.
+            target (str): Etykieta.
+            n_folds (int): Liczba bloków testowych.
+            window_blocks (int): Długość okna przesuwnego w blokach (None = okno rosnące).
+        """
+        if "error" in result:
+            QMessageBox.warning(self, "Błąd", result["error"])
+            return
+
+        table = result["results"]
+        scores = table['wynik']
+        full_fits = int((table['aktualizacja'] == 'pelne uczenie').sum())
+
+        self.cv_results_model.set_data(table)
+        self.cv_results_table.resizeColumnsToContents()
+
+        window_text = f"przesuwne, {window_blocks} bloków" if window_blocks else "rosnące"
+        self.classification_results_text.clear()
+        self.classification_results_text.append(f"Klasyfikator: {classifier_type_text}")
+        self.classification_results_text.append(f"Cechy: {', '.join(features)}")
+        self.classification_results_text.append(f"Etykieta: {target}")
+        self.classification_results_text.append(f"Walk-forward: {n_folds} bloków testowych, okno {window_text}")
+        self.classification_results_text.append(f"Rozmiar danych: {result['samples']} próbek")
+        self.classification_results_text.append(
+            f"Pełne uczenie w {full_fits} z {len(table)} foldów, "
+            f"czas uczenia: {table['czas uczenia [s]'].sum():.1f} s")
+        self.classification_results_text.append(f"\nDokładność: {scores.mean():.4f} ± {scores.std():.4f}")
+        self.classification_results_text.append(
+            f"Najgorszy blok: {scores.min():.4f}, najlepszy: {scores.max():.4f}")
+
+        self.results_panel.setCurrentWidget(self.cv_results_tab)
+        self.status_bar.showMessage(
+            f"Walk-forward: {classifier_type_text}, średnia dokładność: {scores.mean():.4f}")
+
+    def train_out_of_core(self, features, target, classifier_type_text, test_size):
+        """
+        Uczenie klasyfikatora z partial_fit na pliku czytanym kawałkami (w tle).
+
+        Args:
+            features (list): Cechy.
+            target (str): Etykieta.
+            classifier_type_text (str): Nazwa klasyfikatora przyrostowego.
+            test_size (float): Część wierszy z końca pliku do oceny.
+        """
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Plik do uczenia", "", "Pliki CSV (*.csv);;Wszystkie pliki (*.*)"
+        )
+        if not file_path:
+            return
+
+        epochs = self.epochs_spin.value()
+        run_task(
+            self.task_runner, self, f"Uczenie kawałkami: {classifier_type_text}",
+            _incremental_task, file_path, features, target, classifier_type_text, epochs, test_size,
+            on_finished=lambda result: self._show_incremental(
+                result, classifier_type_text, features, target, test_size, file_path, epochs
+            ),
+            on_error=self._show_error
+        )
+
+    def _show_incremental(self, result, classifier_type_text, features, target, test_size, file_path, epochs):
+        """
+        Wyświetlenie wyników uczenia kawałkami (wywoływane w wątku GUI).
+
+        Args:
+            result (dict): Wynik _incremental_task.
+            classifier_type_text (str): Nazwa klasyfikatora.
+            features (list): Cechy.
+            target (str): Etykieta.
+            test_size (float): Część wierszy z końca pliku do oceny.
+            file_path (str): Plik, na którym uczyliśmy.
+            epochs (int): Liczba epok.
+        """
+        self._show_classification(result, classifier_type_text, features, target, test_size, shuffle=False)
+        if "error" in result:
+            return
+
+        self.classification_results_text.append(
+            f"\nPlik: {file_path}\nEpoki: {epochs}, wiersze uczące: {result['train_rows']}, "
+            f"testowe: {result['test_rows']}, czas: {result['seconds']:.1f} s")
+
+    def _on_classifier_changed(self, classifier_type_text):
+        """Uczenie kawałkami jest dostępne tylko dla klasyfikatorów z partial_fit."""
+        incremental = classifier_type_text in INCREMENTAL_CLASSIFIERS
+        self.out_of_core_checkbox.setEnabled(incremental)
+        self.epochs_spin.setEnabled(incremental)
+
+    def _on_evaluation_changed(self, *args):
+        """Włącza tylko te ustawienia, które mają znaczenie dla wybranej oceny."""
+        mode = EVALUATION_MODES[self.evaluation_combo.currentText()]
+        cross_validation = mode in CROSS_VALIDATION_MODES
+        self.test_size_spin.setEnabled(mode in ('time_split', 'random_split'))
+        self.search_combo.setEnabled(cross_validation)
+        self.folds_spin.setEnabled(cross_validation or mode in WALK_FORWARD_MODES)
+        self.n_iter_spin.setEnabled(
+            cross_validation and SEARCH_MODES[self.search_combo.currentText()] == 'random')
+        self.window_spin.setEnabled(mode == 'sliding')
+
+    def _show_classification(self, result, classifier_type_text, features, target, test_size, shuffle=True):
+        """
+        Wyświetlenie wyników klasyfikacji (wywoływane w wątku GUI).
+
+        Args:
+            result (dict): Wynik _classification_task.
+            classifier_type_text (str): Nazwa klasyfikatora.
+            features (list): Cechy.
+            target (str): Etykieta.
+            test_size (float): Rozmiar zbioru testowego.
+            shuffle (bool, optional): Czy wiersze były losowo mieszane przed podziałem.
+        """
+        if "error" in result:
+            QMessageBox.warning(self, "Błąd", result["error"])
+            return
+
+        accuracy = result["accuracy"]
+        report = result["report"]
+
+        # Aktualizacja wyników
+        self.classification_results_text.clear()
+        self.classification_results_text.append(f"Klasyfikator: {classifier_type_text}")
+        self.classification_results_text.append(f"Cechy: {', '.join(features)}")
+        self.classification_results_text.append(f"Etykieta: {target}")
+        self.classification_results_text.append(f"Rozmiar zbioru testowego: {test_size}")
+        self.classification_results_text.append(
+            "Podział: losowy" if shuffle else "Podział: czasowy (test = najpóźniejsze wiersze)")
+        self.classification_results_text.append(f"Rozmiar danych: {result['samples']} próbek")
+        self.classification_results_text.append(f"\nDokładność: {accuracy:.4f}")
+
+        self.classification_results_text.append("\nRaport klasyfikacji:")
+        for label, metrics in report.items():
+            if isinstance(metrics, dict):
+                self.classification_results_text.append(f"\nKlasa: {label}")
+                for metric, value in metrics.items():
+                    if isinstance(value, (int, float)):
+                        self.classification_results_text.append(f"  {metric}: {value:.4f}")
+
+        self.status_bar.showMessage(f"Dokonano klasyfikacji: {classifier_type_text}, dokładność: {accuracy:.4f}")
+
+        self.last_classifier = {
+            "model": result["model"],
+            "scaler": result.get("scaler"),
+            "features": features,
+            "target": target,
+            "kind": "klasyfikacja",
+            "name": f"{classifier_type_text} - {target}",
+            "metrics": {"accuracy": accuracy, "samples": result["samples"]},
+        }
+        self.save_classifier_button.setEnabled(True)
+
+    def save_model(self, trained):
+        """
+        Zapis ostatnio wytrenowanego modelu (z cechami i skalerem) w rejestrze modeli.
+
+        Args:
+            trained (dict): self.last_classifier albo self.last_clustering.
+        """
+        from utils.model_registry import REGISTRY_DIR, save_model
+
+        if trained is None:
+            QMessageBox.warning(self, "Błąd", "Najpierw wytrenuj model.")
+            return
+
+        name, accepted = QInputDialog.getText(self, "Zapisz model", "Nazwa modelu:", text=trained["name"])
+        if not accepted or not name.strip():
+            return
+
+        entry = save_model(
+            trained["model"], trained["features"], name.strip(), kind=trained["kind"],
+            scaler=trained["scaler"], target=trained.get("target"), metrics=trained["metrics"]
+        )
+        if entry is None:
+            QMessageBox.warning(self, "Błąd", "Nie udało się zapisać modelu (szczegóły w konsoli).")
+            return
+
+        self.status_bar.showMessage(f"Zapisano model {entry['name']} ({entry['id']}) w katalogu {REGISTRY_DIR}")
+
+    def _show_error(self, message):
+        """Komunikat o błędzie zadania w tle."""
+        print(f"Błąd przy klasyfikacji/grupowaniu: {message}")
+        QMessageBox.critical(
+            self, "Błąd", f"Wystąpił błąd: {message}"
+        )
+
+    def _on_clustering_method_changed(self, method_text):
+        """Włącza tylko parametry używane przez wybraną metodę grupowania."""
+        density = method_text in ("DBSCAN", "HDBSCAN")
+        self.auto_k_checkbox.setEnabled(method_text in K_METHODS)
+        self.n_clusters_spin.setEnabled(not density and not self.auto_k_checkbox.isChecked())
+        self.eps_spin.setEnabled(method_text == "DBSCAN")
+        self.min_samples_spin.setEnabled(density)
 
     def cluster_data(self):
         """Grupowanie danych - uproszczona implementacja."""
@@ -323,8 +722,6 @@ class ClassificationTab(QWidget):
             )
             return
 
-        import matplotlib.pyplot as plt
-
         # Pobranie wybranych cech
         selected_items = self.clustering_features_list.selectedItems()
 
@@ -339,130 +736,422 @@ class ClassificationTab(QWidget):
         # Pobranie parametrów
         n_clusters = self.n_clusters_spin.value()
         method_text = self.clustering_method_combo.currentText()
+        eps = self.eps_spin.value()
+        min_samples = self.min_samples_spin.value()
+        auto_k = self.auto_k_checkbox.isChecked() and method_text in K_METHODS
+
+        # Grupowanie w tle - wykres rysujemy po powrocie wyniku
+        run_task(
+            self.task_runner, self, f"Grupowanie: {method_text}",
+            _clustering_task, self.current_data, features, method_text, n_clusters,
+            eps, min_samples, auto_k,
+            on_finished=lambda result: self._show_clustering(result, method_text),
+            on_error=self._show_error
+        )
+
+    def _show_clustering(self, result, method_text):
+        """
+        Wyświetlenie wyników grupowania (wywoływane w wątku GUI).
 
-        try:
-            from sklearn.cluster import KMeans, AgglomerativeClustering, DBSCAN
-            from sklearn.preprocessing import StandardScaler
-
-            # Przygotowanie danych - konwersja na numeryczne
-            data_for_clustering = self.current_data[features].copy()
-
-            # Konwertujemy każdą kolumnę na numeryczną
-            numeric_columns = []
-            for feature in features:
-                try:
-                    numeric_series = pd.to_numeric(data_for_clustering[feature], errors='coerce')
-                    if not numeric_series.isna().all():
-                        data_for_clustering[feature] = numeric_series
-                        numeric_columns.append(feature)
-                    else:
-                        print(f"Kolumna {feature} nie zawiera danych numerycznych")
-                except:
-                    print(f"Nie można przekonwertować kolumny {feature}")
-
-            if not numeric_columns:
-                QMessageBox.warning(self, "Błąd", "Żadna z wybranych cech nie zawiera danych numerycznych.")
-                return
-
-            # Bierzemy tylko kolumny numeryczne i usuwamy braki
-            numeric_data = data_for_clustering[numeric_columns].dropna()
-
-            if len(numeric_data) == 0:
-                QMessageBox.warning(self, "Błąd", "Brak danych po usunieciu braków.")
-                return
-
-            print(f"Grupowanie dla {len(numeric_data)} wierszy i {len(numeric_columns)} cech")
-
-            # Skalowanie danych
-            scaler = StandardScaler()
-            scaled_data = scaler.fit_transform(numeric_data)
-
-            # Wybór metody grupowania
-            if method_text == "K-means":
-                clustering = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-            elif method_text == "Hierarchical":
-                clustering = AgglomerativeClustering(n_clusters=n_clusters)
-            elif method_text == "DBSCAN":
-                clustering = DBSCAN(eps=0.5, min_samples=5)
-            else:
-                QMessageBox.warning(self, "Błąd", "Nieznana metoda grupowania.")
-                return
-
-            # Grupowanie
-            labels = clustering.fit_predict(scaled_data)
-
-            # Sprawdzenie czy znaleziono klastry
-            unique_labels = np.unique(labels)
-            n_clusters_found = len(unique_labels)
-
-            if n_clusters_found <= 1:
-                QMessageBox.warning(self, "Błąd",
-                                    f"Znaleziono tylko {n_clusters_found} klastrów. Spróbuj innych parametrów.")
-                return
-
-            print(f"Znaleziono {n_clusters_found} klastrów")
-
-            # Tworzenie wykresu
-            self.clustering_canvas.fig.clear()
-
-            if len(numeric_columns) >= 2:
-                # Wykres 2D - używamy pierwszych dwóch cech
-                ax = self.clustering_canvas.fig.add_subplot(111)
-
-                # Tworzenie wykresu punktowego z kolorami klastrów
-                scatter = ax.scatter(
-                    numeric_data.iloc[:, 0],
-                    numeric_data.iloc[:, 1],
-                    c=labels,
-                    cmap='viridis',
-                    alpha=0.7,
-                    s=50
-                )
-
-                ax.set_title(f"Grupowanie: {method_text} ({n_clusters_found} klastrów)")
-                ax.set_xlabel(numeric_columns[0])
-                ax.set_ylabel(numeric_columns[1])
-                ax.grid(True, alpha=0.3)
-
-                # Dodanie kolorowej legendy
-                import matplotlib.pyplot as plt
-                cbar = plt.colorbar(scatter, ax=ax)
-                cbar.set_label('Numer klastra')
-
-            else:
-                # Wykres słupkowy liczebności klastrów dla jednej cechy
-                ax = self.clustering_canvas.fig.add_subplot(111)
-                unique_labels, counts = np.unique(labels, return_counts=True)
-
-                colors = plt.cm.viridis(np.linspace(0, 1, len(unique_labels)))
-                bars = ax.bar(unique_labels, counts, color=colors, edgecolor='black', alpha=0.7)
-
-                ax.set_title(f"Liczebność klastrów: {method_text}")
-                ax.set_xlabel("Numer klastra")
-                ax.set_ylabel("Liczba punktów")
-
-                # Dodanie wartości na słupkach
-                for bar, count in zip(bars, counts):
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width() / 2., height + 0.5,
-                            f'{count}', ha='center', va='bottom', fontweight='bold')
-
-                ax.grid(True, alpha=0.3, axis='y')
-
-            # Odświeżenie wykresu
-            self.clustering_canvas.fig.tight_layout()
-            self.clustering_canvas.draw()
+        Args:
+            result (dict): Wynik _clustering_task.
+            method_text (str): Nazwa metody grupowania.
+        """
+        import matplotlib
 
-            self.status_bar.showMessage(
-                f"Grupowanie: {method_text}, {n_clusters_found} klastrów, {len(numeric_data)} punktów")
-            print(f"Grupowanie zakończone pomyślnie")
+        if "error" in result:
+            QMessageBox.warning(self, "Błąd", result["error"])
+            return
 
-        except ImportError:
-            QMessageBox.warning(
-                self, "Błąd", "Brak biblioteki scikit-learn. Zainstaluj: pip install scikit-learn"
+        if "sweep" in result:
+            self._show_k_sweep(result["sweep"], result["best_k"], method_text)
+
+        numeric_data = result["data"]
+        numeric_columns = list(numeric_data.columns)
+        labels = result["labels"]
+        n_clusters_found = len(np.unique(labels[labels >= 0]))
+        noise = int((labels < 0).sum())
+
+        print(f"Znaleziono {n_clusters_found} klastrów, szum: {noise} punktów")
+
+        # Tworzenie wykresu
+        self.clustering_canvas.fig.clear()
+
+        if len(numeric_columns) >= 2:
+            # Wykres 2D - używamy pierwszych dwóch cech
+            ax = self.clustering_canvas.fig.add_subplot(111)
+
+            # Miliony punktów nic nie wnoszą do obrazka - rysujemy próbkę
+            # warstwową (każdy klaster, także mały, jest widoczny)
+            shown = stratified_sample(labels)
+            shown_labels = labels[shown]
+            points = numeric_data.iloc[shown, :2].to_numpy()
+            clustered = shown_labels >= 0
+
+            # Tworzenie wykresu punktowego z kolorami klastrów
+            scatter = ax.scatter(
+                points[clustered, 0],
+                points[clustered, 1],
+                c=shown_labels[clustered],
+                cmap='viridis',
+                alpha=0.7,
+                s=50 if len(shown) < 2000 else 5
             )
-        except Exception as error:
-            print(f"Błąd przy grupowaniu: {error}")
-            QMessageBox.critical(
-                self, "Błąd", f"Wystąpił błąd: {str(error)}"
-            )
\ No newline at end of file
+            if not clustered.all():
+                ax.scatter(points[~clustered, 0], points[~clustered, 1],
+                           c='lightgray', s=5, label='szum')
+                ax.legend(loc='best')
+
+            title = f"Grupowanie: {method_text} ({n_clusters_found} klastrów)"
+            if len(shown) < len(labels):
+                title += f"\npokazano {len(shown)} z {len(labels)} punktów"
+            ax.set_title(title)
+            ax.set_xlabel(numeric_columns[0])
+            ax.set_ylabel(numeric_columns[1])
+            ax.grid(True, alpha=0.3)
+
+            # Dodanie kolorowej legendy
+            cbar = self.clustering_canvas.fig.colorbar(scatter, ax=ax)
+            cbar.set_label('Numer klastra')
+
+        else:
+            # Wykres słupkowy liczebności klastrów dla jednej cechy
+            ax = self.clustering_canvas.fig.add_subplot(111)
+            unique_labels, counts = np.unique(labels, return_counts=True)
+
+            colors = matplotlib.colormaps['viridis'](np.linspace(0, 1, len(unique_labels)))
+            bars = ax.bar(unique_labels, counts, color=colors, edgecolor='black', alpha=0.7)
+
+            ax.set_title(f"Liczebność klastrów: {method_text}")
+            ax.set_xlabel("Numer klastra")
+            ax.set_ylabel("Liczba punktów")
+
+            # Dodanie wartości na słupkach
+            for bar, count in zip(bars, counts):
+                height = bar.get_height()
+                ax.text(bar.get_x() + bar.get_width() / 2., height + 0.5,
+                        f'{count}', ha='center', va='bottom', fontweight='bold')
+
+            ax.grid(True, alpha=0.3, axis='y')
+
+        # Odświeżenie wykresu
+        self.clustering_canvas.fig.tight_layout()
+        self.clustering_canvas.draw()
+
+        self.status_bar.showMessage(
+            f"Grupowanie: {method_text}, {n_clusters_found} klastrów, {len(numeric_data)} punktów"
+            + (f", szum: {noise}" if noise else ""))
+        print(f"Grupowanie zakończone pomyślnie")
+
+        # zapisać da się tylko model, który umie przypisać nowe wiersze do klastrów
+        model = result["model"]
+        self.last_clustering = {
+            "model": model,
+            "scaler": result["scaler"],
+            "features": numeric_columns,
+            "kind": "grupowanie",
+            "name": f"{method_text} - {n_clusters_found} klastrów",
+            "metrics": {"clusters": n_clusters_found, "samples": len(numeric_data)},
+        } if hasattr(model, "predict") else None
+        self.save_clustering_button.setEnabled(self.last_clustering is not None)
+
+    def _show_k_sweep(self, sweep, best_k, method_text):
+        """
+        Krzywe inercji, silhouette i Davies-Bouldina dla kolejnych k.
+
+        Args:
+            sweep (pandas.DataFrame): Wynik sweep_clusters.
+            best_k (int): Wybrana liczba klastrów (zaznaczona na wykresach).
+            method_text (str): Nazwa metody grupowania.
+        """
+        self.k_canvas.fig.clear()
+        curves = [("inercja", "Inercja (łokieć)"),
+                  ("silhouette", "Silhouette (więcej = lepiej)"),
+                  ("davies-bouldin", "Davies-Bouldin (mniej = lepiej)")]
+        for position, (column, title) in enumerate(curves, start=1):
+            ax = self.k_canvas.fig.add_subplot(1, len(curves), position)
+            ax.plot(sweep['k'], sweep[column], marker='o')
+            ax.axvline(best_k, color='red', linestyle='--', alpha=0.7)
+            ax.set_title(title, fontsize=9)
+            ax.set_xticks(sweep['k'])
+            ax.set_xlabel("k")
+            ax.grid(True, alpha=0.3)
+        self.k_canvas.fig.suptitle(f"{method_text}: wybrano k = {best_k}")
+        self.k_canvas.fig.tight_layout()
+        self.k_canvas.draw()
+
+        self.k_results_model.set_data(sweep.round(4))
+        self.k_results_table.resizeColumnsToContents()
+        # pole pokazuje wybrane k - po wyłączeniu trybu automatycznego można od niego zacząć
+        self.n_clusters_spin.setValue(best_k)
+
+
+def _complete_rows(data, features, target):
+    """
+    Wiersze bez braków w cechach i etykiecie, ułożone według czasu.
+
+    Returns:
+        tuple: (ramka cech i etykiety, czas wierszy albo None gdy danych nie da się ułożyć w czasie).
+    """
+    from utils.resampling import parse_timestamps
+
+    # braki usuwamy razem z etykietą, żeby X i y miały te same wiersze
+    mask = data[features + [target]].notna().all(axis=1).to_numpy()
+    complete = data.loc[mask, features + [target]]
+
+    time_columns = [column for column in ('Date', 'Time') if column in data.columns]
+    timestamps = parse_timestamps(data.loc[mask, time_columns] if time_columns else complete)
+    if timestamps is None or timestamps.isna().all():
+        # bez kolumny czasu zostaje kolejność z pliku
+        return complete, None
+
+    timestamps = timestamps.to_numpy()
+    order = np.argsort(timestamps, kind='stable')
+    return complete.iloc[order], timestamps[order]
+
+
+def _classification_task(context, data, features, target, classifier_type_text, test_size, shuffle=True):
+    """
+    Zadanie w tle - podział danych, trenowanie i ocena klasyfikatora.
+
+    Returns:
+        dict: accuracy, report, samples, model, scaler (None, gdy model nie
+        potrzebuje skalowania) albo {"error": opis}.
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score, classification_report
+    from sklearn.preprocessing import StandardScaler
+    from utils.classification import make_classifier, SCALED_CLASSIFIERS
+
+    context.report_progress(0, "przygotowanie danych")
+
+    # Przygotowanie danych - przy podziale czasowym test to najpóźniejsze wiersze
+    complete, _ = _complete_rows(data, features, target)
+    X = complete[features]
+    y = complete[target]
+
+    # Sprawdzenie czy mamy dane
+    if len(X) == 0 or len(y) == 0:
+        return {"error": "Brak danych po usunięciu braków."}
+
+    # Podział na zbiór treningowy i testowy
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, shuffle=shuffle, random_state=42 if shuffle else None
+    )
+
+    # Wybór klasyfikatora - skaler osobno, żeby trafił do rejestru modeli
+    classifier = make_classifier(classifier_type_text, scale=False)
+    if classifier is None:
+        return {"error": "Nieznany typ klasyfikatora."}
+
+    # Modele liniowe dostają cechy po standaryzacji (skaler uczony tylko na zbiorze treningowym)
+    scaler = None
+    if classifier_type_text in SCALED_CLASSIFIERS:
+        scaler = StandardScaler().fit(X_train)
+        X_train = pd.DataFrame(scaler.transform(X_train), columns=features, index=X_train.index)
+        X_test = pd.DataFrame(scaler.transform(X_test), columns=features, index=X_test.index)
+
+    # Trenowanie i predykcja
+    context.report_progress(20, "trenowanie")
+    classifier.fit(X_train, y_train)
+
+    context.report_progress(70, "predykcja")
+    y_pred = classifier.predict(X_test)
+
+    # Obliczenie wyników
+    context.report_progress(90, "raport")
+    return {
+        "accuracy": accuracy_score(y_test, y_pred),
+        "report": classification_report(y_test, y_pred, output_dict=True, zero_division=0),
+        "samples": len(X),
+        "model": classifier,
+        "scaler": scaler,
+    }
+
+
+def _cross_validation_task(context, data, features, target, classifier_type_text,
+                           cv, search, n_splits, n_iter):
+    """
+    Zadanie w tle - walidacja krzyżowa zestawów parametrów w procesach roboczych.
+
+    Returns:
+        dict: results (ramka), best_params, samples, pruned, seconds albo {"error": opis}.
+    """
+    import time
+    from utils.classification import search_hyperparameters
+
+    context.report_progress(0, "przygotowanie danych")
+
+    # wiersze w kolejności czasu - potrzebne przy podziale szeregu czasowego
+    complete, _ = _complete_rows(data, features, target)
+    if len(complete) == 0:
+        return {"error": "Brak danych po usunięciu braków."}
+
+    start = time.perf_counter()
+    results, best_params = search_hyperparameters(
+        complete[features], complete[target], classifier_type_text,
+        search=search, n_iter=n_iter, cv=cv, n_splits=n_splits,
+        progress_callback=lambda done, total, message: context.report_progress(
+            100 * done / total, message),
+        should_stop=context.is_cancelled
+    )
+    if results is None:
+        context.check_cancelled()
+        return {"error": "Nie udało się przeprowadzić walidacji krzyżowej (za mało danych?)."}
+    if not np.isfinite(results['sredni wynik'].iloc[0]):
+        return {"error": "Żaden zestaw parametrów nie dał się wytrenować - sprawdź, "
+                         "czy cechy są liczbowe, a etykieta ma klasy."}
+
+    return {
+        "results": results,
+        "best_params": best_params,
+        "samples": len(complete),
+        "pruned": int((results['odrzucony'] == 'tak').sum()),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _walk_forward_task(context, data, features, target, classifier_type_text, n_folds, window_blocks):
+    """
+    Zadanie w tle - ocena walk-forward z douczaniem modelu tam, gdzie się da.
+
+    Returns:
+        dict: results (ramka foldów), samples albo {"error": opis}.
+    """
+    from utils.classification import walk_forward_evaluate
+
+    context.report_progress(0, "przygotowanie danych")
+
+    complete, timestamps = _complete_rows(data, features, target)
+    if len(complete) == 0:
+        return {"error": "Brak danych po usunięciu braków."}
+
+    if timestamps is not None:
+        # czytelne granice bloków w tabeli foldów
+        timestamps = pd.Series(timestamps).dt.strftime('%Y-%m-%d %H:%M').to_numpy()
+
+    # okno w blokach testowych - blok ma tyle wierszy co jeden fold testowy
+    window = window_blocks * (len(complete) // (n_folds + 1)) if window_blocks else None
+
+    results = walk_forward_evaluate(
+        complete[features], complete[target], classifier_type_text,
+        n_folds=n_folds, window=window, timestamps=timestamps,
+        progress_callback=lambda done, total, message: context.report_progress(
+            100 * done / total, message),
+        should_stop=context.is_cancelled
+    )
+    if results is None:
+        context.check_cancelled()
+        return {"error": "Za mało danych na tyle bloków testowych."}
+
+    return {"results": results, "samples": len(complete)}
+
+
+def _incremental_task(context, file_path, features, target, classifier_type_text, epochs, test_size):
+    """
+    Zadanie w tle - uczenie kawałkami z pliku, w pamięci tylko jeden kawałek.
+
+    Returns:
+        dict: wynik train_incremental albo {"error": opis}.
+    """
+    from utils.data_loader import guess_separator, read_csv_header
+    from utils.incremental_learning import train_incremental
+
+    context.report_progress(0, "sprawdzanie pliku")
+
+    separator = guess_separator(file_path)
+    names, _ = read_csv_header(file_path, separator)
+    missing = [column for column in features + [target] if column not in (names or [])]
+    if missing:
+        return {"error": f"W pliku brakuje kolumn: {', '.join(missing)}"}
+
+    result = train_incremental(
+        file_path, features, target, classifier_type_text, epochs=epochs, test_size=test_size,
+        separator=separator,
+        progress_callback=lambda percent, message: context.report_progress(percent, message),
+        should_stop=context.is_cancelled
+    )
+    if result is None:
+        context.check_cancelled()
+        return {"error": "Nie udało się nauczyć klasyfikatora (brak danych albo jedna klasa)."}
+    return result
+
+
+def _clustering_task(context, data, features, method_text, n_clusters, eps=0.5, min_samples=5,
+                     auto_k=False):
+    """
+    Zadanie w tle - przygotowanie danych, skalowanie i grupowanie.
+
+    Metody z utils.clustering działają w czasie prawie liniowym i ograniczonej
+    pamięci (MiniBatch K-means, hierarchiczne na próbce, DBSCAN na drzewie).
+    Przy auto_k najpierw sprawdzamy równolegle k z AUTO_K_VALUES
+    (sweep_clusters) i grupujemy z najlepszym k.
+
+    Returns:
+        dict: data (dane liczbowe bez braków), labels, model, scaler
+        (przy auto_k także sweep i best_k) albo {"error": opis}.
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    context.report_progress(0, "przygotowanie danych")
+
+    # Przygotowanie danych - konwersja na numeryczne
+    data_for_clustering = data[features].copy()
+
+    # Konwertujemy każdą kolumnę na numeryczną
+    numeric_columns = []
+    for feature in features:
+        try:
+            numeric_series = pd.to_numeric(data_for_clustering[feature], errors='coerce')
+            if not numeric_series.isna().all():
+                data_for_clustering[feature] = numeric_series
+                numeric_columns.append(feature)
+            else:
+                print(f"Kolumna {feature} nie zawiera danych numerycznych")
+        except:
+            print(f"Nie można przekonwertować kolumny {feature}")
+
+    if not numeric_columns:
+        return {"error": "Żadna z wybranych cech nie zawiera danych numerycznych."}
+
+    # Bierzemy tylko kolumny numeryczne i usuwamy braki
+    numeric_data = data_for_clustering[numeric_columns].dropna()
+
+    if len(numeric_data) == 0:
+        return {"error": "Brak danych po usunieciu braków."}
+
+    print(f"Grupowanie dla {len(numeric_data)} wierszy i {len(numeric_columns)} cech")
+
+    # Skalowanie danych
+    context.report_progress(10, "skalowanie")
+    scaler = StandardScaler()
+    scaled_data = scaler.fit_transform(numeric_data)
+
+    extra = {}
+    if auto_k:
+        sweep, n_clusters = sweep_clusters(
+            scaled_data, method=method_text,
+            progress_callback=lambda done, total, message: context.report_progress(
+                20 + 60 * done / total, f"szukanie k: {message}"),
+            should_stop=context.is_cancelled)
+        if sweep is None:
+            context.check_cancelled()
+            return {"error": "Nie udało się wybrać liczby klastrów."}
+        extra = {"sweep": sweep, "best_k": n_clusters}
+
+    # Grupowanie - DBSCAN raportuje postęp po każdym kawałku zapytań do drzewa
+    start = 80 if auto_k else 20
+    context.report_progress(start, "grupowanie")
+    labels, clustering = fit_clustering(
+        scaled_data, method_text, n_clusters=n_clusters, eps=eps, min_samples=min_samples,
+        progress_callback=lambda percent, message: context.report_progress(
+            start + (100 - start) * percent / 100, message))
+    if labels is None:
+        return {"error": "Nieznana metoda grupowania."}
+
+    # Sprawdzenie czy znaleziono klastry (szum -1 nie jest klastrem)
+    n_clusters_found = len(np.unique(labels[labels >= 0]))
+    if n_clusters_found <= 1:
+        return {"error": f"Znaleziono tylko {n_clusters_found} klastrów. Spróbuj innych parametrów."}
+
+    return {"data": numeric_data, "labels": labels, "model": clustering, "scaler": scaler, **extra}
@@ -2,29 +2,70 @@
 Moduł zawierający klasę zakładki korelacji.
 ZAKTUALIZOWANY - używa prostych funkcji z utils zamiast obiektów.
 """
+import numpy as np
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel,
-                             QComboBox, QPushButton, QTableWidget, QTableWidgetItem,
+                             QComboBox, QPushButton, QTableView, QCheckBox,
                              QHeaderView, QMessageBox)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QVariant
 from PyQt5.QtGui import QColor
 
+from ..dataframe_model import DataFrameModel
 from ..matplotlib_canvas import MatplotlibCanvas, NavigationToolbar
+from ..task_runner import run_task
+
+
+class CorrelationTableModel(DataFrameModel):
+    """Model macierzy korelacji - tło komórek liczone z wartości tylko dla widocznych komórek."""
+
+    STRONG_COLOR = QColor(255, 100, 100, 150)    # Czerwony (silna korelacja)
+    MODERATE_COLOR = QColor(255, 165, 0, 150)    # Pomarańczowy (umiarkowana korelacja)
+    WEAK_COLOR = QColor(255, 255, 100, 150)      # Żółty (słaba korelacja)
+    DIAGONAL_COLOR = QColor(200, 200, 200, 100)  # Przekątna - szare tło
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Kolorowanie komórek w zależności od siły korelacji."""
+        if role != Qt.BackgroundRole or not index.isValid() or self._data is None:
+            return super(CorrelationTableModel, self).data(index, role)
+
+        if index.row() == index.column():
+            return self.DIAGONAL_COLOR
+
+        value = abs(self._column_array(index.column())[index.row()])
+        if value > 0.7:
+            return self.STRONG_COLOR
+        if value > 0.5:
+            return self.MODERATE_COLOR
+        if value > 0.3:
+            return self.WEAK_COLOR
+        return QVariant()
+
+    def _format_values(self, values):
+        """Korelacje z trzema miejscami po przecinku."""
+        texts = np.char.mod('%.3f', values).astype(object)
+        texts[np.isnan(values)] = "NaN"
+        return texts.tolist()
 
 
 class CorrelationTab(QWidget):
     """Zakładka korelacji."""
 
-    def __init__(self, status_bar):
+    def __init__(self, status_bar, task_runner=None):
         """
         Inicjalizacja zakładki korelacji.
 
         Args:
             status_bar (QStatusBar): Pasek stanu głównego okna.
+            task_runner (TaskRunner, optional): Wykonawca zadań w tle (None = liczenie od razu).
         """
         super(CorrelationTab, self).__init__()
         self.status_bar = status_bar
+        self.task_runner = task_runner
         self.current_data = None
 
+        # ostatnio policzona macierz - do przerysowania i zapisu bez liczenia od nowa
+        self.last_corr_matrix = None
+        self.last_method = None
+
         # Inicjalizacja interfejsu
         self.init_ui()
 
@@ -45,6 +86,13 @@ class CorrelationTab(QWidget):
         calculate_button.clicked.connect(self.calculate_correlation)
         method_layout.addWidget(calculate_button)
 
+        self.reorder_checkbox = QCheckBox("Grupuj podobne zmienne")
+        self.reorder_checkbox.setToolTip(
+            "Grupowanie hierarchiczne - silnie skorelowane zmienne obok siebie"
+        )
+        self.reorder_checkbox.toggled.connect(self._redraw_correlation)
+        method_layout.addWidget(self.reorder_checkbox)
+
         save_corr_button = QPushButton("Zapisz korelacje do CSV")
         save_corr_button.clicked.connect(self.save_correlation)
         method_layout.addWidget(save_corr_button)
@@ -58,7 +106,13 @@ class CorrelationTab(QWidget):
         correlation_group = QGroupBox("Macierz korelacji")
         correlation_layout = QVBoxLayout()
 
-        self.correlation_table = QTableWidget()
+        # widok pyta model tylko o widoczne komórki - szeroka macierz nie tworzy tysięcy elementów
+        self.correlation_model = CorrelationTableModel()
+        self.correlation_table = QTableView()
+        self.correlation_table.setModel(self.correlation_model)
+        self.correlation_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.correlation_table.verticalHeader().setDefaultSectionSize(22)
+        self.correlation_table.horizontalHeader().setResizeContentsPrecision(100)
         correlation_layout.addWidget(self.correlation_table)
 
         correlation_group.setLayout(correlation_layout)
@@ -87,10 +141,11 @@ class CorrelationTab(QWidget):
         self.current_data = data
 
         # Czyścimy tabelę i wykres
-        self.correlation_table.setRowCount(0)
-        self.correlation_table.setColumnCount(0)
+        self.last_corr_matrix = None
+        self.last_method = None
+        self.correlation_model.set_data(None)
         self.correlation_canvas.fig.clear()
-        self.correlation_canvas.draw()
+        self.correlation_canvas.draw_idle()
 
         if data is not None:
             print(f"CorrelationTab: zaktualizowano dane ({len(data)} wierszy, {len(data.columns)} kolumn)")
@@ -103,20 +158,37 @@ class CorrelationTab(QWidget):
             )
             return
 
-        try:
-            # Pobranie metody korelacji
-            method = self.correlation_method_combo.currentText()
+        # Pobranie metody korelacji
+        method = self.correlation_method_combo.currentText()
 
-            # Import i użycie prostej funkcji z utils
-            from utils.data_processor import calculate_correlation
-            corr_matrix = calculate_correlation(self.current_data, method=method)
+        # Macierz liczymy w tle, tabelę i wykres rysujemy po powrocie wyniku
+        run_task(
+            self.task_runner, self, f"Korelacje ({method})",
+            _correlation_task, self.current_data, method,
+            on_finished=lambda corr_matrix: self._show_correlation(corr_matrix, method),
+            on_error=lambda message: QMessageBox.critical(
+                self, "Błąd krytyczny", f"Wystąpił błąd: {message}"
+            )
+        )
 
-            if corr_matrix is None:
-                QMessageBox.warning(
-                    self, "Błąd", "Nie udało się obliczyć macierzy korelacji."
-                )
-                return
+    def _show_correlation(self, corr_matrix, method):
+        """
+        Wyświetlenie policzonej macierzy korelacji.
+
+        Args:
+            corr_matrix (pandas.DataFrame): Macierz korelacji.
+            method (str): Metoda korelacji.
+        """
+        if corr_matrix is None:
+            QMessageBox.warning(
+                self, "Błąd", "Nie udało się obliczyć macierzy korelacji."
+            )
+            return
 
+        self.last_corr_matrix = corr_matrix
+        self.last_method = method
+
+        try:
             # Aktualizacja tabeli korelacji
             self._update_correlation_table(corr_matrix)
 
@@ -139,130 +211,50 @@ class CorrelationTab(QWidget):
         Args:
             corr_matrix (pandas.DataFrame): Macierz korelacji.
         """
-        self.correlation_table.setRowCount(len(corr_matrix.index))
-        self.correlation_table.setColumnCount(len(corr_matrix.columns))
-        self.correlation_table.setHorizontalHeaderLabels(list(corr_matrix.columns))
-        self.correlation_table.setVerticalHeaderLabels(list(corr_matrix.index))
-
-        for i in range(len(corr_matrix.index)):
-            for j in range(len(corr_matrix.columns)):
-                value = corr_matrix.iloc[i, j]
-                item = QTableWidgetItem(f"{value:.3f}")
-
-                # Kolorowanie komórek w zależności od wartości korelacji
-                if i != j:  # Pomijamy przekątną (zawsze 1.0)
-                    if abs(value) > 0.7:
-                        item.setBackground(QColor(255, 100, 100, 150))  # Czerwony (silna korelacja)
-                    elif abs(value) > 0.5:
-                        item.setBackground(QColor(255, 165, 0, 150))   # Pomarańczowy (umiarkowana korelacja)
-                    elif abs(value) > 0.3:
-                        item.setBackground(QColor(255, 255, 100, 150)) # Żółty (słaba korelacja)
-                else:
-                    # Przekątna - szare tło
-                    item.setBackground(QColor(200, 200, 200, 100))
-
-                self.correlation_table.setItem(i, j, item)
-
-        # Dopasowanie szerokości kolumn
-        self.correlation_table.resizeColumnsToContents()
+        self.correlation_model.set_data(corr_matrix)
+
+        # Dopasowanie szerokości kolumn - przy szerokiej macierzy stała szerokość
+        # (mierzenie setek kolumn trwa dłużej niż całe rysowanie)
+        if len(corr_matrix.columns) <= 50:
+            self.correlation_table.resizeColumnsToContents()
+        else:
+            header = self.correlation_table.horizontalHeader()
+            for column in range(len(corr_matrix.columns)):
+                header.resizeSection(column, header.defaultSectionSize())
+
+    def _redraw_correlation(self):
+        """Przerysowanie mapy ciepła z zapamiętanej macierzy (np. po zmianie kolejności)."""
+        if self.last_corr_matrix is not None:
+            self._create_correlation_heatmap(self.last_corr_matrix, self.last_method)
 
     def _create_correlation_heatmap(self, corr_matrix, method):
         """
-        Tworzenie wykresu mapy ciepła korelacji.
+        Tworzenie wykresu mapy ciepła korelacji z już policzonej macierzy.
 
         Args:
             corr_matrix (pandas.DataFrame): Macierz korelacji.
             method (str): Metoda korelacji.
         """
-        try:
-            # Import i użycie funkcji wizualizacji z utils
-            from utils.visualization import create_correlation_heatmap
-
-            # Utworzenie mapy ciepła
-            fig = create_correlation_heatmap(
-                self.current_data,
-                title=f"Macierz korelacji ({method})"
-            )
-
-            if fig:
-                # Zastąpienie figury w canvas
-                self.correlation_canvas.fig.clear()
-
-                # Skopiowanie osi z utworzonej figury
-                original_axes = fig.get_axes()
-                if original_axes:
-                    # Utworzenie nowej osi w canvas
-                    new_ax = self.correlation_canvas.fig.add_subplot(111)
-
-                    # Ponowne utworzenie mapy ciepła bezpośrednio na nowej osi
-                    import seaborn as sns
-                    sns.heatmap(
-                        corr_matrix,
-                        annot=True,
-                        fmt='.2f',
-                        cmap='coolwarm',
-                        center=0,
-                        square=True,
-                        ax=new_ax,
-                        cbar_kws={"shrink": 0.8}
-                    )
-
-                    new_ax.set_title(f"Macierz korelacji ({method})", fontsize=14, fontweight='bold')
-
-                # Odświeżenie canvas
-                self.correlation_canvas.draw()
-
-            else:
-                print("Nie udało się utworzyć mapy ciepła")
-
-        except Exception as error:
-            print(f"Błąd przy tworzeniu mapy ciepła: {error}")
-            # Fallback - prosty wykres bez seaborn
-            self._create_simple_heatmap(corr_matrix, method)
-
-    def _create_simple_heatmap(self, corr_matrix, method):
-        """
-        Tworzenie prostej mapy ciepła bez seaborn (fallback).
-
-        Args:
-            corr_matrix (pandas.DataFrame): Macierz korelacji.
-            method (str): Metoda korelacji.
-        """
-        try:
-            self.correlation_canvas.fig.clear()
-            ax = self.correlation_canvas.fig.add_subplot(111)
-
-            # Prosty heatmap z matplotlib
-            im = ax.imshow(corr_matrix.values, cmap='coolwarm', aspect='auto', vmin=-1, vmax=1)
-
-            # Etykiety osi
-            ax.set_xticks(range(len(corr_matrix.columns)))
-            ax.set_yticks(range(len(corr_matrix.index)))
-            ax.set_xticklabels(corr_matrix.columns, rotation=45, ha='right')
-            ax.set_yticklabels(corr_matrix.index)
-
-            # Dodanie wartości do komórek
-            for i in range(len(corr_matrix.index)):
-                for j in range(len(corr_matrix.columns)):
-                    text = ax.text(j, i, f'{corr_matrix.iloc[i, j]:.2f}',
-                                 ha="center", va="center", color="black", fontsize=8)
-
-            # Tytuł
-            ax.set_title(f"Macierz korelacji ({method})", fontsize=14, fontweight='bold')
-
-            # Colorbar
-            self.correlation_canvas.fig.colorbar(im, ax=ax, shrink=0.8)
+        from utils.visualization import draw_correlation_matrix
+
+        # Rysujemy od razu na osiach płótna - jeden imshow, liczby tylko w dużych komórkach
+        ax = self.correlation_canvas.reset_axes()
+        fig = draw_correlation_matrix(
+            corr_matrix,
+            title=f"Macierz korelacji ({method})",
+            ax=ax,
+            reorder=self.reorder_checkbox.isChecked()
+        )
 
-            # Dopasowanie layoutu
-            self.correlation_canvas.fig.tight_layout()
-            self.correlation_canvas.draw()
+        if fig is None:
+            print("Nie udało się utworzyć mapy ciepła")
 
-        except Exception as error:
-            print(f"Błąd przy tworzeniu prostej mapy ciepła: {error}")
+        # Odświeżenie canvas
+        self.correlation_canvas.draw_idle()
 
     def save_correlation(self):
         """Zapisuje macierz korelacji do pliku CSV."""
-        if self.correlation_table.rowCount() == 0:
+        if self.last_corr_matrix is None:
             QMessageBox.warning(self, "Błąd", "Brak macierzy korelacji do zapisania.")
             return
 
@@ -274,12 +266,16 @@ class CorrelationTab(QWidget):
 
         if file_path:
             try:
-                from utils.data_processor import calculate_correlation
-                method = self.correlation_method_combo.currentText()
-                corr_matrix = calculate_correlation(self.current_data, method=method)
-
-                if corr_matrix is not None:
-                    corr_matrix.to_csv(file_path)
-                    self.status_bar.showMessage(f"Zapisano korelacje do {file_path}")
+                # zapisujemy macierz, która jest na ekranie - bez liczenia od nowa
+                self.last_corr_matrix.to_csv(file_path)
+                self.status_bar.showMessage(f"Zapisano korelacje do {file_path}")
             except Exception as e:
-                QMessageBox.warning(self, "Błąd", f"Nie udało się zapisać: {str(e)}")
\ No newline at end of file
+                QMessageBox.warning(self, "Błąd", f"Nie udało się zapisać: {str(e)}")
+
+
+def _correlation_task(context, data, method):
+    """Zadanie w tle - macierz korelacji."""
+    from utils.data_processor import calculate_correlation
+
+    context.report_progress(0, method)
+    return calculate_correlation(data, method=method)
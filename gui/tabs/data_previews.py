@@ -3,15 +3,26 @@ Moduł zawierający klasę zakładki podglądu danych.
 ZAKTUALIZOWANY - przyjmuje dane bezpośrednio zamiast przez data_loader.
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGroupBox, QTextEdit,
-                             QTableWidget, QTableWidgetItem, QHeaderView)
+                             QTableView, QHeaderView)
+
+from gui.dataframe_model import DataFrameModel
+from gui.task_runner import run_task
 
 
 class DataPreviewTab(QWidget):
     """Zakładka podglądu danych."""
 
-    def __init__(self):
-        """Inicjalizacja zakładki podglądu danych."""
+    def __init__(self, status_bar=None, task_runner=None):
+        """
+        Inicjalizacja zakładki podglądu danych.
+
+        Args:
+            status_bar (QStatusBar, optional): Pasek stanu głównego okna.
+            task_runner (TaskRunner, optional): Wykonawca zadań w tle (None = liczenie od razu).
+        """
         super(DataPreviewTab, self).__init__()
+        self.status_bar = status_bar
+        self.task_runner = task_runner
         self.current_data = None
 
         # Inicjalizacja interfejsu
@@ -33,10 +44,17 @@ class DataPreviewTab(QWidget):
         info_group.setLayout(info_layout)
 
         # Tabela z danymi
-        table_group = QGroupBox("Podgląd danych (pierwsze 1000 wierszy)")
+        table_group = QGroupBox("Podgląd danych (wszystkie wiersze)")
         table_layout = QVBoxLayout()
 
-        self.data_table = QTableWidget()
+        # Widok pyta model tylko o widoczne komórki - stała wysokość wierszy,
+        # żeby Qt nie musiało mierzyć milionów wierszy
+        self.data_model = DataFrameModel()
+        self.data_table = QTableView()
+        self.data_table.setModel(self.data_model)
+        self.data_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.data_table.verticalHeader().setDefaultSectionSize(22)
+        self.data_table.horizontalHeader().setResizeContentsPrecision(100)
 
         table_layout.addWidget(self.data_table)
         table_group.setLayout(table_layout)
@@ -55,79 +73,58 @@ class DataPreviewTab(QWidget):
         self.current_data = data
 
         if data is not None:
-            # Aktualizacja informacji o danych
-            self._update_data_info()
-
-            # Aktualizacja tabeli danych
+            # Najpierw tabela (tania), potem informacje - te liczą się w tle
             self._update_data_table()
+            self._update_data_info()
 
             print(f"DataPreviewTab: zaktualizowano dane ({len(data)} wierszy, {len(data.columns)} kolumn)")
         else:
             # Wyczyszczenie interfejsu
             self.data_info_text.clear()
             self.data_info_text.append("Brak danych do wyświetlenia")
-            self.data_table.setRowCount(0)
-            self.data_table.setColumnCount(0)
+            self.data_model.set_data(None)
 
     def _update_data_info(self):
         """Aktualizacja informacji o danych."""
         if self.current_data is None:
             return
 
-        try:
-            # Podstawowe informacje
-            shape = self.current_data.shape
-            info_text = f"Liczba wierszy: {shape[0]}\n"
-            info_text += f"Liczba kolumn: {shape[1]}\n\n"
-
-            # Rozmiar w pamięci
-            memory_usage = self.current_data.memory_usage(deep=True).sum()
-            memory_mb = memory_usage / (1024 * 1024)
-            info_text += f"Rozmiar w pamięci: {memory_mb:.2f} MB\n\n"
-
-            # Typy danych
-            info_text += "Typy kolumn:\n"
-            for col, dtype in self.current_data.dtypes.items():
-                info_text += f"  {col}: {dtype}\n"
-
-            # Brakujące wartości
-            missing = self.current_data.isnull().sum()
-            total_missing = missing.sum()
-
-            if total_missing > 0:
-                info_text += f"\nBrakujące wartości (łącznie: {total_missing}):\n"
-                for col, count in missing.items():
-                    if count > 0:
-                        percent = (count / len(self.current_data)) * 100
-                        info_text += f"  {col}: {count} ({percent:.1f}%)\n"
-            else:
-                info_text += "\nBrak brakujących wartości.\n"
-
-            # Duplikaty
-            duplicates = self.current_data.duplicated().sum()
-            if duplicates > 0:
-                info_text += f"\nDuplikaty: {duplicates} wierszy\n"
-            else:
-                info_text += "\nBrak duplikatów.\n"
-
-            # Podstawowe statystyki numeryczne
-            numeric_columns = self.current_data.select_dtypes(include=['number']).columns
-            if len(numeric_columns) > 0:
-                info_text += f"\nKolumny numeryczne: {len(numeric_columns)}\n"
-
-            # Kolumny tekstowe
-            text_columns = self.current_data.select_dtypes(include=['object']).columns
-            if len(text_columns) > 0:
-                info_text += f"Kolumny tekstowe: {len(text_columns)}\n"
-
-            # Aktualizacja pola tekstowego
-            self.data_info_text.clear()
-            self.data_info_text.append(info_text)
+        data = self.current_data
+
+        # Od razu tylko to, co nic nie kosztuje - pełne skanowanie danych idzie w tle
+        shape = data.shape
+        self.data_info_text.clear()
+        self.data_info_text.append(
+            f"Liczba wierszy: {shape[0]}\nLiczba kolumn: {shape[1]}\n\n"
+            "Liczenie rozmiaru, braków i duplikatów..."
+        )
+
+        if self.task_runner is not None:
+            # poprzednie liczenie dotyczy już nieaktualnych danych
+            self.task_runner.cancel(self)
+
+        run_task(
+            self.task_runner, self, "Informacje o danych",
+            _data_info_task, data,
+            on_finished=lambda info_text: self._show_data_info(data, info_text),
+            on_error=lambda message: self._show_data_info(
+                data, f"Błąd przy wyświetlaniu informacji: {message}"
+            )
+        )
+
+    def _show_data_info(self, data, info_text):
+        """
+        Wyświetlenie policzonych informacji (o ile dane się w międzyczasie nie zmieniły).
 
-        except Exception as error:
-            print(f"Błąd przy aktualizacji informacji o danych: {error}")
-            self.data_info_text.clear()
-            self.data_info_text.append(f"Błąd przy wyświetlaniu informacji: {str(error)}")
+        Args:
+            data (pandas.DataFrame): Dane, dla których liczono informacje.
+            info_text (str): Tekst do wyświetlenia.
+        """
+        if data is not self.current_data:
+            return
+
+        self.data_info_text.clear()
+        self.data_info_text.append(info_text)
 
     def _update_data_table(self):
         """Aktualizacja tabeli danych."""
@@ -137,34 +134,10 @@ class DataPreviewTab(QWidget):
         try:
             data = self.current_data
 
-            # Ograniczenie do 1000 wierszy dla wydajności
-            max_rows = min(1000, len(data))
-
-            # Aktualizacja tabeli
-            self.data_table.setRowCount(max_rows)
-            self.data_table.setColumnCount(len(data.columns))
-            self.data_table.setHorizontalHeaderLabels(list(data.columns))
-
-            # Wypełnienie tabeli danymi
-            for i in range(max_rows):
-                for j in range(len(data.columns)):
-                    value = data.iloc[i, j]
-
-                    # Formatowanie wartości
-                    if value is None or (isinstance(value, float) and str(value) == 'nan'):
-                        display_value = "NaN"
-                    elif isinstance(value, float):
-                        display_value = f"{value:.4f}"
-                    else:
-                        display_value = str(value)
-
-                    # Ograniczenie długości tekstu
-                    if len(display_value) > 50:
-                        display_value = display_value[:47] + "..."
-
-                    self.data_table.setItem(i, j, QTableWidgetItem(display_value))
+            # Model nie kopiuje danych - formatuje tylko widoczne komórki
+            self.data_model.set_data(data)
 
-            # Dopasowanie szerokości kolumn
+            # Dopasowanie szerokości kolumn (na próbce wierszy, patrz setResizeContentsPrecision)
             self.data_table.resizeColumnsToContents()
 
             # Ograniczenie maksymalnej szerokości kolumn
@@ -175,5 +148,77 @@ class DataPreviewTab(QWidget):
 
         except Exception as error:
             print(f"Błąd przy aktualizacji tabeli danych: {error}")
-            self.data_table.setRowCount(0)
-            self.data_table.setColumnCount(0)
\ No newline at end of file
+            self.data_model.set_data(None)
+
+
+def _data_info_task(context, data, chunk_size=200000):
+    """
+    Zadanie w tle - pełne informacje o danych (rozmiar w pamięci, braki, duplikaty).
+
+    Dane skanujemy kawałkami wierszy - między kawałkami wątek GUI dostaje
+    swoją kolej, a zadanie raportuje postęp i może zostać anulowane.
+    Duplikaty szukamy po 64-bitowych skrótach wierszy zamiast po całych wierszach.
+
+    Returns:
+        str: Tekst do pola informacji.
+    """
+    import numpy as np
+    import pandas as pd
+
+    memory_usage = data.index.memory_usage()
+    missing = pd.Series(0, index=data.columns)
+    row_hashes = []
+
+    for start in range(0, len(data), chunk_size):
+        context.report_progress(start / len(data) * 100, "skanowanie danych")
+        chunk = data.iloc[start:start + chunk_size]
+
+        memory_usage += chunk.memory_usage(deep=True, index=False).sum()
+        missing += chunk.isnull().sum()
+        row_hashes.append(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+
+    # Podstawowe informacje
+    shape = data.shape
+    info_text = f"Liczba wierszy: {shape[0]}\n"
+    info_text += f"Liczba kolumn: {shape[1]}\n\n"
+
+    # Rozmiar w pamięci
+    memory_mb = memory_usage / (1024 * 1024)
+    info_text += f"Rozmiar w pamięci: {memory_mb:.2f} MB\n\n"
+
+    # Typy danych
+    info_text += "Typy kolumn:\n"
+    for col, dtype in data.dtypes.items():
+        info_text += f"  {col}: {dtype}\n"
+
+    # Brakujące wartości
+    total_missing = missing.sum()
+
+    if total_missing > 0:
+        info_text += f"\nBrakujące wartości (łącznie: {total_missing}):\n"
+        for col, count in missing.items():
+            if count > 0:
+                percent = (count / len(data)) * 100
+                info_text += f"  {col}: {count} ({percent:.1f}%)\n"
+    else:
+        info_text += "\nBrak brakujących wartości.\n"
+
+    # Duplikaty
+    context.report_progress(99, "duplikaty")
+    duplicates = pd.Series(np.concatenate(row_hashes)).duplicated().sum() if row_hashes else 0
+    if duplicates > 0:
+        info_text += f"\nDuplikaty: {duplicates} wierszy\n"
+    else:
+        info_text += "\nBrak duplikatów.\n"
+
+    # Podstawowe statystyki numeryczne
+    numeric_columns = data.select_dtypes(include=['number']).columns
+    if len(numeric_columns) > 0:
+        info_text += f"\nKolumny numeryczne: {len(numeric_columns)}\n"
+
+    # Kolumny tekstowe
+    text_columns = data.select_dtypes(include=['object']).columns
+    if len(text_columns) > 0:
+        info_text += f"Kolumny tekstowe: {len(text_columns)}\n"
+
+    return info_text
@@ -4,23 +4,28 @@ ZAKTUALIZOWANY - używa prostych funkcji z utils zamiast obiektów.
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel,
                              QComboBox, QPushButton, QListWidget, QAbstractItemView,
-                             QLineEdit, QTableWidget, QTableWidgetItem, QSplitter,
+                             QLineEdit, QTableView, QSplitter,
                              QMessageBox, QHeaderView)
 from PyQt5.QtCore import Qt
 
+from gui.dataframe_model import DataFrameModel
+from gui.task_runner import run_task
+
 
 class DataProcessingTab(QWidget):
     """Zakładka przetwarzania danych."""
 
-    def __init__(self, status_bar):
+    def __init__(self, status_bar, task_runner=None):
         """
         Inicjalizacja zakładki przetwarzania danych.
 
         Args:
             status_bar (QStatusBar): Pasek stanu głównego okna.
+            task_runner (TaskRunner, optional): Wykonawca zadań w tle (None = liczenie od razu).
         """
         super(DataProcessingTab, self).__init__()
         self.status_bar = status_bar
+        self.task_runner = task_runner
         self.current_data = None
         self.original_data = None
 
@@ -123,13 +128,13 @@ class DataProcessingTab(QWidget):
 
         # Stara wartość
         self.old_value_edit = QLineEdit()
-        self.old_value_edit.setPlaceholderText("Wartość do zamiany...")
+        self.old_value_edit.setPlaceholderText("np. -200; -999 albo 10..20 albo re:^abc")
         replace_layout.addWidget(QLabel("Stara wartość:"))
         replace_layout.addWidget(self.old_value_edit)
 
         # Nowa wartość
         self.new_value_edit = QLineEdit()
-        self.new_value_edit.setPlaceholderText("Nowa wartość...")
+        self.new_value_edit.setPlaceholderText("Jedna wartość albo lista oddzielona ;")
         replace_layout.addWidget(QLabel("Nowa wartość:"))
         replace_layout.addWidget(self.new_value_edit)
 
@@ -141,6 +146,33 @@ class DataProcessingTab(QWidget):
         replace_group.setLayout(replace_layout)
         control_layout.addWidget(replace_group)
 
+        # Grupa - indeks jakości powietrza
+        aqi_group = QGroupBox("Indeks jakości powietrza")
+        aqi_layout = QVBoxLayout()
+
+        aqi_button = QPushButton("Oblicz AQI i przekroczenia norm")
+        aqi_button.clicked.connect(self.calculate_aqi)
+        aqi_layout.addWidget(aqi_button)
+
+        aqi_group.setLayout(aqi_layout)
+        control_layout.addWidget(aqi_group)
+
+        # Grupa - kalibracja czujników
+        calibration_group = QGroupBox("Kalibracja czujników PT08")
+        calibration_layout = QVBoxLayout()
+
+        self.calibration_period_combo = QComboBox()
+        self.calibration_period_combo.addItems(["Jeden model", "Model na miesiąc", "Model na tydzień"])
+        calibration_layout.addWidget(QLabel("Grupowanie w czasie:"))
+        calibration_layout.addWidget(self.calibration_period_combo)
+
+        calibration_button = QPushButton("Kalibruj względem GT")
+        calibration_button.clicked.connect(self.calibrate_sensors)
+        calibration_layout.addWidget(calibration_button)
+
+        calibration_group.setLayout(calibration_layout)
+        control_layout.addWidget(calibration_group)
+
         # Grupa - zapisywanie danych
         save_group = QGroupBox("Zapisywanie danych")
         save_layout = QVBoxLayout()
@@ -159,9 +191,16 @@ class DataProcessingTab(QWidget):
         results_panel = QWidget()
         results_layout = QVBoxLayout(results_panel)
 
-        results_layout.addWidget(QLabel("Przetworzone dane:"))
+        self.processed_data_label = QLabel("Przetworzone dane:")
+        results_layout.addWidget(self.processed_data_label)
 
-        self.processed_data_table = QTableWidget()
+        # Wszystkie wiersze - model formatuje tylko widoczne komórki
+        self.processed_data_model = DataFrameModel()
+        self.processed_data_table = QTableView()
+        self.processed_data_table.setModel(self.processed_data_model)
+        self.processed_data_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.processed_data_table.verticalHeader().setDefaultSectionSize(22)
+        self.processed_data_table.horizontalHeader().setResizeContentsPrecision(100)
         results_layout.addWidget(self.processed_data_table)
 
         # Splitter do dzielenia paneli
@@ -209,50 +248,23 @@ class DataProcessingTab(QWidget):
     def update_processed_data_table(self):
         """Aktualizacja tabeli z przetworzonymi danymi."""
         if self.current_data is None:
-            self.processed_data_table.setRowCount(0)
-            self.processed_data_table.setColumnCount(0)
+            self.processed_data_model.set_data(None)
+            self.processed_data_label.setText("Przetworzone dane:")
             return
 
         try:
-            data = self.current_data
-
-            # Ograniczenie do 50 wierszy dla wydajności
-            max_rows = min(50, len(data))
+            from utils.data_processor import compute_change_mask
 
-            self.processed_data_table.setRowCount(max_rows)
-            self.processed_data_table.setColumnCount(len(data.columns))
-            self.processed_data_table.setHorizontalHeaderLabels(list(data.columns))
-
-            # Wypełnienie tabeli
-            for i in range(max_rows):
-                for j in range(len(data.columns)):
-                    value = data.iloc[i, j]
-
-                    # Sprawdź czy wartość się zmieniła
-                    has_changed = False
-                    if (self.original_data is not None and
-                            i < len(self.original_data) and
-                            j < len(self.original_data.columns) and
-                            data.columns[j] in self.original_data.columns):
-                        original_value = self.original_data.iloc[i][data.columns[j]]
-                        has_changed = str(value) != str(original_value)
-
-                    # Formatowanie wartości
-                    if value is None or str(value) == 'nan':
-                        display_value = "NaN"
-                    elif isinstance(value, float):
-                        display_value = f"{value:.4f}"
-                    else:
-                        display_value = str(value)
-
-                    item = QTableWidgetItem(display_value)
+            data = self.current_data
 
-                    # Oznacz zmienione komórki kolorem
-                    if has_changed:
-                        from PyQt5.QtGui import QColor
-                        item.setBackground(QColor(255, 255, 0, 100))  # Żółte tło
+            # Maska zmienionych komórek - raz na operację, dopasowana po indeksie
+            changes = compute_change_mask(data, self.original_data)
+            changed_count = int(changes.to_numpy().sum())
 
-                    self.processed_data_table.setItem(i, j, item)
+            self.processed_data_model.set_data(data, highlight=changes)
+            self.processed_data_label.setText(
+                f"Przetworzone dane: {len(data)} wierszy, zmienione komórki: {changed_count}"
+            )
 
             # Dopasowanie szerokości kolumn
             self.processed_data_table.resizeColumnsToContents()
@@ -336,33 +348,36 @@ class DataProcessingTab(QWidget):
         print(f"Rozmiar danych: {self.current_data.shape}")
         print("================================")
 
-        try:
-            # Import i użycie prostej funkcji z utils
-            from utils.data_processor import scale_data
-
-            # Skalowanie danych
-            scaled_data = scale_data(self.current_data, columns, method=method)
+        # Skalowanie w tle - dane podmieniamy dopiero po powrocie wyniku
+        run_task(
+            self.task_runner, self, "Skalowanie danych",
+            _scaling_task, self.current_data, columns, method,
+            on_finished=lambda scaled_data: self._apply_scaled_data(scaled_data, columns),
+            on_error=lambda message: QMessageBox.critical(self, "Błąd", f"Wystąpił błąd: {message}")
+        )
 
-            if scaled_data is not None:
-                print("Skalowanie zakończone sukcesem")
+    def _apply_scaled_data(self, scaled_data, columns):
+        """
+        Podmiana danych na przeskalowane (wywoływane w wątku GUI).
 
-                # Aktualizacja danych
-                self.current_data = scaled_data
+        Args:
+            scaled_data (pandas.DataFrame): Wynik scale_data albo None.
+            columns (list): Przeskalowane kolumny.
+        """
+        if scaled_data is not None:
+            print("Skalowanie zakończone sukcesem")
 
-                # Aktualizacja interfejsu
-                self.update_processed_data_table()
-                self.update_columns(list(scaled_data.columns))
+            # Aktualizacja danych
+            self.current_data = scaled_data
 
-                self.status_bar.showMessage(f"Przeskalowano dane w kolumnach: {', '.join(columns)}")
-            else:
-                print("Skalowanie zwróciło None")
-                QMessageBox.warning(self, "Błąd", "Nie udało się przeskalować danych.")
+            # Aktualizacja interfejsu
+            self.update_processed_data_table()
+            self.update_columns(list(scaled_data.columns))
 
-        except Exception as error:
-            print(f"Błąd przy skalowaniu w GUI: {error}")
-            import traceback
-            traceback.print_exc()
-            QMessageBox.critical(self, "Błąd", f"Wystąpił błąd: {str(error)}")
+            self.status_bar.showMessage(f"Przeskalowano dane w kolumnach: {', '.join(columns)}")
+        else:
+            print("Skalowanie zwróciło None")
+            QMessageBox.warning(self, "Błąd", "Nie udało się przeskalować danych.")
 
     def remove_duplicates(self):
         """Usuwanie duplikatów."""
@@ -396,46 +411,45 @@ class DataProcessingTab(QWidget):
             QMessageBox.critical(self, "Błąd", f"Wystąpił błąd: {str(error)}")
 
     def replace_values(self):
-        """Zamiana wartości."""
+        """
+        Zamiana wartości - wiele par naraz.
+
+        Stara wartość może być listą oddzieloną średnikami, przedziałem "od..do"
+        albo wyrażeniem regularnym "re:wzorzec". Nowa wartość to jedna wartość
+        dla wszystkich albo lista tej samej długości.
+        """
         if self.current_data is None:
             QMessageBox.warning(self, "Błąd", "Brak danych do przetworzenia.")
             return
 
         # Pobranie parametrów
         column = self.replace_column_combo.currentText()
-        old_value = self.old_value_edit.text()
-        new_value = self.new_value_edit.text()
+        old_text = self.old_value_edit.text()
+        new_text = self.new_value_edit.text()
 
-        if not column or not old_value:
+        if not column or not old_text:
             QMessageBox.warning(self, "Błąd", "Wypełnij wszystkie pola.")
             return
 
         try:
-            from utils.data_processor import replace_values
+            from utils.data_processor import replace_many_values
 
-            # Próba konwersji wartości na liczby jeśli to możliwe
-            try:
-                old_value = float(old_value)
-            except ValueError:
-                pass  # Zostaw jako string
+            rules = self._parse_replace_rules(old_text, new_text)
+            if rules is None:
+                QMessageBox.warning(
+                    self, "Błąd", "Liczba nowych wartości musi być 1 albo równa liczbie starych."
+                )
+                return
 
-            try:
-                new_value = float(new_value)
-            except ValueError:
-                pass  # Zostaw jako string
-
-            # Zamiana wartości
-            processed_data = replace_values(
-                self.current_data,
-                column,
-                old_value,
-                new_value
-            )
+            # Zamiana wartości - typy dopasowuje funkcja z utils wg typu kolumny
+            processed_data, counts = replace_many_values(self.current_data, {column: rules})
 
             if processed_data is not None:
                 self.current_data = processed_data
                 self.update_processed_data_table()
-                self.status_bar.showMessage(f"Zamieniono wartości w kolumnie {column}")
+                self.status_bar.showMessage(
+                    f"Zamieniono {counts[column]} wartości w kolumnie {column}"
+                )
             else:
                 QMessageBox.warning(self, "Błąd", "Nie udało się zamienić wartości.")
 
@@ -443,6 +457,107 @@ class DataProcessingTab(QWidget):
             print(f"Błąd przy zamianie wartości: {error}")
             QMessageBox.critical(self, "Błąd", f"Wystąpił błąd: {str(error)}")
 
+    def _parse_replace_rules(self, old_text, new_text):
+        """
+        Zamienia tekst z pól formularza na reguły dla replace_many_values.
+
+        Args:
+            old_text (str): Stare wartości, przedziały lub wyrażenia regularne.
+            new_text (str): Nowa wartość lub lista nowych wartości.
+
+        Returns:
+            dict: Reguły zamiany albo None gdy liczba wartości się nie zgadza.
+        """
+        old_parts = [part.strip() for part in old_text.split(';') if part.strip()]
+        new_parts = [part.strip() for part in new_text.split(';')]
+
+        if len(new_parts) == 1:
+            new_parts = new_parts * len(old_parts)
+        elif len(new_parts) != len(old_parts):
+            return None
+
+        rules = {'mapping': {}, 'ranges': [], 'regex': []}
+        for old_part, new_part in zip(old_parts, new_parts):
+            # pusty tekst oznacza brak wartości
+            new_value = new_part if new_part else None
+
+            if old_part.startswith("re:"):
+                rules['regex'].append((old_part[3:], new_part))
+            elif ".." in old_part:
+                low, high = old_part.split("..", 1)
+                rules['ranges'].append((float(low.replace(',', '.')), float(high.replace(',', '.')), new_value))
+            else:
+                rules['mapping'][old_part] = new_value
+
+        return rules
+
+    def calculate_aqi(self):
+        """Obliczanie indeksu jakości powietrza - nowe kolumny AQI_* i przekroczenie_*."""
+        if self.current_data is None:
+            QMessageBox.warning(self, "Błąd", "Brak danych do przetworzenia.")
+            return
+
+        try:
+            from utils.air_quality_index import calculate_aqi, count_exceedances
+
+            processed_data = calculate_aqi(self.current_data)
+
+            if processed_data is not None:
+                self.current_data = processed_data
+                self.update_processed_data_table()
+                self.update_columns(list(processed_data.columns))
+
+                exceedances = count_exceedances(processed_data)
+                summary = ", ".join(
+                    f"{name}: {int(count)}" for name, count in exceedances.iloc[0].items()
+                ) if exceedances is not None else "brak"
+                self.status_bar.showMessage(f"Obliczono AQI, godziny z przekroczeniem norm - {summary}")
+            else:
+                QMessageBox.warning(
+                    self, "Błąd", "Nie udało się obliczyć indeksu. Czy dane zawierają kolumny CO(GT), NO2(GT)...?"
+                )
+
+        except Exception as error:
+            print(f"Błąd przy obliczaniu AQI: {error}")
+            QMessageBox.critical(self, "Błąd", f"Wystąpił błąd: {str(error)}")
+
+    def calibrate_sensors(self):
+        """Kalibracja czujników PT08 względem pomiarów referencyjnych - nowe kolumny *_kalibr."""
+        if self.current_data is None:
+            QMessageBox.warning(self, "Błąd", "Brak danych do przetworzenia.")
+            return
+
+        periods = {"Jeden model": None, "Model na miesiąc": 'MS', "Model na tydzień": 'W'}
+        period = periods.get(self.calibration_period_combo.currentText())
+
+        try:
+            from utils.calibration import fit_calibration, apply_calibration, GLOBAL_GROUP
+
+            model = fit_calibration(self.current_data, period=period)
+            if model is None:
+                QMessageBox.warning(
+                    self, "Błąd", "Nie udało się dopasować kalibracji. Czy dane zawierają kolumny PT08.* i *(GT)?"
+                )
+                return
+
+            processed_data = apply_calibration(self.current_data, model)
+
+            if processed_data is not None:
+                self.current_data = processed_data
+                self.update_processed_data_table()
+                self.update_columns(list(processed_data.columns))
+
+                scores = model['scores']
+                overall = scores[scores['grupa'] == GLOBAL_GROUP]
+                summary = ", ".join(f"{row.referencja}: R²={row.R2:.2f}" for row in overall.itertuples())
+                self.status_bar.showMessage(f"Skalibrowano czujniki ({len(model['coefficients'])} modeli) - {summary}")
+            else:
+                QMessageBox.warning(self, "Błąd", "Nie udało się zastosować kalibracji.")
+
+        except Exception as error:
+            print(f"Błąd przy kalibracji: {error}")
+            QMessageBox.critical(self, "Błąd", f"Wystąpił błąd: {str(error)}")
+
     def save_processed_data(self):
         """Zapisuje przetworzone dane do pliku CSV."""
         if self.current_data is None:
@@ -461,4 +576,12 @@ class DataProcessingTab(QWidget):
             if success:
                 self.status_bar.showMessage(f"Zapisano przetworzone dane do {file_path}")
             else:
-                QMessageBox.warning(self, "Błąd", "Nie udało się zapisać pliku.")
\ No newline at end of file
+                QMessageBox.warning(self, "Błąd", "Nie udało się zapisać pliku.")
+
+
+def _scaling_task(context, data, columns, method):
+    """Zadanie w tle - skalowanie wybranych kolumn."""
+    from utils.data_processor import scale_data
+
+    context.report_progress(0, method)
+    return scale_data(data, columns, method=method)
@@ -7,19 +7,23 @@ from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QGroupBox, QLabe
                              QHeaderView, QSplitter, QMessageBox)
 from PyQt5.QtCore import Qt
 
+from gui.task_runner import run_task
+
 
 class StatsTab(QWidget):
     """Zakładka analizy statystycznej."""
 
-    def __init__(self, status_bar):
+    def __init__(self, status_bar, task_runner=None):
         """
         Inicjalizacja zakładki analizy statystycznej.
 
         Args:
             status_bar (QStatusBar): Pasek stanu głównego okna.
+            task_runner (TaskRunner, optional): Wykonawca zadań w tle (None = liczenie od razu).
         """
         super(StatsTab, self).__init__()
         self.status_bar = status_bar
+        self.task_runner = task_runner
         self.current_data = None
 
         # Inicjalizacja interfejsu
@@ -47,6 +51,17 @@ class StatsTab(QWidget):
         column_group.setLayout(column_layout)
         control_layout.addWidget(column_group)
 
+        # Wykrywanie anomalii czujników
+        anomaly_group = QGroupBox("Anomalie czujników")
+        anomaly_layout = QVBoxLayout()
+
+        anomaly_button = QPushButton("Wykryj anomalie")
+        anomaly_button.clicked.connect(self.detect_anomalies)
+        anomaly_layout.addWidget(anomaly_button)
+
+        anomaly_group.setLayout(anomaly_layout)
+        control_layout.addWidget(anomaly_group)
+
         # Dodanie elastycznego odstępu
         control_layout.addStretch()
 
@@ -115,44 +130,101 @@ class StatsTab(QWidget):
             )
             return
 
-        try:
-            # Import i użycie prostej funkcji z utils
-            from utils.data_processor import calculate_basic_statistics
-            stats = calculate_basic_statistics(self.current_data, column)
+        # Liczenie w tle - tabelę wypełniamy po powrocie wyniku
+        run_task(
+            self.task_runner, self, f"Statystyki: {column}",
+            _statistics_task, self.current_data, column,
+            on_finished=lambda stats: self._show_statistics(column, stats),
+            on_error=self._show_error
+        )
 
-            if not stats:
-                QMessageBox.warning(
-                    self, "Błąd", "Nie udało się obliczyć statystyk dla wybranej kolumny."
-                )
-                return
+    def _show_statistics(self, column, stats):
+        """
+        Wyświetlenie policzonych statystyk w tabeli.
 
-            # Aktualizacja tabeli statystyk
-            self.stats_table.setRowCount(len(stats))
-            self.stats_table.setColumnCount(2)
-            self.stats_table.setHorizontalHeaderLabels(["Statystyka", "Wartość"])
+        Args:
+            column (str): Nazwa kolumny.
+            stats (dict): Statystyki z calculate_basic_statistics.
+        """
+        if not stats:
+            QMessageBox.warning(
+                self, "Błąd", "Nie udało się obliczyć statystyk dla wybranej kolumny."
+            )
+            return
 
-            for i, (stat, value) in enumerate(stats.items()):
-                self.stats_table.setItem(i, 0, QTableWidgetItem(stat))
+        # Aktualizacja tabeli statystyk
+        self.stats_table.setRowCount(len(stats))
+        self.stats_table.setColumnCount(2)
+        self.stats_table.setHorizontalHeaderLabels(["Statystyka", "Wartość"])
+
+        for i, (stat, value) in enumerate(stats.items()):
+            self.stats_table.setItem(i, 0, QTableWidgetItem(stat))
 
-                # Formatowanie wartości w zależności od typu
-                if isinstance(value, float):
-                    formatted_value = f"{value:.4f}"
-                else:
-                    formatted_value = str(value)
+            # Formatowanie wartości w zależności od typu
+            if isinstance(value, float):
+                formatted_value = f"{value:.4f}"
+            else:
+                formatted_value = str(value)
 
-                self.stats_table.setItem(i, 1, QTableWidgetItem(formatted_value))
+            self.stats_table.setItem(i, 1, QTableWidgetItem(formatted_value))
 
-            # Dopasowanie szerokości kolumn
-            self.stats_table.resizeColumnsToContents()
+        # Dopasowanie szerokości kolumn
+        self.stats_table.resizeColumnsToContents()
 
-            self.status_bar.showMessage(f"Obliczono statystyki dla kolumny {column}")
-            print(f"Obliczono statystyki dla kolumny: {column}")
+        self.status_bar.showMessage(f"Obliczono statystyki dla kolumny {column}")
+        print(f"Obliczono statystyki dla kolumny: {column}")
 
-        except Exception as error:
-            print(f"Błąd przy obliczaniu statystyk: {error}")
-            QMessageBox.critical(
-                self, "Błąd krytyczny", f"Wystąpił błąd: {str(error)}"
+    def detect_anomalies(self):
+        """Wykrywanie anomalii i usterek czujników we wszystkich kolumnach liczbowych."""
+        if self.current_data is None:
+            QMessageBox.warning(
+                self, "Błąd", "Brak danych do analizy."
             )
+            return
+
+        run_task(
+            self.task_runner, self, "Wykrywanie anomalii",
+            _anomalies_task, self.current_data,
+            on_finished=self._show_anomalies,
+            on_error=self._show_error
+        )
+
+    def _show_anomalies(self, summary):
+        """
+        Wyświetlenie podsumowania anomalii w tabeli.
+
+        Args:
+            summary (pandas.DataFrame): Podsumowanie z detect_anomalies.
+        """
+        if summary is None or summary.empty:
+            QMessageBox.warning(
+                self, "Błąd", "Nie udało się wykryć anomalii (brak kolumn liczbowych?)."
+            )
+            return
+
+        # Tabela: wiersze = kolumny danych, kolumny = typy problemów
+        headers = ["Kolumna"] + list(summary.columns)
+        self.stats_table.setRowCount(len(summary))
+        self.stats_table.setColumnCount(len(headers))
+        self.stats_table.setHorizontalHeaderLabels(headers)
+
+        for i, (column, row) in enumerate(summary.iterrows()):
+            self.stats_table.setItem(i, 0, QTableWidgetItem(str(column)))
+            for j, value in enumerate(row.values, start=1):
+                formatted_value = f"{value:.2f}" if isinstance(value, float) else str(value)
+                self.stats_table.setItem(i, j, QTableWidgetItem(formatted_value))
+
+        self.stats_table.resizeColumnsToContents()
+
+        total = int(summary['wiersze z anomalia'].sum())
+        self.status_bar.showMessage(f"Wykryto {total} podejrzanych pomiarów w {len(summary)} kolumnach")
+
+    def _show_error(self, message):
+        """Komunikat o błędzie zadania w tle."""
+        print(f"Błąd przy analizie statystycznej: {message}")
+        QMessageBox.critical(
+            self, "Błąd krytyczny", f"Wystąpił błąd: {message}"
+        )
 
     def save_statistics(self):
         """Zapisuje statystyki do pliku CSV."""
@@ -177,7 +249,37 @@ class StatsTab(QWidget):
                     row.append(item.text() if item else "")
                 data.append(row)
 
-            # Stwórz DataFrame i zapisz
-            df = pd.DataFrame(data, columns=["Statystyka", "Wartość"])
+            # Stwórz DataFrame i zapisz - nagłówki z tabeli (statystyki albo anomalie)
+            headers = [
+                self.stats_table.horizontalHeaderItem(j).text()
+                for j in range(self.stats_table.columnCount())
+            ]
+            df = pd.DataFrame(data, columns=headers)
             df.to_csv(file_path, index=False)
-            self.status_bar.showMessage(f"Zapisano statystyki do {file_path}")
\ No newline at end of file
+            self.status_bar.showMessage(f"Zapisano statystyki do {file_path}")
+
+
+def _statistics_task(context, data, column):
+    """Zadanie w tle - statystyki jednej kolumny."""
+    from utils.data_processor import calculate_basic_statistics
+
+    context.report_progress(0, column)
+    return calculate_basic_statistics(data, column)
+
+
+def _anomalies_task(context, data):
+    """Zadanie w tle - wykrywanie anomalii kolumna po kolumnie (z postępem i anulowaniem)."""
+    import numpy as np
+    import pandas as pd
+    from utils.anomaly_detection import detect_anomalies, FLAG_SUFFIX
+
+    columns = list(data.select_dtypes(include=[np.number]).columns)
+    columns = [c for c in columns if not str(c).endswith(FLAG_SUFFIX)]
+    summaries = []
+    for position, column in enumerate(columns):
+        context.report_progress(position / max(len(columns), 1) * 100, str(column))
+        _, summary = detect_anomalies(data[[column]])
+        if summary is not None:
+            summaries.append(summary)
+
+    return pd.concat(summaries) if summaries else None
@@ -3,28 +3,65 @@ Moduł zawierający klasę zakładki wizualizacji.
 ZAKTUALIZOWANY - używa prostych funkcji z utils zamiast obiektów.
 """
 import os
+import numpy as np
+import pandas as pd
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel,
                              QComboBox, QPushButton, QSpinBox, QSplitter, QMessageBox,
-                             QFileDialog)
-from PyQt5.QtCore import Qt
+                             QFileDialog, QCheckBox)
+from PyQt5.QtCore import Qt, QTimer
 
 from ..matplotlib_canvas import MatplotlibCanvas, NavigationToolbar
 
+# co ile sprawdzamy, czy do pliku dopisano wiersze (tryb na żywo)
+LIVE_POLL_MS = 500
+
+# typy wykresów, które umieją dorysowywać nowe punkty
+LIVE_PLOT_TYPES = ["Szereg czasowy", "Wykres punktowy"]
+
+# siatka wykresów: pierwsza pozycja listy paneli i rodzaje paneli (napis -> nazwa w utils)
+FACET_ALL_COLUMNS = "Każda kolumna liczbowa"
+FACET_KINDS = {"Szereg czasowy": "line", "Histogram": "histogram"}
+
+# statystyki map w czasie (profil tygodniowy, kalendarz): napis -> nazwa w utils
+TIME_GRID_STATS = {
+    "Średnia": "mean",
+    "Maksimum": "max",
+    "Minimum": "min",
+    "Suma": "sum",
+    "Liczba pomiarów": "count",
+}
+
 
 class VisualizationTab(QWidget):
     """Zakładka wizualizacji."""
 
-    def __init__(self, status_bar):
+    def __init__(self, status_bar, task_runner=None):
         """
         Inicjalizacja zakładki wizualizacji.
 
         Args:
             status_bar (QStatusBar): Pasek stanu głównego okna.
+            task_runner (TaskRunner, optional): Wykonawca zadań w tle.
         """
         super(VisualizationTab, self).__init__()
         self.status_bar = status_bar
+        self.task_runner = task_runner
         self.current_data = None
 
+        # podsumowania kolumn i siatki map w czasie - czyszczone przy nowych danych
+        self.summary_cache = {}
+        self.last_plot_type = None
+
+        # piramida agregatów godzina -> dzień -> miesiąc dla map w czasie -
+        # budowana raz dla zbioru, przy pierwszym profilu/kalendarzu
+        self.rollup_pyramid = None
+
+        # tryb na żywo - wykres dorysowujący wiersze dopisywane do pliku
+        self.live_plot = None
+        self.live_source = None
+        self.live_timer = QTimer(self)
+        self.live_timer.timeout.connect(self._poll_live_file)
+
         # Inicjalizacja interfejsu
         self.init_ui()
 
@@ -48,7 +85,10 @@ class VisualizationTab(QWidget):
             "Szereg czasowy",
             "Wykres słupkowy",
             "Wykres kołowy",
-            "Mapa korelacji"
+            "Mapa korelacji",
+            "Profil tygodniowy",
+            "Kalendarz",
+            "Siatka wykresów"
         ])
         self.plot_type_combo.currentIndexChanged.connect(self.update_visualization_controls)
 
@@ -70,6 +110,7 @@ class VisualizationTab(QWidget):
         self.bins_spin = QSpinBox()
         self.bins_spin.setRange(2, 100)
         self.bins_spin.setValue(20)
+        self.bins_spin.valueChanged.connect(self._on_bins_changed)
 
         self.plot_params_layout.addWidget(self.column_combo_label)
         self.plot_params_layout.addWidget(self.column_combo)
@@ -94,6 +135,31 @@ class VisualizationTab(QWidget):
         self.plot_params_layout.addWidget(self.y_column_label)
         self.plot_params_layout.addWidget(self.y_column_combo)
 
+        # Statystyka dla profilu tygodniowego i kalendarza
+        self.stat_label = QLabel("Statystyka:")
+        self.stat_combo = QComboBox()
+        self.stat_combo.addItems(list(TIME_GRID_STATS))
+        self.stat_label.hide()
+        self.stat_combo.hide()
+
+        self.plot_params_layout.addWidget(self.stat_label)
+        self.plot_params_layout.addWidget(self.stat_combo)
+
+        # Siatka wykresów - panel na kolumnę albo na wartość wybranej kolumny
+        self.facet_label = QLabel("Panele:")
+        self.facet_combo = QComboBox()
+        self.facet_combo.addItem(FACET_ALL_COLUMNS)
+        self.facet_combo.currentIndexChanged.connect(self.update_visualization_controls)
+
+        self.facet_kind_label = QLabel("Rodzaj paneli:")
+        self.facet_kind_combo = QComboBox()
+        self.facet_kind_combo.addItems(list(FACET_KINDS))
+        self.facet_kind_combo.currentIndexChanged.connect(self.update_visualization_controls)
+
+        for widget in (self.facet_label, self.facet_combo, self.facet_kind_label, self.facet_kind_combo):
+            widget.hide()
+            self.plot_params_layout.addWidget(widget)
+
         self.plot_params_group.setLayout(self.plot_params_layout)
         control_layout.addWidget(self.plot_params_group)
 
@@ -107,6 +173,21 @@ class VisualizationTab(QWidget):
         save_plot_button.clicked.connect(self.save_plot)
         control_layout.addWidget(save_plot_button)
 
+        # Tryb na żywo
+        live_group = QGroupBox("Na żywo")
+        live_layout = QVBoxLayout()
+
+        self.live_checkbox = QCheckBox("Śledź wiersze dopisywane do pliku")
+        self.live_checkbox.setToolTip(
+            "Szereg czasowy / wykres punktowy - nowe wiersze z pliku CSV\n"
+            "są dorysowywane bez przerysowywania całego wykresu."
+        )
+        self.live_checkbox.toggled.connect(self._on_live_toggled)
+        live_layout.addWidget(self.live_checkbox)
+
+        live_group.setLayout(live_layout)
+        control_layout.addWidget(live_group)
+
         # Dodanie elastycznego odstępu
         control_layout.addStretch()
 
@@ -135,12 +216,28 @@ class VisualizationTab(QWidget):
         Args:
             data (pandas.DataFrame): Nowe dane do wizualizacji.
         """
+        self.stop_live_plot()
         self.current_data = data
+        self.summary_cache = {}
+        self.rollup_pyramid = None
+        self.last_plot_type = None
         if data is not None:
             columns = list(data.columns)
             self.update_columns(columns)
             print(f"VisualizationTab: zaktualizowano dane ({len(data)} wierszy, {len(columns)} kolumn)")
 
+    def _get_rollup_pyramid(self):
+        """
+        Piramida agregatów bieżących danych (budowana przy pierwszym użyciu).
+
+        Returns:
+            dict: Wynik build_rollup_pyramid albo None, gdy dane nie mają czasu.
+        """
+        if self.rollup_pyramid is None and self.current_data is not None:
+            from utils.resampling import build_rollup_pyramid
+            self.rollup_pyramid = build_rollup_pyramid(self.current_data)
+        return self.rollup_pyramid
+
     def update_columns(self, columns):
         """
         Aktualizacja list kolumn.
@@ -157,6 +254,10 @@ class VisualizationTab(QWidget):
         self.y_column_combo.clear()
         self.y_column_combo.addItems(columns)
 
+        self.facet_combo.clear()
+        self.facet_combo.addItem(FACET_ALL_COLUMNS)
+        self.facet_combo.addItems(columns)
+
     def update_visualization_controls(self):
         """Aktualizacja kontrolek wizualizacji w zależności od wybranego typu wykresu."""
         plot_type = self.plot_type_combo.currentText()
@@ -170,6 +271,10 @@ class VisualizationTab(QWidget):
         self.x_column_combo.hide()
         self.y_column_label.hide()
         self.y_column_combo.hide()
+        self.stat_label.hide()
+        self.stat_combo.hide()
+        for widget in (self.facet_label, self.facet_combo, self.facet_kind_label, self.facet_kind_combo):
+            widget.hide()
 
         # Pokazanie odpowiednich kontrolek w zależności od typu wykresu
         if plot_type == "Histogram":
@@ -205,6 +310,22 @@ class VisualizationTab(QWidget):
         elif plot_type == "Mapa korelacji":
             # Mapa korelacji nie potrzebuje dodatkowych parametrów
             pass
+        elif plot_type in ("Profil tygodniowy", "Kalendarz"):
+            self.column_combo_label.show()
+            self.column_combo.show()
+            self.stat_label.show()
+            self.stat_combo.show()
+        elif plot_type == "Siatka wykresów":
+            for widget in (self.facet_label, self.facet_combo, self.facet_kind_label, self.facet_kind_combo):
+                widget.show()
+            # przy podziale po wartościach kolumny pokazujemy jedną kolumnę wartości
+            if self.facet_combo.currentIndex() > 0:
+                self.y_column_label.setText("Kolumna wartości:")
+                self.y_column_label.show()
+                self.y_column_combo.show()
+            if self.facet_kind_combo.currentText() == "Histogram":
+                self.bins_label.show()
+                self.bins_spin.show()
 
     def generate_plot(self):
         """Generowanie wykresu na podstawie wybranych parametrów."""
@@ -214,6 +335,8 @@ class VisualizationTab(QWidget):
             )
             return
 
+        self.stop_live_plot()
+
         try:
             # Pobranie typu wykresu
             plot_type = self.plot_type_combo.currentText()
@@ -222,10 +345,11 @@ class VisualizationTab(QWidget):
             from utils.visualization import (create_histogram, create_boxplot,
                                             create_scatter_plot, create_bar_chart,
                                             create_pie_chart, create_line_plot,
-                                            create_correlation_heatmap)
+                                            create_correlation_heatmap, create_diurnal_heatmap,
+                                            create_calendar_heatmap, create_facet_grid)
 
-            # Wyczyszczenie płótna
-            self.plot_canvas.fig.clear()
+            # Rysujemy od razu na osiach płótna - figura jest używana ponownie
+            ax = self.plot_canvas.reset_axes()
             fig = None
 
             # Generowanie wykresu w zależności od typu
@@ -239,7 +363,8 @@ class VisualizationTab(QWidget):
 
                 fig = create_histogram(
                     self.current_data, column, bins=bins,
-                    title=f"Histogram - {column}"
+                    title=f"Histogram - {column}",
+                    ax=ax, cache=self.summary_cache
                 )
 
             elif plot_type == "Wykres pudełkowy":
@@ -251,7 +376,8 @@ class VisualizationTab(QWidget):
 
                 fig = create_boxplot(
                     self.current_data, column,
-                    title=f"Wykres pudełkowy - {column}"
+                    title=f"Wykres pudełkowy - {column}",
+                    ax=ax, cache=self.summary_cache
                 )
 
             elif plot_type == "Wykres punktowy":
@@ -264,7 +390,8 @@ class VisualizationTab(QWidget):
 
                 fig = create_scatter_plot(
                     self.current_data, x_column, y_column,
-                    title=f"Wykres punktowy - {x_column} vs {y_column}"
+                    title=f"Wykres punktowy - {x_column} vs {y_column}",
+                    ax=ax
                 )
 
             elif plot_type == "Szereg czasowy":
@@ -277,7 +404,8 @@ class VisualizationTab(QWidget):
 
                 fig = create_line_plot(
                     self.current_data, x_column, y_column,
-                    title=f"Szereg czasowy - {y_column}"
+                    title=f"Szereg czasowy - {y_column}",
+                    ax=ax
                 )
 
             elif plot_type == "Wykres słupkowy":
@@ -290,7 +418,8 @@ class VisualizationTab(QWidget):
 
                 fig = create_bar_chart(
                     self.current_data, x_column, y_column,
-                    title=f"Wykres słupkowy - {x_column}"
+                    title=f"Wykres słupkowy - {x_column}",
+                    ax=ax
                 )
 
             elif plot_type == "Wykres kołowy":
@@ -302,13 +431,52 @@ class VisualizationTab(QWidget):
 
                 fig = create_pie_chart(
                     self.current_data, column,
-                    title=f"Wykres kołowy - {column}"
+                    title=f"Wykres kołowy - {column}",
+                    ax=ax
                 )
 
             elif plot_type == "Mapa korelacji":
                 fig = create_correlation_heatmap(
                     self.current_data,
-                    title="Mapa korelacji"
+                    title="Mapa korelacji",
+                    ax=ax
+                )
+
+            elif plot_type in ("Profil tygodniowy", "Kalendarz"):
+                column = self.column_combo.currentText()
+                stat = TIME_GRID_STATS[self.stat_combo.currentText()]
+
+                if not column:
+                    QMessageBox.warning(self, "Błąd", "Nie wybrano kolumny.")
+                    return
+
+                # siatki trafiają do tego samego cache co podsumowania kolumn
+                create_function = (create_diurnal_heatmap if plot_type == "Profil tygodniowy"
+                                   else create_calendar_heatmap)
+                fig = create_function(
+                    self.current_data, column, stat=stat,
+                    title=f"{plot_type} - {column}",
+                    ax=ax, pyramid=self._get_rollup_pyramid(), cache=self.summary_cache
+                )
+
+            elif plot_type == "Siatka wykresów":
+                kind = FACET_KINDS[self.facet_kind_combo.currentText()]
+
+                if self.facet_combo.currentIndex() > 0:
+                    facet_column = self.facet_combo.currentText()
+                    y_columns = [self.y_column_combo.currentText()]
+                else:
+                    facet_column = None
+                    y_columns = list(self.current_data.select_dtypes(include='number').columns)
+
+                if not y_columns or not y_columns[0]:
+                    QMessageBox.warning(self, "Błąd", "Brak kolumn liczbowych do siatki wykresów.")
+                    return
+
+                # siatka zajmuje całą figurę płótna zamiast jednych osi
+                fig = create_facet_grid(
+                    self.current_data, y_columns, facet_column=facet_column,
+                    kind=kind, fig=self.plot_canvas.fig, bins=self.bins_spin.value()
                 )
 
             else:
@@ -319,11 +487,15 @@ class VisualizationTab(QWidget):
 
             # Wyświetlenie wykresu
             if fig:
-                # Kopiowanie wykresu do canvas
-                self._copy_figure_to_canvas(fig)
+                self.last_plot_type = plot_type
+                self.plot_canvas.draw_idle()
                 self.status_bar.showMessage(f"Wygenerowano wykres: {plot_type}")
                 print(f"Wygenerowano wykres: {plot_type}")
             else:
+                self.last_plot_type = None
+                # nie zostawiamy na płótnie połowy wykresu
+                self.plot_canvas.reset_axes()
+                self.plot_canvas.draw_idle()
                 QMessageBox.warning(
                     self, "Błąd", "Nie udało się wygenerować wykresu. Sprawdź dane i wybrane kolumny."
                 )
@@ -334,71 +506,125 @@ class VisualizationTab(QWidget):
                 self, "Błąd krytyczny", f"Wystąpił błąd: {str(error)}"
             )
 
-    def _copy_figure_to_canvas(self, source_fig):
+    def start_live_plot(self, file_path, separator=';'):
         """
-        Kopiuje wykres z funkcji wizualizacji do canvas GUI.
+        Włącza tryb na żywo - wykres z bieżących danych dorysowuje wiersze dopisywane do pliku.
 
         Args:
-            source_fig: Figura matplotlib do skopiowania.
+            file_path (str): Plik CSV, do którego są dopisywane wiersze.
+            separator (str, optional): Separator kolumn. Domyślnie ';'.
+
+        Returns:
+            bool: True, jeśli tryb na żywo wystartował.
         """
-        try:
-            if source_fig is None:
-                return
+        from utils.data_loader import read_csv_header
+        from ..live_plot import LivePlot
 
-            # Prościej - po prostu zastąp figurę
-            self.plot_canvas.fig.clear()
-
-            # Skopiuj wszystkie axes z oryginalnej figury
-            for i, ax in enumerate(source_fig.axes):
-                new_ax = self.plot_canvas.fig.add_subplot(len(source_fig.axes), 1, i + 1)
-
-                # Skopiuj linie
-                for line in ax.lines:
-                    new_ax.plot(line.get_xdata(), line.get_ydata(),
-                                color=line.get_color(), linewidth=line.get_linewidth(),
-                                linestyle=line.get_linestyle(), marker=line.get_marker(),
-                                label=line.get_label())
-
-                # Skopiuj scatter plots
-                for collection in ax.collections:
-                    if hasattr(collection, 'get_offsets') and len(collection.get_offsets()) > 0:
-                        offsets = collection.get_offsets()
-                        colors = collection.get_facecolors()
-                        sizes = collection.get_sizes()
-                        new_ax.scatter(offsets[:, 0], offsets[:, 1], c=colors, s=sizes)
-
-                # Skopiuj histogramy i bar charts
-                for patch in ax.patches:
-                    if hasattr(patch, 'get_x') and hasattr(patch, 'get_width'):
-                        new_ax.add_patch(type(patch)(
-                            (patch.get_x(), patch.get_y()),
-                            patch.get_width(),
-                            patch.get_height(),
-                            facecolor=patch.get_facecolor(),
-                            edgecolor=patch.get_edgecolor()
-                        ))
-
-                # Skopiuj etykiety
-                new_ax.set_title(ax.get_title())
-                new_ax.set_xlabel(ax.get_xlabel())
-                new_ax.set_ylabel(ax.get_ylabel())
-                new_ax.set_xlim(ax.get_xlim())
-                new_ax.set_ylim(ax.get_ylim())
-
-                if ax.legend_:
-                    new_ax.legend()
-
-                if ax.get_xgridlines() or ax.get_ygridlines():
-                    new_ax.grid(True)
-
-            self.plot_canvas.fig.tight_layout()
-            self.plot_canvas.draw()
+        self.stop_live_plot()
 
-        except Exception as error:
-            print(f"Błąd przy kopiowaniu wykresu: {error}")
-            # Fallback - bezpośrednie zastąpienie
-            self.plot_canvas.fig = source_fig
-            self.plot_canvas.draw()
+        plot_type = self.plot_type_combo.currentText()
+        x_column = self.x_column_combo.currentText()
+        y_column = self.y_column_combo.currentText()
+        if plot_type not in LIVE_PLOT_TYPES or not x_column or not y_column:
+            QMessageBox.warning(
+                self, "Błąd",
+                "Tryb na żywo działa dla szeregu czasowego i wykresu punktowego z wybranymi kolumnami X i Y."
+            )
+            return False
+
+        names, offset = read_csv_header(file_path, separator=separator)
+        if names is None or x_column not in names or y_column not in names:
+            QMessageBox.warning(self, "Błąd", "Plik nie zawiera wybranych kolumn.")
+            return False
+
+        # statyczne elementy wykresu - trafią do zapamiętanego tła
+        ax = self.plot_canvas.reset_axes()
+        ax.set_title(f"{y_column} na żywo")
+        ax.set_xlabel(x_column)
+        ax.set_ylabel(y_column)
+        ax.grid(True, alpha=0.3)
+        ax.tick_params(axis='x', labelrotation=45)
+        self.plot_canvas.fig.tight_layout()
+
+        self.live_plot = LivePlot(self.plot_canvas, ax,
+                                  connect_points=(plot_type == "Szereg czasowy"), parent=self)
+        self.live_source = {'path': file_path, 'separator': separator, 'names': names,
+                            'offset': offset, 'x': x_column, 'y': y_column}
+
+        # punkty z już wczytanych danych
+        if self.current_data is not None and x_column in self.current_data.columns:
+            self._append_live_rows(self.current_data)
+
+        self.live_timer.start(LIVE_POLL_MS)
+        self.last_plot_type = None
+        self.plot_canvas.draw_idle()
+        self.status_bar.showMessage(f"Tryb na żywo: śledzę {os.path.basename(file_path)}")
+        return True
+
+    def stop_live_plot(self):
+        """Wyłącza tryb na żywo (wykres zostaje na płótnie)."""
+        self.live_timer.stop()
+        if self.live_plot is not None:
+            self.live_plot.stop()
+            self.live_plot = None
+            self.live_source = None
+
+        if self.live_checkbox.isChecked():
+            self.live_checkbox.blockSignals(True)
+            self.live_checkbox.setChecked(False)
+            self.live_checkbox.blockSignals(False)
+
+    def _on_live_toggled(self, checked):
+        """Przełącznik trybu na żywo - przy włączaniu pytamy o śledzony plik."""
+        if not checked:
+            self.stop_live_plot()
+            return
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Plik do śledzenia", "", "Pliki CSV (*.csv);;Wszystkie pliki (*.*)"
+        )
+        from utils.data_loader import guess_separator
+
+        started = bool(file_path) and self.start_live_plot(file_path, guess_separator(file_path))
+
+        # start_live_plot najpierw zatrzymuje poprzedni tryb (i odznacza pole)
+        self.live_checkbox.blockSignals(True)
+        self.live_checkbox.setChecked(started)
+        self.live_checkbox.blockSignals(False)
+
+    def _poll_live_file(self):
+        """Czyta nowe wiersze z pliku i przekazuje je do wykresu na żywo."""
+        if self.live_source is None:
+            return
+
+        from utils.data_loader import read_appended_rows
+
+        source = self.live_source
+        rows, source['offset'] = read_appended_rows(
+            source['path'], source['offset'], source['names'], separator=source['separator']
+        )
+        if rows is not None:
+            self._append_live_rows(rows)
+            self.status_bar.showMessage(
+                f"Tryb na żywo: +{len(rows)} wierszy, razem {self.live_plot.point_count()} punktów"
+            )
+
+    def _append_live_rows(self, rows):
+        """Zamienia kolumny X/Y wierszy na liczby/daty i dopisuje je do wykresu."""
+        from utils.downsampling import plot_axis_values
+
+        x = plot_axis_values(rows[self.live_source['x']])
+        if x is None:
+            return
+        y = pd.to_numeric(rows[self.live_source['y']], errors='coerce')
+
+        valid = x.notna().to_numpy()
+        self.live_plot.append(x.to_numpy()[valid], y.to_numpy(dtype=np.float64)[valid])
+
+    def _on_bins_changed(self, bins):
+        """Zmiana liczby przedziałów - histogram z cache przerysowuje się od razu."""
+        if self.last_plot_type == "Histogram" and self.plot_type_combo.currentText() == "Histogram":
+            self.generate_plot()
 
     def save_plot(self):
         """Zapisywanie wykresu do pliku."""
@@ -432,4 +658,4 @@ class VisualizationTab(QWidget):
             print(f"Błąd przy zapisywaniu wykresu: {error}")
             QMessageBox.critical(
                 self, "Błąd krytyczny", f"Wystąpił błąd: {str(error)}"
-            )
\ No newline at end of file
+            )
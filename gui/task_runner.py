@@ -0,0 +1,305 @@
+"""
+Moduł zawierający wykonawcę zadań w tle dla zakładek GUI.
+
+Długie obliczenia (wczytywanie, statystyki, korelacje, skalowanie, grupowanie,
+klasyfikacja) uruchamiane są w puli wątków Qt (QThreadPool), a wyniki wracają
+do wątku interfejsu przez sygnały - okno nie zamarza w czasie liczenia.
+Każda zakładka (właściciel) może mieć naraz tylko jedno zadanie.
+
+Funkcja zadania dostaje jako pierwszy argument TaskContext, przez który
+raportuje postęp i sprawdza, czy użytkownik nie anulował zadania.
+"""
+import itertools
+import threading
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QProgressBar, QPushButton
+
+
+class TaskCancelled(Exception):
+    """Zgłaszany w funkcji zadania, gdy użytkownik anulował zadanie."""
+
+
+class TaskContext:
+    """Kontekst zadania - postęp i anulowanie (wywoływane z wątku roboczego)."""
+
+    def __init__(self, progress_callback=None):
+        """
+        Inicjalizacja kontekstu.
+
+        Args:
+            progress_callback (callable, optional): Funkcja (procent, opis) wołana przy postępie.
+        """
+        self._cancel_event = threading.Event()
+        self._progress_callback = progress_callback
+
+    def cancel(self):
+        """Prosi zadanie o zakończenie (zadanie samo sprawdza tę flagę)."""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        """Czy zadanie zostało anulowane."""
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Przerywa zadanie wyjątkiem TaskCancelled, jeśli zostało anulowane."""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, percent, message=""):
+        """
+        Raportuje postęp i jednocześnie sprawdza anulowanie.
+
+        Args:
+            percent (float): Postęp 0-100.
+            message (str, optional): Krótki opis aktualnego etapu.
+        """
+        self.check_cancelled()
+        if self._progress_callback is not None:
+            self._progress_callback(int(max(0, min(100, percent))), message)
+
+
+class _TaskSignals(QObject):
+    """Sygnały pojedynczego zadania - emitowane z wątku roboczego."""
+
+    progress = pyqtSignal(int, int, str)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    cancelled = pyqtSignal(int)
+
+
+class _Task(QRunnable):
+    """Zadanie uruchamiane w QThreadPool."""
+
+    def __init__(self, task_id, function, args, kwargs):
+        super(_Task, self).__init__()
+        # obiekt trzymamy sami (w TaskRunner._tasks) - Qt nie może go usunąć
+        self.setAutoDelete(False)
+        self.task_id = task_id
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _TaskSignals()
+        self.context = TaskContext(
+            lambda percent, message: self.signals.progress.emit(self.task_id, percent, message)
+        )
+
+    def run(self):
+        """Wykonanie funkcji zadania w wątku roboczym."""
+        try:
+            result = self.function(self.context, *self.args, **self.kwargs)
+        except TaskCancelled:
+            self.signals.cancelled.emit(self.task_id)
+            return
+        except Exception as error:
+            traceback.print_exc()
+            self.signals.failed.emit(self.task_id, str(error))
+            return
+
+        # funkcje z utils łapią wyjątki same - anulowanie sprawdzamy też na końcu
+        if self.context.is_cancelled():
+            self.signals.cancelled.emit(self.task_id)
+        else:
+            self.signals.finished.emit(self.task_id, result)
+
+
+class TaskRunner(QObject):
+    """Wykonawca zadań w tle - jedno zadanie na właściciela (zakładkę)."""
+
+    task_started = pyqtSignal(str)
+    task_progress = pyqtSignal(str, int, str)
+    task_done = pyqtSignal(str)
+    task_rejected = pyqtSignal(str)
+
+    def __init__(self, parent=None, max_threads=None):
+        """
+        Inicjalizacja wykonawcy.
+
+        Args:
+            parent (QObject, optional): Obiekt nadrzędny. Domyślnie None.
+            max_threads (int, optional): Liczba wątków (None = liczba rdzeni).
+        """
+        super(TaskRunner, self).__init__(parent)
+        self.pool = QThreadPool()
+        if max_threads is not None:
+            self.pool.setMaxThreadCount(max_threads)
+
+        self._ids = itertools.count(1)
+        self._tasks = {}  # id -> (właściciel, opis, zadanie, callbacki)
+
+    def submit(self, owner, description, function, *args,
+               on_finished=None, on_error=None, on_cancelled=None, **kwargs):
+        """
+        Uruchamia funkcję w tle.
+
+        Args:
+            owner (object): Właściciel zadania (zwykle zakładka) - max jedno zadanie naraz.
+            description (str): Opis zadania do paska stanu.
+            function (callable): Funkcja (context, *args, **kwargs) -> wynik.
+            on_finished (callable, optional): Wołana w wątku GUI z wynikiem.
+            on_error (callable, optional): Wołana w wątku GUI z opisem błędu.
+            on_cancelled (callable, optional): Wołana w wątku GUI po anulowaniu.
+
+        Returns:
+            bool: False gdy właściciel ma już uruchomione zadanie.
+        """
+        if self.is_running(owner):
+            print(f"Zadanie '{description}' odrzucone - poprzednie zadanie jeszcze trwa")
+            self.task_rejected.emit(description)
+            return False
+
+        task_id = next(self._ids)
+        task = _Task(task_id, function, args, kwargs)
+
+        # metody tego obiektu żyją w wątku GUI - Qt dostarczy sygnały przez kolejkę zdarzeń
+        task.signals.progress.connect(self._on_progress)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        task.signals.cancelled.connect(self._on_cancelled)
+
+        self._tasks[task_id] = (owner, description, task, (on_finished, on_error, on_cancelled))
+        self.task_started.emit(description)
+        self.pool.start(task)
+        return True
+
+    def is_running(self, owner=None):
+        """
+        Czy właściciel (None = ktokolwiek) ma uruchomione zadanie.
+        Anulowane zadania się nie liczą - ich wynik i tak zostanie odrzucony.
+        """
+        return any(
+            (owner is None or entry[0] is owner) and not entry[2].context.is_cancelled()
+            for entry in self._tasks.values()
+        )
+
+    def cancel(self, owner=None):
+        """
+        Anuluje zadania właściciela (None = wszystkie).
+
+        Args:
+            owner (object, optional): Właściciel zadania.
+        """
+        for entry_owner, description, task, _ in self._tasks.values():
+            if owner is None or entry_owner is owner:
+                print(f"Anulowanie zadania: {description}")
+                task.context.cancel()
+
+    def wait(self, timeout_ms=-1):
+        """
+        Czeka na zakończenie wszystkich zadań (przydatne przy zamykaniu i w skryptach).
+
+        Args:
+            timeout_ms (int, optional): Maksymalny czas czekania (-1 = bez limitu).
+
+        Returns:
+            bool: True gdy wszystkie zadania się zakończyły.
+        """
+        return self.pool.waitForDone(timeout_ms)
+
+    def _on_progress(self, task_id, percent, message):
+        entry = self._tasks.get(task_id)
+        if entry is not None:
+            self.task_progress.emit(entry[1], percent, message)
+
+    def _on_finished(self, task_id, result):
+        entry = self._finish(task_id)
+        if entry is not None and entry[3][0] is not None:
+            entry[3][0](result)
+
+    def _on_failed(self, task_id, message):
+        entry = self._finish(task_id)
+        if entry is not None and entry[3][1] is not None:
+            entry[3][1](message)
+
+    def _on_cancelled(self, task_id):
+        entry = self._finish(task_id)
+        if entry is not None and entry[3][2] is not None:
+            entry[3][2]()
+
+    def _finish(self, task_id):
+        entry = self._tasks.pop(task_id, None)
+        if entry is not None:
+            self.task_done.emit(entry[1])
+        return entry
+
+
+def run_task(task_runner, owner, description, function, *args,
+             on_finished=None, on_error=None, on_cancelled=None, **kwargs):
+    """
+    Uruchamia zadanie w tle albo - gdy nie ma wykonawcy - od razu w wątku GUI.
+
+    Dzięki temu zakładki działają także bez TaskRunner (np. w skryptach).
+
+    Returns:
+        bool: False gdy zadanie zostało odrzucone.
+    """
+    if task_runner is not None:
+        return task_runner.submit(
+            owner, description, function, *args,
+            on_finished=on_finished, on_error=on_error, on_cancelled=on_cancelled, **kwargs
+        )
+
+    try:
+        result = function(TaskContext(), *args, **kwargs)
+    except TaskCancelled:
+        if on_cancelled is not None:
+            on_cancelled()
+        return True
+    except Exception as error:
+        traceback.print_exc()
+        if on_error is not None:
+            on_error(str(error))
+        return True
+
+    if on_finished is not None:
+        on_finished(result)
+    return True
+
+
+class TaskProgressWidget(QWidget):
+    """Pasek postępu z przyciskiem anulowania do paska stanu."""
+
+    def __init__(self, task_runner, parent=None):
+        """
+        Inicjalizacja widgetu.
+
+        Args:
+            task_runner (TaskRunner): Wykonawca, którego zadania pokazujemy.
+            parent (QWidget, optional): Widget nadrzędny. Domyślnie None.
+        """
+        super(TaskProgressWidget, self).__init__(parent)
+        self.task_runner = task_runner
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.task_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setMaximumWidth(200)
+        self.cancel_button = QPushButton("Anuluj")
+        self.cancel_button.clicked.connect(lambda: self.task_runner.cancel())
+
+        layout.addWidget(self.task_label)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.cancel_button)
+
+        task_runner.task_started.connect(self._on_started)
+        task_runner.task_progress.connect(self._on_progress)
+        task_runner.task_done.connect(self._on_done)
+
+        self.hide()
+
+    def _on_started(self, description):
+        self.task_label.setText(description)
+        self.progress_bar.setValue(0)
+        self.show()
+
+    def _on_progress(self, description, percent, message):
+        self.task_label.setText(f"{description}: {message}" if message else description)
+        self.progress_bar.setValue(percent)
+
+    def _on_done(self, description):
+        if not self.task_runner.is_running():
+            self.hide()
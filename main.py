@@ -22,19 +22,46 @@ Zestaw danych użyty w projekcie:
 Air Quality - https://archive.ics.uci.edu/dataset/360/air+quality
 """
 import sys
+import time
+
+START_TIME = time.perf_counter()
+
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from gui import MainWindow
 
+IMPORTS_DONE_TIME = time.perf_counter()
+
+
+def report_startup_time(window_created_time):
+    """
+    Wypisuje, ile trwało uruchomienie - wołane po pierwszym narysowaniu okna.
+
+    Args:
+        window_created_time (float): Chwila (perf_counter) utworzenia okna.
+    """
+    now = time.perf_counter()
+    print("=== CZAS URUCHOMIENIA ===")
+    print(f"importy: {IMPORTS_DONE_TIME - START_TIME:.2f} s")
+    print(f"budowa okna: {window_created_time - IMPORTS_DONE_TIME:.2f} s")
+    print(f"pierwsze okno po: {now - START_TIME:.2f} s")
+    print("=========================")
+
 
 def main():
     """
     Funkcja główna aplikacji.
 
-    Tworzy i uruchamia główne okno aplikacji.
+    Tworzy i uruchamia główne okno aplikacji. Zakładki budują się przy
+    pierwszym otwarciu; opcja --eager buduje wszystkie od razu.
     """
     app = QApplication(sys.argv)
-    window = MainWindow()
+    window = MainWindow(lazy_tabs="--eager" not in sys.argv)
+    window_created_time = time.perf_counter()
     window.show()
+
+    # zero ms = po obsłużeniu zdarzeń pokazania, czyli gdy okno jest już na ekranie
+    QTimer.singleShot(0, lambda: report_startup_time(window_created_time))
     sys.exit(app.exec_())
 
 
@@ -0,0 +1,283 @@
+"""
+Modul do liczenia indeksu jakosci powietrza (AQI) i przekroczen norm.
+Wzorowany na europejskim indeksie CAQI - skala 0-100, im wiecej tym gorzej.
+
+Kazde zanieczyszczenie ma tabele progow stezen. Stezenie zamieniamy na pod-indeks
+interpolacja liniowa miedzy progami, a indeks ogolny to najgorszy z pod-indeksow
+zanieczyszczen, ktore maja prawdziwe progi CAQI (NO2, CO).
+Wszystko liczymy na calych kolumnach naraz (searchsorted), bez petli po wierszach.
+
+Autor: Student, który chce wiedzieć czy można wyjść pobiegać
+"""
+
+import pandas as pd
+import numpy as np
+
+from utils.resampling import parse_timestamps
+
+
+# progi indeksu wspolne dla wszystkich zanieczyszczen
+AQI_LEVELS = [0, 25, 50, 75, 100]
+AQI_CATEGORIES = ['bardzo niski', 'niski', 'sredni', 'wysoki', 'bardzo wysoki']
+
+# tabele progow stezen dla kolumn z naszego zbioru
+# - hours: okno usredniania (kroczace), 1 = wartosci godzinowe
+# - concentrations: stezenia odpowiadajace progom AQI_LEVELS
+# - limit: norma do liczenia przekroczen (None = brak normy dla tego okna)
+# - in_index: czy pod-indeks wchodzi do indeksu ogolnego
+# NO2 i CO wg CAQI. Dla C6H6 (ug/m3) i NOx CAQI nie ma progow - ich skale sa
+# umowne, wiec pod-indeksy sa tylko informacyjne i nie wchodza do indeksu
+# ogolnego. Norma dla benzenu (5 ug/m3) jest roczna, nie dobowa - nie liczymy
+# z niej przekroczen godzinowych.
+AQI_BREAKPOINTS = {
+    'NO2(GT)': {'name': 'NO2', 'hours': 1, 'concentrations': [0, 50, 100, 200, 400], 'limit': 200,
+                'in_index': True},
+    'CO(GT)': {'name': 'CO', 'hours': 8, 'concentrations': [0, 5, 7.5, 10, 20], 'limit': 10,
+               'in_index': True},
+    'C6H6(GT)': {'name': 'C6H6', 'hours': 24, 'concentrations': [0, 5, 10, 20, 50], 'limit': None,
+                 'in_index': False},
+    'NOx(GT)': {'name': 'NOx', 'hours': 1, 'concentrations': [0, 100, 200, 400, 800], 'limit': None,
+                'in_index': False},
+}
+
+# ile pomiarow w oknie musi byc zeby srednia sie liczyla (np. 6 z 8 godzin)
+MIN_COVERAGE = 0.75
+
+
+def calculate_sub_index(concentrations, breakpoints, levels=AQI_LEVELS):
+    """
+    zamienia stezenia na pod-indeks - interpolacja liniowa miedzy progami
+    powyzej ostatniego progu przedluzamy ostatni odcinek (indeks > 100)
+
+    co bierze:
+    - concentrations: tablica albo seria ze stezeniami
+    - breakpoints: rosnaca lista stezen dla progow
+    - levels: wartosci indeksu dla progow
+
+    co zwraca:
+    - tablica numpy z pod-indeksem (NaN tam gdzie brak stezenia)
+    """
+
+    values = np.asarray(concentrations, dtype=float)
+    breakpoints = np.asarray(breakpoints, dtype=float)
+    levels = np.asarray(levels, dtype=float)
+
+    # w ktorym przedziale lezy kazda wartosc - jedno wyszukiwanie binarne dla calej kolumny
+    segment = np.searchsorted(breakpoints, values, side='right') - 1
+    segment = np.clip(segment, 0, len(breakpoints) - 2)
+
+    low_c = breakpoints[segment]
+    high_c = breakpoints[segment + 1]
+    low_i = levels[segment]
+    high_i = levels[segment + 1]
+
+    sub_index = low_i + (np.clip(values, 0, None) - low_c) * (high_i - low_i) / (high_c - low_c)
+    return np.clip(sub_index, 0, None)
+
+
+def calculate_aqi(data, tables=None, station_column=None, date_column='Date', time_column='Time'):
+    """
+    liczy pod-indeksy dla kazdego zanieczyszczenia, indeks ogolny i przekroczenia norm
+    srednie kroczace (np. 8h dla CO) liczone sa w czasie, osobno dla kazdej stacji
+
+    co bierze:
+    - data: ramka pandas
+    - tables: tabele progow (None = AQI_BREAKPOINTS)
+    - station_column: kolumna z identyfikatorem stacji (None = jedna stacja)
+    - date_column, time_column: skad wziac czas (jak nie ma, kazdy wiersz = kolejna godzina)
+
+    co zwraca:
+    - nowa ramka z dodatkowymi kolumnami:
+      AQI_<nazwa> (pod-indeksy), AQI, AQI_kategoria, AQI_dominujace, przekroczenie_<nazwa>
+      albo None jak cos nie gra
+    """
+
+    if data is None:
+        print("brak danych do liczenia indeksu")
+        return None
+
+    if tables is None:
+        tables = AQI_BREAKPOINTS
+
+    tables = {column: table for column, table in tables.items() if column in data.columns}
+    if not tables:
+        print("nie ma w danych zadnej kolumny z zanieczyszczeniami")
+        return None
+
+    try:
+        order, keys = _time_order(data, station_column, date_column, time_column)
+
+        # plytka kopia - doklejamy tylko nowe kolumny
+        new_data = data.copy(deep=False)
+        sub_indices = []
+        names = []
+
+        for column, table in tables.items():
+            values = pd.to_numeric(data[column], errors='coerce').to_numpy(dtype=float)
+
+            if table['hours'] > 1:
+                values = _rolling_mean(values, order, keys, table['hours'])
+
+            sub_index = calculate_sub_index(values, table['concentrations'])
+            new_data[f"AQI_{table['name']}"] = sub_index
+
+            if table.get('limit') is not None:
+                new_data[f"przekroczenie_{table['name']}"] = values > table['limit']
+
+            if table.get('in_index', True):
+                sub_indices.append(sub_index)
+                names.append(table['name'])
+            print(f"policzono pod-indeks dla {column} (okno {table['hours']}h)")
+
+        # indeks ogolny = najgorszy pod-indeks z progow CAQI, NaN gdy brak wszystkich
+        if not sub_indices:
+            sub_indices.append(np.full(len(data), np.nan))
+            names.append('brak')
+        stacked = np.column_stack(sub_indices)
+        filled = np.where(np.isnan(stacked), -1.0, stacked)
+        worst = filled.argmax(axis=1)
+        overall = np.take_along_axis(filled, worst[:, None], axis=1)[:, 0]
+        has_value = overall >= 0
+        overall[~has_value] = np.nan
+
+        # kategorie jako typ category - kody zamiast milionow napisow
+        category_position = np.searchsorted(AQI_LEVELS[1:], overall, side='right')
+        category_position = np.clip(category_position, 0, len(AQI_CATEGORIES) - 1)
+
+        new_data['AQI'] = overall
+        new_data['AQI_kategoria'] = pd.Categorical.from_codes(
+            np.where(has_value, category_position, -1), categories=AQI_CATEGORIES
+        )
+        new_data['AQI_dominujace'] = pd.Categorical.from_codes(
+            np.where(has_value, worst, -1), categories=names
+        )
+
+        print(f"policzono indeks jakosci powietrza dla {int(has_value.sum())} z {len(data)} wierszy")
+        return new_data
+
+    except Exception as error:
+        print(f"nie udalo sie policzyc indeksu jakosci powietrza: {error}")
+        return None
+
+
+def count_exceedances(aqi_data, station_column=None):
+    """
+    liczy przekroczenia norm z kolumn przekroczenie_* (po calculate_aqi)
+
+    co bierze:
+    - aqi_data: ramka zwrocona przez calculate_aqi
+    - station_column: opcjonalnie - liczymy osobno dla kazdej stacji
+
+    co zwraca:
+    - ramka z liczba godzin z przekroczeniem albo None
+    """
+
+    if aqi_data is None:
+        print("brak danych do liczenia przekroczen")
+        return None
+
+    flag_columns = [c for c in aqi_data.columns if str(c).startswith('przekroczenie_')]
+    if not flag_columns:
+        print("nie ma kolumn z przekroczeniami - najpierw calculate_aqi")
+        return None
+
+    flags = aqi_data[flag_columns].astype(int)
+    flags.columns = [c.replace('przekroczenie_', '') for c in flag_columns]
+
+    if station_column is not None and station_column in aqi_data.columns:
+        result = flags.groupby(aqi_data[station_column]).sum()
+    else:
+        result = flags.sum().to_frame('liczba godzin').T
+
+    print(f"policzono przekroczenia norm dla {len(flag_columns)} zanieczyszczen")
+    return result
+
+
+def _time_order(data, station_column, date_column, time_column):
+    """
+    pomocnicza - ustala kolejnosc wierszy (stacja, czas) i klucze do okien kroczacych
+    klucz = czas w ns + przesuniecie stacji wieksze niz caly zakres czasu,
+    dzieki temu okno nigdy nie siega do innej stacji
+
+    co zwraca:
+    - (kolejnosc wierszy, posortowane klucze) - wiersze bez czasu sa pomijane
+    """
+
+    hour_ns = np.int64(3600 * 10 ** 9)
+
+    timestamps = parse_timestamps(data, date_column, time_column)
+    if timestamps is not None:
+        times = timestamps.to_numpy(dtype='datetime64[ns]')
+    else:
+        # brak czasu - zakladamy kolejne pomiary godzinowe
+        times = (np.arange(len(data), dtype=np.int64) * hour_ns).astype('datetime64[ns]')
+
+    valid = ~np.isnat(times)
+    time_ns = times.view(np.int64)
+
+    if station_column is not None and station_column in data.columns:
+        station_codes, _ = pd.factorize(data[station_column])
+    else:
+        station_codes = np.zeros(len(data), dtype=np.int64)
+
+    rows = np.flatnonzero(valid)
+    if len(rows) == 0:
+        return rows, np.array([], dtype=np.int64)
+
+    span = time_ns[rows].max() - time_ns[rows].min() + 48 * hour_ns
+    keys = (time_ns[rows] - time_ns[rows].min()) + station_codes[rows].astype(np.int64) * span
+
+    sort = np.argsort(keys, kind='stable')
+    return rows[sort], keys[sort]
+
+
+def _rolling_mean(values, order, keys, hours):
+    """
+    pomocnicza - srednia kroczaca z okna (t - hours, t] liczona sumami skumulowanymi
+    poczatek okna dla wszystkich wierszy naraz znajduje searchsorted
+
+    co zwraca:
+    - tablica srednich w oryginalnej kolejnosci wierszy
+    """
+
+    result = np.full(len(values), np.nan)
+    if len(order) == 0:
+        return result
+
+    window_ns = np.int64(hours * 3600 * 10 ** 9)
+    sorted_values = values[order]
+    present = ~np.isnan(sorted_values)
+
+    sums = np.concatenate([[0.0], np.cumsum(np.where(present, sorted_values, 0.0))])
+    counts = np.concatenate([[0], np.cumsum(present)])
+
+    start = np.searchsorted(keys, keys - window_ns, side='right')
+    end = np.arange(1, len(keys) + 1)
+
+    window_sum = sums[end] - sums[start]
+    window_count = counts[end] - counts[start]
+
+    min_count = max(1, int(np.ceil(hours * MIN_COVERAGE)))
+    means = np.where(window_count >= min_count, window_sum / np.maximum(window_count, 1), np.nan)
+
+    result[order] = means
+    return result
+
+
+# przykladowe uzycie
+if __name__ == "__main__":
+    print("testujemy indeks jakosci powietrza...")
+
+    test_data = pd.DataFrame({
+        'Date': ['10/03/2004'] * 6 + ['11/03/2004'] * 6,
+        'Time': [f"{h:02d}.00.00" for h in range(18, 24)] + [f"{h:02d}.00.00" for h in range(6)],
+        'CO(GT)': [2.6, 2.0, 2.2, 11.0, 12.5, 14.0, 13.0, 12.0, np.nan, 1.0, 0.8, 0.5],
+        'NO2(GT)': [113, 92, 114, 122, 250, 300, np.nan, 60, 70, 40, 30, 20],
+        'C6H6(GT)': [11.9, 9.4, 9.0, 9.2, 6.5, 4.7, 3.6, 3.3, 2.3, 1.7, 1.3, 1.1],
+    })
+
+    result = calculate_aqi(test_data)
+    print(result[['Time', 'AQI_CO', 'AQI_NO2', 'AQI_C6H6', 'AQI', 'AQI_kategoria', 'AQI_dominujace']])
+    print(count_exceedances(result))
+
+    print("\nwszystko dziala!")
@@ -0,0 +1,267 @@
+"""
+Modul do wykrywania anomalii i usterek czujnikow.
+Szuka skokow (z-score i odporny MAD), zawieszonych czujnikow (ta sama wartosc
+przez wiele godzin), zbyt szybkich zmian i brakow pomiaru (-200).
+
+Ten sam kod dziala na calej ramce i na kolejnych kawalkach strumienia -
+dla kazdej kolumny pamietamy tylko koncowke poprzedniego kawalka (stala wielkosc),
+wiec wynik jest identyczny niezaleznie od tego jak podzielimy dane.
+
+Autor: Student, który nie chce szukać zepsutych czujników ręcznie
+"""
+
+import pandas as pd
+import numpy as np
+
+
+# flagi sa bitami - jedna kolumna liczb moze trzymac kilka problemow naraz
+FLAG_DROPOUT = 1     # brak pomiaru (NaN albo -200)
+FLAG_SPIKE = 2       # skok wg z-score
+FLAG_MAD = 4         # wartosc odstajaca wg mediany i MAD
+FLAG_FLATLINE = 8    # czujnik zawieszony - ta sama wartosc wiele razy
+FLAG_RATE = 16       # za szybka zmiana miedzy pomiarami
+
+FLAG_NAMES = {
+    FLAG_DROPOUT: 'brak pomiaru',
+    FLAG_SPIKE: 'skok (z-score)',
+    FLAG_MAD: 'odstajaca (MAD)',
+    FLAG_FLATLINE: 'zawieszony czujnik',
+    FLAG_RATE: 'szybka zmiana',
+}
+
+FLAG_SUFFIX = '_flagi'
+
+DEFAULT_PARAMS = {
+    'window': 24,            # ile poprzednich pomiarow bierzemy do statystyk
+    'z_threshold': 4.0,      # od ilu odchylen std to skok
+    'mad_threshold': 6.0,    # od ilu "odpornych odchylen" to wartosc odstajaca
+    'flatline_length': 6,    # ile takich samych wartosci z rzedu to zawieszony czujnik
+    'rate_threshold': 6.0,   # ile odchylen std roznic to za szybka zmiana
+    'missing_value': -200,   # kod braku pomiaru w surowych danych
+}
+
+
+def detect_anomalies(data, columns=None, **params):
+    """
+    wykrywa anomalie w calej ramce naraz (tryb wsadowy)
+
+    co bierze:
+    - data: ramka pandas
+    - columns: ktore kolumny sprawdzac (None = wszystkie liczbowe)
+    - params: progi, patrz DEFAULT_PARAMS
+
+    co zwraca:
+    - (ramka z kolumnami <kolumna>_flagi, podsumowanie) albo (None, None)
+    """
+
+    if data is None:
+        print("brak danych do wykrywania anomalii")
+        return None, None
+
+    flags, _ = detect_anomalies_chunk(data, columns=columns, state=None, **params)
+    if flags is None:
+        return None, None
+
+    new_data = pd.concat([data, flags], axis=1)
+    summary = summarize_flags(flags, total_rows=len(data))
+
+    print(f"wykryto anomalie w {int((flags != 0).to_numpy().sum())} komorkach")
+    return new_data, summary
+
+
+def detect_anomalies_stream(chunks, columns=None, **params):
+    """
+    wykrywa anomalie w strumieniu kawalkow (np. z load_csv_in_chunks)
+    pamiec nie rosnie z dlugoscia strumienia - stan to koncowki kolumn
+
+    co bierze:
+    - chunks: dowolny iterowalny zbior ramek pandas
+    - columns: ktore kolumny sprawdzac (None = liczbowe z pierwszego kawalka)
+    - params: progi, patrz DEFAULT_PARAMS
+
+    co zwraca:
+    - generator par (kawalek z kolumnami flag, podsumowanie narastajaco)
+    """
+
+    state = None
+    summary = None
+    total_rows = 0
+
+    for chunk in chunks:
+        flags, state = detect_anomalies_chunk(chunk, columns=columns, state=state, **params)
+        if flags is None:
+            return
+
+        if columns is None:
+            columns = list(state.keys())
+
+        total_rows += len(chunk)
+        chunk_summary = summarize_flags(flags)
+        summary = chunk_summary if summary is None else summary.add(chunk_summary, fill_value=0)
+        summary = _add_percent(summary, total_rows)
+
+        yield pd.concat([chunk, flags], axis=1), summary
+
+
+def detect_anomalies_chunk(chunk, columns=None, state=None, **params):
+    """
+    wykrywa anomalie w jednym kawalku danych - wspolny kod dla trybu wsadowego i strumienia
+
+    co bierze:
+    - chunk: ramka pandas
+    - columns: ktore kolumny sprawdzac (None = wszystkie liczbowe)
+    - state: stan z poprzedniego kawalka (None = poczatek danych)
+    - params: progi, patrz DEFAULT_PARAMS
+
+    co zwraca:
+    - (ramka flag, nowy stan) albo (None, state) jak cos nie gra
+    """
+
+    settings = dict(DEFAULT_PARAMS)
+    settings.update(params)
+
+    if columns is None:
+        columns = list(chunk.select_dtypes(include=[np.number]).columns)
+        columns = [c for c in columns if not str(c).endswith(FLAG_SUFFIX)]
+
+    missing_columns = [c for c in columns if c not in chunk.columns]
+    if missing_columns:
+        print(f"nie ma takich kolumn: {missing_columns}")
+        return None, state
+
+    try:
+        # koncowka musi wystarczyc na okno statystyk liczonych z okna (MAD) i na zawieszenie
+        tail_length = 2 * settings['window'] + settings['flatline_length'] + 1
+        new_state = {}
+        flags = {}
+
+        for column in columns:
+            tail = np.array([]) if state is None else state.get(column, np.array([]))
+            values = pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=float)
+
+            combined = np.concatenate([tail, values])
+            column_flags = _flag_column(combined, settings)[len(tail):]
+
+            flags[f"{column}{FLAG_SUFFIX}"] = column_flags
+            new_state[column] = combined[-tail_length:]
+
+        return pd.DataFrame(flags, index=chunk.index), new_state
+
+    except Exception as error:
+        print(f"nie udalo sie wykryc anomalii: {error}")
+        return None, state
+
+
+def summarize_flags(flags, total_rows=None):
+    """
+    liczy ile razy wystapil kazdy typ problemu w kazdej kolumnie
+
+    co bierze:
+    - flags: ramka z kolumnami <kolumna>_flagi
+    - total_rows: do liczenia procentu anomalii (None = bez procentu)
+
+    co zwraca:
+    - ramka: wiersze = kolumny danych, kolumny = typy problemow
+    """
+
+    rows = {}
+    for flag_column in flags.columns:
+        values = flags[flag_column].to_numpy()
+        name = flag_column[:-len(FLAG_SUFFIX)] if flag_column.endswith(FLAG_SUFFIX) else flag_column
+        rows[name] = {label: int(np.count_nonzero(values & bit)) for bit, label in FLAG_NAMES.items()}
+        rows[name]['wiersze z anomalia'] = int(np.count_nonzero(values.astype(np.int64) & ~FLAG_DROPOUT))
+
+    summary = pd.DataFrame.from_dict(rows, orient='index')
+
+    if total_rows is not None:
+        summary = _add_percent(summary, total_rows)
+
+    return summary
+
+
+def decode_flags(value):
+    """
+    zamienia liczbe z kolumny flag na liste nazw problemow
+    np. 10 -> ['skok (z-score)', 'zawieszony czujnik']
+    """
+
+    return [label for bit, label in FLAG_NAMES.items() if int(value) & bit]
+
+
+def _add_percent(summary, total_rows):
+    """pomocnicza - dopisuje procent wierszy z anomalia (bez brakow pomiaru)"""
+
+    summary = summary.drop(columns=['procent anomalii'], errors='ignore')
+    summary['procent anomalii'] = (summary['wiersze z anomalia'] / max(total_rows, 1) * 100).round(2)
+    return summary
+
+
+def _flag_column(values, settings):
+    """
+    pomocnicza - wszystkie detektory dla jednej kolumny, wektorowo (okna kroczace pandas)
+    statystyki bierzemy z poprzednich pomiarow - sam skok nie psuje swojego progu
+
+    co zwraca:
+    - tablica flag (uint8) tej samej dlugosci co values
+    """
+
+    window = settings['window']
+    min_periods = max(2, window // 2)
+
+    flags = np.zeros(len(values), dtype=np.uint8)
+
+    missing = np.isnan(values) | (values == settings['missing_value'])
+    flags[missing] |= FLAG_DROPOUT
+
+    series = pd.Series(np.where(missing, np.nan, values))
+    previous = series.shift(1).rolling(window, min_periods=min_periods)
+
+    # z-score wzgledem poprzedniego okna
+    mean = previous.mean()
+    std = previous.std()
+    z_score = (series - mean).abs() / std.where(std > 0)
+    flags[(z_score > settings['z_threshold']).to_numpy()] |= FLAG_SPIKE
+
+    # odporna wersja: odleglosc od mediany w jednostkach MAD (1.4826 * MAD ~ std dla rozkladu normalnego)
+    median = previous.median()
+    deviation = (series - median).abs()
+    mad = deviation.shift(1).rolling(window, min_periods=min_periods).median()
+    robust_z = deviation / (1.4826 * mad.where(mad > 0))
+    flags[(robust_z > settings['mad_threshold']).to_numpy()] |= FLAG_MAD
+
+    # zawieszony czujnik - N takich samych wartosci z rzedu
+    repeats = settings['flatline_length'] - 1
+    if repeats > 0:
+        same_as_previous = (series.diff() == 0).astype(float)
+        run = same_as_previous.rolling(repeats, min_periods=repeats).sum()
+        flags[(run >= repeats).to_numpy()] |= FLAG_FLATLINE
+
+    # za szybka zmiana - roznica wieksza niz typowa zmiennosc roznic
+    change = series.diff()
+    change_std = change.shift(1).rolling(window, min_periods=min_periods).std()
+    rate = change.abs() / change_std.where(change_std > 0)
+    flags[(rate > settings['rate_threshold']).to_numpy()] |= FLAG_RATE
+
+    return flags
+
+
+# przykladowe uzycie
+if __name__ == "__main__":
+    print("testujemy wykrywanie anomalii...")
+
+    np.random.seed(0)
+    values = np.random.normal(1000, 20, 300)
+    values[100] = 1600           # skok
+    values[150:160] = 987.0      # zawieszony czujnik
+    values[200] = -200           # brak pomiaru
+    test_data = pd.DataFrame({'PT08.S1(CO)': values})
+
+    result, summary = detect_anomalies(test_data)
+    print(summary.T)
+
+    # strumien w kawalkach musi dac to samo co calosc
+    chunks = [test_data.iloc[i:i + 37] for i in range(0, len(test_data), 37)]
+    streamed = pd.concat([part for part, _ in detect_anomalies_stream(chunks)])
+    print("strumien == wsad:", (streamed['PT08.S1(CO)_flagi'] == result['PT08.S1(CO)_flagi']).all())
+
+    print("\nwszystko dziala!")
@@ -0,0 +1,324 @@
+"""
+Modul do kalibracji tanich czujnikow PT08.* wzgledem analizatorow referencyjnych (GT).
+Dla kazdego pomiaru referencyjnego dopasowujemy model liniowy:
+
+    referencja = b0 + b1*PT08.S1 + ... + b5*PT08.S5 + kompensacja(T, RH, AH)
+
+Wszystkie referencje jednej grupy (stacja/okres) liczymy naraz - jedno zestawienie
+macierzy i jedno rozwiazanie ukladu rownan dla calej paczki (batched least squares).
+Grupy liczone sa rownolegle, a gotowe wspolczynniki mozna nakladac na kolejne
+kawalki danych bez trzymania calego pliku w pamieci.
+
+Autor: Student, który nie ufa tanim czujnikom
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from utils.resampling import parse_timestamps
+
+
+SENSOR_COLUMNS = ['PT08.S1(CO)', 'PT08.S2(NMHC)', 'PT08.S3(NOx)', 'PT08.S4(NO2)', 'PT08.S5(O3)']
+REFERENCE_COLUMNS = ['CO(GT)', 'NMHC(GT)', 'C6H6(GT)', 'NOx(GT)', 'NO2(GT)']
+COMPENSATION_COLUMNS = ['T', 'RH', 'AH']
+
+# grupa z wszystkimi danymi - uzywana dla wierszy z grup ktorych nie bylo przy uczeniu
+GLOBAL_GROUP = '__wszystkie__'
+
+CALIBRATED_SUFFIX = '_kalibr'
+
+
+def fit_calibration(data, references=None, sensors=None, compensation=None,
+                    group_column=None, period=None, ridge=1e-6, n_jobs=None):
+    """
+    dopasowuje modele kalibracyjne - osobno dla kazdej grupy (stacja i/lub okres)
+
+    co bierze:
+    - data: ramka pandas
+    - references: kolumny referencyjne GT (None = REFERENCE_COLUMNS ktore sa w danych)
+    - sensors: kolumny czujnikow (None = SENSOR_COLUMNS ktore sa w danych)
+    - compensation: kolumny kompensacji (None = T, RH, AH ktore sa w danych, [] = bez)
+    - group_column: kolumna ze stacja (None = jedna stacja)
+    - period: okres pandas do grupowania w czasie, np. 'MS' = osobny model na miesiac
+    - ridge: mala regularyzacja zeby uklad rownan zawsze mial rozwiazanie
+    - n_jobs: ile watkow (None = liczba rdzeni)
+
+    co zwraca:
+    - slownik z modelem {'features', 'references', 'group_column', 'period',
+      'coefficients': {grupa: ramka}, 'scores': ramka} albo None jak cos nie gra
+    """
+
+    if data is None:
+        print("brak danych do kalibracji")
+        return None
+
+    references = _present(data, references, REFERENCE_COLUMNS)
+    sensors = _present(data, sensors, SENSOR_COLUMNS)
+    compensation = _present(data, compensation, COMPENSATION_COLUMNS)
+
+    if not references or not sensors:
+        print("brak kolumn referencyjnych (GT) albo czujnikow (PT08)")
+        return None
+
+    try:
+        features = sensors + compensation
+        X = _numeric_matrix(data, features)
+        Y = _numeric_matrix(data, references)
+
+        group_keys = _group_keys(data, group_column, period)
+        groups = {GLOBAL_GROUP: np.arange(len(data))}
+        if group_keys is not None:
+            codes, uniques = pd.factorize(group_keys)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            for i, key in enumerate(uniques):
+                groups[key] = order[bounds[i]:bounds[i + 1]]
+
+        # grupy sa niezalezne - numpy zwalnia GIL w algebrze liniowej wiec watki wystarcza
+        workers = n_jobs or os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(zip(
+                groups.keys(),
+                executor.map(lambda rows: _fit_group(X[rows], Y[rows], ridge), groups.values())
+            ))
+
+        coefficients = {}
+        score_rows = []
+        for key, (coef, scores) in results.items():
+            if coef is None:
+                continue
+            coefficients[key] = pd.DataFrame(coef, index=['intercept'] + features, columns=references)
+            if key != GLOBAL_GROUP and GLOBAL_GROUP in coefficients:
+                # referencje bez wlasnego modelu w grupie korzystaja z modelu ogolnego
+                coefficients[key] = coefficients[key].fillna(coefficients[GLOBAL_GROUP])
+            for reference, (r2, rmse, count) in zip(references, scores):
+                score_rows.append({'grupa': key, 'referencja': reference, 'R2': r2, 'RMSE': rmse, 'liczba': count})
+
+        if GLOBAL_GROUP not in coefficients:
+            print("za malo kompletnych wierszy do kalibracji")
+            return None
+
+        model = {
+            'features': features,
+            'references': references,
+            'group_column': group_column,
+            'period': period,
+            'coefficients': coefficients,
+            'scores': pd.DataFrame(score_rows),
+        }
+
+        print(f"dopasowano kalibracje: {len(references)} referencji x {len(coefficients)} grup, cechy: {features}")
+        return model
+
+    except Exception as error:
+        print(f"nie udalo sie dopasowac kalibracji: {error}")
+        return None
+
+
+def apply_calibration(data, model, suffix=CALIBRATED_SUFFIX):
+    """
+    naklada zapisane wspolczynniki na dane - dodaje kolumny <referencja>_kalibr
+
+    co bierze:
+    - data: ramka pandas (moze byc tez kawalek wiekszego pliku)
+    - model: slownik z fit_calibration
+    - suffix: koncowka nazw nowych kolumn
+
+    co zwraca:
+    - nowa ramka z kolumnami skalibrowanymi albo None jak cos nie gra
+    """
+
+    if data is None or model is None:
+        print("brak danych albo modelu do kalibracji")
+        return None
+
+    missing_columns = [c for c in model['features'] if c not in data.columns]
+    if missing_columns:
+        print(f"brak kolumn potrzebnych do kalibracji: {missing_columns}")
+        return None
+
+    try:
+        X = _numeric_matrix(data, model['features'])
+        X = np.column_stack([np.ones(len(X)), X])
+
+        keys = list(model['coefficients'].keys())
+        stacked = np.stack([model['coefficients'][key].to_numpy() for key in keys])
+
+        # kazdy wiersz dostaje wspolczynniki swojej grupy (nieznana grupa = model ogolny)
+        group_keys = _group_keys(data, model['group_column'], model['period'])
+        if group_keys is None:
+            codes = np.full(len(data), keys.index(GLOBAL_GROUP))
+        else:
+            codes = pd.Index(keys).get_indexer(group_keys)
+            codes[codes < 0] = keys.index(GLOBAL_GROUP)
+
+        calibrated = np.empty((len(data), len(model['references'])))
+        for code in np.unique(codes):
+            rows = codes == code
+            calibrated[rows] = X[rows] @ stacked[code]
+
+        new_data = data.copy(deep=False)
+        for i, reference in enumerate(model['references']):
+            new_data[f"{reference}{suffix}"] = calibrated[:, i]
+
+        return new_data
+
+    except Exception as error:
+        print(f"nie udalo sie zastosowac kalibracji: {error}")
+        return None
+
+
+def apply_calibration_stream(chunks, model, suffix=CALIBRATED_SUFFIX):
+    """
+    kalibruje strumien kawalkow (np. z load_csv_in_chunks) - pamiec stala
+
+    co bierze:
+    - chunks: dowolny iterowalny zbior ramek pandas
+    - model: slownik z fit_calibration
+
+    co zwraca:
+    - generator skalibrowanych kawalkow
+    """
+
+    for chunk in chunks:
+        calibrated = apply_calibration(chunk, model, suffix=suffix)
+        if calibrated is None:
+            return
+        yield calibrated
+
+
+def _present(data, columns, defaults):
+    """pomocnicza - lista kolumn ktore faktycznie sa w danych"""
+    if columns is None:
+        columns = defaults
+    return [c for c in columns if c in data.columns]
+
+
+def _numeric_matrix(data, columns):
+    """pomocnicza - wybrane kolumny jako macierz float (tekst -> NaN)"""
+    return np.column_stack([
+        pd.to_numeric(data[c], errors='coerce').to_numpy(dtype=float) for c in columns
+    ]) if columns else np.empty((len(data), 0))
+
+
+def _group_keys(data, group_column, period):
+    """
+    pomocnicza - klucz grupy dla kazdego wiersza: stacja, okres albo 'stacja | okres'
+
+    co zwraca:
+    - tablica kluczy (napisy) albo None gdy nie grupujemy
+    """
+
+    parts = []
+
+    if group_column is not None:
+        if group_column not in data.columns:
+            raise ValueError(f"nie ma kolumny {group_column}")
+        parts.append(data[group_column].astype(str).to_numpy())
+
+    if period is not None:
+        timestamps = parse_timestamps(data)
+        if timestamps is None:
+            raise ValueError("grupowanie po okresie wymaga kolumn Date/Time")
+        periods = timestamps.dt.to_period(period.rstrip('S') if period.endswith('S') else period)
+        parts.append(periods.astype(str).to_numpy())
+
+    if not parts:
+        return None
+
+    keys = parts[0].astype(object)
+    for part in parts[1:]:
+        keys = keys + ' | ' + part.astype(object)
+    return keys
+
+
+def _fit_group(X, Y, ridge):
+    """
+    pomocnicza - najmniejsze kwadraty dla wszystkich referencji jednej grupy naraz
+
+    kazda referencja ma swoje braki, wiec uklad rownan jest inny dla kazdej z nich,
+    ale wszystkie macierze X^T W X liczymy jednym einsum i rozwiazujemy jednym solve
+
+    co zwraca:
+    - (wspolczynniki [1 + cechy] x referencje, lista (R2, RMSE, liczba)) albo (None, None)
+    """
+
+    complete = ~np.isnan(X).any(axis=1)
+    X = X[complete]
+    Y = Y[complete]
+
+    weights = ~np.isnan(Y)
+    if len(X) <= X.shape[1] + 1 or not weights.any():
+        return None, None
+
+    # standaryzacja cech - czujniki maja wartosci ~1000, AH ~1, bez tego uklad jest zle uwarunkowany
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    Z = np.column_stack([np.ones(len(X)), (X - mean) / std])
+
+    # referencje z za mala liczba pomiarow w tej grupie pomijamy (wspolczynniki = NaN)
+    enough = weights.sum(axis=0) > Z.shape[1]
+    weights &= enough
+
+    W = weights.astype(float)
+    Y0 = np.where(weights, Y, 0.0)
+
+    # dla kazdej referencji t: A_t = Z^T diag(W_t) Z, b_t = Z^T (W_t * y_t)
+    A = np.einsum('np,nt,nq->tpq', Z, W, Z, optimize=True)
+    b = np.einsum('np,nt->tp', Z, Y0, optimize=True)
+    A[~enough] = np.eye(Z.shape[1])
+
+    penalty = ridge * np.eye(Z.shape[1])
+    penalty[0, 0] = 0.0  # wyrazu wolnego nie karzemy
+    beta = np.linalg.solve(A + penalty, b[..., None])[..., 0]  # referencje x (1 + cechy)
+
+    # powrot do jednostek oryginalnych: y = b0 + sum(b_i * (x_i - m_i) / s_i)
+    slopes = beta[:, 1:] / std
+    intercept = beta[:, 0] - slopes @ mean
+    coef = np.column_stack([intercept, slopes]).T
+
+    # jakosc dopasowania na danych uczacych
+    predicted = Z @ beta.T
+    scores = []
+    for t in range(Y.shape[1]):
+        rows = weights[:, t]
+        count = int(rows.sum())
+        if count == 0:
+            scores.append((np.nan, np.nan, 0))
+            coef[:, t] = np.nan
+            continue
+        residual = Y[rows, t] - predicted[rows, t]
+        total = ((Y[rows, t] - Y[rows, t].mean()) ** 2).sum()
+        r2 = 1 - (residual ** 2).sum() / total if total > 0 else np.nan
+        scores.append((r2, float(np.sqrt((residual ** 2).mean())), count))
+
+    return coef, scores
+
+
+# przykladowe uzycie
+if __name__ == "__main__":
+    print("testujemy kalibracje czujnikow...")
+
+    np.random.seed(1)
+    n = 2000
+    test_data = pd.DataFrame({
+        'PT08.S1(CO)': np.random.normal(1100, 200, n),
+        'T': np.random.normal(18, 8, n),
+        'RH': np.random.uniform(20, 80, n),
+        'AH': np.random.uniform(0.5, 1.5, n),
+    })
+    test_data['CO(GT)'] = 0.005 * test_data['PT08.S1(CO)'] - 0.03 * test_data['T'] - 3 + np.random.normal(0, 0.1, n)
+    test_data.loc[::7, 'CO(GT)'] = np.nan
+
+    model = fit_calibration(test_data)
+    print(model['coefficients'][GLOBAL_GROUP])
+    print(model['scores'])
+
+    calibrated = apply_calibration(test_data, model)
+    print(calibrated[['CO(GT)', 'CO(GT)_kalibr']].head())
+
+    print("\nwszystko dziala!")
@@ -0,0 +1,640 @@
+"""
+Modul do oceny klasyfikatorow walidacja krzyzowa i do strojenia parametrow.
+
+Zamiast jednego losowego podzialu na zbior treningowy i testowy kazdy zestaw
+parametrow (kandydat) uczymy na kilku foldach: k-fold (stratyfikowany, gdy
+klasy na to pozwalaja) albo podzial szeregu czasowego (TimeSeriesSplit -
+uczymy zawsze na przeszlosci, testujemy na kolejnym kawalku).
+
+Pary (kandydat, fold) liczone sa rownolegle w ProcessPoolExecutor. Pierwsze
+prune_after foldow wszystkich kandydatow idzie do procesow naraz; potem
+kandydaci wyraznie slabsi od najlepszego sa odrzucani, a kolejne foldy
+liczymy rundami (fold po foldzie), zeby po kazdym znow odrzucic slabych.
+Gdy odrzucania nie ma (jeden kandydat albo prune_margin=None), wszystkie
+pary startuja od razu.
+
+Walk-forward (okno rosnace albo przesuwne) idzie po czasie fold po foldzie
+i tam, gdzie estymator na to pozwala, nie uczy modelu od zera: modele
+z partial_fit dostaja tylko nowe wiersze, a las losowy (warm_start) wymienia
+czesc najstarszych drzew na nowe, uczone na biezacym oknie.
+
+sklearn importujemy dopiero w funkcjach - sam import trwa prawie sekunde.
+
+Autor: Student, ktory nie ufa jednemu train_test_split
+"""
+
+import itertools
+import multiprocessing
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+import pandas as pd
+
+
+CLASSIFIERS = ["Decision Tree", "Random Forest", "SVM", "KNN", "SGD", "Naive Bayes", "Passive-Aggressive"]
+
+# klasyfikatory z partial_fit - moga sie uczyc kawalkami (utils.incremental_learning)
+INCREMENTAL_CLASSIFIERS = ["SGD", "Naive Bayes", "Passive-Aggressive"]
+
+# modele liniowe uczone gradientem - bez standaryzacji cechy rzedu 1000
+# (czujniki PT08) zagluszaja cechy rzedu 10 (temperatura)
+SCALED_CLASSIFIERS = ["SGD", "Passive-Aggressive"]
+
+# siatki parametrow do przeszukiwania "grid"
+PARAM_GRIDS = {
+    "Decision Tree": {
+        'max_depth': [None, 5, 10, 20],
+        'min_samples_leaf': [1, 5, 20],
+        'criterion': ['gini', 'entropy'],
+    },
+    "Random Forest": {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [None, 10, 20],
+        'min_samples_leaf': [1, 5],
+    },
+    "SVM": {
+        'C': [0.1, 1.0, 10.0],
+        'gamma': ['scale', 0.01, 0.1],
+    },
+    "KNN": {
+        'n_neighbors': [3, 5, 11, 21],
+        'weights': ['uniform', 'distance'],
+    },
+    "SGD": {
+        'loss': ['hinge', 'log_loss', 'modified_huber'],
+        'alpha': [1e-5, 1e-4, 1e-3],
+    },
+    "Naive Bayes": {
+        'var_smoothing': [1e-9, 1e-7, 1e-5, 1e-3],
+    },
+    "Passive-Aggressive": {
+        'eta0': [0.1, 1.0, 10.0],
+        'learning_rate': ['pa1', 'pa2'],
+    },
+}
+
+# przestrzenie do losowania "random": lista = wybor z listy,
+# ('int', od, do) = liczba calkowita, ('log', od, do) = liczba w skali log
+PARAM_SPACES = {
+    "Decision Tree": {
+        'max_depth': ('int', 2, 40),
+        'min_samples_leaf': ('int', 1, 50),
+        'criterion': ['gini', 'entropy'],
+    },
+    "Random Forest": {
+        'n_estimators': ('int', 20, 300),
+        'max_depth': ('int', 3, 40),
+        'min_samples_leaf': ('int', 1, 20),
+        'max_features': ['sqrt', 'log2', None],
+    },
+    "SVM": {
+        'C': ('log', 0.01, 100.0),
+        'gamma': ('log', 0.0001, 1.0),
+    },
+    "KNN": {
+        'n_neighbors': ('int', 1, 50),
+        'weights': ['uniform', 'distance'],
+        'p': [1, 2],
+    },
+    "SGD": {
+        'loss': ['hinge', 'log_loss', 'modified_huber'],
+        'alpha': ('log', 1e-6, 1e-2),
+    },
+    "Naive Bayes": {
+        'var_smoothing': ('log', 1e-10, 1e-2),
+    },
+    "Passive-Aggressive": {
+        'eta0': ('log', 0.01, 100.0),
+        'learning_rate': ['pa1', 'pa2'],
+    },
+}
+
+CV_MODES = {
+    'kfold': 'k-fold',
+    'timeseries': 'szereg czasowy',
+}
+
+# ile foldow musi miec kandydat, zanim mozna go odrzucic
+PRUNE_AFTER = 2
+
+# o ile sredni wynik moze byc gorszy od najlepszego, zeby kandydat przetrwal
+PRUNE_MARGIN = 0.1
+
+# co ile sekund sprawdzamy should_stop w czasie czekania na procesy
+STOP_CHECK_SECONDS = 0.2
+
+# ile drzew lasu wymieniamy na fold w walk-forward (czesc n_estimators)
+WARM_START_FRACTION = 0.1
+
+WALK_FORWARD_COLUMNS = ['fold', 'test od', 'test do', 'okno uczenia', 'nowe wiersze', 'wynik',
+                        'czas uczenia [s]', 'czas oceny [s]', 'aktualizacja']
+
+RESULT_COLUMNS = ['parametry', 'sredni wynik', 'odch. std', 'sredni czas uczenia [s]',
+                  'sredni czas oceny [s]', 'foldy', 'odrzucony']
+
+
+def make_classifier(name, params=None, random_state=42, scale=True):
+    """
+    tworzy klasyfikator sklearn o podanej nazwie
+
+    co bierze:
+    - name: nazwa z CLASSIFIERS
+    - params: slownik parametrow (None = domyslne)
+    - random_state: ziarno dla klasyfikatorow losowych
+    - scale: dla SCALED_CLASSIFIERS zwraca Pipeline(StandardScaler, model) -
+      skaler uczy sie razem z modelem na tych samych wierszach (np. foldzie);
+      False = sam model, skalowanie robi wywolujacy (partial_fit, rejestr modeli)
+
+    co zwraca:
+    - niewytrenowany klasyfikator albo None jak nazwa nieznana
+    """
+
+    model = _make_estimator(name, params, random_state)
+    if model is None or not scale or name not in SCALED_CLASSIFIERS:
+        return model
+
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    return make_pipeline(StandardScaler(), model)
+
+
+def _make_estimator(name, params, random_state):
+    """sam klasyfikator sklearn (bez skalowania) - patrz make_classifier"""
+
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.svm import SVC
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.naive_bayes import GaussianNB
+
+    params = dict(params or {})
+
+    if name == "Decision Tree":
+        return DecisionTreeClassifier(random_state=random_state, **params)
+    if name == "Random Forest":
+        params.setdefault('n_estimators', 100)
+        return RandomForestClassifier(random_state=random_state, **params)
+    if name == "SVM":
+        return SVC(random_state=random_state, **params)
+    if name == "KNN":
+        return KNeighborsClassifier(**params)
+    if name == "SGD":
+        return SGDClassifier(random_state=random_state, **params)
+    if name == "Naive Bayes":
+        return GaussianNB(**params)
+    if name == "Passive-Aggressive":
+        # PassiveAggressiveClassifier jest w sklearn przestarzaly - to samo przez SGD
+        params.setdefault('learning_rate', 'pa1')
+        params.setdefault('eta0', 1.0)
+        return SGDClassifier(loss='hinge', penalty=None, random_state=random_state, **params)
+
+    print(f"nieznany klasyfikator: {name}")
+    return None
+
+
+def grid_candidates(classifier):
+    """
+    wszystkie kombinacje parametrow z PARAM_GRIDS
+
+    co bierze:
+    - classifier: nazwa klasyfikatora
+
+    co zwraca:
+    - lista slownikow parametrow
+    """
+
+    grid = PARAM_GRIDS.get(classifier, {})
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def random_candidates(classifier, n_iter=20, random_state=42):
+    """
+    losuje zestawy parametrow z PARAM_SPACES (bez powtorzen)
+
+    co bierze:
+    - classifier: nazwa klasyfikatora
+    - n_iter: ile zestawow wylosowac
+    - random_state: ziarno losowania
+
+    co zwraca:
+    - lista slownikow parametrow (moze byc krotsza, gdy przestrzen jest mala)
+    """
+
+    space = PARAM_SPACES.get(classifier, {})
+    rng = np.random.default_rng(random_state)
+
+    candidates = []
+    seen = set()
+    # limit prob - mala przestrzen moze nie miec n_iter roznych zestawow
+    for _ in range(n_iter * 20):
+        if len(candidates) >= n_iter:
+            break
+
+        params = {}
+        for name, spec in space.items():
+            if isinstance(spec, list):
+                params[name] = spec[rng.integers(len(spec))]
+            elif spec[0] == 'int':
+                params[name] = int(rng.integers(spec[1], spec[2] + 1))
+            else:
+                # rowno w skali log - 0.01 i 100 maja te sama szanse
+                value = np.exp(rng.uniform(np.log(spec[1]), np.log(spec[2])))
+                params[name] = float(f"{value:.3g}")
+
+        key = tuple(sorted((name, str(value)) for name, value in params.items()))
+        if key not in seen:
+            seen.add(key)
+            candidates.append(params)
+
+    return candidates
+
+
+def make_splits(y, n_splits=5, cv='kfold', random_state=42):
+    """
+    dzieli wiersze na foldy
+
+    co bierze:
+    - y: etykiety (wiersze w kolejnosci czasu dla cv='timeseries')
+    - n_splits: liczba foldow
+    - cv: 'kfold' (stratyfikowany, gdy kazda klasa ma >= n_splits wierszy)
+      albo 'timeseries' (uczymy na przeszlosci, testujemy na kolejnym kawalku)
+    - random_state: ziarno mieszania dla k-fold
+
+    co zwraca:
+    - lista par (indeksy treningowe, indeksy testowe) albo None
+    """
+
+    from sklearn.model_selection import KFold, StratifiedKFold, TimeSeriesSplit
+
+    y = np.asarray(y)
+    if n_splits < 2 or len(y) < n_splits + 1:
+        print(f"za malo wierszy ({len(y)}) na {n_splits} foldow")
+        return None
+
+    if cv == 'timeseries':
+        splitter = TimeSeriesSplit(n_splits=n_splits)
+    elif cv == 'kfold':
+        _, counts = np.unique(y, return_counts=True)
+        if counts.min() >= n_splits:
+            splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        else:
+            # rzadka klasa nie zmiesci sie w kazdym foldzie - zwykly k-fold
+            splitter = KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    else:
+        print(f"nieznany tryb walidacji: {cv}")
+        return None
+
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def search_hyperparameters(X, y, classifier, search='grid', candidates=None, n_iter=20,
+                           cv='kfold', n_splits=5, scoring='accuracy', workers=None,
+                           prune_after=PRUNE_AFTER, prune_margin=PRUNE_MARGIN,
+                           progress_callback=None, should_stop=None, random_state=42):
+    """
+    walidacja krzyzowa wielu zestawow parametrow naraz, rownolegle
+
+    co bierze:
+    - X: macierz cech (ramka albo tablica), y: etykiety
+    - classifier: nazwa z CLASSIFIERS
+    - search: 'grid' (PARAM_GRIDS), 'random' (n_iter losowan z PARAM_SPACES)
+      albo 'none' (tylko domyslne parametry)
+    - candidates: wlasna lista slownikow parametrow (zastepuje search)
+    - cv, n_splits: podzial na foldy, patrz make_splits
+    - scoring: nazwa miary sklearn (accuracy, f1_macro, balanced_accuracy...)
+    - workers: liczba procesow (None = liczba rdzeni, 1 = bez procesow)
+    - prune_after, prune_margin: po ilu foldach i przy jakiej stracie do
+      najlepszego odrzucamy kandydata (prune_margin=None = bez odrzucania)
+    - progress_callback: funkcja (zrobione, wszystkie, opis); moze rzucic
+      wyjatek, zeby przerwac liczenie
+    - should_stop: funkcja bez argumentow sprawdzana co chwile w czasie
+      czekania na procesy (np. anulowanie w GUI); True = przerywamy od razu,
+      nie czekajac na trwajace uczenie
+
+    co zwraca:
+    - (ramka wynikow posortowana od najlepszego, parametry najlepszego)
+      albo (None, None)
+    """
+
+    if candidates is None:
+        if search == 'grid':
+            candidates = grid_candidates(classifier)
+        elif search == 'random':
+            candidates = random_candidates(classifier, n_iter, random_state)
+        else:
+            candidates = [{}]
+    if not candidates or classifier not in CLASSIFIERS:
+        print(f"brak kandydatow do sprawdzenia dla {classifier}")
+        return None, None
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    splits = make_splits(y, n_splits, cv, random_state)
+    if splits is None:
+        return None, None
+
+    workers = workers or os.cpu_count() or 1
+    n_folds = len(splits)
+    scores = np.full((len(candidates), n_folds), np.nan)
+    fit_times = np.full((len(candidates), n_folds), np.nan)
+    score_times = np.full((len(candidates), n_folds), np.nan)
+    pruned_after = {}
+
+    settings = {'classifier': classifier, 'scoring': scoring, 'random_state': random_state}
+    _init_worker(X, y, splits, settings)
+
+    pool = None
+    if workers > 1:
+        # spawn, nie fork - GUI ma watki Qt, a fork kopiuje ich zablokowane muteksy
+        pool = ProcessPoolExecutor(max_workers=workers,
+                                   mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker, initargs=(X, y, splits, settings))
+
+    # pierwsza runda: wszystkie foldy przed pierwszym odrzucaniem (albo wszystkie,
+    # gdy odrzucania nie bedzie); dalej po jednym foldzie na runde
+    can_prune = prune_margin is not None and len(candidates) > 1
+    first_round = min(max(1, prune_after), n_folds) if can_prune else n_folds
+    rounds = [range(first_round)] + [range(fold, fold + 1) for fold in range(first_round, n_folds)]
+
+    done = 0
+    stopped = False
+    try:
+        for folds in rounds:
+            alive = [c for c in range(len(candidates)) if c not in pruned_after]
+            jobs = [(c, fold, candidates[c]) for fold in folds for c in alive]
+            total = done + len(alive) * (n_folds - folds[0])
+            fold = folds[-1]
+
+            for result in _run_jobs(pool, jobs, workers, should_stop):
+                if result is None:
+                    stopped = True
+                    break
+
+                candidate, fold_number, score, fit_time, score_time = result
+                scores[candidate, fold_number] = score
+                fit_times[candidate, fold_number] = fit_time
+                score_times[candidate, fold_number] = score_time
+                done += 1
+                if progress_callback is not None:
+                    progress_callback(done, total, f"fold {fold_number + 1}/{n_folds}")
+
+            if stopped:
+                print("szukanie parametrow przerwane")
+                return None, None
+
+            # odrzucamy kandydatow wyraznie gorszych od najlepszego
+            if can_prune and fold + 1 >= prune_after and fold + 1 < n_folds:
+                means = np.nanmean(scores[alive, :fold + 1], axis=1)
+                best = np.nanmax(means) if np.isfinite(means).any() else np.nan
+                for candidate, mean in zip(alive, means):
+                    if not np.isfinite(mean) or mean < best - prune_margin:
+                        pruned_after[candidate] = fold + 1
+    finally:
+        if pool is not None:
+            # po przerwaniu nie czekamy - procesy skoncza biezace uczenie i same sie zamkna
+            pool.shutdown(wait=not stopped, cancel_futures=True)
+
+    results = _results_frame(candidates, scores, fit_times, score_times, pruned_after)
+    best_params = candidates[results.index[0]] if len(results) else None
+    return results, best_params
+
+
+def walk_forward_evaluate(X, y, classifier, params=None, n_folds=10, window=None, gap=0,
+                          scoring='accuracy', new_trees=None, timestamps=None,
+                          progress_callback=None, should_stop=None, random_state=42):
+    """
+    ocena walk-forward - uczymy na przeszlosci, testujemy na kolejnym bloku
+
+    wiersze musza byc w kolejnosci czasu. Model nie jest uczony od zera
+    w kazdym foldzie, jesli estymator na to pozwala:
+    - partial_fit (SGD, naive Bayes...) w oknie rosnacym - dostaje tylko
+      wiersze dopisane do okna od poprzedniego foldu; w oknie przesuwnym
+      pelne uczenie na oknie (partial_fit nie umie "oduczyc" starych wierszy,
+      wiec wynik bylby taki sam jak przy oknie rosnacym)
+    - las losowy - warm_start: najstarsze new_trees drzew wypada, tyle samo
+      nowych uczymy na biezacym oknie (stala wielkosc lasu)
+    - pozostale (drzewo, SVM, KNN) - pelne uczenie na oknie
+
+    co bierze:
+    - X: macierz cech, y: etykiety (w kolejnosci czasu)
+    - classifier, params: nazwa z CLASSIFIERS i jej parametry
+    - n_folds: liczba blokow testowych (np. 52 tygodnie)
+    - window: dlugosc okna uczenia w wierszach (None = okno rosnace od poczatku)
+    - gap: ile wierszy pomijamy miedzy oknem uczenia a testem
+    - scoring: nazwa miary sklearn
+    - new_trees: ile drzew lasu wymieniac na fold (None = 10% n_estimators)
+    - timestamps: czas wierszy do opisu foldow (None = numery wierszy)
+    - progress_callback: funkcja (zrobione, wszystkie, opis)
+    - should_stop: funkcja bez argumentow, True = przerywamy
+
+    co zwraca:
+    - ramka z wynikiem kazdego foldu albo None
+    """
+
+    from sklearn.model_selection import TimeSeriesSplit
+    from sklearn.metrics import get_scorer
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    if n_folds < 1 or len(y) < n_folds + 1 + gap:
+        print(f"za malo wierszy ({len(y)}) na {n_folds} foldow")
+        return None
+
+    model = make_classifier(classifier, params, random_state, scale=False)
+    if model is None:
+        return None
+
+    # skaler idzie razem z modelem: partial_fit na tych samych nowych wierszach
+    scaler = None
+    if classifier in SCALED_CLASSIFIERS:
+        from sklearn.preprocessing import StandardScaler
+        scaler = StandardScaler()
+
+    splits = TimeSeriesSplit(n_splits=n_folds, max_train_size=window, gap=gap).split(X)
+    scorer = get_scorer(scoring)
+    classes = np.unique(y)
+    labels = np.asarray(timestamps) if timestamps is not None else np.arange(len(y))
+
+    if hasattr(model, 'partial_fit') and window is None:
+        strategy = 'partial_fit'
+    elif 'warm_start' in model.get_params() and hasattr(model, 'n_estimators'):
+        strategy = 'warm_start'
+        new_trees = new_trees or max(1, int(model.n_estimators * WARM_START_FRACTION))
+    else:
+        strategy = 'refit'
+
+    rows = []
+    trained_until = 0  # pierwszy wiersz, ktorego model z partial_fit jeszcze nie widzial
+    for fold, (train_index, test_index) in enumerate(splits):
+        if should_stop is not None and should_stop():
+            print("walk-forward przerwany")
+            return None
+
+        start = time.perf_counter()
+        if strategy == 'partial_fit':
+            new_index = train_index[train_index >= trained_until]
+            if len(new_index):
+                X_new = X[new_index]
+                if scaler is not None:
+                    X_new = scaler.partial_fit(X_new).transform(X_new)
+                if fold == 0:
+                    model.partial_fit(X_new, y[new_index], classes=classes)
+                else:
+                    model.partial_fit(X_new, y[new_index])
+            trained_until = train_index[-1] + 1
+            update = 'partial_fit'
+        elif (strategy == 'warm_start' and fold > 0
+              and np.array_equal(np.unique(y[train_index]), model.classes_)):
+            # drzewa z innym zestawem klas nie dadza sie polaczyc - wtedy pelne uczenie nizej
+            model.estimators_ = model.estimators_[new_trees:]
+            model.set_params(warm_start=True)
+            model.fit(X[train_index], y[train_index])
+            new_index = train_index
+            update = f'warm_start (+{new_trees} drzew)'
+        else:
+            if strategy == 'warm_start':
+                model.set_params(warm_start=False)
+            X_train = X[train_index] if scaler is None else scaler.fit(X[train_index]).transform(X[train_index])
+            model.fit(X_train, y[train_index])
+            new_index = train_index
+            update = 'pelne uczenie'
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        X_test = X[test_index] if scaler is None else scaler.transform(X[test_index])
+        score = scorer(model, X_test, y[test_index])
+        score_time = time.perf_counter() - start
+
+        rows.append({
+            'fold': fold + 1,
+            'test od': labels[test_index[0]],
+            'test do': labels[test_index[-1]],
+            'okno uczenia': len(train_index),
+            'nowe wiersze': len(new_index),
+            'wynik': float(score),
+            'czas uczenia [s]': fit_time,
+            'czas oceny [s]': score_time,
+            'aktualizacja': update,
+        })
+
+        if progress_callback is not None:
+            progress_callback(fold + 1, n_folds, f"fold {fold + 1}/{n_folds}")
+
+    return pd.DataFrame(rows, columns=WALK_FORWARD_COLUMNS)
+
+
+def _results_frame(candidates, scores, fit_times, score_times, pruned_after):
+    """sklada wyniki w ramke - najlepszy kandydat na gorze"""
+    with warnings.catch_warnings():
+        # kandydat z samymi bledami ma same NaN - to nie jest problem
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean_scores = np.nanmean(scores, axis=1)
+        std_scores = np.nanstd(scores, axis=1)
+        mean_fit = np.nanmean(fit_times, axis=1)
+        mean_score_time = np.nanmean(score_times, axis=1)
+
+    results = pd.DataFrame({
+        'parametry': [_format_params(params) for params in candidates],
+        'sredni wynik': mean_scores,
+        'odch. std': std_scores,
+        'sredni czas uczenia [s]': mean_fit,
+        'sredni czas oceny [s]': mean_score_time,
+        'foldy': np.isfinite(scores).sum(axis=1),
+        'odrzucony': ['tak' if c in pruned_after else '' for c in range(len(candidates))],
+    }, columns=RESULT_COLUMNS)
+
+    # odrzuceni na koncu - ich srednia jest z mniejszej liczby foldow
+    order = np.lexsort((-np.nan_to_num(mean_scores, nan=-np.inf),
+                        [c in pruned_after for c in range(len(candidates))]))
+    return results.iloc[order]
+
+
+def _format_params(params):
+    """slownik parametrow jako krotki tekst do tabeli"""
+    if not params:
+        return "(domyslne)"
+    return ", ".join(f"{name}={value}" for name, value in params.items())
+
+
+def _run_jobs(pool, jobs, workers, should_stop=None):
+    """liczy pary (kandydat, fold) - w procesach albo tutaj; zwraca wyniki po kolei, None = przerwano"""
+    if pool is None:
+        for job in jobs:
+            if should_stop is not None and should_stop():
+                yield None
+                return
+            yield _evaluate(*job)
+        return
+
+    # kilka paczek na proces - rowne obciazenie przy malym narzucie komunikacji
+    batch_size = max(1, len(jobs) // (workers * 4))
+    pending = {pool.submit(_evaluate_batch, jobs[i:i + batch_size])
+               for i in range(0, len(jobs), batch_size)}
+
+    while pending:
+        finished, pending = wait(pending, timeout=STOP_CHECK_SECONDS, return_when=FIRST_COMPLETED)
+        if should_stop is not None and should_stop():
+            yield None
+            return
+        for future in finished:
+            yield from future.result()
+
+
+# dane procesu roboczego - przekazywane raz przez _init_worker
+_worker_X = None
+_worker_y = None
+_worker_splits = None
+_worker_settings = None
+
+
+def _init_worker(X, y, splits, settings):
+    """start procesu roboczego: dane i foldy zostaja w procesie na wszystkie zadania"""
+    global _worker_X, _worker_y, _worker_splits, _worker_settings
+    _worker_X, _worker_y, _worker_splits, _worker_settings = X, y, splits, settings
+
+
+def _evaluate_batch(jobs):
+    """liczy paczke par (kandydat, fold) w procesie roboczym"""
+    return [_evaluate(*job) for job in jobs]
+
+
+def _evaluate(candidate, fold, params):
+    """uczy jednego kandydata na jednym foldzie - blad = wynik NaN, nie przerywa szukania"""
+    from sklearn.metrics import get_scorer
+
+    train_index, test_index = _worker_splits[fold]
+    model = make_classifier(_worker_settings['classifier'], params, _worker_settings['random_state'])
+
+    try:
+        start = time.perf_counter()
+        model.fit(_worker_X[train_index], _worker_y[train_index])
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        score = get_scorer(_worker_settings['scoring'])(model, _worker_X[test_index], _worker_y[test_index])
+        score_time = time.perf_counter() - start
+    except Exception as error:
+        print(f"blad dla {_format_params(params)} (fold {fold + 1}): {error}")
+        return candidate, fold, np.nan, np.nan, np.nan
+
+    return candidate, fold, float(score), fit_time, score_time
+
+
+# przykladowe uzycie
+if __name__ == "__main__":
+    print("testujemy szukanie parametrow...")
+
+    rng = np.random.default_rng(0)
+    test_X = rng.normal(size=(3000, 4))
+    test_y = (test_X[:, 0] + test_X[:, 1] ** 2 + rng.normal(scale=0.5, size=3000) > 1).astype(int)
+
+    start_time = time.perf_counter()
+    table, best_params = search_hyperparameters(test_X, test_y, "Decision Tree", search='grid',
+                                                n_splits=5, workers=2)
+    print(table.head(10).to_string())
+    print(f"najlepsze: {best_params} ({time.perf_counter() - start_time:.1f} s)")
@@ -0,0 +1,589 @@
+"""
+Modul z grupowaniem, ktore dziala tez na milionach wierszy.
+
+Zwykle KMeans(n_init=10), AgglomerativeClustering i DBSCAN licza wszystko
+naraz: grupowanie hierarchiczne trzyma macierz odleglosci (n^2 - braklo
+pamieci juz przy ok. 30 tys. wierszy), a DBSCAN liste sasiadow kazdego
+punktu. Tutaj:
+
+- K-means - MiniBatchKMeans (uczy sie na malych paczkach wierszy) dla duzych
+  danych, pelny KMeans tylko dla malych
+- hierarchiczne - drzewo Warda na losowej probce, reszta wierszy trafia do
+  najblizszego srodka klastra (liczone kawalkami)
+- DBSCAN - wlasny indeks BallTree i zapytania o sasiadow kawalkami:
+  najpierw tylko liczba sasiadow (punkty rdzenne), potem laczenie punktow
+  rdzennych przez union-find, na koncu punkty brzegowe; w pamieci sa
+  etykiety i sasiedzi jednego kawalka, nie wszystkich punktow naraz
+- HDBSCAN - na probce, reszta wierszy dostaje etykiete najblizszego
+  punktu probki (jesli jest dosc blisko)
+
+Liczbe klastrow mozna wybrac automatycznie (sweep_clusters): kazde k liczy
+osobny proces na tej samej macierzy w pamieci wspoldzielonej, a oceniamy je
+inercja, silhouette (na probce warstwowej) i wskaznikiem Davies-Bouldina.
+
+Modele hierarchiczny i HDBSCAN maja predict, wiec mozna je zapisac
+w rejestrze modeli (utils.model_registry) i przypisywac nowe wiersze.
+
+Autor: Student, ktoremu skonczyla sie pamiec na AgglomerativeClustering
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+CLUSTERING_METHODS = ["K-means", "MiniBatch K-means", "Hierarchical", "DBSCAN", "HDBSCAN"]
+
+# do ilu wierszy "K-means" liczy pelnym KMeans (wyzej - MiniBatchKMeans)
+KMEANS_FULL_LIMIT = 200000
+
+# probka dla drzewa Warda - pamiec rosnie z kwadratem (5000 wierszy = ok. 100 MB)
+HIERARCHICAL_SAMPLE = 5000
+
+# probka dla HDBSCAN - czas rosnie szybciej niz liniowo
+HDBSCAN_SAMPLE = 50000
+
+# ile wierszy naraz w zapytaniach o sasiadow i przypisywaniu do srodkow
+CHUNK_SIZE = 20000
+
+# ile par sasiadow naraz przy laczeniu punktow rdzennych (8 mln par = ok. 130 MB)
+NEIGHBOUR_PAIRS = 8000000
+
+# ile punktow pokazujemy na wykresie grupowania
+PLOT_POINTS = 20000
+
+# metody z zadana liczba klastrow - tylko dla nich ma sens szukanie k
+K_METHODS = ["K-means", "MiniBatch K-means", "Hierarchical"]
+
+# jakie k sprawdzamy w trybie automatycznym (jak zakres pola "Liczba klastrow")
+AUTO_K_VALUES = range(2, 11)
+
+# probka do silhouette - pelne silhouette liczy wszystkie odleglosci (n^2)
+SILHOUETTE_SAMPLE = 10000
+
+# co ile sekund sprawdzamy should_stop w czasie czekania na procesy
+STOP_CHECK_SECONDS = 0.2
+
+SWEEP_COLUMNS = ['k', 'inercja', 'silhouette', 'davies-bouldin', 'czas [s]']
+
+
+class SampledHierarchical:
+    """Grupowanie Warda na probce + przypisanie reszty do najblizszego srodka."""
+
+    def __init__(self, n_clusters=3, sample_size=HIERARCHICAL_SAMPLE, linkage='ward', random_state=42):
+        """
+        co bierze:
+        - n_clusters: liczba klastrow
+        - sample_size: ile wierszy idzie do drzewa (reszta jest przypisywana)
+        - linkage: sposob laczenia jak w AgglomerativeClustering
+        - random_state: ziarno losowania probki
+        """
+        self.n_clusters = n_clusters
+        self.sample_size = sample_size
+        self.linkage = linkage
+        self.random_state = random_state
+
+    def fit(self, X):
+        """uczy drzewo na probce i przypisuje wszystkie wiersze (labels_)"""
+        from sklearn.cluster import AgglomerativeClustering
+
+        X = np.asarray(X, dtype=np.float64)
+        sample = _sample_rows(len(X), self.sample_size, self.random_state)
+        sample_labels = AgglomerativeClustering(
+            n_clusters=self.n_clusters, linkage=self.linkage
+        ).fit_predict(X[sample])
+
+        # srodki klastrow z probki - jak w Wardzie, liczy sie odleglosc od sredniej
+        counts = np.bincount(sample_labels, minlength=self.n_clusters)
+        self.cluster_centers_ = np.stack([
+            np.bincount(sample_labels, weights=X[sample, column], minlength=self.n_clusters)
+            for column in range(X.shape[1])
+        ], axis=1) / counts[:, None]
+        self.sample_size_ = len(sample)
+
+        self.labels_ = self.predict(X)
+        return self
+
+    def fit_predict(self, X):
+        """fit i zwraca etykiety wszystkich wierszy"""
+        return self.fit(X).labels_
+
+    def predict(self, X):
+        """numer najblizszego srodka dla kazdego wiersza (liczone kawalkami)"""
+        return _nearest_center(np.asarray(X, dtype=np.float64), self.cluster_centers_)
+
+
+class SampledHDBSCAN:
+    """HDBSCAN na probce + etykieta najblizszego punktu probki dla reszty."""
+
+    def __init__(self, min_cluster_size=50, min_samples=None, sample_size=HDBSCAN_SAMPLE,
+                 max_distance=None, random_state=42):
+        """
+        co bierze:
+        - min_cluster_size, min_samples: jak w sklearn.cluster.HDBSCAN
+        - sample_size: ile wierszy idzie do HDBSCAN
+        - max_distance: dalej od najblizszego punktu klastra = szum (-1);
+          None = mediana odleglosci do min_samples-tego sasiada w probce
+        - random_state: ziarno losowania probki
+        """
+        self.min_cluster_size = min_cluster_size
+        self.min_samples = min_samples
+        self.sample_size = sample_size
+        self.max_distance = max_distance
+        self.random_state = random_state
+
+    def fit(self, X):
+        """uczy HDBSCAN na probce i przypisuje wszystkie wiersze (labels_)"""
+        from sklearn.cluster import HDBSCAN
+        from sklearn.neighbors import BallTree
+
+        X = np.asarray(X, dtype=np.float64)
+        sample = _sample_rows(len(X), self.sample_size, self.random_state)
+        sample_labels = HDBSCAN(min_cluster_size=self.min_cluster_size, min_samples=self.min_samples,
+                                algorithm='ball_tree', copy=True).fit_predict(X[sample])
+
+        clustered = sample_labels >= 0
+        self.points_ = X[sample][clustered]
+        self.point_labels_ = sample_labels[clustered]
+        self.sample_size_ = len(sample)
+
+        self.max_distance_ = self.max_distance
+        if self.max_distance_ is None and len(self.points_) > 1:
+            # typowa odleglosc miedzy sasiadami w klastrach - dalej to juz szum
+            k = min(self.min_samples or self.min_cluster_size, len(self.points_) - 1) + 1
+            tree = BallTree(self.points_)
+            distances, _ = tree.query(self.points_[:CHUNK_SIZE], k=k)
+            self.max_distance_ = float(np.median(distances[:, -1]))
+        self._tree = None
+
+        self.labels_ = self.predict(X)
+        return self
+
+    def fit_predict(self, X):
+        """fit i zwraca etykiety wszystkich wierszy"""
+        return self.fit(X).labels_
+
+    def predict(self, X):
+        """etykieta najblizszego punktu probki (albo -1 za daleko) - kawalkami"""
+        from sklearn.neighbors import BallTree
+
+        X = np.asarray(X, dtype=np.float64)
+        labels = np.full(len(X), -1, dtype=np.int64)
+        if len(self.points_) == 0:
+            return labels
+
+        if getattr(self, '_tree', None) is None:
+            self._tree = BallTree(self.points_)
+
+        for start in range(0, len(X), CHUNK_SIZE):
+            distances, nearest = self._tree.query(X[start:start + CHUNK_SIZE], k=1)
+            chunk_labels = self.point_labels_[nearest[:, 0]]
+            chunk_labels[distances[:, 0] > self.max_distance_] = -1
+            labels[start:start + CHUNK_SIZE] = chunk_labels
+        return labels
+
+    def __getstate__(self):
+        # drzewo odbudujemy po wczytaniu - nie ma sensu go zapisywac
+        state = self.__dict__.copy()
+        state['_tree'] = None
+        return state
+
+
+def tree_dbscan(X, eps=0.5, min_samples=5, chunk_size=CHUNK_SIZE, leaf_size=40, progress_callback=None):
+    """
+    DBSCAN z indeksem BallTree i zapytaniami kawalkami (pamiec ~ n, nie n * sasiedzi)
+
+    wynik jak sklearn.cluster.DBSCAN (punkt brzegowy lezacy przy dwoch
+    klastrach moze trafic do innego z nich - tak samo dopuszcza DBSCAN)
+
+    co bierze:
+    - X: macierz cech (najlepiej przeskalowana)
+    - eps: promien sasiedztwa
+    - min_samples: ile punktow (z nim samym) w promieniu eps ma punkt rdzenny
+    - chunk_size: ile punktow pytamy naraz
+    - leaf_size: wielkosc lisci drzewa
+    - progress_callback: funkcja (procent, opis)
+
+    co zwraca:
+    - tablica etykiet (-1 = szum)
+    """
+
+    from sklearn.neighbors import BallTree
+
+    X = np.asarray(X, dtype=np.float64)
+    n = len(X)
+    labels = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return labels
+
+    def report(percent, message):
+        if progress_callback is not None:
+            progress_callback(percent, message)
+
+    # 1. punkty rdzenne - samo liczenie sasiadow, bez list indeksow
+    tree = BallTree(X, leaf_size=leaf_size)
+    counts = np.zeros(n, dtype=np.int64)
+    for start in range(0, n, chunk_size):
+        counts[start:start + chunk_size] = tree.query_radius(X[start:start + chunk_size], r=eps,
+                                                             count_only=True)
+        report(40 * min(start + chunk_size, n) / n, "punkty rdzenne")
+    core = counts >= min_samples
+
+    core_index = np.flatnonzero(core)
+    if len(core_index) == 0:
+        return labels
+
+    # 2. laczenie punktow rdzennych - sasiedzi tylko wsrod rdzennych; kawalki
+    # dobieramy po liczbie sasiadow z kroku 1, zeby w gestych miejscach
+    # listy sasiadow nie zajely calej pamieci
+    core_points = X[core_index]
+    core_tree = BallTree(core_points, leaf_size=leaf_size)
+    parent = np.arange(len(core_index))
+    pairs_before = np.concatenate([[0], np.cumsum(counts[core_index])])
+    start = 0
+    while start < len(core_index):
+        limit = np.searchsorted(pairs_before, pairs_before[start] + NEIGHBOUR_PAIRS, side='right') - 1
+        stop = min(max(limit, start + 1), start + chunk_size, len(core_index))
+        neighbours = core_tree.query_radius(core_points[start:stop], r=eps)
+        sizes = np.fromiter((len(item) for item in neighbours), dtype=np.int64, count=len(neighbours))
+        left = np.repeat(np.arange(start, stop), sizes)
+        right = np.concatenate(neighbours)
+        _union(parent, left, right)
+        start = stop
+        report(40 + 40 * start / len(core_index), "laczenie klastrow")
+
+    roots = _find_roots(parent)
+    _, core_labels = np.unique(roots, return_inverse=True)
+    labels[core_index] = core_labels
+
+    # 3. punkty brzegowe - najblizszy punkt rdzenny, jesli jest w promieniu eps
+    other = np.flatnonzero(~core)
+    for start in range(0, len(other), chunk_size):
+        rows = other[start:start + chunk_size]
+        distances, nearest = core_tree.query(X[rows], k=1)
+        border = distances[:, 0] <= eps
+        labels[rows[border]] = core_labels[nearest[border, 0]]
+    report(100, "punkty brzegowe")
+
+    return labels
+
+
+def fit_clustering(X, method, n_clusters=3, eps=0.5, min_samples=5, random_state=42,
+                   progress_callback=None):
+    """
+    grupuje wiersze wybrana metoda - wersje, ktore nie wybuchaja na duzych danych
+
+    co bierze:
+    - X: macierz cech (przeskalowana)
+    - method: nazwa z CLUSTERING_METHODS
+    - n_clusters: liczba klastrow (K-means, hierarchiczne)
+    - eps, min_samples: parametry DBSCAN (min_samples tez dla HDBSCAN)
+    - random_state: ziarno
+    - progress_callback: funkcja (procent, opis) - tylko DBSCAN raportuje po drodze
+
+    co zwraca:
+    - (etykiety, model albo None gdy metoda nie ma modelu do zapisania) albo (None, None)
+    """
+
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    X = np.asarray(X, dtype=np.float64)
+    start = time.perf_counter()
+
+    if method == "K-means" and len(X) <= KMEANS_FULL_LIMIT:
+        model = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10).fit(X)
+    elif method in ("K-means", "MiniBatch K-means"):
+        # paczki po kilka tysiecy wierszy - czas prawie liniowy, pamiec stala
+        model = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3,
+                                batch_size=4096).fit(X)
+    elif method == "Hierarchical":
+        model = SampledHierarchical(n_clusters=n_clusters, random_state=random_state).fit(X)
+    elif method == "HDBSCAN":
+        model = SampledHDBSCAN(min_samples=min_samples, random_state=random_state).fit(X)
+    elif method == "DBSCAN":
+        labels = tree_dbscan(X, eps=eps, min_samples=min_samples, progress_callback=progress_callback)
+        print(f"{method}: {len(X)} wierszy w {time.perf_counter() - start:.1f} s")
+        return labels, None
+    else:
+        print(f"nieznana metoda grupowania: {method}")
+        return None, None
+
+    print(f"{method}: {len(X)} wierszy w {time.perf_counter() - start:.1f} s")
+    return np.asarray(model.labels_), model
+
+
+def sweep_clusters(X, k_values=AUTO_K_VALUES, method="K-means", workers=None,
+                   silhouette_sample=SILHOUETTE_SAMPLE, progress_callback=None, should_stop=None,
+                   random_state=42):
+    """
+    grupuje dla kilku k naraz (kazde k w osobnym procesie) i wybiera najlepsze
+
+    macierz X trafia raz do pamieci wspoldzielonej - procesy czytaja te sama
+    kopie, wiec pamiec nie rosnie z liczba procesow
+
+    co bierze:
+    - X: macierz cech (przeskalowana)
+    - k_values: sprawdzane liczby klastrow
+    - method: nazwa z K_METHODS
+    - workers: liczba procesow (None = liczba rdzeni, 1 = bez procesow)
+    - silhouette_sample: z ilu wierszy liczymy silhouette (probka warstwowa)
+    - progress_callback: funkcja (zrobione, wszystkie, opis); moze rzucic
+      wyjatek, zeby przerwac
+    - should_stop: funkcja bez argumentow sprawdzana co chwile w czasie
+      czekania na procesy, True = przerywamy
+    - random_state: ziarno
+
+    co zwraca:
+    - (tabela SWEEP_COLUMNS po k, wybrane k - najwyzsze silhouette) albo (None, None)
+    """
+
+    if method not in K_METHODS:
+        print(f"{method} nie ma zadanej liczby klastrow - nie ma czego wybierac")
+        return None, None
+
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    k_values = [k for k in k_values if 2 <= k < len(X)]
+    if not k_values:
+        print("za malo wierszy, zeby sprawdzic choc jedno k")
+        return None, None
+
+    workers = min(workers or os.cpu_count() or 1, len(k_values))
+    settings = {'method': method, 'silhouette_sample': silhouette_sample,
+                'random_state': random_state}
+    rows = []
+    stopped = False
+
+    if workers == 1:
+        _init_sweep_worker(None, X.shape, X.dtype.str, settings, X)
+        for k in k_values:
+            if should_stop is not None and should_stop():
+                stopped = True
+                break
+            rows.append(_sweep_one(k))
+            if progress_callback is not None:
+                progress_callback(len(rows), len(k_values), f"k = {k}")
+    else:
+        memory = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+        pool = None
+        try:
+            np.ndarray(X.shape, dtype=X.dtype, buffer=memory.buf)[:] = X
+            # spawn, nie fork - GUI ma watki Qt, a fork kopiuje ich zablokowane muteksy
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_sweep_worker,
+                                       initargs=(memory.name, X.shape, X.dtype.str, settings))
+            # duze k licza sie najdluzej - startuja pierwsze, zeby procesy skonczyly razem
+            pending = {pool.submit(_sweep_one, k) for k in sorted(k_values, reverse=True)}
+            while pending:
+                finished, pending = wait(pending, timeout=STOP_CHECK_SECONDS, return_when=FIRST_COMPLETED)
+                if should_stop is not None and should_stop():
+                    stopped = True
+                    break
+                for future in finished:
+                    rows.append(future.result())
+                    if progress_callback is not None:
+                        progress_callback(len(rows), len(k_values), f"k = {rows[-1][0]}")
+        finally:
+            if pool is not None:
+                # po przerwaniu nie czekamy - procesy skoncza biezace k i same sie zamkna
+                pool.shutdown(wait=not stopped, cancel_futures=True)
+            # procesy, ktore jeszcze licza, maja pamiec zmapowana - usuwamy tylko nazwe
+            memory.close()
+            memory.unlink()
+
+    if stopped:
+        print("szukanie liczby klastrow przerwane")
+        return None, None
+
+    results = pd.DataFrame(rows, columns=SWEEP_COLUMNS).sort_values('k', ignore_index=True)
+    best_k = int(results.loc[results['silhouette'].idxmax(), 'k']) \
+        if results['silhouette'].notna().any() else int(results['k'].iloc[0])
+    print(f"{method}: sprawdzono k = {list(results['k'])}, wybrano k = {best_k}")
+    return results, best_k
+
+
+def cluster_scores(X, labels):
+    """
+    inercja i wskaznik Davies-Bouldina w jednym przejsciu po danych (kawalkami)
+
+    co bierze:
+    - X: macierz cech
+    - labels: etykiety 0..k-1 (szum -1 pomijamy)
+
+    co zwraca:
+    - (inercja, davies-bouldin) - davies-bouldin jak sklearn, nan dla jednego klastra
+    """
+
+    X = np.asarray(X, dtype=np.float64)
+    labels = np.asarray(labels)
+    keep = labels >= 0
+    if not keep.all():
+        X, labels = X[keep], labels[keep]
+    k = int(labels.max()) + 1 if len(labels) else 0
+    if k == 0:
+        return float('nan'), float('nan')
+
+    counts = np.bincount(labels, minlength=k)
+    centers = np.column_stack([np.bincount(labels, weights=X[:, column], minlength=k)
+                               for column in range(X.shape[1])]) / np.maximum(counts, 1)[:, None]
+
+    inertia = 0.0
+    spread = np.zeros(k)
+    for start in range(0, len(X), CHUNK_SIZE):
+        chunk_labels = labels[start:start + CHUNK_SIZE]
+        squared = ((X[start:start + CHUNK_SIZE] - centers[chunk_labels]) ** 2).sum(axis=1)
+        inertia += squared.sum()
+        spread += np.bincount(chunk_labels, weights=np.sqrt(squared), minlength=k)
+
+    used = counts > 0
+    if used.sum() < 2:
+        return float(inertia), float('nan')
+
+    # dla kazdego klastra najgorszy stosunek (rozrzut i + rozrzut j) / odleglosc srodkow
+    spread = spread[used] / counts[used]
+    centers = centers[used]
+    distances = np.sqrt(((centers[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2))
+    np.fill_diagonal(distances, np.inf)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = (spread[:, None] + spread[None, :]) / distances
+    ratios[~np.isfinite(ratios)] = 0.0
+    return float(inertia), float(ratios.max(axis=1).mean())
+
+
+def stratified_sample(labels, max_points=PLOT_POINTS, min_per_cluster=None, random_state=42):
+    """
+    indeksy probki warstwowej - kazdy klaster ma w niej swoja czesc
+
+    co bierze:
+    - labels: etykiety wszystkich wierszy
+    - max_points: ile punktow najwyzej
+    - min_per_cluster: ile punktow dostaje co najmniej maly klaster
+      (None = kilkaset, zeby byl widoczny na wykresie; 2 = prawie
+      proporcjonalnie, np. do silhouette)
+    - random_state: ziarno
+
+    co zwraca:
+    - posortowana tablica indeksow (wszystkie, jesli jest ich malo)
+    """
+
+    labels = np.asarray(labels)
+    n = len(labels)
+    if n <= max_points:
+        return np.arange(n)
+
+    rng = np.random.default_rng(random_state)
+    unique, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+
+    # proporcjonalnie do wielkosci, ale maly klaster dostaje co najmniej "minimum" punktow
+    minimum = max_points // (4 * len(unique)) if min_per_cluster is None else min_per_cluster
+    quotas = np.minimum(counts, np.maximum(counts * max_points // n, minimum))
+
+    # losowa kolejnosc i w kazdym klastrze pierwsze "quota" wierszy
+    order = rng.permutation(n)
+    by_label = order[np.argsort(inverse[order], kind='stable')]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = np.arange(n) - np.repeat(starts, counts)
+    chosen = by_label[rank < np.repeat(quotas, counts)]
+    return np.sort(chosen)
+
+
+# dane procesu liczacego k - przekazywane raz przez _init_sweep_worker
+_sweep_memory = None
+_sweep_X = None
+_sweep_settings = None
+
+
+def _init_sweep_worker(memory_name, shape, dtype, settings, X=None):
+    """start procesu: podlaczenie do macierzy w pamieci wspoldzielonej (bez kopiowania)"""
+    global _sweep_memory, _sweep_X, _sweep_settings
+    if X is None:
+        # trzymamy obiekt pamieci w globalnej, inaczej bufor zniknalby pod macierza
+        _sweep_memory = shared_memory.SharedMemory(name=memory_name)
+        X = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_sweep_memory.buf)
+    _sweep_X, _sweep_settings = X, settings
+
+
+def _sweep_one(k):
+    """grupowanie dla jednego k i jego oceny: (k, inercja, silhouette, davies-bouldin, czas)"""
+    from sklearn.metrics import silhouette_score
+
+    start = time.perf_counter()
+    settings = _sweep_settings
+    labels, _ = fit_clustering(_sweep_X, settings['method'], n_clusters=k,
+                               random_state=settings['random_state'])
+    inertia, davies_bouldin = cluster_scores(_sweep_X, labels)
+
+    silhouette = float('nan')
+    if len(np.unique(labels)) > 1:
+        sample = stratified_sample(labels, settings['silhouette_sample'], min_per_cluster=2,
+                                   random_state=settings['random_state'])
+        silhouette = float(silhouette_score(_sweep_X[sample], labels[sample]))
+    return k, inertia, silhouette, davies_bouldin, time.perf_counter() - start
+
+
+def _sample_rows(n, sample_size, random_state):
+    """losowe (posortowane) indeksy probki - wszystkie, jesli wierszy jest malo"""
+    if n <= sample_size:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(random_state).choice(n, sample_size, replace=False))
+
+
+def _nearest_center(X, centers):
+    """numer najblizszego srodka - kawalkami, zeby macierz odleglosci byla mala"""
+    labels = np.empty(len(X), dtype=np.int64)
+    center_norms = (centers ** 2).sum(axis=1)
+    for start in range(0, len(X), CHUNK_SIZE):
+        chunk = X[start:start + CHUNK_SIZE]
+        # |x - c|^2 = |x|^2 - 2 x.c + |c|^2, a |x|^2 nie zmienia, ktory srodek jest najblizszy
+        distances = center_norms[None, :] - 2 * chunk @ centers.T
+        labels[start:start + CHUNK_SIZE] = distances.argmin(axis=1)
+    return labels
+
+
+def _find_roots(parent):
+    """korzen kazdego elementu union-find (skracanie sciezek az do stabilizacji)"""
+    while True:
+        grandparent = parent[parent]
+        if np.array_equal(grandparent, parent):
+            return parent
+        parent[:] = grandparent
+
+
+def _union(parent, left, right):
+    """laczy pary (left[i], right[i]) w union-find - wektorowo, mniejszy korzen wygrywa"""
+    while len(left):
+        root_left = _find_roots(parent)[left]
+        root_right = parent[right]
+        different = root_left != root_right
+        if not different.any():
+            return
+        left, right = left[different], right[different]
+        root_left, root_right = root_left[different], root_right[different]
+        low = np.minimum(root_left, root_right)
+        high = np.maximum(root_left, root_right)
+        np.minimum.at(parent, high, low)
+
+
+# przykladowe uzycie
+if __name__ == "__main__":
+    print("testujemy grupowanie na duzych danych...")
+
+    rng = np.random.default_rng(0)
+    centers = np.array([[0, 0], [5, 5], [0, 6]])
+    test_X = np.concatenate([rng.normal(center, 0.8, size=(200_000, 2)) for center in centers])
+
+    for name in CLUSTERING_METHODS:
+        start_time = time.perf_counter()
+        labels, _ = fit_clustering(test_X, name, n_clusters=3, eps=0.1, min_samples=10)
+        found = np.unique(labels[labels >= 0])
+        print(f"{name}: {len(found)} klastrow, szum {np.mean(labels < 0):.1%}, "
+              f"{time.perf_counter() - start_time:.1f} s")
+
+    results, best_k = sweep_clusters(test_X, method="MiniBatch K-means", workers=2)
+    print(results.round(3).to_string(index=False))
+    print(f"wybrane k: {best_k}")
@@ -0,0 +1,176 @@
+"""
+Modul z podsumowaniami kolumn pod histogramy i wykresy pudelkowe.
+
+Surowa kolumna jest przegladana raz: liczymy drobny histogram (FINE_BINS
+przedzialow), kwartyle, wasy i wartosci odstajace. Potem histogram z dowolna
+liczba przedzialow to tylko zsumowanie sasiednich drobnych przedzialow,
+a boxplot rysuje sie z gotowych liczb - czas zalezy od liczby przedzialow,
+nie od liczby wierszy.
+
+Podsumowania trzymamy w zwyklym slowniku (cache) - kto go trzyma, ten go
+czysci, gdy dane sie zmienia.
+
+Autor: Student, który nie lubi czekać na wykresy
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# ile drobnych przedzialow liczymy z surowych danych
+FINE_BINS = 4096
+
+# ile wartosci odstajacych pamietamy do boxplota (reszta to i tak jedna plama)
+MAX_FLIERS = 2000
+
+
+def summarize_column(values, fine_bins=FINE_BINS, whisker=1.5):
+    """
+    liczy podsumowanie kolumny - jedno przejscie po danych
+
+    co bierze:
+    - values: seria pandas albo tablica liczb (braki sa pomijane)
+    - fine_bins: liczba drobnych przedzialow histogramu
+    - whisker: dlugosc wasow boxplota w IQR (jak w matplotlib)
+
+    co zwraca:
+    - slownik z histogramem, kwartylami i wasami albo None jak nie ma liczb
+    """
+
+    values = pd.Series(values)
+    if not pd.api.types.is_numeric_dtype(values):
+        return None
+
+    values = values.dropna().to_numpy(dtype=np.float64)
+    if len(values) == 0:
+        return None
+
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        # same takie same wartosci - histogram wokol nich jak w np.histogram
+        low, high = low - 0.5, high + 0.5
+
+    # rowne przedzialy - numpy liczy numer przedzialu bez sortowania
+    fine_counts, fine_edges = np.histogram(values, bins=fine_bins, range=(low, high))
+
+    # percentyle przez czesciowe sortowanie (partition), nie pelne sortowanie
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+
+    # wasy do najdalszej wartosci w zakresie 1.5 IQR - tak jak ax.boxplot
+    inside = values[(values >= q1 - whisker * iqr) & (values <= q3 + whisker * iqr)]
+    whisker_low = float(inside.min()) if len(inside) else float(q1)
+    whisker_high = float(inside.max()) if len(inside) else float(q3)
+
+    fliers = values[(values < whisker_low) | (values > whisker_high)]
+    n_fliers = len(fliers)
+    if n_fliers > MAX_FLIERS:
+        # rowno rozlozona probka z posortowanych - skrajne wartosci zostaja
+        fliers = np.sort(fliers)[np.linspace(0, n_fliers - 1, MAX_FLIERS).astype(np.int64)]
+
+    return {
+        'count': len(values),
+        'mean': float(values.mean()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'whisker_low': whisker_low,
+        'whisker_high': whisker_high,
+        'fliers': fliers,
+        'n_fliers': n_fliers,
+        'fine_counts': fine_counts,
+        'fine_edges': fine_edges,
+    }
+
+
+def get_column_summary(data, column_name, cache=None):
+    """
+    zwraca podsumowanie kolumny - z cache albo liczy i zapamietuje
+
+    co bierze:
+    - data: ramka pandas
+    - column_name: nazwa kolumny
+    - cache: slownik na podsumowania (None = bez zapamietywania);
+      trzeba go wyczyscic, gdy zmienia sie dane
+
+    co zwraca:
+    - slownik z summarize_column albo None
+    """
+
+    if cache is not None and column_name in cache:
+        return cache[column_name]
+
+    if data is None or column_name not in data.columns:
+        print(f"nie ma kolumny {column_name}")
+        return None
+
+    summary = summarize_column(data[column_name])
+    if cache is not None and summary is not None:
+        cache[column_name] = summary
+    return summary
+
+
+def histogram_from_summary(summary, bins):
+    """
+    sklada histogram z drobnych przedzialow - O(liczba przedzialow)
+
+    granice przedzialow sa dociagniete do granic drobnych przedzialow,
+    wiec liczebnosci sa dokladne (szerokosci roznia sie o max 1/FINE_BINS zakresu)
+
+    co bierze:
+    - summary: wynik summarize_column
+    - bins: ile przedzialow chcemy
+
+    co zwraca:
+    - (liczebnosci, granice) jak z np.histogram
+    """
+
+    fine_counts = summary['fine_counts']
+    fine_edges = summary['fine_edges']
+    n_fine = len(fine_counts)
+    bins = int(min(max(bins, 1), n_fine))
+
+    # indeksy drobnych granic najblizsze rownemu podzialowi
+    edge_positions = np.unique(np.round(np.linspace(0, n_fine, bins + 1)).astype(np.int64))
+    counts = np.add.reduceat(fine_counts, edge_positions[:-1])
+    return counts, fine_edges[edge_positions]
+
+
+def boxplot_stats_from_summary(summary, label=''):
+    """
+    zamienia podsumowanie na slownik dla ax.bxp (bez dotykania surowych danych)
+
+    co bierze:
+    - summary: wynik summarize_column
+    - label: podpis pudelka
+
+    co zwraca:
+    - slownik statystyk w formacie matplotlib.cbook.boxplot_stats
+    """
+
+    return {
+        'label': label,
+        'mean': summary['mean'],
+        'med': summary['median'],
+        'q1': summary['q1'],
+        'q3': summary['q3'],
+        'whislo': summary['whisker_low'],
+        'whishi': summary['whisker_high'],
+        'fliers': summary['fliers'],
+    }
+
+
+# przykladowe uzycie
+if __name__ == "__main__":
+    print("testujemy podsumowania kolumn...")
+
+    test_data = pd.DataFrame({'pm10': np.random.lognormal(3, 0.5, 1_000_000)})
+    cache = {}
+    summary = get_column_summary(test_data, 'pm10', cache)
+    print(f"kwartyle: {summary['q1']:.2f} {summary['median']:.2f} {summary['q3']:.2f}")
+
+    for bins in (10, 30, 100):
+        counts, edges = histogram_from_summary(summary, bins)
+        print(f"{bins} przedzialow -> suma {counts.sum()} (wierszy {summary['count']})")
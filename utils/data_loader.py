@@ -6,12 +6,14 @@ Autor: Student hurtowni danych
 Data: 2025
 """
 
+import io
+import os
+
 import pandas as pd
 import numpy as np
-import os
 
 
-def load_csv_data(file_path, separator=';', encoding='ISO-8859-1'):
+def load_csv_data(file_path, separator=';', encoding='ISO-8859-1', progress_callback=None):
     """
     wczytuje dane z pliku csv i robi podstawowe czyszczenie
 
@@ -19,6 +21,8 @@ def load_csv_data(file_path, separator=';', encoding='ISO-8859-1'):
     - file_path: gdzie jest nasz plik (string)
     - separator: czym sa oddzielone kolumny (domyslnie ; bo europejski format)
     - encoding: jakie kodowanie ma plik (domyslnie ISO-8859-1 bo stare pliki)
+    - progress_callback: opcjonalna funkcja(procent) - wtedy czytamy kawalkami
+      i po kazdym kawalku mowimy ile juz mamy (np. do paska postepu w GUI)
 
     co zwraca:
     - ramke danych pandas albo None jak cos sie zepsuje
@@ -33,12 +37,15 @@ def load_csv_data(file_path, separator=';', encoding='ISO-8859-1'):
             return None
 
         # wczytujemy dane - decimal=',' bo europejski format liczb
-        data = pd.read_csv(
-            file_path,
-            delimiter=separator,
-            encoding=encoding,
-            decimal=','
-        )
+        if progress_callback is None:
+            data = pd.read_csv(
+                file_path,
+                delimiter=separator,
+                encoding=encoding,
+                decimal=','
+            )
+        else:
+            data = _read_csv_with_progress(file_path, separator, encoding, progress_callback)
 
         # usuwamy puste kolumny które powstają przez ;; na końcu wierszy
         data = data.dropna(axis=1, how='all')
@@ -57,6 +64,210 @@ def load_csv_data(file_path, separator=';', encoding='ISO-8859-1'):
         return None
 
 
+def _read_csv_with_progress(file_path, separator, encoding, progress_callback, chunk_size=50000):
+    """
+    pomocnicza - czyta plik kawalkami i raportuje postep
+    liczbe wierszy zgadujemy z rozmiaru pliku i dlugosci pierwszych linii
+    """
+
+    estimated_rows = max(estimate_row_count(file_path), 1)
+
+    reader = pd.read_csv(
+        file_path,
+        delimiter=separator,
+        encoding=encoding,
+        decimal=',',
+        chunksize=chunk_size
+    )
+
+    chunks = []
+    rows_read = 0
+    for chunk in reader:
+        chunks.append(chunk)
+        rows_read += len(chunk)
+        progress_callback(min(99.0, rows_read / estimated_rows * 100))
+
+    data = pd.concat(chunks, ignore_index=True)
+    progress_callback(100.0)
+    return data
+
+
+def estimate_row_count(file_path, sample_bytes=65536):
+    """
+    szacuje liczbe wierszy pliku bez czytania calosci
+    (rozmiar pliku / srednia dlugosc linii z poczatku pliku)
+
+    co bierze:
+    - file_path: sciezka do pliku
+    - sample_bytes: ile bajtow z poczatku pliku obejrzec
+
+    co zwraca:
+    - przyblizona liczba wierszy (bez naglowka), 0 jak sie nie da
+    """
+
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as file:
+            sample = file.read(sample_bytes)
+
+        lines = sample.count(b'\n')
+        if lines == 0:
+            return 0
+
+        return int(file_size / (len(sample) / lines)) - 1
+
+    except OSError as error:
+        print(f"nie udalo sie oszacowac liczby wierszy: {error}")
+        return 0
+
+
+def load_csv_in_chunks(file_path, separator=';', encoding='ISO-8859-1', chunk_size=100000, columns=None):
+    """
+    wczytuje duzy plik csv kawalkami - zeby nie trzymac calego pliku w pamieci
+    kazdy kawalek jest czyszczony tak samo jak w load_csv_data
+
+    co bierze:
+    - file_path: gdzie jest nasz plik (string)
+    - separator: czym sa oddzielone kolumny
+    - encoding: jakie kodowanie ma plik
+    - chunk_size: ile wierszy w jednym kawalku
+    - columns: ktore kolumny wczytac (None = wszystkie)
+
+    co zwraca:
+    - generator kolejnych ramek pandas (pusty jak cos sie zepsuje)
+    """
+
+    if not os.path.exists(file_path):
+        print(f"plik nie istnieje, sprawdz sciezke: {file_path}")
+        return
+
+    try:
+        reader = pd.read_csv(
+            file_path,
+            delimiter=separator,
+            encoding=encoding,
+            decimal=',',
+            chunksize=chunk_size,
+            usecols=columns
+        )
+
+        chunk_count = 0
+        for chunk in reader:
+            # puste kolumny od ;; na koncu wierszy maja nazwy "Unnamed: ..."
+            # (nie mozemy ich szukac przez dropna bo w jednym kawalku kazda kolumna moze byc pusta)
+            empty_columns = [c for c in chunk.columns if str(c).startswith('Unnamed:')]
+            chunk = chunk.drop(columns=empty_columns)
+            chunk = chunk.dropna(how='all')
+
+            # -200 oznacza brak pomiaru
+            chunk = chunk.replace(-200, np.nan)
+
+            chunk_count += 1
+            yield chunk
+
+        print(f"wczytano plik {file_path} w {chunk_count} kawalkach")
+
+    except Exception as error:
+        print(f"ups, cos sie zepsulo przy wczytywaniu kawalkami: {error}")
+
+
+def guess_separator(file_path, encoding='ISO-8859-1'):
+    """
+    zgaduje separator kolumn z pierwszej linii pliku (srednik albo przecinek)
+
+    co bierze:
+    - file_path: gdzie jest nasz plik
+    - encoding: jakie kodowanie ma plik
+
+    co zwraca:
+    - ';' albo ',' (';' jak nie da sie przeczytac pliku)
+    """
+
+    try:
+        with open(file_path, encoding=encoding) as file:
+            header = file.readline()
+    except OSError:
+        return ';'
+    return ';' if header.count(';') >= header.count(',') else ','
+
+
+def read_csv_header(file_path, separator=';', encoding='ISO-8859-1'):
+    """
+    czyta tylko naglowek pliku - do sledzenia dopisywanych wierszy
+
+    co bierze:
+    - file_path: gdzie jest nasz plik
+    - separator: czym sa oddzielone kolumny
+    - encoding: jakie kodowanie ma plik
+
+    co zwraca:
+    - (lista nazw kolumn, pozycja konca pliku w bajtach) albo (None, 0)
+    """
+
+    try:
+        header = pd.read_csv(file_path, delimiter=separator, encoding=encoding, nrows=0)
+        return list(header.columns), os.path.getsize(file_path)
+
+    except Exception as error:
+        print(f"nie udalo sie przeczytac naglowka {file_path}: {error}")
+        return None, 0
+
+
+def read_appended_rows(file_path, offset, names, separator=';', encoding='ISO-8859-1'):
+    """
+    czyta wiersze dopisane do pliku od pozycji offset (jak tail -f)
+
+    niedokonczona ostatnia linia zostaje na nastepny raz,
+    wiersze sa czyszczone tak samo jak w load_csv_data
+
+    co bierze:
+    - file_path: gdzie jest nasz plik
+    - offset: od ktorego bajtu czytac (z read_csv_header albo poprzedniego wywolania)
+    - names: nazwy kolumn z read_csv_header
+    - separator: czym sa oddzielone kolumny
+    - encoding: jakie kodowanie ma plik
+
+    co zwraca:
+    - (ramka z nowymi wierszami albo None, nowa pozycja w pliku)
+    """
+
+    try:
+        size = os.path.getsize(file_path)
+        if size < offset:
+            # plik zostal nadpisany/skrocony - zaczynamy sledzic od jego konca
+            print(f"plik {file_path} sie skrocil - sledze od nowa od konca")
+            return None, size
+        if size == offset:
+            return None, offset
+
+        with open(file_path, 'rb') as file:
+            file.seek(offset)
+            chunk = file.read(size - offset)
+
+        complete = chunk.rfind(b'\n') + 1
+        if complete == 0:
+            return None, offset
+
+        rows = pd.read_csv(
+            io.BytesIO(chunk[:complete]),
+            delimiter=separator,
+            encoding=encoding,
+            decimal=',',
+            header=None,
+            names=names
+        )
+
+        empty_columns = [c for c in rows.columns if str(c).startswith('Unnamed:')]
+        rows = rows.drop(columns=empty_columns).dropna(how='all')
+        rows = rows.replace(-200, np.nan)
+
+        return (rows if len(rows) else None), offset + complete
+
+    except Exception as error:
+        print(f"ups, cos sie zepsulo przy czytaniu nowych wierszy: {error}")
+        return None, offset
+
+
 def check_basic_info(data):
     """
     pokazuje podstawowe informacje o naszych danych
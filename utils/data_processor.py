@@ -10,8 +10,9 @@ Autor: Student, który chce żeby wszystko było proste
 
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from sklearn.impute import SimpleImputer
+
+# sklearn importujemy dopiero w scale_data - sam import trwa prawie sekunde,
+# a reszta modulu go nie potrzebuje
 
 
 def calculate_basic_statistics(data, column_name):
@@ -101,7 +102,14 @@ def calculate_correlation(data, method='pearson'):
         return None
 
     try:
-        correlation_matrix = numeric_data.corr(method=method)
+        if method == 'pearson' and not numeric_data.isna().to_numpy().any():
+            # bez brakow wystarczy jedno mnozenie macierzy (BLAS) zamiast petli po parach kolumn
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.corrcoef(numeric_data.to_numpy(dtype=np.float64), rowvar=False)
+            correlation_matrix = pd.DataFrame(np.atleast_2d(values),
+                                              index=numeric_data.columns, columns=numeric_data.columns)
+        else:
+            correlation_matrix = numeric_data.corr(method=method)
         print(f"obliczono korelacje metoda {method} dla {len(numeric_data.columns)} kolumn")
         return correlation_matrix
 
@@ -110,6 +118,44 @@ def calculate_correlation(data, method='pearson'):
         return None
 
 
+def reorder_correlation_matrix(corr_matrix, method='average'):
+    """
+    uklada kolumny macierzy korelacji tak, zeby podobne zmienne byly obok siebie
+    (grupowanie hierarchiczne, odleglosc = 1 - |korelacja|)
+
+    co bierze:
+    - corr_matrix: kwadratowa macierz korelacji (ramka pandas)
+    - method: sposob laczenia grup w scipy (average, complete, single, ward)
+
+    co zwraca:
+    - macierz z przestawionymi wierszami i kolumnami (albo bez zmian jak sie nie da)
+    """
+
+    if corr_matrix is None or len(corr_matrix) < 3:
+        return corr_matrix
+
+    try:
+        from scipy.cluster.hierarchy import linkage, leaves_list
+        from scipy.spatial.distance import squareform
+    except ImportError:
+        print("brak scipy - zostawiamy oryginalna kolejnosc kolumn")
+        return corr_matrix
+
+    try:
+        # kolumny bez korelacji (NaN) traktujemy jak niezalezne
+        distance = 1 - np.abs(np.nan_to_num(corr_matrix.to_numpy(dtype=np.float64)))
+        distance = (distance + distance.T) / 2
+        np.fill_diagonal(distance, 0)
+        distance = np.clip(distance, 0, None)
+
+        order = leaves_list(linkage(squareform(distance, checks=False), method=method))
+        return corr_matrix.iloc[order, order]
+
+    except Exception as error:
+        print(f"nie udalo sie pogrupowac kolumn: {error}")
+        return corr_matrix
+
+
 def extract_subset(data, columns=None, rows=None):
     """
     wycina kawałek z naszych danych - wybrane kolumny i/lub wiersze
@@ -178,22 +224,235 @@ def replace_values(data, column_name, old_value, new_value):
         print(f"nie ma kolumny {column_name}")
         return None
 
+    # jedna para to najprostszy przypadek zamiany wielu wartosci naraz
+    new_data, counts = replace_many_values(data, {column_name: {'mapping': {old_value: new_value}}})
+
+    if new_data is None:
+        return None
+
+    print(f"zamieniono {counts[column_name]} wartosci '{old_value}' na '{new_value}' w kolumnie {column_name}")
+    return new_data
+
+
+def replace_many_values(data, rules, inplace=False):
+    """
+    zamienia wiele wartosci naraz - wg par stara->nowa, przedzialow i wyrazen regularnych
+    kazda kolumna jest przerabiana jednym wektorowym przejsciem, bez petli po wierszach
+
+    co bierze:
+    - data: ramka pandas
+    - rules: slownik {kolumna: reguly}, reguly to slownik z kluczami (wszystkie opcjonalne):
+        'mapping': {stara_wartosc: nowa_wartosc, ...}
+        'ranges': [(od, do, nowa_wartosc), ...] - przedzialy domkniete, nie moga na siebie zachodzic
+        'regex': [(wzorzec, zamiennik), ...] - tylko dla kolumn tekstowych
+    - inplace: True = zmieniamy przekazana ramke, False = nowa ramka ktora dzieli
+      niezmienione kolumny z oryginalem (kopiujemy tylko zmienione kolumny)
+
+    co zwraca:
+    - (dane, slownik {kolumna: ile wartosci zamieniono}) albo (None, {}) jak cos nie gra
+    """
+
+    if data is None:
+        print("brak danych do zamiany wartosci")
+        return None, {}
+
+    missing_columns = [c for c in rules if c not in data.columns]
+    if missing_columns:
+        print(f"nie ma takich kolumn: {missing_columns}")
+        return None, {}
+
     try:
-        # robimy kopie zeby nie zepsuc oryginalnych danych
-        new_data = data.copy()
+        # plytka kopia - zmienione kolumny podmieniamy w calosci wiec oryginal zostaje nietkniety
+        new_data = data if inplace else data.copy(deep=False)
+        counts = {}
 
-        # liczymy ile wartosci zamienimy
-        count_to_replace = (new_data[column_name] == old_value).sum()
+        for column_name, column_rules in rules.items():
+            new_column, count = _replace_in_column(new_data[column_name], column_rules)
+            counts[column_name] = count
 
-        # zamieniamy
-        new_data[column_name] = new_data[column_name].replace(old_value, new_value)
+            if count > 0:
+                new_data[column_name] = new_column
 
-        print(f"zamieniono {count_to_replace} wartosci '{old_value}' na '{new_value}' w kolumnie {column_name}")
-        return new_data
+            print(f"kolumna {column_name}: zamieniono {count} wartosci")
+
+        return new_data, counts
 
     except Exception as error:
         print(f"nie udalo sie zamienic wartosci: {error}")
-        return None
+        return None, {}
+
+
+def _replace_in_column(column, column_rules):
+    """
+    pomocnicza - robi wszystkie zamiany w jednej kolumnie
+    kazda komorka zmienia sie najwyzej raz: najpierw pary, potem przedzialy, na koncu regex
+
+    co zwraca:
+    - (nowa kolumna, liczba zamian) - jak nic nie pasuje to oryginalna kolumna
+    """
+
+    is_numeric = pd.api.types.is_numeric_dtype(column.dtype) and not pd.api.types.is_bool_dtype(column.dtype)
+    numbers = column.to_numpy(dtype=float, na_value=np.nan) if is_numeric else None
+
+    replaced = np.zeros(len(column), dtype=bool)
+    new_values = np.empty(len(column), dtype=object)
+
+    # pary stara -> nowa
+    mapping = column_rules.get('mapping') or {}
+    if mapping:
+        if is_numeric:
+            hit, mapped = _map_numeric(numbers, mapping)
+        else:
+            # wszystkie wartosci szukamy naraz w indeksie (tablica haszujaca) kluczy
+            position = pd.Index(list(mapping.keys())).get_indexer(column)
+            hit = position >= 0
+            mapped = np.empty(len(mapping), dtype=object)
+            mapped[:] = list(mapping.values())
+            mapped = mapped[position]
+        new_values[hit] = mapped[hit]
+        replaced |= hit
+
+    # przedzialy [od, do] -> nowa
+    ranges = column_rules.get('ranges') or []
+    if ranges:
+        if not is_numeric:
+            raise ValueError(f"przedzialy dzialaja tylko dla kolumn liczbowych ({column.name})")
+        hit, mapped = _map_ranges(numbers, ranges)
+        hit &= ~replaced
+        new_values[hit] = mapped[hit]
+        replaced |= hit
+
+    # wyrazenia regularne - zamieniamy pasujacy fragment tekstu
+    regex_rules = column_rules.get('regex') or []
+    if regex_rules:
+        if is_numeric:
+            raise ValueError(f"regex dziala tylko dla kolumn tekstowych ({column.name})")
+        text = column.astype('string')
+        for pattern, replacement in regex_rules:
+            hit = text.str.contains(pattern, regex=True, na=False).to_numpy() & ~replaced
+            if hit.any():
+                new_values[hit] = text[hit].str.replace(pattern, replacement, regex=True).to_numpy(dtype=object)
+                replaced |= hit
+
+    count = int(replaced.sum())
+    if count == 0:
+        return column, 0
+
+    # skladamy nowa kolumne - zostaje liczbowa jesli wszystkie nowe wartosci sa liczbami
+    values = column.to_numpy()
+    new_part = new_values[replaced]
+    if is_numeric:
+        new_part = np.array([_to_number(v, keep_text=True) for v in new_part], dtype=object)
+
+    if is_numeric and all(isinstance(v, (int, float, np.number)) for v in new_part):
+        new_numbers = np.asarray(new_part.tolist())
+        result = values.astype(np.result_type(values.dtype, new_numbers.dtype))
+        result[replaced] = new_numbers
+    else:
+        result = values.astype(object)
+        result[replaced] = new_part
+
+    return pd.Series(result, index=column.index, name=column.name), count
+
+
+def _to_number(value, keep_text=False):
+    """
+    pomocnicza - zamienia wartosc na liczbe jesli sie da (np. tekst "-200" z GUI)
+    None oznacza brak wartosci wiec zamieniamy go na NaN
+
+    co zwraca:
+    - liczbe albo None (lub oryginalna wartosc gdy keep_text=True)
+    """
+
+    if value is None:
+        return np.nan
+    if isinstance(value, (bool, np.bool_)):
+        return value if keep_text else None
+    if isinstance(value, (int, float, np.number)):
+        return value
+    try:
+        text = str(value).strip().replace(',', '.')
+        number = float(text)
+        return int(number) if number.is_integer() and '.' not in text and 'e' not in text.lower() else number
+    except ValueError:
+        return value if keep_text else None
+
+
+def _map_numeric(numbers, mapping):
+    """
+    pomocnicza - zamiana wg slownika dla kolumny liczbowej
+    zamiast sprawdzac kazda pare osobno szukamy wszystkich wartosci naraz w posortowanych kluczach
+
+    co zwraca:
+    - (maska trafien, tablica nowych wartosci)
+    """
+
+    keys = []
+    targets = []
+    nan_target = None
+    has_nan_key = False
+
+    for old_value, new_value in mapping.items():
+        key = _to_number(old_value)
+        if key is None:
+            continue  # klucz tekstowy nigdy nie pasuje do kolumny liczbowej
+        if np.isnan(key):
+            has_nan_key = True
+            nan_target = new_value
+            continue
+        keys.append(key)
+        targets.append(new_value)
+
+    hit = np.zeros(len(numbers), dtype=bool)
+    mapped = np.empty(len(numbers), dtype=object)
+
+    if keys:
+        keys = np.asarray(keys, dtype=float)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        sorted_targets = np.empty(len(targets), dtype=object)
+        sorted_targets[:] = targets
+        sorted_targets = sorted_targets[order]
+
+        position = np.clip(np.searchsorted(sorted_keys, numbers), 0, len(sorted_keys) - 1)
+        hit = sorted_keys[position] == numbers
+        mapped = sorted_targets[position]
+
+    if has_nan_key:
+        nan_hit = np.isnan(numbers)
+        hit = hit | nan_hit
+        mapped[nan_hit] = nan_target
+
+    return hit, mapped
+
+
+def _map_ranges(numbers, ranges):
+    """
+    pomocnicza - zamiana wg przedzialow [od, do]
+    dla kazdej wartosci szukamy przedzialu binarnie (searchsorted) - jedno przejscie
+
+    co zwraca:
+    - (maska trafien, tablica nowych wartosci)
+    """
+
+    lows = np.array([float(r[0]) for r in ranges])
+    highs = np.array([float(r[1]) for r in ranges])
+    targets = np.empty(len(ranges), dtype=object)
+    targets[:] = [r[2] for r in ranges]
+
+    order = np.argsort(lows, kind='stable')
+    lows, highs, targets = lows[order], highs[order], targets[order]
+
+    if np.any(highs < lows):
+        raise ValueError("poczatek przedzialu nie moze byc wiekszy niz koniec")
+    if np.any(lows[1:] <= highs[:-1]):
+        raise ValueError("przedzialy nie moga na siebie zachodzic")
+
+    position = np.searchsorted(lows, numbers, side='right') - 1
+    safe_position = np.clip(position, 0, None)
+    hit = (position >= 0) & (numbers <= highs[safe_position])
+
+    return hit, targets[safe_position]
 
 
 def scale_data(data, column_names, method='minmax'):
@@ -286,6 +545,8 @@ def scale_data(data, column_names, method='minmax'):
             print(f"  {col}: min={min_val:.4f}, max={max_val:.4f}, mean={mean_val:.4f}")
 
         # Wybieramy metode skalowania
+        from sklearn.preprocessing import StandardScaler, MinMaxScaler
+
         print(f"\n--- Skalowanie metodą {method} ---")
         if method == 'minmax':
             scaler = MinMaxScaler()
@@ -422,7 +683,7 @@ def remove_duplicates(data, column_names=None):
     - column_names: na podstawie ktorych kolumn szukac duplikatow (None = wszystkie)
 
     co zwraca:
-    - dane bez duplikatow
+    - dane bez duplikatow (indeks zostaje - da sie porownac z oryginalem)
     """
 
     if data is None:
@@ -434,11 +695,11 @@ def remove_duplicates(data, column_names=None):
 
         if column_names is None:
             # sprawdzamy duplikaty we wszystkich kolumnach
-            new_data = data.drop_duplicates().reset_index(drop=True)
+            new_data = data.drop_duplicates()
             description = "wszystkich kolumn"
         else:
             # sprawdzamy duplikaty tylko w wybranych kolumnach
-            new_data = data.drop_duplicates(subset=column_names).reset_index(drop=True)
+            new_data = data.drop_duplicates(subset=column_names)
             description = f"kolumn: {', '.join(column_names)}"
 
         after = len(new_data)
@@ -452,6 +713,76 @@ def remove_duplicates(data, column_names=None):
         return None
 
 
+def compute_change_mask(processed, original):
+    """
+    sprawdza ktore komorki zmienily sie po przetwarzaniu - cala ramka naraz
+    wiersze dopasowujemy po indeksie (nie po pozycji), wiec usuniecie wierszy
+    nie przesuwa porownania; NaN == NaN traktujemy jako brak zmiany
+
+    co bierze:
+    - processed: ramka po przetwarzaniu
+    - original: ramka przed przetwarzaniem
+
+    co zwraca:
+    - ramka True/False o ksztalcie processed (True = zmieniona komorka)
+      nowe kolumny i wiersze ktorych nie bylo w oryginale = False
+    """
+
+    if processed is None:
+        return None
+
+    if original is None:
+        return pd.DataFrame(False, index=processed.index, columns=processed.columns)
+
+    # gdzie w oryginale lezy kazdy wiersz przetworzonych danych
+    if processed.index.equals(original.index):
+        positions = None
+        found = np.ones(len(processed), dtype=bool)
+    elif original.index.is_unique:
+        positions = original.index.get_indexer(processed.index)
+        found = positions >= 0
+    else:
+        # indeks z powtorzeniami nie da sie dopasowac - porownujemy po pozycji
+        positions = np.arange(len(processed))
+        found = positions < len(original)
+        positions = np.where(found, positions, -1)
+
+    mask = {}
+    for column in processed.columns:
+        if column not in original.columns:
+            mask[column] = np.zeros(len(processed), dtype=bool)
+            continue
+
+        new_values = processed[column].to_numpy()
+        old_values = original[column].to_numpy()
+        if positions is not None:
+            old_values = old_values.take(np.where(found, positions, 0))
+
+        mask[column] = _changed_values(new_values, old_values) & found
+
+    return pd.DataFrame(mask, index=processed.index, columns=processed.columns)
+
+
+def _changed_values(new_values, old_values):
+    """
+    pomocnicza - porownanie dwoch tablic tej samej dlugosci, NaN == NaN
+    liczby porownujemy jako liczby, reszte jako obiekty (bez zamiany na tekst)
+    """
+
+    if new_values.dtype.kind in 'iufb' and old_values.dtype.kind in 'iufb':
+        new_values = new_values.astype(float, copy=False)
+        old_values = old_values.astype(float, copy=False)
+        changed = new_values != old_values
+        # NaN != NaN - cofamy tylko tam gdzie oba sa puste
+        changed[changed] = ~(np.isnan(new_values[changed]) & np.isnan(old_values[changed]))
+        return changed
+
+    new_missing = pd.isna(new_values)
+    old_missing = pd.isna(old_values)
+    equal = np.asarray(new_values.astype(object) == old_values.astype(object), dtype=bool)
+    return ~(equal | (new_missing & old_missing))
+
+
 # przykladowe uzycie
 if __name__ == "__main__":
     print("testujemy przetwarzanie danych...")
@@ -481,4 +812,8 @@ if __name__ == "__main__":
     no_duplicates = remove_duplicates(test_data)
     print(f"bez duplikatow:\n{no_duplicates}")
 
+    # zmienione komorki
+    changes = compute_change_mask(handle_missing_values(test_data, method='drop'), test_data)
+    print(f"zmienione komorki:\n{changes}")
+
     print("\nwszystko dziala!")
\ No newline at end of file
@@ -0,0 +1,442 @@
+"""
+Modul do zmniejszania liczby punktow na wykresach (level of detail).
+
+Ekran ma kilkaset pikseli szerokosci - nie ma sensu rysowac miliona punktow.
+Zostawiamy ok. 2 punkty na piksel tak, zeby piki (minima i maksima) nadal byly
+widoczne:
+- min/max w kubelkach - szybkie, dla interaktywnego przegladania
+- LTTB (Largest Triangle Three Buckets) - ladniejszy ksztalt linii, do raportow
+
+Przy przyblizaniu/przesuwaniu wykresu punkty sa wybierane od nowa tylko
+z widocznego zakresu, wiec w zblizeniu widac wszystkie szczegoly.
+
+Dla wykresow punktowych z milionami punktow zamiast punktow rysujemy mape
+gestosci - histogram 2D liczony w numpy i pokazany jako obrazek (skala log).
+Po zoomie histogram liczony jest od nowa dla widocznego fragmentu.
+
+Autor: Student, ktory nie lubi czekac na wykresy
+"""
+
+import numpy as np
+import pandas as pd
+from matplotlib.image import AxesImage
+
+
+# ile punktow na jeden piksel szerokosci osi
+POINTS_PER_PIXEL = 2
+
+# ponizej tylu widocznych punktow rysujemy tez znaczniki 'o'
+MARKER_LIMIT = 200
+
+# powyzej tylu punktow wykres punktowy rysujemy jako mape gestosci
+DENSITY_THRESHOLD = 50000
+
+# ile pikseli ekranu na jedna komorke mapy gestosci
+DENSITY_CELL_PIXELS = 2
+
+# na ile pasow wzdluz x dzielimy punkty mapy gestosci (szybki wybor po zoomie)
+DENSITY_BANDS = 1024
+
+
+def min_max_downsample(x, y, n_buckets):
+    """
+    wybiera min i max z kazdego kubelka - piki zostaja na wykresie
+
+    co bierze:
+    - x: posortowane wartosci osi x (numpy)
+    - y: wartosci osi y bez NaN (numpy)
+    - n_buckets: liczba kubelkow (zwykle szerokosc osi w pikselach)
+
+    co zwraca:
+    - indeksy wybranych punktow (rosnaco) - max 2 * n_buckets + 2
+    """
+
+    n = len(y)
+    n_buckets = max(int(n_buckets), 1)
+    if n <= 2 * n_buckets + 2:
+        return np.arange(n)
+
+    # kubelki po tyle samo punktow - pelne kubelki ida przez reshape (bez petli)
+    bucket_size = int(np.ceil(n / n_buckets))
+    n_full = n // bucket_size
+    blocks = y[:n_full * bucket_size].reshape(n_full, bucket_size)
+    offsets = np.arange(n_full) * bucket_size
+
+    parts = [
+        [0, n - 1],  # konce zawsze zostaja - zakres osi sie nie zmienia
+        offsets + blocks.argmin(axis=1),
+        offsets + blocks.argmax(axis=1),
+    ]
+
+    # ostatni, niepelny kubelek
+    if n_full * bucket_size < n:
+        tail = y[n_full * bucket_size:]
+        start = n_full * bucket_size
+        parts.append([start + tail.argmin(), start + tail.argmax()])
+
+    return np.unique(np.concatenate(parts).astype(np.int64))
+
+
+def build_min_max_pyramid(y, block_size=16, min_points=4096):
+    """
+    liczy raz indeksy min i max w blokach 16, 256, 4096... punktow
+
+    dzieki temu przy zoomie nie przegladamy calego widocznego zakresu,
+    tylko gotowe bloki - czas zalezy od szerokosci osi, nie od liczby danych
+
+    co bierze:
+    - y: wartosci osi y bez NaN (numpy)
+    - block_size: ile razy kazdy poziom jest wiekszy od poprzedniego
+    - min_points: ponizej tylu punktow nie ma sensu robic piramidy
+
+    co zwraca:
+    - lista poziomow (rozmiar bloku, indeksy min, indeksy max)
+    """
+
+    levels = []
+    size = block_size
+    min_idx = max_idx = None
+    while len(y) // size >= min_points // block_size:
+        n_blocks = len(y) // size
+        if min_idx is None:
+            # pierwszy poziom z surowych danych
+            blocks = y[:n_blocks * size].reshape(n_blocks, size)
+            offsets = np.arange(n_blocks) * size
+            min_idx = offsets + blocks.argmin(axis=1)
+            max_idx = offsets + blocks.argmax(axis=1)
+        else:
+            # kolejne poziomy z poprzedniego - block_size blokow w jeden
+            min_idx = _pick_in_groups(y, min_idx[:n_blocks * block_size], block_size, np.argmin)
+            max_idx = _pick_in_groups(y, max_idx[:n_blocks * block_size], block_size, np.argmax)
+        levels.append((size, min_idx, max_idx))
+        size *= block_size
+
+    return levels
+
+
+def pyramid_downsample(pyramid, y, start, end, n_buckets):
+    """
+    min/max w kubelkach dla zakresu [start, end) z uzyciem piramidy
+
+    kubelki skladaja sie z calych blokow piramidy (granice przesuniete o mniej
+    niz pol kubelka), niepelne bloki na brzegach zakresu liczymy z surowych danych
+
+    co bierze:
+    - pyramid: wynik build_min_max_pyramid
+    - y: te same wartosci co przy budowaniu piramidy
+    - start, end: zakres indeksow widocznych punktow
+    - n_buckets: liczba kubelkow
+
+    co zwraca:
+    - indeksy wybranych punktow (rosnaco)
+    """
+
+    n_buckets = max(int(n_buckets), 1)
+    bucket_size = (end - start) / n_buckets
+
+    # najwiekszy poziom, ktorego bloki mieszcza sie min. 2 razy w kubelku
+    level = None
+    for candidate in pyramid:
+        if candidate[0] * 2 <= bucket_size:
+            level = candidate
+    if level is None:
+        return start + min_max_downsample(None, y[start:end], n_buckets)
+
+    size, min_idx, max_idx = level
+    # tylko pelne bloki w zakresie - niepelne brzegi liczymy z surowych danych
+    first = -(-start // size)
+    last = min(end // size, len(min_idx))
+    group = max(int(bucket_size // size), 1)
+
+    parts = [
+        [start, end - 1],
+        _pick_in_groups(y, min_idx[first:last], group, np.argmin),
+        _pick_in_groups(y, max_idx[first:last], group, np.argmax),
+    ]
+    for edge_start, edge_end in ((start, first * size), (last * size, end)):
+        if edge_start < edge_end:
+            parts.append(edge_start + min_max_downsample(None, y[edge_start:edge_end], 1))
+
+    return np.unique(np.concatenate(parts).astype(np.int64))
+
+
+def _pick_in_groups(y, indices, group, reducer):
+    """indeksy min/max w grupach po group kolejnych indeksow (ostatnia grupa moze byc krotsza)"""
+    n_full = len(indices) // group
+    picked = []
+    if n_full:
+        grouped = indices[:n_full * group].reshape(n_full, group)
+        choice = reducer(y[grouped], axis=1)
+        picked.append(grouped[np.arange(n_full), choice])
+    if n_full * group < len(indices):
+        rest = indices[n_full * group:]
+        picked.append(rest[[reducer(y[rest])]])
+    return np.concatenate(picked) if picked else indices[:0]
+
+
+def lttb_downsample(x, y, n_out):
+    """
+    LTTB - z kazdego kubelka bierze punkt tworzacy najwiekszy trojkat
+    z punktem wybranym wczesniej i srednia nastepnego kubelka
+
+    wolniejsze od min/max (petla po kubelkach), ale linia lepiej
+    przypomina oryginal - dobre do zapisywanych wykresow
+
+    co bierze:
+    - x: posortowane wartosci osi x (liczby)
+    - y: wartosci osi y bez NaN
+    - n_out: ile punktow zostawic (min 3)
+
+    co zwraca:
+    - indeksy wybranych punktow (rosnaco)
+    """
+
+    n = len(y)
+    n_out = max(int(n_out), 3)
+    if n <= n_out:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # granice kubelkow - pierwszy i ostatni punkt sa osobno
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    # srednie wszystkich kubelkow liczone raz, z sum skumulowanych
+    x_sums = np.concatenate([[0.0], np.cumsum(x)])
+    y_sums = np.concatenate([[0.0], np.cumsum(y)])
+    counts = np.maximum(np.diff(edges), 1)
+    x_means = (x_sums[edges[1:]] - x_sums[edges[:-1]]) / counts
+    y_means = (y_sums[edges[1:]] - y_sums[edges[:-1]]) / counts
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], max(edges[bucket + 1], edges[bucket] + 1)
+
+        # nastepny "kubelek" dla ostatniego to ostatni punkt
+        if bucket + 1 < len(x_means):
+            next_x, next_y = x_means[bucket + 1], y_means[bucket + 1]
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        # pole trojkata (bez 1/2 - liczy sie tylko ktore najwieksze)
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def downsample_for_plot(x, y, n_pixels, method='minmax'):
+    """
+    zmniejsza serie do ok. POINTS_PER_PIXEL punktow na piksel
+
+    co bierze:
+    - x: posortowane wartosci osi x (liczby)
+    - y: wartosci osi y bez NaN
+    - n_pixels: szerokosc osi w pikselach
+    - method: 'minmax' albo 'lttb'
+
+    co zwraca:
+    - indeksy wybranych punktow
+    """
+
+    if method == 'lttb':
+        return lttb_downsample(x, y, n_pixels * POINTS_PER_PIXEL)
+    return min_max_downsample(x, y, n_pixels * POINTS_PER_PIXEL // 2)
+
+
+def plot_axis_values(values):
+    """
+    zamienia kolumne na wartosci, po ktorych da sie sortowac i ciac zakresem
+    (liczby albo daty - tekst z datami probujemy zamienic na daty)
+
+    co bierze:
+    - values: seria pandas
+
+    co zwraca:
+    - seria liczb/dat albo None jak sie nie da (np. kategorie)
+    """
+
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    # np. kolumna Date w formacie DD/MM/YYYY
+    parsed = pd.to_datetime(values, dayfirst=True, errors='coerce')
+    if parsed.notna().mean() >= 0.9:
+        return parsed
+    return None
+
+
+def attach_line_lod(ax, line, x, y, method='minmax'):
+    """
+    podpina do osi automatyczne przeliczanie punktow linii przy zoomie/przesuwaniu
+
+    linia na starcie dostaje punkty dla calego zakresu, potem po kazdej
+    zmianie zakresu osi x (pasek narzedzi, kolko myszy) tylko widoczny
+    fragment jest zmniejszany do szerokosci osi w pikselach
+
+    co bierze:
+    - ax: osie matplotlib z linia
+    - line: obiekt Line2D do aktualizacji
+    - x: posortowane wartosci osi x (numpy, liczby albo datetime64)
+    - y: wartosci osi y bez NaN (numpy)
+    - method: 'minmax' albo 'lttb'
+
+    co zwraca:
+    - funkcje odswiezajaca (mozna wywolac recznie, np. po zmianie rozmiaru)
+    """
+
+    # do wyszukiwania zakresu potrzebujemy liczb w jednostkach osi
+    if np.issubdtype(x.dtype, np.datetime64):
+        import matplotlib.dates as mdates
+        x_numbers = mdates.date2num(x)
+    else:
+        x_numbers = x.astype(np.float64, copy=False)
+
+    pyramid = build_min_max_pyramid(y) if method == 'minmax' else None
+
+    def refresh(changed_ax=None):
+        left, right = sorted(ax.get_xlim())
+        # jeden punkt zapasu z kazdej strony - linia dochodzi do krawedzi osi
+        start = max(np.searchsorted(x_numbers, left, side='left') - 1, 0)
+        end = min(np.searchsorted(x_numbers, right, side='right') + 1, len(x_numbers))
+
+        n_pixels = max(int(ax.bbox.width), 100)
+        if pyramid is not None:
+            indices = pyramid_downsample(pyramid, y, start, end, n_pixels * POINTS_PER_PIXEL // 2)
+        else:
+            indices = start + downsample_for_plot(x_numbers[start:end], y[start:end], n_pixels, method)
+
+        line.set_data(x[indices], y[indices])
+        line.set_marker('o' if len(indices) <= MARKER_LIMIT else 'None')
+
+        if changed_ax is not None:
+            ax.figure.canvas.draw_idle()
+
+    # zwykla funkcja (nie metoda) - CallbackRegistry trzyma ja na stale razem z osiami
+    ax.callbacks.connect('xlim_changed', refresh)
+    refresh()
+    return refresh
+
+
+def density_grid(x, y, x_range, y_range, shape):
+    """
+    liczy histogram 2D punktow (ile punktow wpada w kazda komorke)
+
+    szybciej niz np.histogram2d - komorki sa rowne, wiec numer komorki
+    to zwykle mnozenie, a zliczanie robi jeden np.bincount
+
+    co bierze:
+    - x, y: wspolrzedne punktow (numpy, bez NaN)
+    - x_range, y_range: (od, do) - punkty spoza zakresu sa pomijane
+    - shape: (liczba komorek w poziomie, w pionie)
+
+    co zwraca:
+    - tablica liczebnosci o wymiarach (w pionie, w poziomie)
+    """
+
+    nx, ny = max(int(shape[0]), 1), max(int(shape[1]), 1)
+    x0, x1 = x_range
+    y0, y1 = y_range
+    if x1 <= x0 or y1 <= y0:
+        return np.zeros((ny, nx), dtype=np.int64)
+
+    column = (x - x0) * (nx / (x1 - x0))
+    row = (y - y0) * (ny / (y1 - y0))
+
+    # punkt dokladnie na prawej/gornej krawedzi liczymy do ostatniej komorki
+    inside = (column >= 0) & (column <= nx) & (row >= 0) & (row <= ny)
+    column = np.minimum(column[inside].astype(np.int64), nx - 1)
+    row = np.minimum(row[inside].astype(np.int64), ny - 1)
+
+    return np.bincount(row * nx + column, minlength=nx * ny).reshape(ny, nx)
+
+
+def add_density_image(ax, x, y, cmap='viridis'):
+    """
+    rysuje mape gestosci punktow, ktora sama przelicza sie po zoomie
+
+    co bierze:
+    - ax: osie matplotlib
+    - x, y: wspolrzedne punktow (numpy, bez NaN)
+    - cmap: mapa kolorow
+
+    co zwraca:
+    - obraz (AxesImage) - np. do fig.colorbar
+    """
+
+    from matplotlib.colors import LogNorm
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    image = _DensityImage(ax, x, y, cmap=cmap, norm=LogNorm(vmin=1, vmax=2))
+    ax.add_image(image)
+
+    # zakres osi ustawiamy raz z danych - potem zmienia go tylko uzytkownik
+    x_range = _padded_range(x)
+    y_range = _padded_range(y)
+    ax.set_xlim(*x_range)
+    ax.set_ylim(*y_range)
+    ax.set_autoscale_on(False)
+    image.rebin()
+    return image
+
+
+def _padded_range(values):
+    low, high = float(values.min()), float(values.max())
+    margin = (high - low) * 0.02 or 0.5
+    return low - margin, high + margin
+
+
+class _DensityImage(AxesImage):
+    """obraz mapy gestosci - przed rysowaniem sprawdza, czy zakres osi sie zmienil"""
+
+    def __init__(self, ax, x, y, **kwargs):
+        super().__init__(ax, origin='lower', interpolation='nearest', **kwargs)
+
+        # punkty ukladamy pasami wzdluz x (sortowanie kubelkowe po int16 jest szybkie),
+        # zeby po zoomie liczyc tylko widoczne pasy, a nie wszystkie punkty
+        self._x_low, x_high = float(x.min()), float(x.max())
+        self._band_width = (x_high - self._x_low) / DENSITY_BANDS or 1.0
+        bands = np.minimum((x - self._x_low) / self._band_width, DENSITY_BANDS - 1).astype(np.int16)
+        order = np.argsort(bands, kind='stable')
+        self._x = x[order]
+        self._y = y[order]
+        self._band_starts = np.searchsorted(bands[order], np.arange(DENSITY_BANDS + 1))
+        self._binned_view = None
+
+    def rebin(self):
+        """liczy histogram od nowa, jesli zakres albo rozmiar osi sie zmienil"""
+        ax = self.axes
+        x_range, y_range = sorted(ax.get_xlim()), sorted(ax.get_ylim())
+        shape = (max(int(ax.bbox.width) // DENSITY_CELL_PIXELS, 10),
+                 max(int(ax.bbox.height) // DENSITY_CELL_PIXELS, 10))
+        view = (tuple(x_range), tuple(y_range), shape)
+        if view == self._binned_view:
+            return
+
+        # tylko pasy, ktore zachodza na widoczny zakres x
+        first = int(np.clip((x_range[0] - self._x_low) // self._band_width, 0, DENSITY_BANDS))
+        last = int(np.clip((x_range[1] - self._x_low) // self._band_width + 1, 0, DENSITY_BANDS))
+        start, end = self._band_starts[first], self._band_starts[last]
+
+        counts = density_grid(self._x[start:end], self._y[start:end], x_range, y_range, shape)
+        # puste komorki przezroczyste - log(0) i tak nie istnieje
+        self.set_data(np.ma.masked_equal(counts, 0))
+        self.set_extent((*x_range, *y_range))
+        self.norm.vmax = max(int(counts.max()), 2)
+        self._binned_view = view
+
+    def draw(self, renderer):
+        # jedno przeliczenie na klatke, nawet gdy zoom zmienia x i y osobno
+        self.rebin()
+        super().draw(renderer)
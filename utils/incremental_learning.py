@@ -0,0 +1,227 @@
+"""
+Modul do uczenia klasyfikatorow na plikach wiekszych niz pamiec.
+
+Plik czytamy kawalkami (load_csv_in_chunks) i w pamieci trzymamy naraz tylko
+jeden kawalek. Klasyfikatory z partial_fit (SGD, naive Bayes,
+passive-aggressive) ucza sie kawalek po kawalku:
+
+1. pierwsze przejscie - StandardScaler.partial_fit (srednie i wariancje),
+   lista klas i liczba wierszy; nic wiecej nie zapamietujemy
+2. kolejne przejscia (epoki) - skalowanie kawalka i partial_fit na
+   wymieszanych wierszach kawalka
+
+Ostatnie test_size wierszy pliku (najpozniejsze w czasie) nie ida do uczenia.
+Ocenia je model w ostatniej epoce - sa na koncu pliku, wiec model jest juz
+wtedy nauczony. Zapamietujemy tylko macierz pomylek (klasy x klasy),
+wiec pamiec nie zalezy od dlugosci pliku.
+
+Autor: Student, ktoremu archiwum nie miesci sie w RAM
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.classification import INCREMENTAL_CLASSIFIERS, make_classifier
+from utils.data_loader import estimate_row_count, load_csv_in_chunks
+
+
+# ile wierszy w kawalku - pamiec to mniej wiecej kawalek x liczba kolumn x 8 bajtow
+CHUNK_SIZE = 100000
+
+
+def train_incremental(file_path, features, target, classifier="SGD", params=None, epochs=3,
+                      test_size=0.2, chunk_size=CHUNK_SIZE, separator=';', encoding='ISO-8859-1',
+                      progress_callback=None, should_stop=None, random_state=42):
+    """
+    uczy klasyfikator z partial_fit na pliku csv czytanym kawalkami
+
+    co bierze:
+    - file_path: plik csv (moze byc wiekszy niz pamiec)
+    - features: kolumny cech (liczbowe), target: kolumna etykiety
+    - classifier, params: nazwa z INCREMENTAL_CLASSIFIERS i jej parametry
+    - epochs: ile razy przechodzimy po danych treningowych
+    - test_size: jaka czesc wierszy z konca pliku zostawiamy do oceny
+    - chunk_size: ile wierszy w kawalku
+    - separator, encoding: jak w load_csv_in_chunks
+    - progress_callback: funkcja (procent, opis)
+    - should_stop: funkcja bez argumentow, True = przerywamy
+
+    co zwraca:
+    - slownik: model, scaler, classes, accuracy, report (jak classification_report
+      z output_dict=True), samples, train_rows, test_rows, seconds
+      albo None jak sie nie udalo
+    """
+
+    from sklearn.preprocessing import StandardScaler
+
+    if classifier not in INCREMENTAL_CLASSIFIERS:
+        print(f"{classifier} nie umie sie uczyc kawalkami (brak partial_fit)")
+        return None
+
+    # skalujemy sami (StandardScaler.partial_fit w pierwszym przejsciu) - bez Pipeline
+    model = make_classifier(classifier, params, random_state, scale=False)
+    start = time.perf_counter()
+    columns = list(features) + [target]
+    estimated_rows = max(estimate_row_count(file_path), 1)
+    total_work = estimated_rows * (epochs + 1)
+
+    def report(rows_done, message):
+        if progress_callback is not None:
+            progress_callback(min(99.0, rows_done / total_work * 100), message)
+
+    # przejscie 1: skaler, klasy i liczba wierszy
+    scaler = StandardScaler()
+    classes = None
+    samples = 0
+    for X, y in _feature_chunks(file_path, features, target, columns, chunk_size, separator, encoding):
+        if should_stop is not None and should_stop():
+            print("uczenie przerwane")
+            return None
+        scaler.partial_fit(X)
+        chunk_classes = np.unique(y)
+        classes = chunk_classes if classes is None else np.union1d(classes, chunk_classes)
+        samples += len(y)
+        report(samples, "statystyki cech")
+
+    if samples == 0 or classes is None or len(classes) < 2:
+        print("za malo danych albo tylko jedna klasa - nie ma czego uczyc")
+        return None
+
+    test_rows = int(samples * test_size)
+    train_rows = samples - test_rows
+    rng = np.random.default_rng(random_state)
+    confusion = np.zeros((len(classes), len(classes)), dtype=np.int64)
+
+    # kolejne przejscia: uczenie (i ocena konca pliku w ostatniej epoce)
+    rows_done = samples
+    for epoch in range(epochs):
+        last_epoch = epoch == epochs - 1
+        position = 0
+        first_call = epoch == 0
+        for X, y in _feature_chunks(file_path, features, target, columns, chunk_size, separator, encoding):
+            if should_stop is not None and should_stop():
+                print("uczenie przerwane")
+                return None
+
+            X = scaler.transform(X)
+            train_part = max(0, min(len(y), train_rows - position))
+            position += len(y)
+
+            if train_part:
+                # mieszamy wiersze w kawalku - SGD nie lubi dlugich serii podobnych wierszy
+                order = rng.permutation(train_part)
+                if first_call:
+                    model.partial_fit(X[order], y[order], classes=classes)
+                    first_call = False
+                else:
+                    model.partial_fit(X[order], y[order])
+
+            if last_epoch and train_part < len(y):
+                true_codes = np.searchsorted(classes, y[train_part:])
+                predicted_codes = np.searchsorted(classes, model.predict(X[train_part:]))
+                np.add.at(confusion, (true_codes, predicted_codes), 1)
+
+            rows_done += len(y)
+            report(rows_done, f"epoka {epoch + 1}/{epochs}")
+
+    print(f"nauczono {classifier} na {train_rows} wierszach w {epochs} epokach, "
+          f"test na {test_rows} wierszach")
+
+    return {
+        'model': model,
+        'scaler': scaler,
+        'classes': classes,
+        'accuracy': float(np.trace(confusion) / confusion.sum()) if confusion.sum() else float('nan'),
+        'report': report_from_confusion(confusion, classes),
+        'samples': samples,
+        'train_rows': train_rows,
+        'test_rows': test_rows,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def report_from_confusion(confusion, classes):
+    """
+    raport jak classification_report(output_dict=True), liczony z macierzy pomylek
+
+    co bierze:
+    - confusion: macierz pomylek (wiersze = prawdziwe klasy, kolumny = przewidziane)
+    - classes: etykiety klas w tej samej kolejnosci
+
+    co zwraca:
+    - slownik {klasa: {precision, recall, f1-score, support}, 'macro avg': ..., 'weighted avg': ...}
+    """
+
+    true_positive = np.diag(confusion).astype(np.float64)
+    support = confusion.sum(axis=1)
+    predicted = confusion.sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, true_positive / predicted, 0.0)
+        recall = np.where(support > 0, true_positive / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    report = {}
+    for index, label in enumerate(classes):
+        report[str(label)] = {
+            'precision': float(precision[index]),
+            'recall': float(recall[index]),
+            'f1-score': float(f1[index]),
+            'support': float(support[index]),
+        }
+
+    total = support.sum()
+    report['accuracy'] = float(true_positive.sum() / total) if total else 0.0
+    for name, weights in (('macro avg', None), ('weighted avg', support)):
+        if weights is not None and not weights.sum():
+            weights = None
+        report[name] = {
+            'precision': float(np.average(precision, weights=weights)),
+            'recall': float(np.average(recall, weights=weights)),
+            'f1-score': float(np.average(f1, weights=weights)),
+            'support': float(total),
+        }
+    return report
+
+
+def _feature_chunks(file_path, features, target, columns, chunk_size, separator, encoding):
+    """
+    kolejne kawalki pliku jako (X float64, y) - tylko wiersze bez brakow
+
+    etykiety liczbowe zamieniamy na float (w jednym kawalku kolumna moze byc
+    int, w innym float), pozostale na tekst - klasy musza byc porownywalne
+    miedzy kawalkami
+    """
+    for chunk in load_csv_in_chunks(file_path, separator=separator, encoding=encoding,
+                                    chunk_size=chunk_size, columns=columns):
+        X = chunk[features].apply(pd.to_numeric, errors='coerce')
+        y = chunk[target]
+        complete = X.notna().all(axis=1).to_numpy() & y.notna().to_numpy()
+        if not complete.any():
+            continue
+
+        y = y[complete]
+        y = y.to_numpy(dtype=np.float64) if pd.api.types.is_numeric_dtype(y) else y.astype(str).to_numpy()
+        yield X.to_numpy(dtype=np.float64)[complete], y
+
+
+# przykladowe uzycie
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    print("testujemy uczenie kawalkami...")
+
+    rng = np.random.default_rng(0)
+    rows = 300_000
+    test_data = pd.DataFrame(rng.normal(size=(rows, 3)), columns=['a', 'b', 'c'])
+    test_data['klasa'] = np.where(test_data['a'] + 0.5 * test_data['b'] > 0, 'wysoki', 'niski')
+
+    path = os.path.join(tempfile.mkdtemp(), 'archiwum.csv')
+    test_data.to_csv(path, sep=';', index=False, decimal=',')
+
+    for name in INCREMENTAL_CLASSIFIERS:
+        result = train_incremental(path, ['a', 'b', 'c'], 'klasa', name, chunk_size=50_000)
+        print(f"{name}: dokladnosc {result['accuracy']:.4f} ({result['seconds']:.1f} s)")
@@ -0,0 +1,455 @@
+"""
+Modul z rejestrem wytrenowanych modeli i przewidywaniem wsadowym bez GUI.
+
+Model zapisujemy razem ze wszystkim, czego trzeba do przewidywania: lista
+cech, skaler (jesli byl), etykieta i klasy. Calosc idzie do jednego pliku
+joblib, a nazwa pliku to poczatek skrotu sha256 jego zawartosci - ten sam
+model zapisany dwa razy to jeden plik, a zmieniony albo uszkodzony plik
+wychodzi przy wczytywaniu (skrot nie zgadza sie z index.json).
+
+Uwaga: joblib/pickle przy wczytywaniu moze wykonac dowolny kod - wczytujemy
+tylko pliki z wlasnego rejestru, ze zgodnym skrotem.
+
+Przewidywanie wsadowe czyta nowe pliki CSV kawalkami (load_csv_in_chunks),
+kilka plikow naraz w osobnych procesach; kazdy proces wczytuje model raz.
+
+Uzycie:
+    python -m utils.model_registry list
+    python -m utils.model_registry predict 3fa2c1d09b7e4a55 dane/marzec/*.csv --output predykcje
+    python -m utils.model_registry predict "SGD - klasa" stacja_*.csv --workers 8 --keep Date Time
+
+Autor: Student, ktory nie chce uczyc modelu od nowa co miesiac
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+REGISTRY_DIR = 'models'
+INDEX_FILE = 'index.json'
+
+# ile znakow skrotu sha256 w identyfikatorze i nazwie pliku
+ID_LENGTH = 16
+
+MODEL_KINDS = ['klasyfikacja', 'grupowanie']
+
+PREDICTION_COLUMN = 'predykcja'
+PREDICTION_SUFFIX = '_predykcje.csv'
+
+# kolumny przepisywane do pliku z przewidywaniami (o ile sa w pliku)
+DEFAULT_KEEP_COLUMNS = ['Date', 'Time']
+
+CHUNK_SIZE = 100000
+
+
+def save_model(model, features, name, kind='klasyfikacja', scaler=None, target=None,
+               metrics=None, registry_dir=REGISTRY_DIR):
+    """
+    zapisuje model z jego cechami i skalerem do rejestru
+
+    co bierze:
+    - model: wytrenowany estymator sklearn z metoda predict
+    - features: lista kolumn cech w kolejnosci uczenia
+    - name: nazwa modelu (do wyszukiwania i w liscie)
+    - kind: 'klasyfikacja' albo 'grupowanie'
+    - scaler: skaler dopasowany na danych uczacych (None = bez skalowania)
+    - target: kolumna etykiety (dla klasyfikacji)
+    - metrics: slownik z wynikami (np. {'accuracy': 0.8}) do index.json
+    - registry_dir: katalog rejestru
+
+    co zwraca:
+    - wpis z index.json (slownik) albo None jak sie nie udalo
+    """
+
+    import joblib
+    import sklearn
+
+    if not hasattr(model, 'predict'):
+        print(f"model {type(model).__name__} nie umie przypisywac nowych wierszy (brak predict)")
+        return None
+    if kind not in MODEL_KINDS:
+        print(f"nieznany rodzaj modelu: {kind}")
+        return None
+
+    bundle = {
+        'model': model,
+        'scaler': scaler,
+        'features': list(features),
+        'target': target,
+        'kind': kind,
+        'name': name,
+    }
+
+    try:
+        buffer = io.BytesIO()
+        joblib.dump(bundle, buffer, compress=3)
+        content = buffer.getvalue()
+        digest = hashlib.sha256(content).hexdigest()
+        model_id = digest[:ID_LENGTH]
+
+        os.makedirs(registry_dir, exist_ok=True)
+        file_name = f"{model_id}.joblib"
+        path = os.path.join(registry_dir, file_name)
+        if not os.path.exists(path):
+            with open(path, 'wb') as model_file:
+                model_file.write(content)
+
+        entry = {
+            'id': model_id,
+            'sha256': digest,
+            'name': name,
+            'kind': kind,
+            'estimator': type(model).__name__,
+            'features': list(features),
+            'target': target,
+            'classes': [_plain(value) for value in getattr(model, 'classes_', [])],
+            'metrics': {key: _plain(value) for key, value in (metrics or {}).items()},
+            'file': file_name,
+            'size': len(content),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'sklearn': sklearn.__version__,
+        }
+
+        entries = [e for e in list_models(registry_dir) if e['id'] != model_id]
+        entries.append(entry)
+        _write_index(entries, registry_dir)
+
+        print(f"zapisano model {name} ({model_id}, {len(content) / 1024:.0f} KB)")
+        return entry
+
+    except Exception as error:
+        print(f"ups, nie udalo sie zapisac modelu: {error}")
+        return None
+
+
+def list_models(registry_dir=REGISTRY_DIR):
+    """
+    lista modeli z index.json
+
+    co bierze:
+    - registry_dir: katalog rejestru
+
+    co zwraca:
+    - lista wpisow (pusta jak rejestru jeszcze nie ma)
+    """
+
+    path = os.path.join(registry_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+
+    try:
+        with open(path, encoding='utf-8') as index_file:
+            return json.load(index_file)
+    except (OSError, ValueError) as error:
+        print(f"nie udalo sie przeczytac {path}: {error}")
+        return []
+
+
+def find_model(model_ref, registry_dir=REGISTRY_DIR):
+    """
+    szuka wpisu po identyfikatorze (lub jego poczatku) albo po nazwie
+
+    co bierze:
+    - model_ref: id, poczatek id albo nazwa (przy kilku o tej samej nazwie - najnowszy)
+    - registry_dir: katalog rejestru
+
+    co zwraca:
+    - wpis z index.json albo None
+    """
+
+    entries = list_models(registry_dir)
+
+    # krotki poczatek id latwo pomylic z nazwa - od 4 znakow
+    by_id = [e for e in entries if e['id'].startswith(model_ref)] if len(model_ref) >= 4 else []
+    if len(by_id) > 1:
+        print(f"{model_ref} pasuje do kilku modeli - podaj dluzszy identyfikator")
+        return None
+    if by_id:
+        return by_id[0]
+
+    by_name = [e for e in entries if e['name'] == model_ref]
+    if not by_name:
+        print(f"nie ma w rejestrze modelu {model_ref}")
+        return None
+    return max(by_name, key=lambda e: e['created'])
+
+
+def load_model(model_ref, registry_dir=REGISTRY_DIR):
+    """
+    wczytuje model z rejestru i sprawdza skrot pliku
+
+    co bierze:
+    - model_ref: id, poczatek id albo nazwa modelu
+    - registry_dir: katalog rejestru
+
+    co zwraca:
+    - slownik (model, scaler, features, target, kind, name) albo None
+    """
+
+    import joblib
+
+    entry = find_model(model_ref, registry_dir)
+    if entry is None:
+        return None
+
+    path = os.path.join(registry_dir, entry['file'])
+    try:
+        with open(path, 'rb') as model_file:
+            content = model_file.read()
+    except OSError as error:
+        print(f"nie udalo sie przeczytac pliku modelu: {error}")
+        return None
+
+    if hashlib.sha256(content).hexdigest() != entry['sha256']:
+        print(f"plik {path} nie zgadza sie ze skrotem w rejestrze - nie wczytuje go")
+        return None
+
+    return joblib.load(io.BytesIO(content))
+
+
+def predict_frame(bundle, data):
+    """
+    przewiduje dla ramki - te same cechy i skalowanie co przy uczeniu
+
+    co bierze:
+    - bundle: wynik load_model
+    - data: ramka z kolumnami cech (inne kolumny sa pomijane)
+
+    co zwraca:
+    - seria przewidywan (indeks jak w data, wiersze z brakami w cechach = brak)
+    """
+
+    features = bundle['features']
+    X = data[features].apply(pd.to_numeric, errors='coerce')
+    complete = X.notna().all(axis=1).to_numpy()
+
+    predictions = pd.Series(pd.NA, index=data.index, dtype=object)
+    if not complete.any():
+        return predictions
+
+    X = X[complete].astype(np.float64)
+    if bundle['scaler'] is not None:
+        X = bundle['scaler'].transform(_model_input(bundle['scaler'], X))
+        X = pd.DataFrame(X, columns=features)
+
+    predictions[complete] = bundle['model'].predict(_model_input(bundle['model'], X))
+    return predictions
+
+
+def batch_predict(model_ref, input_paths, output_dir, registry_dir=REGISTRY_DIR, workers=None,
+                  chunk_size=CHUNK_SIZE, separator=';', keep_columns=None):
+    """
+    przewiduje dla wielu plikow csv - kawalkami, kilka plikow naraz
+
+    co bierze:
+    - model_ref: id albo nazwa modelu z rejestru
+    - input_paths: lista plikow csv
+    - output_dir: katalog na pliki <nazwa>_predykcje.csv; pliki o tej samej
+      nazwie z roznych katalogow (stacja1/2004-03.csv, stacja2/2004-03.csv)
+      trafiaja do podkatalogow jak na wejsciu
+    - registry_dir: katalog rejestru
+    - workers: liczba procesow (None = liczba rdzeni, najwyzej liczba plikow)
+    - chunk_size: ile wierszy czytamy naraz
+    - separator: separator kolumn w plikach wejsciowych i wyjsciowych
+    - keep_columns: kolumny przepisywane obok przewidywania (None = Date i Time)
+
+    co zwraca:
+    - lista wpisow {file, output, rows, predicted, seconds, error} albo None
+    """
+
+    entry = find_model(model_ref, registry_dir)
+    if entry is None:
+        return None
+    if not input_paths:
+        print("brak plikow do przewidywania")
+        return None
+
+    # ten sam plik podany dwa razy liczymy raz
+    input_paths = list(dict.fromkeys(input_paths))
+    outputs = _output_paths(input_paths, output_dir)
+
+    os.makedirs(output_dir, exist_ok=True)
+    keep_columns = DEFAULT_KEEP_COLUMNS if keep_columns is None else list(keep_columns)
+    settings = {'chunk_size': chunk_size, 'separator': separator,
+                'keep_columns': keep_columns}
+
+    start = time.perf_counter()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(input_paths)))
+    results = []
+    if workers == 1:
+        _init_worker(entry['id'], registry_dir)
+        for path in input_paths:
+            results.append(_predict_file(path, outputs[path], settings))
+            print(f"[{len(results)}/{len(input_paths)}] {path}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(entry['id'], registry_dir)) as pool:
+            futures = [pool.submit(_predict_file, path, outputs[path], settings) for path in input_paths]
+            for future in as_completed(futures):
+                results.append(future.result())
+                print(f"[{len(results)}/{len(input_paths)}] {results[-1]['file']}")
+
+    rows = sum(result['rows'] for result in results)
+    print(f"przewidziano {rows} wierszy w {len(input_paths)} plikach "
+          f"w {time.perf_counter() - start:.1f} s ({workers} procesow)")
+    return results
+
+
+def _output_paths(input_paths, output_dir):
+    """
+    unikalny plik wynikowy dla kazdego wejscia - sciezka wzgledem wspolnego
+    katalogu plikow wejsciowych, a gdyby i tak sie powtorzyla - numer na koncu
+    """
+    directories = [os.path.dirname(os.path.abspath(path)) for path in input_paths]
+    try:
+        common = os.path.commonpath(directories)
+    except ValueError:
+        # rozne dyski (Windows) - nie ma wspolnego katalogu
+        common = None
+
+    outputs = {}
+    used = set()
+    for path, directory in zip(input_paths, directories):
+        name = os.path.splitext(os.path.basename(path))[0]
+        relative = os.path.relpath(directory, common) if common is not None else ''
+        base = os.path.normpath(os.path.join(output_dir, relative, name))
+
+        output = base + PREDICTION_SUFFIX
+        number = 2
+        while os.path.normcase(output) in used:
+            output = f"{base}_{number}{PREDICTION_SUFFIX}"
+            number += 1
+        used.add(os.path.normcase(output))
+        outputs[path] = output
+    return outputs
+
+
+def _write_index(entries, registry_dir):
+    """zapisuje index.json przez plik tymczasowy - przerwany zapis nie psuje rejestru"""
+    path = os.path.join(registry_dir, INDEX_FILE)
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as index_file:
+        json.dump(entries, index_file, ensure_ascii=False, indent=1)
+    os.replace(temporary, path)
+
+
+def _plain(value):
+    """wartosc numpy jako zwykly typ Pythona (do JSON)"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _model_input(estimator, X):
+    """estymator uczony na ramce dostaje ramke, uczony na tablicy - tablice (bez ostrzezen sklearn)"""
+    if hasattr(estimator, 'feature_names_in_'):
+        return X
+    return X.to_numpy() if isinstance(X, pd.DataFrame) else X
+
+
+# model procesu roboczego - wczytywany raz przez _init_worker
+_worker_bundle = None
+
+
+def _init_worker(model_id, registry_dir):
+    """start procesu roboczego: model z rejestru (ze sprawdzeniem skrotu)"""
+    global _worker_bundle
+    _worker_bundle = load_model(model_id, registry_dir)
+
+
+def _predict_file(path, output, settings):
+    """przewiduje dla jednego pliku kawalkami - blad wraca we wpisie, nie przerywa reszty"""
+    import contextlib
+    from utils.data_loader import load_csv_in_chunks
+
+    start = time.perf_counter()
+    result = {'file': path, 'output': output, 'rows': 0, 'predicted': 0, 'seconds': 0.0, 'error': None}
+
+    if _worker_bundle is None:
+        result['error'] = 'nie udalo sie wczytac modelu'
+        return result
+
+    try:
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        header = True
+        # loader wypisuje komunikat po kazdym pliku - przy setkach plikow tylko zaciemnia
+        with contextlib.redirect_stdout(io.StringIO()):
+            chunks = load_csv_in_chunks(path, separator=settings['separator'],
+                                        chunk_size=settings['chunk_size'])
+            for chunk in chunks:
+                missing = [c for c in _worker_bundle['features'] if c not in chunk.columns]
+                if missing:
+                    result['error'] = f"brak kolumn: {', '.join(missing)}"
+                    break
+
+                kept = [c for c in settings['keep_columns'] if c in chunk.columns]
+                out = chunk[kept].copy()
+                out[PREDICTION_COLUMN] = predict_frame(_worker_bundle, chunk)
+                out.to_csv(output, sep=settings['separator'], decimal=',', index=False,
+                           mode='w' if header else 'a', header=header)
+                header = False
+
+                result['rows'] += len(chunk)
+                result['predicted'] += int(out[PREDICTION_COLUMN].notna().sum())
+
+        if header and result['error'] is None:
+            result['error'] = 'pusty plik albo nie udalo sie go przeczytac'
+    except Exception as error:
+        result['error'] = str(error)
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def main(arguments=None):
+    """wywolanie z linii polecen: python -m utils.model_registry list|predict ..."""
+    parser = argparse.ArgumentParser(description='Rejestr modeli i przewidywanie wsadowe bez GUI')
+    parser.add_argument('--registry', default=REGISTRY_DIR, help='katalog rejestru (domyslnie "models")')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list', help='lista zapisanych modeli')
+
+    predict_parser = commands.add_parser('predict', help='przewidywanie dla plikow csv')
+    predict_parser.add_argument('model', help='id (albo jego poczatek) lub nazwa modelu')
+    predict_parser.add_argument('files', nargs='+', help='pliki csv (mozna z * i ?)')
+    predict_parser.add_argument('--output', default='predykcje', help='katalog wynikowy')
+    predict_parser.add_argument('--workers', type=int, help='liczba procesow (domyslnie liczba rdzeni)')
+    predict_parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='wierszy w kawalku')
+    predict_parser.add_argument('--separator', default=';', help='separator kolumn')
+    predict_parser.add_argument('--keep', nargs='*', help='kolumny przepisywane obok przewidywania')
+    options = parser.parse_args(arguments)
+
+    if options.command == 'list':
+        for entry in list_models(options.registry):
+            metrics = ', '.join(f"{k}={v:.4f}" if isinstance(v, float) else f"{k}={v}"
+                                for k, v in entry['metrics'].items())
+            print(f"{entry['id']}  {entry['created']}  {entry['kind']:<12} {entry['name']}  "
+                  f"[{', '.join(entry['features'])}] {metrics}")
+        return 0
+
+    # powloka w Windows nie rozwija * - robimy to sami
+    paths = []
+    for pattern in options.files:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    results = batch_predict(options.model, paths, options.output, registry_dir=options.registry,
+                            workers=options.workers, chunk_size=options.chunk_size,
+                            separator=options.separator, keep_columns=options.keep)
+    if results is None:
+        return 1
+    for result in results:
+        if result['error']:
+            print(f"blad w {result['file']}: {result['error']}")
+    return 0 if not any(result['error'] for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,504 @@
+"""
+Modul do generowania raportow z wykresami bez GUI (tryb wsadowy).
+
+Bierze specyfikacje wykresow (JSON), rysuje je na backendzie Agg w kilku
+procesach naraz i zapisuje pliki PNG/SVG/PDF oraz index.html z podgladem.
+
+Dane wczytujemy z CSV tylko raz - zapisujemy je kolumna po kolumnie do plikow
+.npy, a kazdy proces roboczy otwiera je przez mmap (bez kopiowania i bez
+ponownego parsowania CSV). System trzyma te pliki w pamieci podrecznej raz
+dla wszystkich procesow.
+
+Uzycie:
+    python -m utils.report_generator raport.json
+    python -m utils.report_generator raport.json --workers 8 --output raport_marzec
+
+Przykladowa specyfikacja:
+    {
+        "data": "data/AirQualityUCI.csv",
+        "output": "raport",
+        "formats": ["png", "pdf"],
+        "dpi": 100,
+        "plots": [
+            {"type": "histogram", "column": ["CO(GT)", "NO2(GT)"], "month": "*", "bins": 30},
+            {"type": "line", "x": "Czas", "y": "*", "month": "*"},
+            {"type": "scatter", "x": "T", "y": "RH"},
+            {"type": "correlation", "reorder": true},
+            {"type": "calendar", "column": "*", "stat": "max"}
+        ]
+    }
+
+Lista w polu = osobny wykres dla kazdej wartosci (wszystkie kombinacje),
+"*" w polu kolumny = wszystkie kolumny liczbowe, "month": "*" = kazdy miesiac,
+"station": "*" = kazda stacja (kolumna stacji w "station_column").
+Kolumna "Czas" powstaje z Date + Time.
+
+Autor: Student, ktory nie chce klikac 500 wykresow
+"""
+
+import argparse
+import contextlib
+import html
+import io
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+
+# typ wykresu -> (funkcja z utils.visualization, pola przekazywane po kolei)
+PLOT_TYPES = {
+    'histogram': ('create_histogram', ['column']),
+    'boxplot': ('create_boxplot', ['column']),
+    'scatter': ('create_scatter_plot', ['x', 'y']),
+    'line': ('create_line_plot', ['x', 'y']),
+    'bar': ('create_bar_chart', ['x', 'y']),
+    'pie': ('create_pie_chart', ['column']),
+    'correlation': ('create_correlation_heatmap', []),
+    'diurnal': ('create_diurnal_heatmap', ['column']),
+    'calendar': ('create_calendar_heatmap', ['column']),
+}
+
+# domyslne tytuly - uzupelniane o miesiac/stacje
+PLOT_TITLES = {
+    'histogram': 'Histogram - {column}',
+    'boxplot': 'Wykres pudełkowy - {column}',
+    'scatter': '{x} vs {y}',
+    'line': 'Szereg czasowy - {y}',
+    'bar': 'Wykres słupkowy - {x}',
+    'pie': 'Wykres kołowy - {column}',
+    'correlation': 'Mapa korelacji',
+    'diurnal': 'Profil tygodniowy - {column}',
+    'calendar': 'Kalendarz - {column}',
+}
+
+# pola specyfikacji, ktore nie ida do funkcji rysujacej
+FILTER_FIELDS = ['month', 'station']
+SPEC_FIELDS = ['type', 'name'] + FILTER_FIELDS
+
+SUPPORTED_FORMATS = ['png', 'svg', 'pdf', 'jpg']
+
+# kolumna czasu skladana z Date + Time
+TIME_COLUMN = 'Czas'
+
+CACHE_DIR_NAME = '.cache'
+MONTH_FILE = '__miesiac__.npy'
+
+
+def build_data_cache(data, cache_dir, source=None):
+    """
+    zapisuje ramke kolumna po kolumnie do plikow .npy (do otwierania przez mmap)
+
+    liczby i daty ida wprost, tekst jako kody (pd.factorize) + lista kategorii
+
+    co bierze:
+    - data: ramka pandas
+    - cache_dir: katalog na pliki
+    - source: opis zrodla (sciezka, rozmiar, data zmiany) - do sprawdzania aktualnosci
+
+    co zwraca:
+    - slownik z opisem cache (to samo co w meta.json)
+    """
+
+    os.makedirs(cache_dir, exist_ok=True)
+    from utils.resampling import parse_timestamps
+
+    columns = []
+    for position, column in enumerate(data.columns):
+        values = data[column]
+        file_name = f'kolumna_{position}.npy'
+        entry = {'name': str(column), 'file': file_name}
+
+        if pd.api.types.is_datetime64_any_dtype(values):
+            np.save(os.path.join(cache_dir, file_name), values.to_numpy(dtype='datetime64[ns]').view(np.int64))
+            entry['kind'] = 'datetime'
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            np.save(os.path.join(cache_dir, file_name), values.to_numpy(dtype=np.float64))
+            entry['kind'] = 'numeric'
+        else:
+            codes, categories = pd.factorize(values)
+            np.save(os.path.join(cache_dir, file_name), codes.astype(np.int32))
+            entry['kind'] = 'category'
+            entry['categories'] = [str(category) for category in categories]
+
+        columns.append(entry)
+
+    # miesiac kazdego wiersza (rrrrmm, -1 = brak daty) - szybkie filtrowanie w procesach
+    timestamps = data[TIME_COLUMN] if TIME_COLUMN in data.columns else parse_timestamps(data)
+    if timestamps is not None:
+        months = (timestamps.dt.year * 100 + timestamps.dt.month).fillna(-1).to_numpy(dtype=np.int32)
+    else:
+        months = np.full(len(data), -1, dtype=np.int32)
+    np.save(os.path.join(cache_dir, MONTH_FILE), months)
+
+    meta = {'source': source, 'rows': len(data), 'columns': columns}
+    with open(os.path.join(cache_dir, 'meta.json'), 'w', encoding='utf-8') as meta_file:
+        json.dump(meta, meta_file, ensure_ascii=False, indent=1)
+
+    print(f"zapisano cache danych: {len(columns)} kolumn, {len(data)} wierszy -> {cache_dir}")
+    return meta
+
+
+def load_data_cache(cache_dir):
+    """
+    otwiera cache przez mmap - kolumny liczbowe nie sa kopiowane do pamieci procesu
+
+    co bierze:
+    - cache_dir: katalog z build_data_cache
+
+    co zwraca:
+    - (ramka pandas, tablica miesiecy rrrrmm) albo (None, None)
+    """
+
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        print(f"nie ma cache danych w {cache_dir}")
+        return None, None
+
+    with open(meta_path, encoding='utf-8') as meta_file:
+        meta = json.load(meta_file)
+
+    columns = {}
+    for entry in meta['columns']:
+        values = np.load(os.path.join(cache_dir, entry['file']), mmap_mode='r')
+        if entry['kind'] == 'datetime':
+            columns[entry['name']] = values.view('datetime64[ns]')
+        elif entry['kind'] == 'category':
+            columns[entry['name']] = pd.Categorical.from_codes(values, entry['categories'])
+        else:
+            columns[entry['name']] = values
+
+    months = np.load(os.path.join(cache_dir, MONTH_FILE), mmap_mode='r')
+    return pd.DataFrame(columns, copy=False), months
+
+
+def expand_plot_specs(plots, data, months, station_column=None):
+    """
+    rozwija specyfikacje: listy i "*" -> osobny wykres dla kazdej kombinacji
+
+    co bierze:
+    - plots: lista slownikow ze specyfikacji
+    - data: ramka (do "*" = wszystkie kolumny liczbowe)
+    - months: miesiace wierszy (do "month": "*")
+    - station_column: kolumna stacji (do "station": "*")
+
+    co zwraca:
+    - lista pojedynczych zadan (slowniki z jedna wartoscia w kazdym polu)
+    """
+
+    numeric_columns = [str(c) for c in data.select_dtypes(include=[np.number]).columns]
+    all_months = [f'{m // 100}-{m % 100:02d}' for m in np.unique(months) if m >= 0]
+    all_stations = []
+    if station_column is not None and station_column in data.columns:
+        all_stations = [str(s) for s in pd.unique(data[station_column].dropna())]
+
+    jobs = []
+    for plot in plots:
+        if plot.get('type') not in PLOT_TYPES:
+            print(f"nieznany typ wykresu: {plot.get('type')} - pomijam")
+            continue
+
+        _, positional = PLOT_TYPES[plot['type']]
+        options = {}
+        for field, value in plot.items():
+            if value == '*' and field in positional:
+                value = numeric_columns
+            elif value == '*' and field == 'month':
+                value = all_months
+            elif value == '*' and field == 'station':
+                value = all_stations
+            options[field] = value if isinstance(value, list) else [value]
+
+        # wszystkie kombinacje wartosci
+        fields = list(options)
+        for combination in itertools.product(*(options[field] for field in fields)):
+            jobs.append(dict(zip(fields, combination)))
+
+    # unikalne nazwy plikow
+    used = {}
+    for job in jobs:
+        name = job.get('name') or _default_name(job)
+        count = used.get(name, 0)
+        used[name] = count + 1
+        job['name'] = name if count == 0 else f'{name}_{count + 1}'
+
+    return jobs
+
+
+def generate_report(spec, output_dir=None, workers=None):
+    """
+    generuje wszystkie wykresy ze specyfikacji i index.html
+
+    co bierze:
+    - spec: slownik specyfikacji albo sciezka do pliku JSON
+    - output_dir: katalog wynikowy (None = "output" ze specyfikacji)
+    - workers: liczba procesow (None = liczba rdzeni, 1 = bez puli procesow)
+
+    co zwraca:
+    - lista wpisow indeksu (nazwa, pliki, czas, blad) albo None jak sie nie udalo
+    """
+
+    start = time.perf_counter()
+
+    if isinstance(spec, str):
+        with open(spec, encoding='utf-8') as spec_file:
+            spec = json.load(spec_file)
+
+    output_dir = output_dir or spec.get('output', 'raport')
+    formats = [f.lower() for f in spec.get('formats', ['png']) if f.lower() in SUPPORTED_FORMATS]
+    if not formats:
+        print(f"brak obslugiwanych formatow - dozwolone: {SUPPORTED_FORMATS}")
+        return None
+
+    dpi = spec.get('dpi', 100)
+    station_column = spec.get('station_column')
+    workers = workers or spec.get('workers') or os.cpu_count() or 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    cache_dir = _prepare_cache(spec, output_dir)
+    if cache_dir is None:
+        return None
+
+    data, months = load_data_cache(cache_dir)
+    jobs = expand_plot_specs(spec.get('plots', []), data, months, station_column)
+    if not jobs:
+        print("specyfikacja nie zawiera zadnych wykresow")
+        return None
+
+    print(f"rysujemy {len(jobs)} wykresow w {workers} procesach...")
+    settings = {'output_dir': output_dir, 'formats': formats, 'dpi': dpi,
+                'station_column': station_column}
+
+    if workers == 1:
+        # bez puli - przydatne do szukania bledow
+        _init_worker(cache_dir)
+        entries = _render_batch(jobs, settings)
+    else:
+        entries = _render_in_pool(jobs, settings, cache_dir, workers)
+
+    # kolejnosc jak w specyfikacji
+    order = {job['name']: position for position, job in enumerate(jobs)}
+    entries.sort(key=lambda entry: order[entry['name']])
+    write_index(entries, output_dir, title=spec.get('title', 'Raport'))
+
+    failed = sum(1 for entry in entries if entry['error'])
+    print(f"gotowe: {len(entries) - failed} wykresow, {failed} bledow, "
+          f"{time.perf_counter() - start:.1f} s -> {os.path.join(output_dir, 'index.html')}")
+    return entries
+
+
+def write_index(entries, output_dir, title='Raport'):
+    """
+    zapisuje index.json (dla programow) i index.html (podglad w przegladarce)
+
+    co bierze:
+    - entries: wpisy z generate_report
+    - output_dir: katalog raportu
+    - title: tytul strony
+    """
+
+    with open(os.path.join(output_dir, 'index.json'), 'w', encoding='utf-8') as index_file:
+        json.dump(entries, index_file, ensure_ascii=False, indent=1)
+
+    cards = []
+    for entry in entries:
+        name = html.escape(entry['name'])
+        if entry['error']:
+            cards.append(f'<div class="plot error"><h3>{name}</h3><p>{html.escape(entry["error"])}</p></div>')
+            continue
+
+        files = entry['files']
+        preview = next((f for f in files if f.endswith(('.png', '.jpg', '.svg'))), None)
+        image = f'<img src="{html.escape(preview)}" loading="lazy">' if preview else ''
+        links = ' '.join(f'<a href="{html.escape(f)}">{html.escape(f.rsplit(".", 1)[-1])}</a>' for f in files)
+        cards.append(f'<div class="plot"><h3>{name}</h3>{image}<p>{links}</p></div>')
+
+    page = f"""<!DOCTYPE html>
+<html lang="pl">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+.grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(360px, 1fr)); gap: 16px; }}
+.plot {{ border: 1px solid #ccc; padding: 8px; }}
+.plot img {{ width: 100%; }}
+.plot h3 {{ font-size: 14px; margin: 0 0 8px 0; word-break: break-all; }}
+.error {{ background: #fee; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+<p>Wykresow: {len(entries)}, wygenerowano {time.strftime('%Y-%m-%d %H:%M')}</p>
+<div class="grid">
+{chr(10).join(cards)}
+</div>
+</body>
+</html>
+"""
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as index_file:
+        index_file.write(page)
+
+
+def _prepare_cache(spec, output_dir):
+    """wczytuje CSV i buduje cache - albo uzywa istniejacego, jesli plik sie nie zmienil"""
+    from utils.data_loader import load_csv_data
+    from utils.resampling import parse_timestamps
+
+    data_path = spec.get('data')
+    if not data_path or not os.path.exists(data_path):
+        print(f"nie ma pliku z danymi: {data_path}")
+        return None
+
+    cache_dir = os.path.join(output_dir, CACHE_DIR_NAME)
+    stat = os.stat(data_path)
+    source = {'path': os.path.abspath(data_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as meta_file:
+            if json.load(meta_file).get('source') == source:
+                print(f"uzywam istniejacego cache danych: {cache_dir}")
+                return cache_dir
+
+    data = load_csv_data(data_path, separator=spec.get('separator', ';'))
+    if data is None:
+        return None
+
+    timestamps = parse_timestamps(data)
+    if timestamps is not None and TIME_COLUMN not in data.columns:
+        data[TIME_COLUMN] = timestamps
+
+    build_data_cache(data, cache_dir, source=source)
+    return cache_dir
+
+
+def _render_in_pool(jobs, settings, cache_dir, workers):
+    """rozdziela zadania na paczki i rysuje je w ProcessPoolExecutor"""
+    # kilka paczek na proces - rowne obciazenie przy malym narzucie komunikacji
+    batch_size = max(1, len(jobs) // (workers * 4))
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache_dir,)) as pool:
+        futures = [pool.submit(_render_batch, batch, settings) for batch in batches]
+        for future in as_completed(futures):
+            entries.extend(future.result())
+            print(f"[{len(entries)}/{len(jobs)}]")
+
+    return entries
+
+
+# dane procesu roboczego - wczytywane raz przez _init_worker
+_worker_data = None
+_worker_months = None
+
+
+def _init_worker(cache_dir):
+    """start procesu roboczego: backend Agg i dane z cache (mmap)"""
+    global _worker_data, _worker_months
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    _worker_data, _worker_months = load_data_cache(cache_dir)
+
+
+def _render_batch(jobs, settings):
+    """rysuje paczke wykresow w procesie roboczym"""
+    return [_render_plot(job, settings) for job in jobs]
+
+
+def _render_plot(job, settings):
+    """rysuje i zapisuje jeden wykres - bledy wracaja we wpisie, nie przerywaja raportu"""
+    import utils.visualization as visualization
+
+    start = time.perf_counter()
+    entry = {'name': job['name'], 'spec': job, 'files': [], 'seconds': 0.0, 'error': None}
+
+    try:
+        function_name, positional = PLOT_TYPES[job['type']]
+        subset = _filter_rows(job, settings['station_column'])
+
+        arguments = [job.get(field) for field in positional]
+        options = {k: v for k, v in job.items() if k not in SPEC_FIELDS and k not in positional}
+        if 'title' not in options:
+            options['title'] = _default_title(job)
+
+        # funkcje rysujace duzo wypisuja - w raporcie interesuje nas tylko wynik
+        with contextlib.redirect_stdout(io.StringIO()):
+            fig = getattr(visualization, function_name)(subset, *arguments, **options)
+
+        if fig is None:
+            entry['error'] = 'nie udalo sie narysowac wykresu (brak danych albo zle kolumny)'
+        else:
+            for file_format in settings['formats']:
+                file_name = f"{job['name']}.{file_format}"
+                fig.savefig(os.path.join(settings['output_dir'], file_name), dpi=settings['dpi'])
+                entry['files'].append(file_name)
+
+    except Exception as error:
+        entry['error'] = str(error)
+
+    entry['seconds'] = round(time.perf_counter() - start, 3)
+    return entry
+
+
+def _filter_rows(job, station_column):
+    """wiersze dla miesiaca/stacji z zadania (bez filtrow = cala ramka)"""
+    mask = None
+
+    if job.get('month') is not None:
+        year, month = str(job['month']).split('-')
+        mask = _worker_months == int(year) * 100 + int(month)
+
+    if job.get('station') is not None and station_column in _worker_data.columns:
+        station_mask = (_worker_data[station_column].astype(str) == str(job['station'])).to_numpy()
+        mask = station_mask if mask is None else mask & station_mask
+
+    if mask is None:
+        return _worker_data
+
+    subset = _worker_data.loc[mask]
+    # kategorie bez wierszy w tym wycinku nie powinny trafic na wykres
+    for column in subset.columns:
+        if isinstance(subset[column].dtype, pd.CategoricalDtype):
+            subset[column] = subset[column].cat.remove_unused_categories()
+    return subset
+
+
+def _default_name(job):
+    """nazwa pliku z typu i wartosci pol, np. histogram_CO(GT)_2004-03 -> histogram_CO_GT_2004-03"""
+    parts = [job['type']] + [str(job[field]) for field in PLOT_TYPES[job['type']][1] if job.get(field)]
+    parts += [str(job[field]) for field in FILTER_FIELDS if job.get(field) is not None]
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', '_'.join(parts)).strip('_')
+
+
+def _default_title(job):
+    """tytul z PLOT_TITLES plus miesiac i stacja"""
+    values = {field: job.get(field) for field in PLOT_TYPES[job['type']][1]}
+    title = PLOT_TITLES[job['type']].format(**values)
+    filters = [str(job[field]) for field in FILTER_FIELDS if job.get(field) is not None]
+    return f"{title} ({', '.join(filters)})" if filters else title
+
+
+def main(arguments=None):
+    """wywolanie z linii polecen: python -m utils.report_generator spec.json"""
+    parser = argparse.ArgumentParser(description='Generowanie raportu z wykresami bez GUI')
+    parser.add_argument('spec', help='plik JSON ze specyfikacja wykresow')
+    parser.add_argument('--output', help='katalog wynikowy (domyslnie "output" ze specyfikacji)')
+    parser.add_argument('--workers', type=int, help='liczba procesow (domyslnie liczba rdzeni)')
+    options = parser.parse_args(arguments)
+
+    entries = generate_report(options.spec, output_dir=options.output, workers=options.workers)
+    return 0 if entries is not None and not any(entry['error'] for entry in entries) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,564 @@
+"""
+Modul do przepróbkowania (resampling) i agregacji danych w czasie.
+Srednie dobowe, kroczace maksima 8-godzinne, percentyle miesieczne - takie rzeczy.
+
+Do tego "piramida" agregatow godzina -> dzien -> miesiac, ktora trzymamy w pamieci
+i dopisujemy do niej nowe wiersze bez liczenia wszystkiego od nowa.
+Dzieki temu wykresy w duzym przyblizeniu nie musza dotykac surowych danych.
+
+Autor: Student, który nie lubi czekać na wykresy
+"""
+
+import pandas as pd
+import numpy as np
+
+
+# poziomy piramidy: nazwa -> czestotliwosc pandas
+ROLLUP_LEVELS = [('hour', 'h'), ('day', 'D'), ('month', 'MS')]
+
+# statystyki ktore da sie laczyc kawalkami (srednia = suma / liczba)
+ROLLUP_STATS = ['sum', 'count', 'min', 'max']
+
+# podpisy dni tygodnia (poniedzialek = 0) i miesiecy do map cieplnych
+WEEKDAY_LABELS = ['pon', 'wt', 'sr', 'czw', 'pt', 'sob', 'nd']
+MONTH_LABELS = ['sty', 'lut', 'mar', 'kwi', 'maj', 'cze', 'lip', 'sie', 'wrz', 'paz', 'lis', 'gru']
+
+# statystyki dostepne w mapach cieplnych
+GRID_STATS = ['mean', 'sum', 'count', 'min', 'max']
+
+# kolumny kalendarza - tydzien roku liczony od poniedzialku (0..53)
+CALENDAR_WEEKS = 54
+
+# ile "tykniec" datetime64 przypada na godzine w danej jednostce
+TICKS_PER_HOUR = {'s': 3600, 'ms': 3_600_000, 'us': 3_600_000_000, 'ns': 3_600_000_000_000}
+
+
+def parse_timestamps(data, date_column='Date', time_column='Time'):
+    """
+    sklada kolumny Date i Time w jedna kolumne czasu - wiersz w wiersz z danymi
+    (bez sortowania i bez wyrzucania wierszy, brak daty = NaT)
+
+    co bierze:
+    - data: ramka pandas
+    - date_column: kolumna z data (DD/MM/YYYY)
+    - time_column: kolumna z godzina (HH.MM.SS), None = tylko data
+
+    co zwraca:
+    - seria z czasem albo None jak nie ma kolumny z data
+    """
+
+    if isinstance(data.index, pd.DatetimeIndex):
+        return pd.Series(data.index, index=data.index)
+
+    if date_column not in data.columns:
+        return None
+
+    # jedno wektorowe parsowanie ze stalym formatem - duzo szybsze niz zgadywanie formatu
+    if time_column is not None and time_column in data.columns:
+        text = data[date_column].astype(str) + ' ' + data[time_column].astype(str)
+        return pd.to_datetime(text, format='%d/%m/%Y %H.%M.%S', errors='coerce')
+
+    return pd.to_datetime(data[date_column], format='%d/%m/%Y', errors='coerce')
+
+
+def build_datetime_index(data, date_column='Date', time_column='Time'):
+    """
+    sklada kolumny Date i Time w indeks czasowy (DatetimeIndex)
+    wszystkie funkcje w tym module pracuja na takim indeksie
+
+    co bierze:
+    - data: ramka pandas
+    - date_column: kolumna z data (DD/MM/YYYY)
+    - time_column: kolumna z godzina (HH.MM.SS), None = tylko data
+
+    co zwraca:
+    - nowa ramka z indeksem czasowym posortowanym rosnaco albo None jak cos nie gra
+    """
+
+    if data is None:
+        print("brak danych do zbudowania indeksu czasowego")
+        return None
+
+    if isinstance(data.index, pd.DatetimeIndex):
+        return data.sort_index() if not data.index.is_monotonic_increasing else data
+
+    if date_column not in data.columns:
+        print(f"nie ma kolumny {date_column}")
+        return None
+
+    try:
+        timestamps = parse_timestamps(data, date_column, time_column)
+
+        valid = timestamps.notna().to_numpy()
+        if not valid.any():
+            print("nie udalo sie odczytac zadnej daty")
+            return None
+
+        new_data = data.loc[valid].copy()
+        new_data.index = pd.DatetimeIndex(timestamps[valid], name='datetime')
+        new_data = new_data.sort_index()
+
+        print(f"zbudowano indeks czasowy: {len(new_data)} wierszy, pominieto {int((~valid).sum())} bez daty")
+        return new_data
+
+    except Exception as error:
+        print(f"nie udalo sie zbudowac indeksu czasowego: {error}")
+        return None
+
+
+def resample_data(data, columns=None, freq='D', aggregations=('mean',), percentiles=None,
+                  rolling_window=None, rolling_aggregation='mean'):
+    """
+    liczy agregaty w przedzialach czasu (np. srednie dobowe) - wszystko w jednym grupowaniu
+    opcjonalnie najpierw liczy okno kroczace, np. srednia 8h -> maksimum dobowe (norma dla CO)
+
+    co bierze:
+    - data: ramka pandas z indeksem czasowym (albo z kolumnami Date/Time)
+    - columns: ktore kolumny agregowac (None = wszystkie liczbowe)
+    - freq: przedzial czasu pandas ('h', 'D', 'W', 'MS', ...)
+    - aggregations: lista agregatow ('mean', 'min', 'max', 'sum', 'count', 'std', 'median')
+    - percentiles: lista percentyli 0-100, np. [50, 95, 98]
+    - rolling_window: okno kroczace, np. '8h' (None = bez okna)
+    - rolling_aggregation: co liczyc w oknie kroczacym ('mean', 'max', ...)
+
+    co zwraca:
+    - ramka z kolumnami (kolumna, agregat) albo None jak cos nie gra
+    """
+
+    data = build_datetime_index(data)
+    if data is None:
+        return None
+
+    if columns is None:
+        columns = list(data.select_dtypes(include=[np.number]).columns)
+
+    missing_columns = [c for c in columns if c not in data.columns]
+    if missing_columns:
+        print(f"nie ma takich kolumn: {missing_columns}")
+        return None
+
+    try:
+        values = data[columns]
+
+        if rolling_window is not None:
+            # okno czasowe a nie liczba wierszy - dziury w danych nie psuja wyniku
+            values = values.rolling(rolling_window, min_periods=1).agg(rolling_aggregation)
+
+        # jedno grupowanie - kody przedzialow liczone raz dla wszystkich agregatow
+        grouped = values.resample(freq)
+        parts = []
+
+        if aggregations:
+            result = grouped.agg(list(aggregations))
+            parts.append(result)
+
+        if percentiles:
+            quantiles = grouped.quantile([p / 100 for p in percentiles])
+            quantiles = quantiles.unstack(level=-1)
+            quantiles.columns = pd.MultiIndex.from_tuples(
+                [(column, f"p{_format_percentile(q * 100)}") for column, q in quantiles.columns]
+            )
+            parts.append(quantiles)
+
+        if not parts:
+            print("nie wybrano zadnych agregatow")
+            return None
+
+        result = pd.concat(parts, axis=1)
+        result = result[sorted(result.columns, key=lambda c: columns.index(c[0]))]
+
+        prefix = f"{rolling_aggregation} {rolling_window} -> " if rolling_window else ""
+        print(f"policzono agregaty ({prefix}{freq}): {len(result)} przedzialow x {len(result.columns)} kolumn")
+        return result
+
+    except Exception as error:
+        print(f"nie udalo sie policzyc agregatow: {error}")
+        return None
+
+
+def _format_percentile(value):
+    """pomocnicza - 95.0 -> '95', 99.9 -> '99.9'"""
+    return f"{value:g}"
+
+
+def build_rollup_pyramid(data, columns=None):
+    """
+    buduje piramide agregatow godzina -> dzien -> miesiac
+    kazdy poziom trzyma sume, liczbe, minimum i maksimum - z nich da sie potem
+    liczyc srednie i dokladac nowe dane bez powrotu do surowych wierszy
+
+    co bierze:
+    - data: ramka pandas z indeksem czasowym (albo z kolumnami Date/Time)
+    - columns: ktore kolumny agregowac (None = wszystkie liczbowe)
+
+    co zwraca:
+    - slownik {'columns': [...], 'levels': {poziom: {statystyka: ramka}}} albo None
+    """
+
+    data = build_datetime_index(data)
+    if data is None:
+        return None
+
+    if columns is None:
+        columns = list(data.select_dtypes(include=[np.number]).columns)
+
+    if not columns:
+        print("nie ma kolumn liczbowych do piramidy")
+        return None
+
+    try:
+        pyramid = {'columns': list(columns), 'levels': {}}
+
+        # poziom najnizszy z surowych danych, kazdy wyzszy z poprzedniego
+        partials = _summarize_rows(data[columns], ROLLUP_LEVELS[0][1])
+        pyramid['levels'][ROLLUP_LEVELS[0][0]] = partials
+
+        for level_name, freq in ROLLUP_LEVELS[1:]:
+            partials = _summarize_partials(partials, freq)
+            pyramid['levels'][level_name] = partials
+
+        sizes = ", ".join(f"{name}: {len(pyramid['levels'][name]['count'])}" for name, _ in ROLLUP_LEVELS)
+        print(f"zbudowano piramide agregatow ({sizes})")
+        return pyramid
+
+    except Exception as error:
+        print(f"nie udalo sie zbudowac piramidy agregatow: {error}")
+        return None
+
+
+def append_to_rollup_pyramid(pyramid, new_rows):
+    """
+    dopisuje nowe wiersze do istniejacej piramidy
+    przeliczamy tylko te godziny/dni/miesiace do ktorych trafily nowe dane
+
+    co bierze:
+    - pyramid: piramida z build_rollup_pyramid
+    - new_rows: ramka pandas z nowymi pomiarami (indeks czasowy albo Date/Time)
+
+    co zwraca:
+    - ta sama piramida (zmieniona w miejscu) albo None jak cos nie gra
+    """
+
+    if pyramid is None:
+        print("brak piramidy do uzupelnienia")
+        return None
+
+    new_rows = build_datetime_index(new_rows)
+    if new_rows is None or len(new_rows) == 0:
+        return pyramid
+
+    try:
+        columns = pyramid['columns']
+        increment = _summarize_rows(new_rows.reindex(columns=columns), ROLLUP_LEVELS[0][1])
+
+        # przyrost idzie w gore piramidy - kazdy poziom laczy go ze swoimi przedzialami
+        for position, (level_name, freq) in enumerate(ROLLUP_LEVELS):
+            if position > 0:
+                increment = _summarize_partials(increment, freq)
+            _merge_partials(pyramid['levels'][level_name], increment)
+
+        print(f"dopisano {len(new_rows)} wierszy do piramidy agregatow")
+        return pyramid
+
+    except Exception as error:
+        print(f"nie udalo sie dopisac danych do piramidy: {error}")
+        return None
+
+
+def get_rollup(pyramid, level='day', stat='mean', start=None, end=None):
+    """
+    odczytuje jeden poziom piramidy - np. srednie dobowe dla wykresu
+
+    co bierze:
+    - pyramid: piramida z build_rollup_pyramid
+    - level: 'hour', 'day' albo 'month'
+    - stat: 'mean', 'sum', 'count', 'min' albo 'max'
+    - start, end: opcjonalny zakres czasu
+
+    co zwraca:
+    - ramka (przedzialy x kolumny) albo None
+    """
+
+    if pyramid is None or level not in pyramid['levels']:
+        print(f"nie ma poziomu {level} w piramidzie")
+        return None
+
+    partials = pyramid['levels'][level]
+
+    if stat == 'mean':
+        counts = partials['count'].loc[start:end]
+        result = partials['sum'].loc[start:end] / counts.where(counts > 0)
+    elif stat in partials:
+        result = partials[stat].loc[start:end]
+    else:
+        print(f"nieznana statystyka: {stat}")
+        return None
+
+    return result.copy()
+
+
+def diurnal_profile(data, column, stat='mean', pyramid=None):
+    """
+    profil tygodniowy: dzien tygodnia x godzina (7 x 24) - jedno grupowanie po kodzie
+
+    kod komorki = dzien_tygodnia * 24 + godzina liczony na liczbach (bez dt.*),
+    a statystyka przez np.bincount - czas zalezy tylko od liczby wierszy
+
+    co bierze:
+    - data: ramka pandas (indeks czasowy, kolumna z datami albo Date/Time)
+    - column: ktora kolumne agregowac
+    - stat: 'mean', 'sum', 'count', 'min' albo 'max'
+    - pyramid: piramida z build_rollup_pyramid - jak jest, liczymy z poziomu
+      godzinowego zamiast z surowych wierszy
+
+    co zwraca:
+    - ramka 7 x 24 (wiersze: dni tygodnia, kolumny: godziny) albo None
+    """
+
+    if stat not in GRID_STATS:
+        print(f"nieznana statystyka: {stat} (dostepne: {GRID_STATS})")
+        return None
+
+    source = _grid_source(data, column, pyramid, 'hour')
+    if source is None:
+        return None
+
+    ticks, ticks_per_hour, values = source
+    # godziny od 1970-01-01 (czwartek): +3 dni daje poniedzialek = 0,
+    # a reszta z dzielenia przez tydzien to od razu dzien_tygodnia * 24 + godzina
+    codes = (ticks // ticks_per_hour + 3 * 24) % (7 * 24)
+
+    grid = _grid_stat(codes, values, 7 * 24, stat).reshape(7, 24)
+    return pd.DataFrame(grid, index=WEEKDAY_LABELS, columns=range(24))
+
+
+def calendar_grid(data, column, stat='mean', pyramid=None):
+    """
+    kalendarz: dla kazdego roku siatka dzien tygodnia x tydzien roku (7 x 54)
+
+    najpierw jedno grupowanie wierszy po numerze dnia (np.bincount),
+    potem dni (kilka tysiecy) rozkladamy do komorek kalendarza
+
+    co bierze:
+    - data: ramka pandas (indeks czasowy, kolumna z datami albo Date/Time)
+    - column: ktora kolumne agregowac
+    - stat: 'mean', 'sum', 'count', 'min' albo 'max'
+    - pyramid: piramida z build_rollup_pyramid - jak jest, liczymy z poziomu dziennego
+
+    co zwraca:
+    - (tablica lata x 7 x 54, lista lat) albo None
+    """
+
+    if stat not in GRID_STATS:
+        print(f"nieznana statystyka: {stat} (dostepne: {GRID_STATS})")
+        return None
+
+    source = _grid_source(data, column, pyramid, 'day')
+    if source is None:
+        return None
+
+    ticks, ticks_per_hour, values = source
+    days = ticks // (24 * ticks_per_hour)
+    first_day, last_day = int(days.min()), int(days.max())
+    daily = _grid_stat(days - first_day, values, last_day - first_day + 1, stat)
+
+    # kazdy dzien -> (rok, dzien tygodnia, tydzien roku)
+    day_numbers = np.arange(first_day, last_day + 1)
+    dates = day_numbers.astype('datetime64[D]')
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    year_starts = dates.astype('datetime64[Y]').astype('datetime64[D]').astype(np.int64)
+    weekdays = (day_numbers + 3) % 7
+    weeks = (day_numbers - year_starts + (year_starts + 3) % 7) // 7
+
+    year_list = list(range(int(years[0]), int(years[-1]) + 1))
+    grid = np.full((len(year_list), 7, CALENDAR_WEEKS), np.nan)
+    grid[years - year_list[0], weekdays, weeks] = daily
+
+    return grid, year_list
+
+
+def _grid_source(data, column, pyramid, level):
+    """
+    pomocnicza - czas jako liczby int64 (w jednostce danych, bez kopiowania
+    do nanosekund), ile ich jest na godzine, i wartosci do map cieplnych;
+    z poziomu piramidy (jak jest) albo z surowych wierszy -
+    przy piramidzie wartosci to slownik statystyk czesciowych
+    """
+
+    if pyramid is not None and level in pyramid['levels'] and column in pyramid['columns']:
+        partials = pyramid['levels'][level]
+        ticks, ticks_per_hour = _datetime_ticks(partials['count'].index)
+        values = {stat: partials[stat][column].to_numpy(dtype=np.float64) for stat in ROLLUP_STATS}
+        return ticks, ticks_per_hour, values
+
+    if data is None or column not in data.columns:
+        print(f"nie ma kolumny {column}")
+        return None
+
+    if isinstance(data.index, pd.DatetimeIndex):
+        timestamps = data.index
+    else:
+        # gotowa kolumna z czasem (np. Czas z raportu) albo skladanie z Date/Time
+        datetime_columns = [c for c in data.columns if pd.api.types.is_datetime64_any_dtype(data[c])]
+        timestamps = data[datetime_columns[0]] if datetime_columns else parse_timestamps(data)
+
+    if timestamps is None:
+        print("nie ma kolumny z czasem (Date/Time) - nie da sie zrobic mapy w czasie")
+        return None
+
+    ticks, ticks_per_hour = _datetime_ticks(timestamps)
+    values = pd.to_numeric(data[column], errors='coerce').to_numpy(dtype=np.float64)
+
+    # NaT jako liczba to najmniejszy int64
+    valid = (ticks != np.iinfo(np.int64).min) & ~np.isnan(values)
+    if not valid.any():
+        print(f"brak pomiarow z data w kolumnie {column}")
+        return None
+
+    if not valid.all():
+        ticks, values = ticks[valid], values[valid]
+    return ticks, ticks_per_hour, values
+
+
+def _datetime_ticks(timestamps):
+    """pomocnicza - daty jako int64 w ich wlasnej jednostce (s/ms/us/ns) + tykniecia na godzine"""
+
+    values = pd.DatetimeIndex(timestamps).tz_localize(None).to_numpy()
+    unit = np.datetime_data(values.dtype)[0]
+    if unit not in TICKS_PER_HOUR:
+        values, unit = values.astype('datetime64[ns]'), 'ns'
+    return values.view(np.int64), TICKS_PER_HOUR[unit]
+
+
+def _grid_stat(codes, values, size, stat):
+    """
+    pomocnicza - statystyka w grupach o kodach 0..size-1 (puste grupy = NaN)
+    values to surowe liczby albo slownik statystyk czesciowych z piramidy
+    """
+
+    partial = isinstance(values, dict)
+
+    if stat in ('mean', 'sum', 'count'):
+        if partial:
+            valid = values['count'] > 0
+            counts = np.bincount(codes[valid], weights=values['count'][valid], minlength=size)
+            sums = np.bincount(codes[valid], weights=np.nan_to_num(values['sum'][valid]), minlength=size)
+        else:
+            counts = np.bincount(codes, minlength=size).astype(np.float64)
+            sums = np.bincount(codes, weights=values, minlength=size)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = {'mean': sums / counts, 'sum': sums, 'count': counts}[stat]
+        return np.where(counts > 0, result, np.nan)
+
+    # min/max - grupowanie pandas po kodach (bincount umie tylko sumowac)
+    source = values[stat] if partial else values
+    valid = ~np.isnan(source)
+    grouped = pd.Series(source[valid]).groupby(codes[valid]).agg(stat)
+    result = np.full(size, np.nan)
+    result[grouped.index.to_numpy()] = grouped.to_numpy()
+    return result
+
+
+def _summarize_rows(values, freq):
+    """
+    pomocnicza - z surowych wierszy robi sume/liczbe/min/max w przedzialach czasu
+    puste przedzialy (dziury w pomiarach) od razu wyrzucamy
+    """
+
+    grouped = values.resample(freq)
+    partials = {
+        'sum': grouped.sum(min_count=1),
+        'count': grouped.count(),
+        'min': grouped.min(),
+        'max': grouped.max(),
+    }
+    return _drop_empty_buckets(partials)
+
+
+def _summarize_partials(partials, freq):
+    """
+    pomocnicza - laczy przedzialy nizszego poziomu w przedzialy wyzszego
+    (sumy i liczby sie dodaje, z minimow bierze minimum, z maksimow maksimum)
+    """
+
+    result = {
+        'sum': partials['sum'].resample(freq).sum(min_count=1),
+        'count': partials['count'].resample(freq).sum(),
+        'min': partials['min'].resample(freq).min(),
+        'max': partials['max'].resample(freq).max(),
+    }
+    return _drop_empty_buckets(result)
+
+
+def _drop_empty_buckets(partials):
+    """pomocnicza - wyrzuca przedzialy bez zadnego pomiaru"""
+
+    not_empty = (partials['count'] > 0).any(axis=1).to_numpy()
+    return {stat: frame.loc[not_empty] for stat, frame in partials.items()}
+
+
+def _merge_partials(level, increment):
+    """
+    pomocnicza - wkleja przyrost do poziomu piramidy (w miejscu)
+    przedzialy ktore juz istnialy laczymy, nowe po prostu doklejamy
+    """
+
+    for stat in ROLLUP_STATS:
+        current = level[stat]
+        addition = increment[stat].reindex(columns=current.columns)
+
+        common = addition.index.intersection(current.index)
+        if len(common) > 0:
+            old_values = current.loc[common].to_numpy(dtype=float)
+            new_values = addition.loc[common].to_numpy(dtype=float)
+
+            if stat in ('sum', 'count'):
+                merged = np.where(np.isnan(old_values), 0, old_values) + np.where(np.isnan(new_values), 0, new_values)
+                merged[np.isnan(old_values) & np.isnan(new_values)] = np.nan
+            elif stat == 'min':
+                merged = np.fmin(old_values, new_values)
+            else:
+                merged = np.fmax(old_values, new_values)
+
+            current = current.astype(float)
+            current.loc[common] = merged
+
+        fresh = addition.index.difference(current.index)
+        if len(fresh) > 0:
+            current = pd.concat([current, addition.loc[fresh]])
+            if not current.index.is_monotonic_increasing:
+                current = current.sort_index()
+
+        level[stat] = current
+
+
+# przykladowe uzycie
+if __name__ == "__main__":
+    print("testujemy agregacje w czasie...")
+
+    index = pd.date_range('2004-03-10 18:00', periods=24 * 70, freq='h')
+    test_data = pd.DataFrame({
+        'CO(GT)': np.random.gamma(2.0, 1.0, len(index)),
+        'NO2(GT)': np.random.normal(110, 30, len(index)),
+    }, index=index)
+
+    daily = resample_data(test_data, freq='D', aggregations=['mean', 'max'])
+    print(daily.head())
+
+    co_8h = resample_data(test_data, ['CO(GT)'], freq='D', aggregations=['max'], rolling_window='8h')
+    print(co_8h.head())
+
+    monthly = resample_data(test_data, freq='MS', aggregations=None, percentiles=[50, 98])
+    print(monthly)
+
+    pyramid = build_rollup_pyramid(test_data.iloc[:1000])
+    append_to_rollup_pyramid(pyramid, test_data.iloc[1000:])
+    print(get_rollup(pyramid, 'month'))
+    print(test_data.resample('MS').mean())
+
+    print(diurnal_profile(test_data, 'CO(GT)').round(2))
+    grid, years = calendar_grid(test_data, 'NO2(GT)', pyramid=pyramid)
+    print(f"kalendarz: lata {years}, dni z danymi: {int(np.isfinite(grid).sum())}")
+
+    print("\nwszystko dziala!")
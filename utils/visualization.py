@@ -5,11 +5,17 @@ Proste funkcje do robienia ladnych wykresow bez kombinowania.
 Każda funkcja robi jeden typ wykresu i zwraca gotowa figure.
 Mozna je potem pokazac, zapisac albo wstawic do GUI.
 
+Kazda funkcja przyjmuje tez ax= - wtedy rysuje prosto na podanych osiach
+(np. na plotnie w GUI) zamiast robic nowa figure. Nowe figury robimy przez
+matplotlib.figure.Figure, nie przez pyplot - nie zostaja w globalnym
+rejestrze pyplot i nie zjadaja pamieci, gdy nikt ich nie zamknie.
+
 Autor: Student, który lubi ladne wykresy
 """
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 import pandas as pd
 import numpy as np
 
@@ -19,21 +25,47 @@ def setup_plot_style():
     ustawia ladny styl dla wszystkich wykresow
     wywolaj to na poczatku zeby wykresy wygladaly profesjonalnie
     """
+    import seaborn as sns  # seaborn ladujemy dopiero tutaj - dlugo sie importuje
+
     sns.set_style("whitegrid")  # bialy styl z siatka
-    plt.rcParams['figure.figsize'] = (10, 6)  # domyslny rozmiar
-    plt.rcParams['font.size'] = 12  # rozmiar czcionki
+    matplotlib.rcParams['figure.figsize'] = (10, 6)  # domyslny rozmiar
+    matplotlib.rcParams['font.size'] = 12  # rozmiar czcionki
     print("ustawiono ladny styl wykresow")
 
 
-def create_histogram(data, column_name, bins=20, title=None):
+def _prepare_axes(ax, figsize):
+    """
+    daje figure i osie do rysowania
+
+    co bierze:
+    - ax: osie od wolajacego (None = robimy nowa figure)
+    - figsize: rozmiar nowej figury
+
+    co zwraca:
+    - (figure, osie) - przy podanych osiach figura to ax.figure
+    """
+    if ax is not None:
+        return ax.figure, ax
+
+    # Figure zamiast plt.subplots - bez pyplot figura nie wisi w pamieci
+    fig = Figure(figsize=figsize)
+    return fig, fig.add_subplot(111)
+
+
+def create_histogram(data, column_name, bins=20, title=None, ax=None, cache=None):
     """
     rysuje histogram - pokazuje jak czesto wystepuja rozne wartosci
 
+    histogram sklada sie z podsumowania kolumny (utils/column_summary.py) -
+    z cache zmiana liczby przedzialow nie dotyka surowych danych
+
     co bierze:
     - data: ramka pandas
     - column_name: ktora kolumne narysowac
     - bins: na ile części podzielic wartosci
     - title: tytul wykresu (None = automatyczny)
+    - ax: osie do rysowania (None = nowa figura)
+    - cache: slownik na podsumowania kolumn (None = liczymy od nowa)
 
     co zwraca:
     - obiekt figure do pokazania/zapisania
@@ -43,27 +75,31 @@ def create_histogram(data, column_name, bins=20, title=None):
         print(f"nie ma kolumny {column_name}")
         return None
 
-    # bierzemy dane bez brakow
-    values = data[column_name].dropna()
-
-    if len(values) == 0:
-        print("nie ma danych do narysowania")
-        return None
+    from utils.column_summary import get_column_summary, histogram_from_summary
 
     # sprawdzamy czy to sa liczby
-    if not np.issubdtype(values.dtype, np.number):
+    if not np.issubdtype(data[column_name].dtype, np.number):
         print("histogram dziala tylko dla liczb")
         return None
 
+    # podsumowanie pomija braki - None gdy nie zostalo nic
+    summary = get_column_summary(data, column_name, cache)
+
+    if summary is None:
+        print("nie ma danych do narysowania")
+        return None
+
     try:
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = _prepare_axes(ax, (10, 6))
 
-        # rysujemy histogram
-        ax.hist(values, bins=bins, color='skyblue', edgecolor='black', alpha=0.7)
+        # rysujemy histogram z gotowych liczebnosci (wagi na srodkach przedzialow)
+        counts, edges = histogram_from_summary(summary, bins)
+        ax.hist(edges[:-1], bins=edges, weights=counts,
+                color='skyblue', edgecolor='black', alpha=0.7)
 
         # dodajemy linie ze srednia i mediana
-        mean_val = values.mean()
-        median_val = values.median()
+        mean_val = summary['mean']
+        median_val = summary['median']
 
         ax.axvline(mean_val, color='red', linestyle='--', linewidth=2, label=f'srednia: {mean_val:.2f}')
         ax.axvline(median_val, color='green', linestyle='--', linewidth=2, label=f'mediana: {median_val:.2f}')
@@ -78,7 +114,7 @@ def create_histogram(data, column_name, bins=20, title=None):
         ax.legend()
         ax.grid(True, alpha=0.3)
 
-        plt.tight_layout()
+        fig.tight_layout()
         print(f"narysowano histogram dla {column_name}")
         return fig
 
@@ -87,15 +123,20 @@ def create_histogram(data, column_name, bins=20, title=None):
         return None
 
 
-def create_boxplot(data, column_name, title=None):
+def create_boxplot(data, column_name, title=None, ax=None, cache=None):
     """
     rysuje boxplot (wykres pudelkowy) - pokazuje rozklad danych
     widac mediane, kwartyle i wartosci odstajace
 
+    kwartyle i wasy bierzemy z podsumowania kolumny (utils/column_summary.py),
+    wiec rysowanie nie sortuje calej kolumny
+
     co bierze:
     - data: ramka pandas
     - column_name: ktora kolumne narysowac
     - title: tytul wykresu
+    - ax: osie do rysowania (None = nowa figura)
+    - cache: slownik na podsumowania kolumn (None = liczymy od nowa)
 
     co zwraca:
     - obiekt figure
@@ -105,17 +146,19 @@ def create_boxplot(data, column_name, title=None):
         print(f"nie ma kolumny {column_name}")
         return None
 
-    values = data[column_name].dropna()
+    from utils.column_summary import get_column_summary, boxplot_stats_from_summary
+
+    summary = get_column_summary(data, column_name, cache)
 
-    if len(values) == 0 or not np.issubdtype(values.dtype, np.number):
+    if summary is None:
         print("boxplot dziala tylko dla liczb")
         return None
 
     try:
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = _prepare_axes(ax, (10, 6))
 
-        # rysujemy boxplot
-        box_plot = ax.boxplot(values, patch_artist=True)
+        # rysujemy boxplot z gotowych statystyk
+        box_plot = ax.bxp([boxplot_stats_from_summary(summary, label='1')], patch_artist=True)
         box_plot['boxes'][0].set_facecolor('lightblue')
 
         # ustawiamy tytuly
@@ -126,7 +169,7 @@ def create_boxplot(data, column_name, title=None):
         ax.set_ylabel(column_name, fontsize=12)
         ax.grid(True, alpha=0.3)
 
-        plt.tight_layout()
+        fig.tight_layout()
         print(f"narysowano boxplot dla {column_name}")
         return fig
 
@@ -135,15 +178,20 @@ def create_boxplot(data, column_name, title=None):
         return None
 
 
-def create_scatter_plot(data, x_column, y_column, title=None):
+def create_scatter_plot(data, x_column, y_column, title=None, ax=None, density=None):
     """
     rysuje wykres punktowy - pokazuje zaleznosc miedzy dwoma zmiennymi
 
+    przy duzej liczbie punktow (DENSITY_THRESHOLD) zamiast punktow rysuje
+    mape gestosci w skali log - przeliczana od nowa po zoomie
+
     co bierze:
     - data: ramka pandas
     - x_column: kolumna na osi x
     - y_column: kolumna na osi y
     - title: tytul wykresu
+    - ax: osie do rysowania (None = nowa figura)
+    - density: None = automatycznie, True/False = wymus mape gestosci / punkty
 
     co zwraca:
     - obiekt figure
@@ -160,17 +208,31 @@ def create_scatter_plot(data, x_column, y_column, title=None):
         print("nie ma danych do narysowania po usunieciu brakow")
         return None
 
+    from utils.downsampling import add_density_image, DENSITY_THRESHOLD
+
+    numeric = (pd.api.types.is_numeric_dtype(clean_data[x_column])
+               and pd.api.types.is_numeric_dtype(clean_data[y_column]))
+    if density is None:
+        density = numeric and len(clean_data) > DENSITY_THRESHOLD
+
     try:
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = _prepare_axes(ax, (10, 6))
 
-        # rysujemy punkty
-        ax.scatter(clean_data[x_column], clean_data[y_column], alpha=0.7, color='blue')
+        if density:
+            # mapa gestosci zamiast milionow nakladajacych sie punktow
+            image = add_density_image(ax, clean_data[x_column].to_numpy(),
+                                      clean_data[y_column].to_numpy())
+            fig.colorbar(image, ax=ax, label='liczba punktow')
+        else:
+            # rysujemy punkty
+            ax.scatter(clean_data[x_column], clean_data[y_column], alpha=0.7, color='blue')
 
-        # dodajemy linie trendu
-        z = np.polyfit(clean_data[x_column], clean_data[y_column], 1)
-        p = np.poly1d(z)
-        ax.plot(clean_data[x_column], p(clean_data[x_column]), "r--", alpha=0.8,
-                label=f'trend: y={z[0]:.2f}x+{z[1]:.2f}')
+        # dodajemy linie trendu - prosta wyznaczona przez dwa konce zakresu x
+        slope, intercept = _linear_trend(clean_data[x_column].to_numpy(dtype=np.float64),
+                                         clean_data[y_column].to_numpy(dtype=np.float64))
+        x_ends = np.array([clean_data[x_column].min(), clean_data[x_column].max()])
+        ax.plot(x_ends, slope * x_ends + intercept, "r--", alpha=0.8,
+                label=f'trend: y={slope:.2f}x+{intercept:.2f}')
 
         # ustawiamy tytuly
         if title is None:
@@ -182,8 +244,9 @@ def create_scatter_plot(data, x_column, y_column, title=None):
         ax.legend()
         ax.grid(True, alpha=0.3)
 
-        plt.tight_layout()
-        print(f"narysowano scatter plot: {x_column} vs {y_column}")
+        fig.tight_layout()
+        mode = 'mapa gestosci' if density else 'punkty'
+        print(f"narysowano scatter plot: {x_column} vs {y_column} ({len(clean_data)} punktow, {mode})")
         return fig
 
     except Exception as error:
@@ -191,7 +254,29 @@ def create_scatter_plot(data, x_column, y_column, title=None):
         return None
 
 
-def create_correlation_heatmap(data, title='Mapa korelacji'):
+def _linear_trend(x, y):
+    """
+    prosta najmniejszych kwadratow (to samo co np.polyfit(x, y, 1), ale bez
+    budowania macierzy Vandermonde'a - duzo szybciej dla milionow punktow)
+
+    co zwraca:
+    - (nachylenie, wyraz wolny)
+    """
+    x_mean, y_mean = x.mean(), y.mean()
+    x_centered = x - x_mean
+    variance = np.dot(x_centered, x_centered)
+    slope = np.dot(x_centered, y - y_mean) / variance if variance > 0 else 0.0
+    return slope, y_mean - slope * x_mean
+
+
+# komorki mniejsze niz tyle pikseli nie dostaja liczb - i tak nie da sie ich czytac
+ANNOTATE_MIN_CELL_PIXELS = 24
+
+# ile najwyzej podpisow kolumn na osi - przy szerszych macierzach co n-ty
+MAX_TICK_LABELS = 50
+
+
+def create_correlation_heatmap(data, title='Mapa korelacji', ax=None, reorder=False):
     """
     rysuje mape ciepla korelacji - pokazuje jak zmienne sa ze soba powiazane
     czerwone = silna korelacja, niebieskie = slaba korelacja
@@ -199,6 +284,8 @@ def create_correlation_heatmap(data, title='Mapa korelacji'):
     co bierze:
     - data: ramka pandas
     - title: tytul wykresu
+    - ax: osie do rysowania (None = nowa figura)
+    - reorder: czy ustawic obok siebie podobne zmienne (grupowanie hierarchiczne)
 
     co zwraca:
     - obiekt figure
@@ -218,24 +305,76 @@ def create_correlation_heatmap(data, title='Mapa korelacji'):
     try:
         # liczymy korelacje
         correlation_matrix = numeric_data.corr()
+    except Exception as error:
+        print(f"nie udalo sie obliczyc korelacji: {error}")
+        return None
 
-        fig, ax = plt.subplots(figsize=(12, 10))
-
-        # rysujemy mape ciepla
-        heatmap = sns.heatmap(
-            correlation_matrix,
-            annot=True,  # pokazuj wartosci
-            fmt='.2f',   # format liczb
-            cmap='coolwarm',  # kolory od niebieskiego do czerwonego
-            center=0,    # wyśrodkuj na 0
-            square=True, # kwadratowe komorki
-            ax=ax
-        )
+    return draw_correlation_matrix(correlation_matrix, title=title, ax=ax, reorder=reorder)
+
+
+def draw_correlation_matrix(corr_matrix, title='Mapa korelacji', ax=None, reorder=False,
+                            annotate=None):
+    """
+    rysuje gotowa macierz korelacji jednym imshow (bez liczenia jej od nowa)
+
+    liczby w komorkach pojawiaja sie tylko gdy komorki sa wystarczajaco duze,
+    a podpisy osi sa przerzedzane - dzieki temu macierz 500x500 rysuje sie
+    tak samo szybko jak 10x10
+
+    co bierze:
+    - corr_matrix: macierz korelacji (ramka pandas)
+    - title: tytul wykresu
+    - ax: osie do rysowania (None = nowa figura)
+    - reorder: czy ustawic obok siebie podobne zmienne (grupowanie hierarchiczne)
+    - annotate: None = automatycznie wg rozmiaru komorek, True/False = wymus
+
+    co zwraca:
+    - obiekt figure
+    """
+
+    if corr_matrix is None or corr_matrix.empty:
+        print("brak macierzy korelacji do narysowania")
+        return None
+
+    try:
+        if reorder:
+            from utils.data_processor import reorder_correlation_matrix
+            corr_matrix = reorder_correlation_matrix(corr_matrix)
+
+        n = len(corr_matrix.columns)
+        fig, ax = _prepare_axes(ax, (12, 10))
+
+        # cala macierz jako jeden obrazek
+        values = corr_matrix.to_numpy(dtype=np.float64)
+        image = ax.imshow(values, cmap='coolwarm', vmin=-1, vmax=1, interpolation='nearest')
+        fig.colorbar(image, ax=ax, shrink=0.8)
+
+        # podpisy osi - przy duzej liczbie kolumn co n-ty
+        step = int(np.ceil(n / MAX_TICK_LABELS))
+        positions = np.arange(0, n, step)
+        labels = [str(corr_matrix.columns[i]) for i in positions]
+        ax.set_xticks(positions)
+        ax.set_yticks(positions)
+        ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=10 if n <= 20 else 7)
+        ax.set_yticklabels(labels, fontsize=10 if n <= 20 else 7)
+
+        # liczby tylko w komorkach, w ktorych da sie je przeczytac
+        cell_pixels = min(ax.bbox.width, ax.bbox.height) / n
+        if annotate is None:
+            annotate = cell_pixels >= ANNOTATE_MIN_CELL_PIXELS
+
+        if annotate:
+            fontsize = max(min(cell_pixels / 3.5, 10), 5)
+            rows, columns = np.indices(values.shape)
+            for row, column, value in zip(rows.ravel(), columns.ravel(), values.ravel()):
+                if not np.isnan(value):
+                    ax.text(column, row, f'{value:.2f}', ha='center', va='center',
+                            fontsize=fontsize, color='white' if abs(value) > 0.6 else 'black')
 
         ax.set_title(title, fontsize=16, fontweight='bold')
-        plt.tight_layout()
+        fig.tight_layout()
 
-        print("narysowano mape korelacji")
+        print(f"narysowano mape korelacji ({n}x{n})")
         return fig
 
     except Exception as error:
@@ -243,7 +382,135 @@ def create_correlation_heatmap(data, title='Mapa korelacji'):
         return None
 
 
-def create_bar_chart(data, x_column, y_column=None, title=None):
+# opisy statystyk na skali kolorow map cieplnych w czasie
+STAT_LABELS = {'mean': 'srednia', 'sum': 'suma', 'count': 'liczba pomiarow', 'min': 'minimum', 'max': 'maksimum'}
+
+
+def create_diurnal_heatmap(data, column_name, stat='mean', title=None, ax=None, pyramid=None, cache=None):
+    """
+    rysuje profil tygodniowy - dzien tygodnia x godzina (7 x 24) jako jeden obrazek
+
+    co bierze:
+    - data: ramka pandas z czasem (indeks czasowy, kolumna z datami albo Date/Time)
+    - column_name: ktora kolumne pokazac
+    - stat: 'mean', 'sum', 'count', 'min' albo 'max'
+    - title: tytul wykresu
+    - ax: osie do rysowania (None = nowa figura)
+    - pyramid: piramida agregatow z resampling.build_rollup_pyramid (opcjonalnie)
+    - cache: slownik na policzone siatki (jak w create_histogram)
+
+    co zwraca:
+    - obiekt figure
+    """
+
+    try:
+        from utils.resampling import diurnal_profile
+
+        key = ('profil', column_name, stat)
+        profile = cache.get(key) if cache is not None else None
+        if profile is None:
+            profile = diurnal_profile(data, column_name, stat, pyramid=pyramid)
+            if profile is None:
+                return None
+            if cache is not None:
+                cache[key] = profile
+
+        fig, ax = _prepare_axes(ax, (12, 5))
+
+        image = ax.imshow(profile.to_numpy(), cmap='YlOrRd', aspect='auto', interpolation='nearest')
+        fig.colorbar(image, ax=ax, label=STAT_LABELS.get(stat, stat))
+
+        ax.set_xticks(range(0, 24, 2))
+        ax.set_xticklabels([f'{hour}:00' for hour in range(0, 24, 2)])
+        ax.set_yticks(range(7))
+        ax.set_yticklabels(profile.index)
+        ax.set_xlabel('godzina')
+
+        if title is None:
+            title = f'Profil tygodniowy - {column_name}'
+        ax.set_title(title, fontsize=16, fontweight='bold')
+        fig.tight_layout()
+
+        print(f"narysowano profil tygodniowy dla {column_name}")
+        return fig
+
+    except Exception as error:
+        print(f"nie udalo sie narysowac profilu tygodniowego: {error}")
+        return None
+
+
+def create_calendar_heatmap(data, column_name, stat='mean', title=None, ax=None, pyramid=None, cache=None):
+    """
+    rysuje kalendarz - kazdy dzien to kratka, lata jeden pod drugim, wszystko jednym imshow
+
+    co bierze:
+    - data: ramka pandas z czasem (indeks czasowy, kolumna z datami albo Date/Time)
+    - column_name: ktora kolumne pokazac
+    - stat: statystyka dzienna ('mean', 'sum', 'count', 'min', 'max')
+    - title: tytul wykresu
+    - ax: osie do rysowania (None = nowa figura)
+    - pyramid: piramida agregatow z resampling.build_rollup_pyramid (opcjonalnie)
+    - cache: slownik na policzone siatki (jak w create_histogram)
+
+    co zwraca:
+    - obiekt figure
+    """
+
+    try:
+        from utils.resampling import calendar_grid, WEEKDAY_LABELS, MONTH_LABELS
+
+        key = ('kalendarz', column_name, stat)
+        result = cache.get(key) if cache is not None else None
+        if result is None:
+            result = calendar_grid(data, column_name, stat, pyramid=pyramid)
+            if result is None:
+                return None
+            if cache is not None:
+                cache[key] = result
+
+        grid, years = result
+        n_years, n_weekdays, n_weeks = grid.shape
+
+        # lata jeden pod drugim, miedzy nimi pusty wiersz
+        stacked = np.full((n_years, n_weekdays + 1, n_weeks), np.nan)
+        stacked[:, :n_weekdays] = grid
+        stacked = stacked.reshape(-1, n_weeks)[:-1]
+
+        fig, ax = _prepare_axes(ax, (14, min(2 + 1.5 * n_years, 12)))
+
+        image = ax.imshow(stacked, cmap='YlOrRd', aspect='auto', interpolation='nearest')
+        fig.colorbar(image, ax=ax, label=STAT_LABELS.get(stat, stat), shrink=0.8)
+
+        # lata na osi y (przy jednym roku - dni tygodnia)
+        if n_years == 1:
+            ax.set_yticks(range(n_weekdays))
+            ax.set_yticklabels(WEEKDAY_LABELS)
+            ax.set_ylabel(str(years[0]))
+        else:
+            ax.set_yticks(np.arange(n_years) * (n_weekdays + 1) + n_weekdays / 2 - 0.5)
+            ax.set_yticklabels([str(year) for year in years])
+
+        # poczatki miesiecy - tydzien, w ktorym wypada 1. dzien miesiaca
+        month_starts = np.arange(f'{years[0]}-01', f'{years[0] + 1}-01', dtype='datetime64[M]')
+        first_days = month_starts.astype('datetime64[D]').astype(np.int64)
+        year_start = first_days[0]
+        ax.set_xticks((first_days - year_start + (year_start + 3) % 7) // 7)
+        ax.set_xticklabels(MONTH_LABELS)
+
+        if title is None:
+            title = f'Kalendarz - {column_name}'
+        ax.set_title(title, fontsize=16, fontweight='bold')
+        fig.tight_layout()
+
+        print(f"narysowano kalendarz dla {column_name} ({years[0]}-{years[-1]})")
+        return fig
+
+    except Exception as error:
+        print(f"nie udalo sie narysowac kalendarza: {error}")
+        return None
+
+
+def create_bar_chart(data, x_column, y_column=None, title=None, ax=None):
     """
     rysuje wykres slupkowy - pokazuje wartosci dla roznych kategorii
 
@@ -252,6 +519,7 @@ def create_bar_chart(data, x_column, y_column=None, title=None):
     - x_column: kolumna z kategoriami
     - y_column: kolumna z wartosciami (None = liczy wystapienia)
     - title: tytul wykresu
+    - ax: osie do rysowania (None = nowa figura)
 
     co zwraca:
     - obiekt figure
@@ -262,7 +530,7 @@ def create_bar_chart(data, x_column, y_column=None, title=None):
         return None
 
     try:
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = _prepare_axes(ax, (10, 6))
 
         if y_column is None:
             # liczymy wystapienia kategorii
@@ -300,9 +568,9 @@ def create_bar_chart(data, x_column, y_column=None, title=None):
 
         # obracamy etykiety jak jest ich duzo
         if len(x_values) > 5:
-            plt.xticks(rotation=45)
+            ax.tick_params(axis='x', labelrotation=45)
 
-        plt.tight_layout()
+        fig.tight_layout()
         print(f"narysowano wykres slupkowy dla {x_column}")
         return fig
 
@@ -311,7 +579,7 @@ def create_bar_chart(data, x_column, y_column=None, title=None):
         return None
 
 
-def create_pie_chart(data, column_name, title=None, max_categories=8):
+def create_pie_chart(data, column_name, title=None, max_categories=8, ax=None):
     """
     rysuje wykres kolowy - pokazuje udzialy procentowe kategorii
 
@@ -320,6 +588,7 @@ def create_pie_chart(data, column_name, title=None, max_categories=8):
     - column_name: ktora kolumne narysowac
     - title: tytul wykresu
     - max_categories: maksymalna liczba kategorii (reszta w "inne")
+    - ax: osie do rysowania (None = nowa figura)
 
     co zwraca:
     - obiekt figure
@@ -340,7 +609,7 @@ def create_pie_chart(data, column_name, title=None, max_categories=8):
             value_counts = top_categories
             value_counts['Inne'] = others_sum
 
-        fig, ax = plt.subplots(figsize=(10, 8))
+        fig, ax = _prepare_axes(ax, (10, 8))
 
         # rysujemy wykres kolowy
         wedges, texts, autotexts = ax.pie(
@@ -348,7 +617,7 @@ def create_pie_chart(data, column_name, title=None, max_categories=8):
             labels=value_counts.index,
             autopct='%1.1f%%',
             startangle=90,
-            colors=plt.cm.Set3.colors  # ladne kolory
+            colors=matplotlib.colormaps['Set3'].colors  # ladne kolory
         )
 
         # ustawiamy styl tekstu
@@ -362,7 +631,7 @@ def create_pie_chart(data, column_name, title=None, max_categories=8):
 
         ax.set_title(title, fontsize=14, fontweight='bold')
 
-        plt.tight_layout()
+        fig.tight_layout()
         print(f"narysowano wykres kolowy dla {column_name}")
         return fig
 
@@ -371,15 +640,21 @@ def create_pie_chart(data, column_name, title=None, max_categories=8):
         return None
 
 
-def create_line_plot(data, x_column, y_column, title=None):
+def create_line_plot(data, x_column, y_column, title=None, ax=None, downsample=True):
     """
     rysuje wykres liniowy - dobry dla szeregów czasowych
 
+    dlugie serie sa zmniejszane do ok. 2 punktow na piksel (min/max w kubelkach,
+    piki zostaja), a przy zoomie/przesuwaniu punkty wybierane sa od nowa
+    z widocznego zakresu - patrz utils/downsampling.py
+
     co bierze:
     - data: ramka pandas
     - x_column: kolumna na osi x (czesto data/czas)
     - y_column: kolumna na osi y (wartosci)
     - title: tytul wykresu
+    - ax: osie do rysowania (None = nowa figura)
+    - downsample: czy zmniejszac liczbe punktow (False = rysuj wszystko)
 
     co zwraca:
     - obiekt figure
@@ -389,19 +664,43 @@ def create_line_plot(data, x_column, y_column, title=None):
         print(f"nie ma kolumn {x_column} lub {y_column}")
         return None
 
+    from utils.downsampling import (plot_axis_values, min_max_downsample,
+                                    attach_line_lod, POINTS_PER_PIXEL, MARKER_LIMIT)
+
+    # daty zapisane jako tekst zamieniamy na daty - inaczej os x to kategorie
+    x_values = plot_axis_values(data[x_column])
+    use_lod = (downsample and x_values is not None
+               and pd.api.types.is_numeric_dtype(data[y_column]))
+
     # bierzemy dane bez brakow i sortujemy po x
-    clean_data = data[[x_column, y_column]].dropna().sort_values(x_column)
+    if use_lod:
+        clean_data = pd.DataFrame({x_column: x_values, y_column: data[y_column]})
+        clean_data = clean_data.dropna().sort_values(x_column, kind='stable')
+    else:
+        clean_data = data[[x_column, y_column]].dropna().sort_values(x_column)
 
     if len(clean_data) == 0:
         print("nie ma danych do narysowania")
         return None
 
     try:
-        fig, ax = plt.subplots(figsize=(12, 6))
-
-        # rysujemy linie
-        ax.plot(clean_data[x_column], clean_data[y_column],
-                color='blue', linewidth=2, marker='o', markersize=4)
+        fig, ax = _prepare_axes(ax, (12, 6))
+
+        if use_lod:
+            x = clean_data[x_column].to_numpy()
+            y = clean_data[y_column].to_numpy(dtype=np.float64)
+
+            # na start caly zakres - min/max zachowuje skrajne wartosci dla autoskali
+            n_pixels = max(int(ax.bbox.width), 100)
+            indices = min_max_downsample(x, y, n_pixels * POINTS_PER_PIXEL // 2)
+            line, = ax.plot(x[indices], y[indices], color='blue', linewidth=2,
+                            marker='o' if len(indices) <= MARKER_LIMIT else 'None',
+                            markersize=4)
+            attach_line_lod(ax, line, x, y)
+        else:
+            # rysujemy linie
+            ax.plot(clean_data[x_column], clean_data[y_column],
+                    color='blue', linewidth=2, marker='o', markersize=4)
 
         # ustawiamy tytuly
         if title is None:
@@ -413,10 +712,10 @@ def create_line_plot(data, x_column, y_column, title=None):
         ax.grid(True, alpha=0.3)
 
         # obracamy etykiety dat
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        ax.tick_params(axis='x', labelrotation=45)
+        fig.tight_layout()
 
-        print(f"narysowano wykres liniowy: {x_column} vs {y_column}")
+        print(f"narysowano wykres liniowy: {x_column} vs {y_column} ({len(clean_data)} punktow)")
         return fig
 
     except Exception as error:
@@ -424,6 +723,234 @@ def create_line_plot(data, x_column, y_column, title=None):
         return None
 
 
+# ile paneli miesci sie w jednej siatce (wiecej = nieczytelne)
+MAX_FACETS = 64
+
+
+def create_facet_grid(data, y_columns, x_column=None, facet_column=None, kind='line',
+                      title=None, fig=None, ncols=None, sharey=None, bins=30):
+    """
+    rysuje siatke malych wykresow (small multiples) na jednej figurze
+
+    panel na kazda kolumne z y_columns (np. 13 zanieczyszczen) albo na kazda
+    wartosc facet_column (np. 50 stacji, wtedy rysujemy y_columns[0]).
+    Dane dzielimy na panele jednym sortowaniem, osie sa wspolne (wspolny lokator
+    podzialek, podpisy tylko na brzegach), a kazda linia jest zmniejszana do
+    szerokosci swojego panelu w pikselach jak w create_line_plot
+
+    co bierze:
+    - data: ramka pandas
+    - y_columns: kolumna albo lista kolumn z wartosciami
+    - x_column: kolumna osi x dla linii (None = czas z Date/Time albo numer wiersza)
+    - facet_column: kolumna dzielaca na panele (None = panel na kolumne)
+    - kind: 'line' albo 'histogram'
+    - title: tytul calej figury
+    - fig: figura do rysowania (np. z plotna w GUI - zostanie wyczyszczona),
+      None = nowa figura
+    - ncols: liczba kolumn siatki (None = mniej wiecej kwadrat)
+    - sharey: wspolna os y (None = tak przy podziale po facet_column)
+    - bins: liczba przedzialow histogramu
+
+    co zwraca:
+    - obiekt figure
+    """
+
+    if data is None:
+        print("brak danych do siatki wykresow")
+        return None
+
+    y_columns = [y_columns] if isinstance(y_columns, str) else list(y_columns)
+    missing = [c for c in y_columns + [x_column, facet_column] if c is not None and c not in data.columns]
+    if missing or not y_columns:
+        print(f"nie ma kolumn: {missing}")
+        return None
+
+    if kind not in ('line', 'histogram'):
+        print(f"nieznany rodzaj siatki: {kind}")
+        return None
+
+    try:
+        from utils.downsampling import attach_line_lod, min_max_downsample, POINTS_PER_PIXEL
+
+        x = _facet_x_values(data, x_column) if kind == 'line' else None
+        panels, values = _facet_panels(data, y_columns, facet_column, x)
+        if not panels:
+            print("nie ma danych do narysowania")
+            return None
+
+        if len(panels) > MAX_FACETS:
+            print(f"za duzo paneli ({len(panels)}) - rysujemy pierwsze {MAX_FACETS}")
+            panels = panels[:MAX_FACETS]
+
+        n = len(panels)
+        ncols = ncols or int(np.ceil(np.sqrt(n)))
+        nrows = int(np.ceil(n / ncols))
+        if sharey is None:
+            sharey = facet_column is not None
+        # przy panelach z roznych kolumn histogramy maja rozne jednostki na x
+        sharex = kind == 'line' or facet_column is not None
+
+        if fig is None:
+            fig = Figure(figsize=(min(4 * ncols, 20), min(2.5 * nrows + 1, 16)))
+        else:
+            fig.clear()
+        axes = fig.subplots(nrows, ncols, sharex=sharex, sharey=sharey, squeeze=False).ravel()
+
+        if kind == 'histogram':
+            counts, edges = _facet_histograms(panels, values, facet_column is not None, bins)
+            for ax, (label, _), panel_counts, panel_edges in zip(axes, panels, counts, edges):
+                ax.stairs(panel_counts, panel_edges, fill=True, color='skyblue', edgecolor='black',
+                          linewidth=0.5)
+                ax.set_title(str(label), fontsize=9, pad=2)
+        else:
+            # daty jako liczby matplotlib - linie dodajemy bez autoskalowania,
+            # bo przy wspolnych osiach kazde ax.plot przeliczaloby zakres wszystkich paneli
+            if np.issubdtype(x.dtype, np.datetime64):
+                import matplotlib.dates as mdates
+                x = mdates.date2num(x)
+                axes[0].xaxis_date()
+
+            n_pixels = max(int(fig.get_figwidth() * fig.dpi / ncols), 50)
+            lines = []
+            for ax, (label, rows) in zip(axes, panels):
+                panel_x, panel_y = x[rows], values[label][rows]
+                indices = min_max_downsample(panel_x, panel_y, n_pixels * POINTS_PER_PIXEL // 2)
+                line = Line2D(panel_x[indices], panel_y[indices], color='blue', linewidth=0.8)
+                ax.add_line(line)
+                lines.append((ax, line, panel_x, panel_y))
+                ax.set_title(str(label), fontsize=9, pad=2)
+
+            # zakresy ustawiamy raz (wspolne osie dostaja je od razu wszystkie)
+            axes[0].set_xlim(min(panel_x[0] for _, _, panel_x, _ in lines),
+                             max(panel_x[-1] for _, _, panel_x, _ in lines))
+            y_ranges = [(panel_y.min(), panel_y.max()) for _, _, _, panel_y in lines]
+            if sharey:
+                y_ranges = [(min(r[0] for r in y_ranges), max(r[1] for r in y_ranges))]
+            for ax, (low, high) in zip(axes, y_ranges):
+                margin = max(high - low, 1e-9) * 0.05
+                ax.set_ylim(low - margin, high + margin)
+
+            # LOD dopiero przy gotowych zakresach - kazdy panel przelicza sie raz
+            for ax, line, panel_x, panel_y in lines:
+                attach_line_lod(ax, line, panel_x, panel_y)
+
+        for position, ax in enumerate(axes):
+            if position >= n:
+                ax.set_visible(False)
+                continue
+
+            ax.tick_params(labelsize=7)
+            ax.grid(True, alpha=0.3)
+            # podpisy osi x tylko pod ostatnim panelem w kolumnie (subplots chowa je
+            # tylko w dolnym wierszu siatki, a ten moze byc niepelny)
+            if sharex and position + ncols < n:
+                ax.tick_params(labelbottom=False)
+            else:
+                ax.tick_params(axis='x', labelbottom=True, labelrotation=45)
+
+        if title is None:
+            title = f'Porownanie {n} kolumn' if facet_column is None else f'{y_columns[0]} wg {facet_column}'
+        fig.suptitle(title, fontsize=14, fontweight='bold')
+
+        # stale marginesy zamiast tight_layout - przy 50 panelach tight_layout liczy wszystkie napisy
+        fig.subplots_adjust(left=0.06, right=0.98, bottom=0.1, top=0.9,
+                            wspace=0.1 if sharey else 0.3, hspace=0.4)
+
+        print(f"narysowano siatke {nrows}x{ncols} ({n} paneli)")
+        return fig
+
+    except Exception as error:
+        print(f"nie udalo sie narysowac siatki wykresow: {error}")
+        return None
+
+
+def _facet_x_values(data, x_column):
+    """pomocnicza - os x dla paneli liniowych (numpy: liczby albo datetime64)"""
+    from utils.downsampling import plot_axis_values
+    from utils.resampling import parse_timestamps
+
+    if x_column is not None:
+        x_values = plot_axis_values(data[x_column])
+    elif isinstance(data.index, pd.DatetimeIndex):
+        x_values = pd.Series(data.index)
+    else:
+        x_values = parse_timestamps(data)
+
+    if x_values is None:
+        return np.arange(len(data), dtype=np.float64)
+    return x_values.to_numpy()
+
+
+def _facet_panels(data, y_columns, facet_column, x):
+    """
+    pomocnicza - dzieli wiersze na panele jednym sortowaniem
+
+    zwraca (lista (podpis, numery wierszy), slownik podpis -> wartosci y);
+    numery wierszy w panelu sa posortowane po x
+    """
+
+    def numeric(column):
+        return pd.to_numeric(data[column], errors='coerce').to_numpy(dtype=np.float64)
+
+    x_valid = np.ones(len(data), dtype=bool) if x is None else ~pd.isna(x)
+
+    if facet_column is None:
+        # panel na kolumne - jedno sortowanie po x dla wszystkich
+        order = np.flatnonzero(x_valid)
+        if x is not None:
+            order = order[np.argsort(x[order], kind='stable')]
+
+        panels, values = [], {}
+        for column in y_columns:
+            y = numeric(column)
+            rows = order[~np.isnan(y[order])]
+            if len(rows):
+                panels.append((column, rows))
+                values[column] = y
+        return panels, values
+
+    # panel na grupe - sortujemy po (grupa, x) i tniemy w granicach grup
+    y = numeric(y_columns[0])
+    codes, groups = pd.factorize(data[facet_column], sort=True)
+    rows = np.flatnonzero((codes >= 0) & ~np.isnan(y) & x_valid)
+
+    if x is None or np.all(x[rows][1:] >= x[rows][:-1]):
+        # x juz rosnie (typowo czas) - wystarczy stabilne sortowanie po malych
+        # liczbach calkowitych, ktore numpy robi pozycyjnie (radix) w O(n)
+        small_codes = codes[rows].astype(np.int16 if len(groups) < 2 ** 15 else np.int64)
+        rows = rows[np.argsort(small_codes, kind='stable')]
+    else:
+        rows = rows[np.lexsort((x[rows], codes[rows]))]
+
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes[rows], minlength=len(groups)))])
+    panels = [(group, rows[bounds[g]:bounds[g + 1]]) for g, group in enumerate(groups)
+              if bounds[g + 1] > bounds[g]]
+    return panels, {group: y for group, _ in panels}
+
+
+def _facet_histograms(panels, values, shared_bins, bins):
+    """
+    pomocnicza - histogramy paneli; przy wspolnych przedzialach jeden np.bincount
+    po (panel, przedzial) zamiast osobnego histogramu dla kazdego panelu
+    """
+
+    if not shared_bins:
+        results = [np.histogram(values[label][rows], bins=bins) for label, rows in panels]
+        return [r[0] for r in results], [r[1] for r in results]
+
+    y = values[panels[0][0]]
+    all_rows = np.concatenate([rows for _, rows in panels])
+    low, high = y[all_rows].min(), y[all_rows].max()
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    edges = np.linspace(low, high, bins + 1)
+
+    panel_codes = np.repeat(np.arange(len(panels)), [len(rows) for _, rows in panels])
+    bin_codes = np.clip(((y[all_rows] - low) / (high - low) * bins).astype(np.int64), 0, bins - 1)
+    counts = np.bincount(panel_codes * bins + bin_codes, minlength=len(panels) * bins)
+    return list(counts.reshape(len(panels), bins)), [edges] * len(panels)
+
+
 def save_plot(figure, filename, dpi=300):
     """
     zapisuje wykres do pliku